@@ -6,6 +6,7 @@ from sqlalchemy import select, func, extract
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
 from datetime import datetime, timedelta
+import asyncio
 import json
 import base64
 
@@ -1174,7 +1175,7 @@ async def get_telemetry(current_user: User = Depends(get_current_user)):
     if not metrics_collector:
         return {"available": False, "error": "Monitoring modülü yüklü değil"}
     try:
-        telemetry = await get_full_telemetry()
+        telemetry = await asyncio.to_thread(get_full_telemetry, metrics_collector)
         return {"available": True, **telemetry}
     except Exception as e:
         return {"available": False, "error": str(e)}
@@ -3859,4 +3860,32 @@ async def security_dashboard(current_user: User = Depends(get_current_user)):
     try:
         return {"available": True, **security_layer.get_dashboard()}
     except Exception as e:
-        return {"available": True, "error": str(e)}
\ No newline at end of file
+        return {"available": True, "error": str(e)}
+
+# ── v7.27.00: Sorgu Aşama Latency (Span Tracing) ──────────────
+
+@router.get("/stage-latency")
+async def stage_latency_dashboard(
+    limit: int = 20,
+    min_total_ms: float = 0.0,
+    current_user: User = Depends(get_current_user),
+):
+    """Aşama başına p50/p95/p99 + son ve en yavaş sorgu trace'leri."""
+    check_admin_or_manager(current_user)
+    from app.core.stage_tracing import stage_tracer
+    return {
+        **stage_tracer.stats(),
+        "recent": stage_tracer.recent(limit=limit, min_total_ms=min_total_ms),
+        "slowest": stage_tracer.slowest(limit=limit),
+    }
+
+
+@router.get("/stage-latency/traces/{trace_id}")
+async def stage_latency_trace(trace_id: str, current_user: User = Depends(get_current_user)):
+    """Tek sorgunun flame-style kırılımı — span listesi + katlanmış yığınlar."""
+    check_admin_or_manager(current_user)
+    from app.core.stage_tracing import stage_tracer
+    trace = stage_tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace bulunamadı")
+    return trace
@@ -34,6 +34,7 @@ logger = structlog.get_logger()
 try:
     from app.core.document_analyzer import (
         parse_file_to_dataframe,
+        ColumnProfile,
         discover_data,
         create_pivot,
         smart_pivot,
@@ -62,6 +63,9 @@ try:
 except ImportError:
     INSIGHT_AVAILABLE = False
 
+# Akışlı Excel/CSV okuma (v7.31.00) — tablo yüklemeleri belleğe tek parça alınmaz
+from app.core.tabular_ingest import read_upload, source_bytes, source_size
+
 # Dosya çıkarıcı (documents.py'den)
 try:
     from app.api.routes.documents import extract_text_from_file
@@ -347,8 +351,8 @@ async def upload_and_analyze(
     start_time = time.time()
     
     try:
-        file_content = await file.read()
-        if not file_content:
+        file_content = await read_upload(file)
+        if not source_size(file_content):
             raise HTTPException(status_code=400, detail="Dosya boş")
         
         filename = file.filename or "unknown"
@@ -360,10 +364,13 @@ async def upload_and_analyze(
         # 2. DataFrame başarılıysa tablolu analiz
         if df is not None and not df.empty:
             # Cache'e al
-            discovery = discover_data(df)
+            # Sütun profili bir kez hesaplanır, cache'teki tüm analizler paylaşır
+            profile = ColumnProfile(df)
+            discovery = discover_data(df, profile)
             _cache_analysis(current_user.id, filename, {
                 "df": df,
                 "discovery": discovery,
+                "profile": profile,
                 "filename": filename,
                 "uploaded_at": time.time(),
             })
@@ -374,6 +381,7 @@ async def upload_and_analyze(
                 analysis_type=analysis_type,
                 question=question,
                 filename=filename,
+                profile=profile,
             )
             
             # LLM'den analiz al
@@ -430,7 +438,7 @@ async def upload_and_analyze(
             text_content, doc_type = extract_text_from_file(filename, file_content)
         else:
             try:
-                text_content = file_content.decode('utf-8')
+                text_content = source_bytes(file_content).decode('utf-8')
                 doc_type = "text"
             except Exception:
                 raise HTTPException(status_code=400, detail="Dosya okunamadı")
@@ -498,8 +506,8 @@ async def upload_and_analyze_stream(
     
     start_time = time.time()
     
-    file_content = await file.read()
-    if not file_content:
+    file_content = await read_upload(file)
+    if not source_size(file_content):
         raise HTTPException(status_code=400, detail="Dosya boş")
     
     filename = file.filename or "unknown"
@@ -508,13 +516,16 @@ async def upload_and_analyze_stream(
     df = parse_file_to_dataframe(filename, file_content)
     
     if df is not None and not df.empty:
-        discovery = discover_data(df)
+        profile = ColumnProfile(df)
+        discovery = discover_data(df, profile)
         _cache_analysis(current_user.id, filename, {
-            "df": df, "discovery": discovery, "filename": filename, "uploaded_at": time.time(),
+            "df": df, "discovery": discovery, "profile": profile,
+            "filename": filename, "uploaded_at": time.time(),
         })
         
         analysis_prompt = format_analysis_for_llm(
             df=df, analysis_type=analysis_type, question=question, filename=filename,
+            profile=profile,
         )
         data_info = {
             "rows": discovery["row_count"],
@@ -526,7 +537,7 @@ async def upload_and_analyze_stream(
         if EXTRACTOR_AVAILABLE:
             text_content, doc_type = extract_text_from_file(filename, file_content)
         else:
-            text_content = file_content.decode('utf-8', errors='ignore')
+            text_content = source_bytes(file_content).decode('utf-8', errors='ignore')
             doc_type = "text"
         
         analysis_prompt = format_analysis_for_llm(
@@ -589,13 +600,13 @@ async def discover_uploaded_file(
     if not ANALYZER_AVAILABLE:
         raise HTTPException(status_code=503, detail="Analiz modülü kullanılamıyor")
     
-    file_content = await file.read()
+    file_content = await read_upload(file)
     df = parse_file_to_dataframe(file.filename, file_content)
     
     if df is None or df.empty:
         # Metin bazlı — basit bilgi döndür
         try:
-            text = file_content.decode('utf-8', errors='ignore')
+            text = source_bytes(file_content).decode('utf-8', errors='ignore')
         except Exception:
             text = ""
         
@@ -609,9 +620,11 @@ async def discover_uploaded_file(
             "available_analyses": ["full", "summary", "recommend", "report"],
         }
     
-    discovery = discover_data(df)
+    profile = ColumnProfile(df)
+    discovery = discover_data(df, profile)
     _cache_analysis(current_user.id, file.filename, {
-        "df": df, "discovery": discovery, "filename": file.filename, "uploaded_at": time.time(),
+        "df": df, "discovery": discovery, "profile": profile,
+        "filename": file.filename, "uploaded_at": time.time(),
     })
     
     # Hangi analizler yapılabilir?
@@ -675,7 +688,7 @@ async def create_pivot_table(
             aggfunc=request.aggfunc,
         )
     else:
-        result = smart_pivot(df)
+        result = smart_pivot(df, profile=cached.get("profile"))
     
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error", "Pivot oluşturulamadı"))
@@ -720,6 +733,7 @@ async def query_data(
         analysis_type="full",
         question=request.question,
         filename=cached["filename"],
+        profile=cached.get("profile"),
     )
     
     system_prompt = """Sen bir veri analistisin. Verilen soruyu verilere dayanarak yanıtla. 
@@ -756,7 +770,7 @@ async def get_statistics(
         raise HTTPException(status_code=404, detail="Önce bir dosya yükleyin")
     
     df = cached["df"]
-    stats = statistical_analysis(df)
+    stats = statistical_analysis(df, cached.get("profile"))
     
     # v3.9.0 — Otomatik insight ekleme
     auto_insights = None
@@ -1,5 +1,6 @@
 """AI Soru-Cevap API Routes"""
 
+import asyncio
 import time
 import json as _json
 from fastapi import APIRouter, Depends, HTTPException, Request
@@ -36,11 +37,13 @@ except ImportError:
 
 # RAG modülü
 try:
-    from app.rag.vector_store import search_documents as rag_search_documents
+    from app.rag.vector_store import async_search_documents as rag_search_documents
     RAG_AVAILABLE = True
 except ImportError:
     RAG_AVAILABLE = False
-    rag_search_documents = lambda q, n=3: []
+
+    async def rag_search_documents(q, n_results=3):
+        return []
 
 # Otomatik öğrenme motoru
 try:
@@ -101,6 +104,7 @@ class AskResponse(BaseModel):
     risk_level: str
     confidence: float
     processing_time_ms: int
+    cache_hit: bool = False  # v7.23.00: yanıt LLM cache'inden geldi
 
 
 @router.post("/ask", response_model=AskResponse)
@@ -225,6 +229,7 @@ async def ask_ai(
             risk_level=result["risk"],
             confidence=result["confidence"],
             processing_time_ms=processing_time,
+            cache_hit=bool((result.get("llm_cache") or {}).get("hit")),
         )
         
     except Exception as e:
@@ -336,7 +341,7 @@ async def ask_ai_stream(
     stream_rag_docs = []
     if RAG_AVAILABLE:
         try:
-            raw_docs = rag_search_documents(request.question, n_results=5)
+            raw_docs = await rag_search_documents(request.question, n_results=5)
             if raw_docs:
                 for doc in raw_docs:
                     hybrid = doc.get('relevance', 0)
@@ -371,7 +376,6 @@ async def ask_ai_stream(
 
         if should_search:
             try:
-                import asyncio
                 web_text, rich_data = await search_and_summarize(request.question)
                 if web_text:
                     web_results_text = web_text
@@ -438,7 +442,6 @@ async def ask_ai_stream(
 
         # ── OTOMATİK ÖĞRENME — Arka planda öğren, stream'i yavaşlatma ──
         if KNOWLEDGE_EXTRACTOR_AVAILABLE:
-            import asyncio
             try:
                 _user_name = current_user.full_name or current_user.email.split("@")[0]
                 asyncio.get_event_loop().run_in_executor(
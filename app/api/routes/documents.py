@@ -8,15 +8,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
+import asyncio
 import io
 import json
 import re
+import uuid
 import structlog
 
 from app.db.database import get_db
 from app.db.models import User
 from app.api.routes.auth import get_current_user
 from app.auth.jwt_handler import verify_password
+from app.core.ingest_jobs import get_ingest_queue
+from app.core.tabular_ingest import iter_text_rows, source_bytes, source_size
 
 logger = structlog.get_logger()
 
@@ -156,7 +160,6 @@ SUPPORTED_FORMATS = {
 # v6.02.00: PDF GÖRSEL ÇIKARMA — app.rag.pdf_images modülünden import
 # ═══════════════════════════════════════════════════════════════
 from app.rag.pdf_images import (
-    extract_pdf_images,
     get_pdf_images_for_pages,
     get_all_pdf_images,
     PDF_IMAGES_DIR,
@@ -229,25 +232,39 @@ def parse_user_departments(department_str: str) -> List[str]:
         return [department_str]
 
 
-def extract_text_from_file(filename: str, file_content: bytes) -> tuple:
-    """Dosyadan metin çıkar - Genişletilmiş format desteği"""
-    filename_lower = filename.lower()
+def _log_ingest_progress(event: dict):
+    logger.debug("tabular_ingest_progress", **event)
+
+
+def _detect_format(filename: str) -> tuple:
+    """(uzantı, doküman tipi) — desteklenmiyorsa (None, None)."""
+    filename_lower = (filename or "").lower()
+    for e in SUPPORTED_FORMATS:
+        if filename_lower.endswith(e):
+            return e, SUPPORTED_FORMATS[e]
+    return None, None
+
+
+_UNSUPPORTED_FORMAT_DETAIL = (
+    f"Desteklenmeyen dosya formatı. Desteklenen formatlar: {', '.join(SUPPORTED_FORMATS.keys())}"
+)
+
+
+def extract_text_from_file(filename: str, file_content) -> tuple:
+    """Dosyadan metin çıkar - Genişletilmiş format desteği
+
+    file_content: bytes veya (Excel/CSV için) dosya tutamacı.
+    """
     content = ""
-    doc_type = "text"
     
     # Uzantıyı bul
-    ext = None
-    for e in SUPPORTED_FORMATS:
-        if filename_lower.endswith(e):
-            ext = e
-            doc_type = SUPPORTED_FORMATS[e]
-            break
+    ext, doc_type = _detect_format(filename)
     
     if ext is None:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Desteklenmeyen dosya formatı. Desteklenen formatlar: {', '.join(SUPPORTED_FORMATS.keys())}"
-        )
+        raise HTTPException(status_code=400, detail=_UNSUPPORTED_FORMAT_DETAIL)
+    
+    if doc_type not in ('csv', 'excel'):
+        file_content = source_bytes(file_content)
     
     try:
         # ── Metin tabanlı dosyalar ──
@@ -267,40 +284,19 @@ def extract_text_from_file(filename: str, file_content: bytes) -> tuple:
                 content = file_content.decode('latin-1', errors='ignore')
         
         # ── CSV / TSV ── (v5.10.1: RAG-optimized row-by-row extraction)
+        # v7.31.00: parça parça okunur (tabular_ingest), ayraç örnekten tespit edilir
         elif doc_type == 'csv':
             try:
-                import pandas as pd
-                df = None
-                for sep in [',', ';', '\t', '|']:
-                    try:
-                        df = pd.read_csv(io.BytesIO(file_content), sep=sep, encoding='utf-8')
-                        if len(df.columns) > 1:
-                            break
-                    except Exception:
-                        continue
-                if df is None:
-                    df = pd.read_csv(io.BytesIO(file_content), encoding='utf-8')
-                
-                columns = [str(c).strip() for c in df.columns]
-                all_rows_text = []
-                for idx, row in df.iterrows():
-                    parts = []
-                    for col in columns:
-                        val = row[col]
-                        if pd.notna(val):
-                            val_str = str(val).strip()
-                            if val_str:
-                                parts.append(f"{col}: {val_str}")
-                    if parts:
-                        all_rows_text.append(f"{filename} | Satır {idx + 1}: {', '.join(parts)}")
+                all_rows_text = list(iter_text_rows(filename, file_content, on_progress=_log_ingest_progress))
                 content = "\n".join(all_rows_text)
                 logger.info("csv_rag_extracted", filename=filename, rows=len(all_rows_text))
             except Exception:
                 # Fallback: ham metin olarak oku
+                raw = source_bytes(file_content)
                 try:
-                    content = file_content.decode('utf-8')
+                    content = raw.decode('utf-8')
                 except UnicodeDecodeError:
-                    content = file_content.decode('latin-1', errors='ignore')
+                    content = raw.decode('latin-1', errors='ignore')
         
         # ── PDF ──
         elif doc_type == 'pdf':
@@ -348,42 +344,23 @@ def extract_text_from_file(filename: str, file_content: bytes) -> tuple:
                     logger.warning("pypdf2_failed", filename=filename, error=str(e))
             
             # 3) Hiçbiri çalışmazsa — görüntü tabanlı PDF → OCR ile dene
+            # v7.33.00: sayfa paralel OCR (ham pixmap, uyarlanır DPI, boş sayfa atlama, sayfa önbelleği)
             if not content.strip():
                 try:
-                    import fitz  # PyMuPDF
-                    from PIL import Image
+                    from app.core.pdf_ocr import iter_pdf_ocr_pages, pdf_page_count
                     
-                    pdf_doc = fitz.open(stream=file_content, filetype="pdf")
-                    page_count = len(pdf_doc)
+                    page_count = pdf_page_count(file_content)
                     file_size_mb = round(len(file_content) / 1024 / 1024, 1)
                     
                     logger.info("pdf_ocr_starting", filename=filename, 
                                 pages=page_count, size_mb=file_size_mb)
                     
-                    ocr_reader = _get_ocr_reader() if EASYOCR_AVAILABLE else None
-                    
-                    if ocr_reader:
+                    if EASYOCR_AVAILABLE:
                         pages_text = []
-                        for page_num in range(page_count):
-                            page = pdf_doc[page_num]
-                            # Sayfayı 200 DPI resme çevir (hız/kalite dengesi)
-                            mat = fitz.Matrix(200/72, 200/72)
-                            pix = page.get_pixmap(matrix=mat)
-                            img_bytes = pix.tobytes("png")
-                            
-                            # EasyOCR ile metin çıkar
-                            try:
-                                results = ocr_reader.readtext(img_bytes, detail=0, paragraph=True)
-                                page_text = "\n".join(results)
-                                if page_text.strip():
-                                    pages_text.append(f"--- Sayfa {page_num + 1} ---\n{page_text}")
-                                    logger.debug("pdf_ocr_page_done", page=page_num+1, 
-                                                chars=len(page_text))
-                            except Exception as ocr_err:
-                                logger.warning("pdf_ocr_page_error", page=page_num+1, 
-                                              error=str(ocr_err))
-                        
-                        pdf_doc.close()
+                        # Sayfalar sırayla, hazır oldukça gelir
+                        for page in iter_pdf_ocr_pages(file_content, filename=filename):
+                            if page.text.strip():
+                                pages_text.append(f"--- Sayfa {page.page} ---\n{page.text}")
                         
                         if pages_text:
                             content = "\n\n".join(pages_text)
@@ -397,7 +374,6 @@ def extract_text_from_file(filename: str, file_content: bytes) -> tuple:
                                 f"OCR denendi fakat metin çıkarılamadı."
                             )
                     else:
-                        pdf_doc.close()
                         content = (
                             f"[Görüntü tabanlı PDF dosyası: {filename}]\n"
                             f"Boyut: {file_size_mb} MB, Sayfa sayısı: {page_count}\n"
@@ -420,75 +396,14 @@ def extract_text_from_file(filename: str, file_content: bytes) -> tuple:
         
         # ── Excel ── (v5.10.1: RAG-optimized row-by-row extraction)
         # v5.10.8: Auto header detection — "Unnamed" sütunlar tespit edilip gerçek başlık bulunur
+        # v7.31.00: openpyxl read_only ile satır satır; başlık ilk satırların örneğinden bulunur
         elif doc_type == 'excel':
             try:
-                import pandas as pd
-                xls = pd.ExcelFile(io.BytesIO(file_content))
-                all_rows_text = []
-                
-                for sheet_name in xls.sheet_names:
-                    df = pd.read_excel(xls, sheet_name=sheet_name)
-                    if df.empty:
-                        continue
-                    
-                    # ── v5.10.8: "Unnamed" sütun tespiti → başlık satırını otomatik bul ──
-                    unnamed_count = sum(1 for c in df.columns if str(c).startswith("Unnamed:"))
-                    if unnamed_count > len(df.columns) // 2:
-                        # Başlık satırı hatalı → header=None ile yeniden oku
-                        df_raw = pd.read_excel(xls, sheet_name=sheet_name, header=None)
-                        # İlk 20 satırda başlık satırını bul
-                        best_row = 0
-                        best_score = 0
-                        for ri in range(min(20, len(df_raw))):
-                            row_vals = df_raw.iloc[ri].dropna()
-                            if len(row_vals) < 2:
-                                continue
-                            # Başlık satırı: çoğu hücre metin, rakam değil
-                            str_count = sum(
-                                1 for v in row_vals
-                                if isinstance(v, str) and len(str(v).strip()) > 1
-                                and not str(v).strip().replace('.', '').replace(',', '').isdigit()
-                            )
-                            score = str_count / max(len(df_raw.columns), 1)
-                            if score > best_score:
-                                best_score = score
-                                best_row = ri
-                        
-                        if best_score >= 0.3:
-                            new_headers = df_raw.iloc[best_row].tolist()
-                            df = df_raw.iloc[best_row + 1:].copy()
-                            df.columns = [
-                                str(h).strip() if pd.notna(h) else f"Sütun_{j}"
-                                for j, h in enumerate(new_headers)
-                            ]
-                            df = df.reset_index(drop=True)
-                            logger.info("excel_header_autodetected", filename=filename,
-                                       sheet=sheet_name, header_row=best_row,
-                                       score=round(best_score, 2))
-                    
-                    # Birden fazla sayfa varsa başlık ekle
-                    if len(xls.sheet_names) > 1:
-                        all_rows_text.append(f"\n[Sayfa: {sheet_name}]")
-                    
-                    # Sütun adları
-                    columns = [str(c).strip() for c in df.columns]
-                    
-                    # Her satırı "Kolon: Değer" formatında yaz (RAG semantic search için)
-                    for idx, row in df.iterrows():
-                        parts = []
-                        for col in columns:
-                            val = row[col]
-                            if pd.notna(val):
-                                val_str = str(val).strip()
-                                if val_str:
-                                    parts.append(f"{col}: {val_str}")
-                        if parts:
-                            row_text = f"{filename} | Satır {idx + 1}: {', '.join(parts)}"
-                            all_rows_text.append(row_text)
-                
+                all_rows_text = list(iter_text_rows(filename, file_content, on_progress=_log_ingest_progress))
+                sheet_headers = sum(1 for line in all_rows_text if line.startswith("\n[Sayfa: "))
                 content = "\n".join(all_rows_text)
                 logger.info("excel_rag_extracted", filename=filename,
-                           sheets=len(xls.sheet_names), rows=len(all_rows_text))
+                           sheets=max(sheet_headers, 1), rows=len(all_rows_text) - sheet_headers)
             except ImportError:
                 raise HTTPException(status_code=500, detail="pandas/openpyxl yüklü değil")
         
@@ -723,71 +638,60 @@ async def add_document_text(
         raise HTTPException(status_code=500, detail="Doküman eklenemedi")
 
 
+def _check_upload_department(current_user: User, department: str):
+    """Departman yetki kontrolü"""
+    if current_user.role == 'user':
+        user_depts = parse_user_departments(current_user.department)
+        if department not in user_depts:
+            raise HTTPException(status_code=403, detail="Bu departmana dosya yükleme yetkiniz yok")
+
+
+def _job_response(job: dict) -> dict:
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "duplicate": job.get("duplicate", False),
+        "status_url": f"/api/rag/documents/jobs/{job['job_id']}",
+    }
+
+
 @router.post("/documents/upload")
 async def upload_document(
     file: UploadFile = File(...),
     department: str = Form("Genel"),
     current_user: User = Depends(get_current_user)
 ):
-    """Dosya yükle - Çoklu format desteği"""
+    """Dosya yükle - Çoklu format desteği
+
+    v7.32.00: Dosya diske alınıp ingestion kuyruğuna eklenir, istek hemen
+    döner. Çıkarma/OCR/embedding arka planda yapılır; durum için
+    GET /documents/jobs/{job_id}.
+    """
     if not RAG_AVAILABLE:
         raise HTTPException(status_code=503, detail="RAG sistemi kullanılamıyor")
     
-    # Departman yetki kontrolü
-    if current_user.role == 'user':
-        user_depts = parse_user_departments(current_user.department)
-        if department not in user_depts:
-            raise HTTPException(status_code=403, detail="Bu departmana dosya yükleme yetkiniz yok")
+    _check_upload_department(current_user, department)
+    
+    if _detect_format(file.filename)[0] is None:
+        raise HTTPException(status_code=400, detail=_UNSUPPORTED_FORMAT_DETAIL)
     
     try:
-        file_content = await file.read()
-        
-        if not file_content:
+        size = source_size(file.file)
+        if not size:
             raise HTTPException(status_code=400, detail="Dosya boş")
         
-        logger.info("upload_started", filename=file.filename, size_mb=round(len(file_content)/1024/1024, 1))
-        
-        content, doc_type = extract_text_from_file(file.filename, file_content)
-        
-        if not content.strip():
-            logger.warning("upload_empty_content", filename=file.filename, doc_type=doc_type)
-            raise HTTPException(status_code=400, detail=f"Dosyadan içerik çıkarılamadı ({doc_type})")
-        
-        logger.info("upload_content_extracted", filename=file.filename, chars=len(content), doc_type=doc_type)
-        
-        # v6.02.00: PDF ise görselleri de çıkar
-        images_extracted = 0
-        if doc_type == 'pdf':
-            try:
-                page_images = extract_pdf_images(file.filename, file_content)
-                images_extracted = sum(len(v) for v in page_images.values())
-            except Exception as img_err:
-                logger.warning("upload_image_extract_error", filename=file.filename, error=str(img_err))
+        logger.info("upload_started", filename=file.filename, size_mb=round(size/1024/1024, 1))
         
-        # Dokümanı ekle
-        success = add_document(
-            content=content,
-            source=file.filename,
-            doc_type=doc_type,
-            metadata={
-                "department": department,
-                "author": current_user.full_name or current_user.email,
-                "created_at": datetime.utcnow().isoformat()
-            }
+        job = await get_ingest_queue().submit(
+            file.filename, file.file,
+            department=department,
+            author=current_user.full_name or current_user.email,
+            user_id=current_user.id,
         )
-        
-        if success:
-            result = {
-                "message": f"Dosya yüklendi: {file.filename}",
-                "success": True,
-                "type": doc_type,
-                "chars": len(content)
-            }
-            if images_extracted > 0:
-                result["images_extracted"] = images_extracted
-            return result
-        else:
-            raise HTTPException(status_code=500, detail="Doküman eklenemedi")
+        message = (f"Dosya zaten yüklendi: {file.filename}" if job["duplicate"]
+                   else f"Dosya kuyruğa alındı: {file.filename}")
+        return {"message": message, "success": True, **_job_response(job)}
             
     except HTTPException:
         raise
@@ -802,60 +706,86 @@ async def upload_multiple_documents(
     department: str = Form("Genel"),
     current_user: User = Depends(get_current_user)
 ):
-    """Birden fazla dosya yükle (klasör yükleme için)"""
+    """Birden fazla dosya yükle (klasör yükleme için)
+
+    v7.32.00: Her dosya ayrı job olarak kuyruğa alınır (ortak batch_id);
+    dosyalar worker havuzunda paralel işlenir.
+    """
     if not RAG_AVAILABLE:
         raise HTTPException(status_code=503, detail="RAG sistemi kullanılamıyor")
     
-    # Departman yetki kontrolü
-    if current_user.role == 'user':
-        user_depts = parse_user_departments(current_user.department)
-        if department not in user_depts:
-            raise HTTPException(status_code=403, detail="Bu departmana dosya yükleme yetkiniz yok")
+    _check_upload_department(current_user, department)
     
+    queue = get_ingest_queue()
+    batch_id = uuid.uuid4().hex[:12]
     results = []
     for file in files:
         try:
-            file_content = await file.read()
-            
-            if not file_content:
-                results.append({"file": file.filename, "success": False, "error": "Dosya boş"})
+            if _detect_format(file.filename)[0] is None:
+                results.append({"file": file.filename, "success": False, "error": "Desteklenmeyen dosya formatı"})
                 continue
             
-            content, doc_type = extract_text_from_file(file.filename, file_content)
-            
-            if not content.strip():
-                results.append({"file": file.filename, "success": False, "error": "İçerik çıkarılamadı"})
+            if not source_size(file.file):
+                results.append({"file": file.filename, "success": False, "error": "Dosya boş"})
                 continue
             
-            success = add_document(
-                content=content,
-                source=file.filename,
-                doc_type=doc_type,
-                metadata={
-                    "department": department,
-                    "author": current_user.full_name or current_user.email,
-                    "created_at": datetime.utcnow().isoformat()
-                }
+            job = await queue.submit(
+                file.filename, file.file,
+                department=department,
+                author=current_user.full_name or current_user.email,
+                user_id=current_user.id,
+                batch_id=batch_id,
             )
-            
-            results.append({
-                "file": file.filename,
-                "success": success,
-                "type": doc_type,
-                "chars": len(content) if success else 0
-            })
+            results.append({"file": file.filename, "success": True, **_job_response(job)})
             
         except Exception as e:
             results.append({"file": file.filename, "success": False, "error": str(e)})
     
-    success_count = sum(1 for r in results if r.get('success'))
+    queued_count = sum(1 for r in results if r.get('success'))
     return {
-        "message": f"{success_count}/{len(files)} dosya yüklendi",
+        "message": f"{queued_count}/{len(files)} dosya kuyruğa alındı",
+        "batch_id": batch_id,
         "results": results,
-        "success": success_count > 0
+        "success": queued_count > 0
     }
 
 
+def _visible_job(job_id: str, current_user: User) -> dict:
+    job = get_ingest_queue().get(job_id)
+    if job is None or (current_user.role != "admin" and job.get("user_id") != current_user.id):
+        raise HTTPException(status_code=404, detail="Yükleme işi bulunamadı")
+    return job
+
+
+@router.get("/documents/jobs")
+async def list_ingest_jobs(
+    batch_id: Optional[str] = None,
+    limit: int = 50,
+    current_user: User = Depends(get_current_user)
+):
+    """Yükleme işleri (admin tümünü, diğer kullanıcılar kendi işlerini görür)"""
+    queue = get_ingest_queue()
+    user_id = None if current_user.role == "admin" else current_user.id
+    jobs = await asyncio.to_thread(queue.list_jobs, user_id, batch_id, min(max(limit, 1), 500))
+    return {"jobs": jobs, "total": len(jobs), "stats": queue.stats()}
+
+
+@router.get("/documents/jobs/{job_id}")
+async def get_ingest_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Tek dosyanın yükleme durumu / ilerlemesi"""
+    return _visible_job(job_id, current_user)
+
+
+@router.post("/documents/jobs/{job_id}/retry")
+async def retry_ingest_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Başarısız yükleme işini yeniden kuyruğa al"""
+    _visible_job(job_id, current_user)
+    job = await get_ingest_queue().retry(job_id)
+    if job is None:
+        raise HTTPException(status_code=409, detail="Yalnızca dosyası duran başarısız işler yeniden denenebilir")
+    return {"success": True, **_job_response(job)}
+
+
 # ═══════════════════════════════════════════════════════════════
 # v6.02.00: PDF GÖRSEL SUNMA — Çıkarılmış görselleri HTTP ile sun
 # ═══════════════════════════════════════════════════════════════
@@ -1503,6 +1433,7 @@ async def learn_from_image(
                     system_prompt="Sen bir görsel analiz asistanısın. Görselleri Türkçe olarak ayrıntılı açıklarsın.",
                     images=[b64_image],
                     use_omni=False,
+                    priority="background",
                 )
                 if vision_description and vision_description.strip():
                     content_parts.append(f"[Vision AI açıklaması]\n{vision_description.strip()}")
@@ -3,89 +3,268 @@ CompanyAI — Prometheus Metrics Endpoint
 ==========================================
 /api/metrics endpoint'i — Prometheus scraping uyumlu.
 Toplanan metrikler: istek sayısı, yanıt süresi, öğrenme stats.
+
+v7.41.00: Metrikler app.core.shared_metrics üzerinden worker'lar arası
+paylaşılır — /api/metrics hangi worker'a düşerse düşsün fleet toplamını
+verir. HTTP süreleri route şablonu başına histogram.
 """
 
+import asyncio
 import time
-from collections import defaultdict
 from typing import Optional
 
 from fastapi import APIRouter, Request, Response
 
+from app.core.shared_metrics import counter, get_shared_metrics, histogram, inc, observe, render
+
 router = APIRouter(tags=["Monitoring"])
 
-# ── In-memory Metrikler (process başına) ──
-# Not: Multi-worker'da her worker kendi metrikleri tutar.
-# Tam çözüm için prometheus_client kütüphanesi kullanılabilir.
-
-_metrics = {
-    "requests_total": 0,
-    "requests_by_status": defaultdict(int),  # status_code → count
-    "requests_by_path": defaultdict(int),    # path → count
-    "response_time_sum": 0.0,               # toplam süre (saniye)
-    "response_time_count": 0,               # sayaç
-    "errors_total": 0,
-    "startup_time": time.time(),
-}
-
-
-def record_request(path: str, status_code: int, duration: float):
-    """Bir isteğin metriklerini kaydet (middleware'den çağrılır)."""
-    _metrics["requests_total"] += 1
-    _metrics["requests_by_status"][status_code] += 1
-    _metrics["requests_by_path"][path] += 1
-    _metrics["response_time_sum"] += duration
-    _metrics["response_time_count"] += 1
+_startup_time = time.time()
+
+counter("companyai_requests_total", "Total HTTP requests")
+counter("companyai_requests_by_status", "HTTP requests by status code")
+counter("companyai_errors_total", "Total 5xx errors")
+counter("companyai_requests_by_path", "HTTP requests by route template")
+histogram("companyai_http_request_duration_seconds", "HTTP request latency by route template")
+inc("companyai_requests_total", 0)
+inc("companyai_errors_total", 0)
+
+
+def record_request(path: str, status_code: int, duration: float, method: str = "GET"):
+    """Bir isteğin metriklerini kaydet (middleware'den çağrılır).
+
+    path route şablonu olmalı (/api/documents/{source}) — ham path ile
+    seri sayısı her dosya adı için büyür.
+    """
+    inc("companyai_requests_total")
+    inc("companyai_requests_by_status", status=status_code)
+    inc("companyai_requests_by_path", path=path)
+    observe("companyai_http_request_duration_seconds", duration, method=method, route=path)
     if status_code >= 500:
-        _metrics["errors_total"] += 1
+        inc("companyai_errors_total")
 
 
-def _format_prometheus(metrics: dict) -> str:
-    """Metrikleri Prometheus text format'a çevir."""
+def _format_subsystems() -> str:
+    """Bu worker'ın alt sistem metrikleri (Prometheus text) — snapshot collector'ı."""
     lines = []
 
     # Uptime
-    uptime = time.time() - metrics["startup_time"]
-    lines.append(f"# HELP companyai_uptime_seconds Server uptime in seconds")
-    lines.append(f"# TYPE companyai_uptime_seconds gauge")
+    uptime = time.time() - _startup_time
+    lines.append("# HELP companyai_uptime_seconds Server uptime in seconds")
+    lines.append("# TYPE companyai_uptime_seconds gauge")
     lines.append(f"companyai_uptime_seconds {uptime:.2f}")
 
-    # Toplam istek
-    lines.append(f"# HELP companyai_requests_total Total HTTP requests")
-    lines.append(f"# TYPE companyai_requests_total counter")
-    lines.append(f'companyai_requests_total {metrics["requests_total"]}')
-
-    # Status code bazlı
-    lines.append(f"# HELP companyai_requests_by_status HTTP requests by status code")
-    lines.append(f"# TYPE companyai_requests_by_status counter")
-    for code, count in sorted(metrics["requests_by_status"].items()):
-        lines.append(f'companyai_requests_by_status{{status="{code}"}} {count}')
-
-    # Hata sayısı
-    lines.append(f"# HELP companyai_errors_total Total 5xx errors")
-    lines.append(f"# TYPE companyai_errors_total counter")
-    lines.append(f'companyai_errors_total {metrics["errors_total"]}')
-
-    # Ortalama yanıt süresi
-    avg_time = (
-        metrics["response_time_sum"] / metrics["response_time_count"]
-        if metrics["response_time_count"] > 0
-        else 0
-    )
-    lines.append(f"# HELP companyai_response_time_avg_seconds Average response time")
-    lines.append(f"# TYPE companyai_response_time_avg_seconds gauge")
-    lines.append(f"companyai_response_time_avg_seconds {avg_time:.4f}")
-
-    # En çok istek alan endpoint'ler (top 10)
-    lines.append(f"# HELP companyai_requests_by_path HTTP requests by path")
-    lines.append(f"# TYPE companyai_requests_by_path counter")
-    top_paths = sorted(metrics["requests_by_path"].items(), key=lambda x: -x[1])[:10]
-    for path, count in top_paths:
-        safe_path = path.replace('"', '\\"')
-        lines.append(f'companyai_requests_by_path{{path="{safe_path}"}} {count}')
+    # RAG executor backpressure (v7.18.00)
+    try:
+        from app.rag.vector_store import get_rag_executor_stats
+        rag = get_rag_executor_stats()
+        lines.append("# HELP companyai_rag_executor_queue_depth RAG tasks waiting for an executor thread")
+        lines.append("# TYPE companyai_rag_executor_queue_depth gauge")
+        lines.append(f'companyai_rag_executor_queue_depth {rag["queue_depth"]}')
+        lines.append("# HELP companyai_rag_executor_running RAG tasks currently running")
+        lines.append("# TYPE companyai_rag_executor_running gauge")
+        lines.append(f'companyai_rag_executor_running {rag["running"]}')
+        lines.append("# HELP companyai_rag_searches_waiting Async searches waiting for admission")
+        lines.append("# TYPE companyai_rag_searches_waiting gauge")
+        lines.append(f'companyai_rag_searches_waiting {rag["searches_waiting"]}')
+        lines.append("# HELP companyai_rag_executor_tasks_total RAG executor tasks by outcome")
+        lines.append("# TYPE companyai_rag_executor_tasks_total counter")
+        lines.append(f'companyai_rag_executor_tasks_total{{outcome="completed"}} {rag["completed"]}')
+        lines.append(f'companyai_rag_executor_tasks_total{{outcome="failed"}} {rag["failed"]}')
+        lines.append("# HELP companyai_rag_executor_queue_wait_avg_ms Average executor queue wait")
+        lines.append("# TYPE companyai_rag_executor_queue_wait_avg_ms gauge")
+        lines.append(f'companyai_rag_executor_queue_wait_avg_ms {rag["avg_queue_wait_ms"]}')
+    except Exception:
+        pass
+
+    # Paylaşılan embedding servisi (v7.21.00)
+    try:
+        from app.rag.embedding_service import get_embedding_service_stats
+        emb = get_embedding_service_stats()
+        lines.append("# HELP companyai_embedding_requests_total Encode calls served by the shared embedding service")
+        lines.append("# TYPE companyai_embedding_requests_total counter")
+        lines.append(f'companyai_embedding_requests_total {emb.get("requests", 0)}')
+        lines.append("# HELP companyai_embedding_forward_passes_total Model forward passes (after micro-batching)")
+        lines.append("# TYPE companyai_embedding_forward_passes_total counter")
+        lines.append(f'companyai_embedding_forward_passes_total {emb.get("forward_passes", 0)}')
+        lines.append("# HELP companyai_embedding_queue_depth Encode requests waiting for the batcher")
+        lines.append("# TYPE companyai_embedding_queue_depth gauge")
+        lines.append(f'companyai_embedding_queue_depth {emb.get("queue_depth", 0)}')
+    except Exception:
+        pass
+
+    # Embedding cache (v7.22.00)
+    try:
+        from app.cache.embedding_cache import get_embedding_cache_stats
+        ec = get_embedding_cache_stats()
+        lines.append("# HELP companyai_embedding_cache_lookups_total Embedding cache lookups by result")
+        lines.append("# TYPE companyai_embedding_cache_lookups_total counter")
+        lines.append(f'companyai_embedding_cache_lookups_total{{result="l1_hit"}} {ec["l1_hits"]}')
+        lines.append(f'companyai_embedding_cache_lookups_total{{result="l2_hit"}} {ec["l2_hits"]}')
+        lines.append(f'companyai_embedding_cache_lookups_total{{result="miss"}} {ec["misses"]}')
+        lines.append("# HELP companyai_embedding_cache_l1_size Vectors held in the in-process LRU")
+        lines.append("# TYPE companyai_embedding_cache_l1_size gauge")
+        lines.append(f'companyai_embedding_cache_l1_size {ec["l1_size"]}')
+        lines.append("# HELP companyai_embedding_cache_redis_errors_total Redis errors in the embedding cache")
+        lines.append("# TYPE companyai_embedding_cache_redis_errors_total counter")
+        lines.append(f'companyai_embedding_cache_redis_errors_total {ec["redis_errors"]}')
+    except Exception:
+        pass
+
+    # Cross-encoder rerank servisi (v7.36.00)
+    try:
+        from app.rag.reranker import get_rerank_stats
+        rr = get_rerank_stats()
+        lines.append("# HELP companyai_rerank_pairs_total Rerank (query, chunk) pairs by outcome")
+        lines.append("# TYPE companyai_rerank_pairs_total counter")
+        lines.append(f'companyai_rerank_pairs_total{{outcome="cache_hit"}} {rr.get("cache_hits", 0)}')
+        lines.append(f'companyai_rerank_pairs_total{{outcome="predicted"}} {rr.get("predicted", 0)}')
+        lines.append(f'companyai_rerank_pairs_total{{outcome="skipped_budget"}} {rr.get("skipped_budget", 0)}')
+        lines.append("# HELP companyai_rerank_forward_passes_total Cross-encoder predict batches")
+        lines.append("# TYPE companyai_rerank_forward_passes_total counter")
+        lines.append(f'companyai_rerank_forward_passes_total {rr.get("forward_passes", 0)}')
+    except Exception:
+        pass
+
+    # LLM yanıt cache'i (v7.23.00)
+    try:
+        from app.llm.response_cache import get_llm_cache_stats
+        lc = get_llm_cache_stats()
+        lines.append("# HELP companyai_llm_cache_lookups_total LLM response cache lookups by result")
+        lines.append("# TYPE companyai_llm_cache_lookups_total counter")
+        lines.append(f'companyai_llm_cache_lookups_total{{result="exact_hit"}} {lc["exact_hits"]}')
+        lines.append(f'companyai_llm_cache_lookups_total{{result="semantic_hit"}} {lc["semantic_hits"]}')
+        lines.append(f'companyai_llm_cache_lookups_total{{result="miss"}} {lc["misses"]}')
+        lines.append("# HELP companyai_llm_cache_invalidations_total LLM cache invalidations (document changes)")
+        lines.append("# TYPE companyai_llm_cache_invalidations_total counter")
+        lines.append(f'companyai_llm_cache_invalidations_total {lc["invalidations"]}')
+    except Exception:
+        pass
+
+    # LLM single-flight (v7.24.00)
+    try:
+        from app.llm.client import get_single_flight_stats
+        sf = get_single_flight_stats()
+        lines.append("# HELP companyai_llm_single_flight_total LLM calls by single-flight role")
+        lines.append("# TYPE companyai_llm_single_flight_total counter")
+        lines.append(f'companyai_llm_single_flight_total{{kind="generate",role="leader"}} {sf["leaders"]}')
+        lines.append(f'companyai_llm_single_flight_total{{kind="generate",role="coalesced"}} {sf["coalesced"]}')
+        lines.append(f'companyai_llm_single_flight_total{{kind="stream",role="leader"}} {sf["stream_leaders"]}')
+        lines.append(f'companyai_llm_single_flight_total{{kind="stream",role="coalesced"}} {sf["stream_coalesced"]}')
+        lines.append("# HELP companyai_llm_inflight Distinct LLM requests currently in flight")
+        lines.append("# TYPE companyai_llm_inflight gauge")
+        lines.append(f'companyai_llm_inflight {sf["inflight"] + sf["stream_inflight"]}')
+    except Exception:
+        pass
+
+    # LLM zamanlayıcı — öncelik sınıfı başına kuyruk (v7.25.00)
+    try:
+        from app.llm.scheduler import get_llm_scheduler_stats
+        sch = get_llm_scheduler_stats()
+        lines.append("# HELP companyai_llm_queue_depth LLM requests waiting for a scheduler slot")
+        lines.append("# TYPE companyai_llm_queue_depth gauge")
+        for cls, c in sch["classes"].items():
+            lines.append(f'companyai_llm_queue_depth{{priority="{cls}"}} {c["queued"]}')
+        lines.append("# HELP companyai_llm_running LLM requests holding a scheduler slot")
+        lines.append("# TYPE companyai_llm_running gauge")
+        for cls, c in sch["classes"].items():
+            lines.append(f'companyai_llm_running{{priority="{cls}"}} {c["running"]}')
+        lines.append("# HELP companyai_llm_queue_wait_p95_ms p95 scheduler queue wait over the last minute")
+        lines.append("# TYPE companyai_llm_queue_wait_p95_ms gauge")
+        for cls, c in sch["classes"].items():
+            lines.append(f'companyai_llm_queue_wait_p95_ms{{priority="{cls}"}} {c["wait_p95_ms"]}')
+        lines.append("# HELP companyai_llm_shed_total LLM requests rejected by admission control")
+        lines.append("# TYPE companyai_llm_shed_total counter")
+        for cls, c in sch["classes"].items():
+            lines.append(f'companyai_llm_shed_total{{priority="{cls}"}} {c["shed"]}')
+        lines.append("# HELP companyai_llm_degraded 1 while queue latency exceeds the SLO")
+        lines.append("# TYPE companyai_llm_degraded gauge")
+        lines.append(f'companyai_llm_degraded {int(sch["degraded"])}')
+    except Exception:
+        pass
+
+    # Sorgu aşama latency (v7.27.00)
+    try:
+        from app.core.stage_tracing import get_stage_latency_stats
+        stages = get_stage_latency_stats()["stages"]
+        lines.append("# HELP companyai_stage_latency_ms Per-stage process_question latency")
+        lines.append("# TYPE companyai_stage_latency_ms summary")
+        for stage, st in stages.items():
+            for q, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                lines.append(f'companyai_stage_latency_ms{{stage="{stage}",quantile="{q}"}} {st[key]}')
+            lines.append(f'companyai_stage_latency_ms_count{{stage="{stage}"}} {st["count"]}')
+    except Exception:
+        pass
+
+    # Doküman yükleme kuyruğu (v7.32.00)
+    try:
+        from app.core.ingest_jobs import get_ingest_stats
+        ingest = get_ingest_stats()
+        if ingest.get("started"):
+            lines.append("# HELP companyai_ingest_jobs Document ingestion jobs by status")
+            lines.append("# TYPE companyai_ingest_jobs gauge")
+            for status, count in ingest["jobs_by_status"].items():
+                lines.append(f'companyai_ingest_jobs{{status="{status}"}} {count}')
+            lines.append("# HELP companyai_ingest_queue_depth Jobs waiting for an ingestion worker")
+            lines.append("# TYPE companyai_ingest_queue_depth gauge")
+            lines.append(f"companyai_ingest_queue_depth {ingest['queue_depth']}")
+            lines.append("# HELP companyai_ingest_retries_total Ingestion job retries")
+            lines.append("# TYPE companyai_ingest_retries_total counter")
+            lines.append(f"companyai_ingest_retries_total {ingest['retries']}")
+    except Exception:
+        pass
+
+    # Event bus listener kuyrukları (v7.40.00)
+    try:
+        from app.core.event_bus import event_bus
+        listeners = event_bus.get_listener_stats()
+        if listeners:
+            lines.append("# HELP companyai_event_listener_queue_depth Events waiting in a listener queue")
+            lines.append("# TYPE companyai_event_listener_queue_depth gauge")
+            for ls in listeners:
+                lines.append(f'companyai_event_listener_queue_depth{{pattern="{ls["pattern"]}",listener="{ls["listener"]}"}} {ls["queue_depth"]}')
+            lines.append("# HELP companyai_event_listener_events_total Listener deliveries by outcome")
+            lines.append("# TYPE companyai_event_listener_events_total counter")
+            for ls in listeners:
+                for outcome in ("delivered", "failed", "dropped"):
+                    lines.append(f'companyai_event_listener_events_total{{pattern="{ls["pattern"]}",listener="{ls["listener"]}",outcome="{outcome}"}} {ls[outcome]}')
+            lines.append("# HELP companyai_event_listener_handler_avg_ms Average listener handler time")
+            lines.append("# TYPE companyai_event_listener_handler_avg_ms gauge")
+            for ls in listeners:
+                lines.append(f'companyai_event_listener_handler_avg_ms{{pattern="{ls["pattern"]}",listener="{ls["listener"]}"}} {ls["avg_handler_ms"]}')
+    except Exception:
+        pass
 
     return "\n".join(lines) + "\n"
 
 
+get_shared_metrics().add_collector(_format_subsystems)
+
+
+def _fleet_families() -> dict:
+    """Tüm worker'ların birleşik aileleri + fleet ortalama yanıt süresi."""
+    families = get_shared_metrics().collect()
+    samples = families.get("companyai_http_request_duration_seconds", {}).get("samples", [])
+    total = sum(v for name, _, v in samples if name.endswith("_sum"))
+    count = sum(v for name, _, v in samples if name.endswith("_count"))
+    families["companyai_response_time_avg_seconds"] = {
+        "type": "gauge",
+        "help": "Average response time",
+        "samples": [["companyai_response_time_avg_seconds", {}, round(total / count, 4) if count else 0]],
+    }
+    return families
+
+
+def _sample_values(families: dict, name: str, label: Optional[str] = None):
+    samples = families.get(name, {}).get("samples", [])
+    if label is None:
+        return sum(v for _, _, v in samples)
+    out = {}
+    for _, labels, v in samples:
+        out[labels.get(label, "")] = out.get(labels.get(label, ""), 0) + v
+    return out
+
+
 @router.get("/metrics", response_class=Response)
 async def prometheus_metrics():
     """
@@ -97,19 +276,19 @@ async def prometheus_metrics():
           - targets: ['192.168.0.12:8000']
         metrics_path: '/api/metrics'
     """
-    body = _format_prometheus(_metrics)
+    body = render(await asyncio.to_thread(_fleet_families))
     return Response(content=body, media_type="text/plain; charset=utf-8")
 
 
 @router.get("/metrics/json")
 async def metrics_json():
-    """JSON formatında metrikler (admin dashboard için)."""
-    uptime = time.time() - _metrics["startup_time"]
-    avg_time = (
-        _metrics["response_time_sum"] / _metrics["response_time_count"]
-        if _metrics["response_time_count"] > 0
-        else 0
-    )
+    """JSON formatında metrikler (admin dashboard için).
+
+    İstek sayaçları fleet geneli; alt sistem istatistikleri bu worker'ın.
+    """
+    uptime = time.time() - _startup_time
+    fleet = await asyncio.to_thread(_fleet_families)
+    avg_time = fleet["companyai_response_time_avg_seconds"]["samples"][0][2]
 
     # ChromaDB istatistikleri
     chroma_stats = {}
@@ -119,16 +298,90 @@ async def metrics_json():
     except Exception:
         chroma_stats = {"available": False}
 
+    rag_executor_stats = {}
+    try:
+        from app.rag.vector_store import get_rag_executor_stats
+        rag_executor_stats = get_rag_executor_stats()
+    except Exception:
+        rag_executor_stats = {"available": False}
+
+    embedding_stats = {}
+    try:
+        from app.rag.embedding_service import get_embedding_service_stats
+        embedding_stats = get_embedding_service_stats()
+    except Exception:
+        embedding_stats = {"available": False}
+
+    embedding_cache_stats = {}
+    try:
+        from app.cache.embedding_cache import get_embedding_cache_stats
+        embedding_cache_stats = get_embedding_cache_stats()
+    except Exception:
+        embedding_cache_stats = {"available": False}
+
+    rerank_stats = {}
+    try:
+        from app.rag.reranker import get_rerank_stats
+        rerank_stats = get_rerank_stats()
+    except Exception:
+        rerank_stats = {"available": False}
+
+    llm_cache_stats = {}
+    try:
+        from app.llm.response_cache import get_llm_cache_stats
+        llm_cache_stats = get_llm_cache_stats()
+    except Exception:
+        llm_cache_stats = {"available": False}
+
+    single_flight_stats = {}
+    try:
+        from app.llm.client import get_single_flight_stats
+        single_flight_stats = get_single_flight_stats()
+    except Exception:
+        single_flight_stats = {"available": False}
+
+    scheduler_stats = {}
+    try:
+        from app.llm.scheduler import get_llm_scheduler_stats
+        scheduler_stats = get_llm_scheduler_stats()
+    except Exception:
+        scheduler_stats = {"available": False}
+
+    stage_latency_stats = {}
+    try:
+        from app.core.stage_tracing import get_stage_latency_stats
+        stage_latency_stats = get_stage_latency_stats()
+    except Exception:
+        stage_latency_stats = {"available": False}
+
+    ingest_stats = {}
+    try:
+        from app.core.ingest_jobs import get_ingest_stats
+        ingest_stats = get_ingest_stats()
+    except Exception:
+        ingest_stats = {"available": False}
+
     return {
         "uptime_seconds": round(uptime, 2),
-        "requests_total": _metrics["requests_total"],
-        "errors_total": _metrics["errors_total"],
+        "requests_total": int(_sample_values(fleet, "companyai_requests_total")),
+        "errors_total": int(_sample_values(fleet, "companyai_errors_total")),
         "avg_response_time_ms": round(avg_time * 1000, 2),
-        "requests_by_status": dict(_metrics["requests_by_status"]),
+        "requests_by_status": _sample_values(fleet, "companyai_requests_by_status", "status"),
         "top_paths": dict(
-            sorted(_metrics["requests_by_path"].items(), key=lambda x: -x[1])[:10]
+            sorted(_sample_values(fleet, "companyai_requests_by_path", "path").items(),
+                   key=lambda x: -x[1])[:10]
         ),
+        "shared_metrics": get_shared_metrics().stats(),
         "chromadb": chroma_stats,
+        "rag_executor": rag_executor_stats,
+        "embedding_service": embedding_stats,
+        "embedding_cache": embedding_cache_stats,
+        "reranker": rerank_stats,
+        "llm_cache": llm_cache_stats,
+        "llm_single_flight": single_flight_stats,
+        "llm_scheduler": scheduler_stats,
+        "stage_latency": stage_latency_stats,
+        "ingest_queue": ingest_stats,
     }
 
 
@@ -148,6 +401,7 @@ async def learning_dashboard():
     dashboard = {
         "collections": {},
         "retrieval_quality": {},
+        "ingestion": {},
         "knowledge_extractor": {},
     }
     
@@ -165,6 +419,27 @@ async def learning_dashboard():
     except Exception as e:
         dashboard["retrieval_quality"] = {"error": str(e)}
     
+    # 2a. Ingestion aşama süreleri (v7.20.00)
+    try:
+        from app.rag.vector_store import get_ingestion_metrics_summary
+        dashboard["ingestion"] = get_ingestion_metrics_summary()
+    except Exception as e:
+        dashboard["ingestion"] = {"error": str(e)}
+    
+    # 2b. Keyword ters indeksi (v7.19.00)
+    try:
+        from app.rag.keyword_index import get_keyword_index_stats
+        dashboard["keyword_index"] = get_keyword_index_stats()
+    except Exception as e:
+        dashboard["keyword_index"] = {"error": str(e)}
+
+    # 2c. Retrieval backend — HNSW ayarları ve departman bölümleri (v7.35.00)
+    try:
+        from app.rag.retrieval_backend import get_retrieval_backend_stats
+        dashboard["retrieval_backend"] = get_retrieval_backend_stats()
+    except Exception as e:
+        dashboard["retrieval_backend"] = {"error": str(e)}
+
     # 3. Öğrenme kalite bilgisi
     try:
         from app.core.knowledge_extractor import MIN_QUALITY_SCORE
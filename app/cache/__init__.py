@@ -8,8 +8,11 @@ Kullanım:
   from app.cache.redis_cache import cache_get, cache_set, cached_embedding
 
 Cache Categories:
-  - emb:<hash>     → Embedding vektörleri (7 gün TTL)
+  - emb:v2:<model>:<sha256> → Embedding vektörleri, binary float32 (7 gün TTL)
+                              bkz. app.cache.embedding_cache (LRU + Redis)
   - llm:<hash>     → LLM yanıtları (1 saat TTL)
+  - llm:v2:<sha256> → OllamaClient.generate yanıt cache'i (mod bazlı TTL)
+                      bkz. app.llm.response_cache
   - rag:<hash>     → RAG search sonuçları (30 dakika TTL)
 """
 
@@ -24,14 +27,21 @@ logger = structlog.get_logger()
 # ── Redis bağlantısı ──
 _redis_client = None
 REDIS_AVAILABLE = False
+# v7.23.00: Bağlantı başarısızsa bu süre boyunca tekrar denenmez —
+# LLM cache her generate'te Redis'e baktığı için sıcak yolda timeout beklenmesin
+REDIS_RETRY_SECONDS = 30.0
+_redis_retry_at = 0.0
 
 try:
     import redis.asyncio as aioredis
 
     async def get_redis():
         """Lazy Redis client (async)."""
-        global _redis_client, REDIS_AVAILABLE
+        global _redis_client, REDIS_AVAILABLE, _redis_retry_at
         if _redis_client is None:
+            import time
+            if time.monotonic() < _redis_retry_at:
+                return None
             try:
                 from app.config import settings
                 _redis_client = aioredis.from_url(
@@ -49,6 +59,7 @@ try:
                 logger.warning("redis_unavailable", error=str(e))
                 _redis_client = None
                 REDIS_AVAILABLE = False
+                _redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
         return _redis_client
 
 except ImportError:
@@ -102,26 +113,33 @@ async def cache_delete(key: str) -> bool:
 
 
 # ── Embedding Cache ──
-async def cached_embedding(text: str) -> Optional[list]:
+# v7.22.00: İki katmanlı (LRU + Redis binary) cache'e delege eder.
+# Embedding servisi bu cache'i zaten kullanır; bu yardımcılar async kod içindir.
+async def cached_embedding(text: str, model_name: Optional[str] = None) -> Optional[list]:
     """
     Embedding vektörünü cache'den oku.
     Cache yoksa None → arayanın hesaplaması gerekir.
     """
-    key = _cache_key("emb", text)
-    raw = await cache_get(key)
-    if raw:
-        try:
-            return json.loads(raw)
-        except (json.JSONDecodeError, TypeError):
-            pass
-    return None
+    import asyncio
+    from app.cache.embedding_cache import get_embedding_cache
+    if model_name is None:
+        from app.rag.embedding_service import EMBEDDING_MODEL as model_name
+    try:
+        found = await asyncio.to_thread(get_embedding_cache().get_many, model_name, [text])
+    except Exception:
+        return None
+    return found[0].tolist() if 0 in found else None
 
 
-async def save_embedding(text: str, vector: list, ttl: int = 604800) -> bool:
-    """Embedding vektörünü cache'e kaydet (7 gün TTL)."""
-    key = _cache_key("emb", text)
+async def save_embedding(text: str, vector: list, model_name: Optional[str] = None) -> bool:
+    """Embedding vektörünü cache'e kaydet (TTL: EMBEDDING_CACHE_TTL, 7 gün)."""
+    import asyncio
+    from app.cache.embedding_cache import get_embedding_cache
+    if model_name is None:
+        from app.rag.embedding_service import EMBEDDING_MODEL as model_name
     try:
-        return await cache_set(key, json.dumps(vector), ttl=ttl)
+        await asyncio.to_thread(get_embedding_cache().set_many, model_name, [text], [vector])
+        return True
     except Exception:
         return False
 
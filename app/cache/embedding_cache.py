@@ -0,0 +1,231 @@
+"""
+CompanyAI — İki Katmanlı Embedding Cache (v7.22.00)
+====================================================
+L1: süreç içi, boyutu sınırlı LRU (numpy float32 vektörler)
+L2: Redis — binary float32 (JSON liste yerine ~4x küçük, parse maliyeti yok)
+
+Anahtar: emb:v2:<model>:<sha256(text)> — tam uzunlukta hash ve model adı
+sayesinde model değiştiğinde eski vektörler yanlışlıkla dönmez.
+
+Embedding çağrıları sync thread'lerden (RAG executor, ingestion) geldiği
+için Redis tarafı senkron client kullanır. Redis erişilemezse cache L1 ile
+çalışmaya devam eder; bağlantı REDIS_RETRY_SECONDS sonra tekrar denenir.
+
+Kullanım:
+  from app.cache.embedding_cache import get_embedding_cache
+  cache = get_embedding_cache()
+  found = cache.get_many(model_name, texts)   # {index: np.ndarray}
+  cache.set_many(model_name, texts, vectors)
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+try:
+    import redis as _redis
+    REDIS_CLIENT_AVAILABLE = True
+except ImportError:
+    REDIS_CLIENT_AVAILABLE = False
+
+# L1 LRU kapasitesi (vektör sayısı — 768-d float32 ≈ 3 KB/vektör)
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "10000"))
+# L2 (Redis) TTL — 7 gün
+EMBEDDING_CACHE_TTL = int(os.environ.get("EMBEDDING_CACHE_TTL", "604800"))
+# Redis katmanını kapatmak için "0"
+EMBEDDING_CACHE_REDIS = os.environ.get("EMBEDDING_CACHE_REDIS", "1") != "0"
+# Redis bağlantısı koptuktan sonra yeniden deneme aralığı
+REDIS_RETRY_SECONDS = 60.0
+
+_KEY_PREFIX = "emb:v2"
+
+
+def embedding_cache_key(model_name: str, text: str) -> str:
+    """Model adı + tam SHA-256 ile embedding cache anahtarı."""
+    h = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{_KEY_PREFIX}:{model_name}:{h}"
+
+
+class EmbeddingCache:
+    """L1 LRU + L2 Redis embedding cache (thread-safe)."""
+
+    def __init__(
+        self,
+        max_size: int = EMBEDDING_CACHE_SIZE,
+        ttl: int = EMBEDDING_CACHE_TTL,
+        use_redis: bool = EMBEDDING_CACHE_REDIS,
+    ):
+        self.max_size = max(0, max_size)
+        self.ttl = ttl
+        self.use_redis = use_redis and REDIS_CLIENT_AVAILABLE
+        self._lru: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self._stats = {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "redis_errors": 0,
+        }
+
+    # ── Redis ──
+
+    def _get_redis(self):
+        """Lazy senkron Redis client; hata sonrası bir süre denemez."""
+        if not self.use_redis:
+            return None
+        if self._redis is not None:
+            return self._redis
+        now = time.monotonic()
+        if now < self._redis_retry_at:
+            return None
+        try:
+            from app.config import settings
+            client = _redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=1,
+                socket_timeout=2,
+            )
+            client.ping()
+            self._redis = client
+            logger.info("embedding_cache_redis_connected")
+        except Exception as e:
+            self._redis_retry_at = now + REDIS_RETRY_SECONDS
+            logger.debug("embedding_cache_redis_unavailable", error=str(e))
+        return self._redis
+
+    def _redis_failed(self, error: Exception):
+        with self._lock:
+            self._stats["redis_errors"] += 1
+        self._redis = None
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+        logger.warning("embedding_cache_redis_error", error=str(error))
+
+    # ── L1 ──
+
+    def _l1_get(self, key: str):
+        vec = self._lru.get(key)
+        if vec is not None:
+            self._lru.move_to_end(key)
+        return vec
+
+    def _l1_put(self, key: str, vec):
+        if self.max_size == 0:
+            return
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+
+    # ── Okuma / Yazma ──
+
+    def get_many(self, model_name: str, texts: List[str]) -> Dict[int, object]:
+        """Cache'te bulunan vektörler: {texts içindeki index: float32 vektör}."""
+        import numpy as np
+
+        keys = [embedding_cache_key(model_name, t) for t in texts]
+        found: Dict[int, object] = {}
+        missing: List[int] = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                vec = self._l1_get(key)
+                if vec is not None:
+                    found[i] = vec
+                else:
+                    missing.append(i)
+            self._stats["l1_hits"] += len(found)
+
+        l2_hits = 0
+        if missing:
+            client = self._get_redis()
+            if client is not None:
+                try:
+                    raws = client.mget([keys[i] for i in missing])
+                except Exception as e:
+                    self._redis_failed(e)
+                    raws = [None] * len(missing)
+                with self._lock:
+                    for i, raw in zip(missing, raws):
+                        if raw:
+                            vec = np.frombuffer(raw, dtype=np.float32)
+                            found[i] = vec
+                            self._l1_put(keys[i], vec)
+                            l2_hits += 1
+
+        with self._lock:
+            self._stats["l2_hits"] += l2_hits
+            self._stats["misses"] += len(texts) - len(found)
+        return found
+
+    def set_many(self, model_name: str, texts: List[str], vectors) -> None:
+        """Yeni hesaplanan vektörleri L1 ve L2'ye yaz."""
+        import numpy as np
+
+        if not texts:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        keys = [embedding_cache_key(model_name, t) for t in texts]
+        with self._lock:
+            for key, vec in zip(keys, vectors):
+                # Çağıranın diziyi değiştirmesi cache'i bozmasın
+                vec = vec.copy()
+                vec.flags.writeable = False
+                self._l1_put(key, vec)
+            self._stats["writes"] += len(keys)
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for key, vec in zip(keys, vectors):
+                    pipe.set(key, vec.tobytes(), ex=self.ttl)
+                pipe.execute()
+            except Exception as e:
+                self._redis_failed(e)
+
+    def clear(self):
+        """L1'i temizle (Redis tarafı TTL ile düşer)."""
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            size = len(self._lru)
+        lookups = s["l1_hits"] + s["l2_hits"] + s["misses"]
+        return {
+            **s,
+            "hits": s["l1_hits"] + s["l2_hits"],
+            "hit_rate": round((s["l1_hits"] + s["l2_hits"]) / lookups, 4) if lookups else 0,
+            "l1_size": size,
+            "l1_max_size": self.max_size,
+            "redis_connected": self._redis is not None,
+        }
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Süreç genelindeki embedding cache (singleton)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache()
+    return _cache
+
+
+def get_embedding_cache_stats() -> dict:
+    """Embedding cache metrikleri (metrics dashboard için)."""
+    return get_embedding_cache().stats()
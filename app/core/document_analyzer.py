@@ -10,7 +10,7 @@ Yüklenen dokümanlardan:
 - Doğal dil ile veri sorgulama
 
 Desteklenen girdiler:
-- Excel (.xlsx, .xls) → Tam tablolu analiz
+- Excel (.xlsx, .xls) → Tam tablolu analiz (akışlı okuma, tabular_ingest)
 - CSV (.csv) → Tablolu analiz
 - JSON (.json) → Yapısal analiz
 - PDF/DOCX/TXT → Metin tabanlı analiz
@@ -19,7 +19,10 @@ Desteklenen girdiler:
 
 import io
 import json
+import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Any
 from datetime import datetime
 
@@ -27,6 +30,8 @@ import structlog
 import pandas as pd
 import numpy as np
 
+from app.core.tabular_ingest import is_tabular_file, read_sheets
+
 logger = structlog.get_logger()
 
 # Opsiyonel: statsmodels istatistik testleri
@@ -43,6 +48,7 @@ try:
         holt_linear_trend,
         holt_winters_seasonal,
         exponential_smoothing,
+        forecast_columns,
         STATSMODELS_AVAILABLE,
     )
     FORECASTING_AVAILABLE = True
@@ -50,6 +56,12 @@ except ImportError:
     FORECASTING_AVAILABLE = False
     STATSMODELS_AVAILABLE = False
 
+# Sütun profili (v7.30.00) — geniş tablolarda sütun grupları paralel hesaplanır
+ANALYZER_PROFILE_WORKERS = int(os.environ.get(
+    "ANALYZER_PROFILE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Bu hücre sayısının altında profil tek thread'de hesaplanır
+ANALYZER_PROFILE_PARALLEL_CELLS = int(os.environ.get("ANALYZER_PROFILE_PARALLEL_CELLS", "2000000"))
+
 # Opsiyonel: pdfplumber ile PDF tablo çıkarma (v4.4.0)
 try:
     import pdfplumber
@@ -62,49 +74,23 @@ except ImportError:
 # 1. VERİ PARSE & KEŞİF
 # ══════════════════════════════════════════════════════════════
 
-def parse_file_to_dataframe(filename: str, file_content: bytes) -> Optional[pd.DataFrame]:
+def parse_file_to_dataframe(filename: str, file_content) -> Optional[pd.DataFrame]:
     """
     Dosyayı pandas DataFrame'e çevir.
     Excel, CSV, JSON ve TSV destekler.
+
+    file_content: bytes veya (tablo dosyalarında) UploadFile.file gibi
+    dosya tutamacı — Excel/CSV parça parça okunur (v7.31.00, tabular_ingest).
     """
     filename_lower = filename.lower()
+    if not isinstance(file_content, (bytes, bytearray)) and not is_tabular_file(filename):
+        file_content = file_content.read()
     
     try:
-        if filename_lower.endswith(('.xlsx', '.xls')):
+        if filename_lower.endswith(('.xlsx', '.xlsm', '.xls')):
             # Excel — tüm sayfaları oku ve birleştir (v4.4.0)
-            # v5.10.8: Auto header detection
-            xls = pd.ExcelFile(io.BytesIO(file_content))
-            sheets = {}
-            for sheet_name in xls.sheet_names:
-                df = pd.read_excel(xls, sheet_name=sheet_name)
-                if not df.empty:
-                    # "Unnamed" sütun tespiti → başlık satırını otomatik bul
-                    unnamed_count = sum(1 for c in df.columns if str(c).startswith("Unnamed:"))
-                    if unnamed_count > len(df.columns) // 2:
-                        df_raw = pd.read_excel(xls, sheet_name=sheet_name, header=None)
-                        best_row, best_score = 0, 0
-                        for ri in range(min(20, len(df_raw))):
-                            row_vals = df_raw.iloc[ri].dropna()
-                            if len(row_vals) < 2:
-                                continue
-                            str_count = sum(
-                                1 for v in row_vals
-                                if isinstance(v, str) and len(str(v).strip()) > 1
-                                and not str(v).strip().replace('.', '').replace(',', '').isdigit()
-                            )
-                            score = str_count / max(len(df_raw.columns), 1)
-                            if score > best_score:
-                                best_score = score
-                                best_row = ri
-                        if best_score >= 0.3:
-                            new_headers = df_raw.iloc[best_row].tolist()
-                            df = df_raw.iloc[best_row + 1:].copy()
-                            df.columns = [
-                                str(h).strip() if pd.notna(h) else f"Sütun_{j}"
-                                for j, h in enumerate(new_headers)
-                            ]
-                            df = df.reset_index(drop=True)
-                    sheets[sheet_name] = df
+            # v5.10.8: Auto header detection (v7.31.00: örnek satırlardan, tek okumada)
+            sheets, truncated = read_sheets(filename, file_content)
             
             if not sheets:
                 return None
@@ -116,6 +102,8 @@ def parse_file_to_dataframe(filename: str, file_content: bytes) -> Optional[pd.D
                     name: {"rows": len(df), "cols": len(df.columns)}
                     for name, df in sheets.items()
                 }
+                if truncated:
+                    only_df.attrs['_truncated'] = True
                 return only_df
             
             # Çoklu sayfa: sütunlar uyumluysa birleştir, değilse en büyüğünü kullan
@@ -143,20 +131,19 @@ def parse_file_to_dataframe(filename: str, file_content: bytes) -> Optional[pd.D
                 name: {"rows": len(df), "cols": len(df.columns)}
                 for name, df in sheets.items()
             }
+            if truncated:
+                main_sheet.attrs['_truncated'] = True
             
             return main_sheet
         
-        elif filename_lower.endswith('.csv'):
-            # CSV — farklı delimiter'ları dene
-            for sep in [',', ';', '\t', '|']:
-                try:
-                    df = pd.read_csv(io.BytesIO(file_content), sep=sep, encoding='utf-8')
-                    if len(df.columns) > 1:
-                        return df
-                except Exception:
-                    continue
-            # Son deneme: otomatik
-            return pd.read_csv(io.BytesIO(file_content), encoding='utf-8')
+        elif filename_lower.endswith(('.csv', '.tsv')):
+            # CSV — ayraç örnekten tespit edilir (',', ';', '\t', '|'), TSV her zaman '\t'
+            sep = '\t' if filename_lower.endswith('.tsv') else None
+            sheets, truncated = read_sheets(filename, file_content, sep=sep)
+            df = sheets.get(None)
+            if df is not None and truncated:
+                df.attrs['_truncated'] = True
+            return df
         
         elif filename_lower.endswith('.json'):
             text = file_content.decode('utf-8')
@@ -172,9 +159,6 @@ def parse_file_to_dataframe(filename: str, file_content: bytes) -> Optional[pd.D
                             return pd.DataFrame(val)
                 return pd.DataFrame([data])
             
-        elif filename_lower.endswith('.tsv'):
-            return pd.read_csv(io.BytesIO(file_content), sep='\t', encoding='utf-8')
-            
     except Exception as e:
         logger.warning("parse_to_df_failed", file=filename, error=str(e))
     
@@ -282,7 +266,94 @@ def parse_pdf_tables(file_content: bytes, filename: str = "document.pdf") -> Opt
         return None
 
 
-def discover_data(df: pd.DataFrame) -> dict:
+# ══════════════════════════════════════════════════════════════
+# 1b. SÜTUN PROFİLİ — tüm analizlerin ortak istatistikleri (v7.30.00)
+# ══════════════════════════════════════════════════════════════
+
+PROFILE_QUANTILES = (0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95, 0.99)
+_DESCRIBE_ROWS = {"count": "count", "mean": "mean", "std": "std", "min": "min",
+                  "q25": "25%", "q50": "50%", "q75": "75%", "max": "max"}
+
+
+def _numeric_stats(block: pd.DataFrame) -> pd.DataFrame:
+    """Sütun bloğu için tek geçişte istatistikler (satır=istatistik, sütun=kolon)."""
+    quantiles = block.quantile(list(PROFILE_QUANTILES))
+    quantiles.index = [f"q{round(q * 100):02d}" for q in PROFILE_QUANTILES]
+    median = quantiles.loc["q50"]
+    stats = pd.DataFrame({
+        "count": block.count(),
+        "mean": block.mean(),
+        "std": block.std(),
+        "min": block.min(),
+        "max": block.max(),
+        "sum": block.sum(),
+        "median": median,
+        "skew": block.skew(),
+        "kurtosis": block.kurtosis(),
+        "mad": (block - median).abs().median(),
+    }).T
+    return pd.concat([stats, quantiles])
+
+
+class ColumnProfile:
+    """DataFrame başına bir kez hesaplanan sütun istatistikleri.
+
+    Eskiden statistical/anomaly/correlation/distribution/quality analizleri
+    her sütun için ortalama, std, yüzdelik ve medyanı ayrı ayrı yeniden
+    hesaplıyordu. Profil bunları vektörel tek geçişte üretir (geniş
+    tablolarda sütun grupları thread havuzunda); korelasyon matrisleri ilk
+    istekte hesaplanıp saklanır. analyze.py profili yüklenen dosyanın
+    cache kaydında tutar.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+        self.row_count = len(df)
+        self.numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+        self.null_counts = df.isna().sum()
+        self.nunique = df.nunique()
+        self.numeric = self._compute_numeric(df[self.numeric_columns])
+        self._corr: dict[tuple, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _compute_numeric(block: pd.DataFrame) -> pd.DataFrame:
+        n_cols = block.shape[1]
+        workers = min(ANALYZER_PROFILE_WORKERS, n_cols)
+        if workers <= 1 or block.size < ANALYZER_PROFILE_PARALLEL_CELLS:
+            return _numeric_stats(block)
+        step = -(-n_cols // workers)
+        chunks = [block.iloc[:, i:i + step] for i in range(0, n_cols, step)]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="col-profile") as pool:
+            return pd.concat(list(pool.map(_numeric_stats, chunks)), axis=1)
+
+    def stat(self, col: str, name: str) -> float:
+        """Tek istatistik (ör. stat("Tutar", "q25"))."""
+        return self.numeric.at[name, col]
+
+    def describe(self, cols: list[str]) -> pd.DataFrame:
+        """df[cols].describe() ile aynı tablo — yeniden hesaplamadan."""
+        desc = self.numeric.loc[list(_DESCRIBE_ROWS), cols].astype(float)
+        desc.index = list(_DESCRIBE_ROWS.values())
+        return desc
+
+    def corr(self, cols: list[str], method: str = "pearson") -> pd.DataFrame:
+        """Korelasyon matrisi — (yöntem, sütunlar) başına bir kez hesaplanır."""
+        key = (method, tuple(cols))
+        with self._lock:
+            if key not in self._corr:
+                self._corr[key] = self._df[cols].corr(method=method)
+            return self._corr[key]
+
+
+def get_column_profile(df: pd.DataFrame, profile: Optional[ColumnProfile] = None) -> ColumnProfile:
+    """Verilen profili kullan, yoksa DataFrame için yenisini hesapla."""
+    if profile is not None:
+        return profile
+    return ColumnProfile(df)
+
+
+def discover_data(df: pd.DataFrame, profile: Optional[ColumnProfile] = None) -> dict:
     """
     DataFrame'i otomatik keşfet — sütun tipleri, istatistikler, ilişkiler.
     """
@@ -292,6 +363,7 @@ def discover_data(df: pd.DataFrame) -> dict:
     # sonsuz döngüye girer → RecursionError. Bu satır attrs'u TEMİZLER.
     # parse_file_to_dataframe() sheets bilgisini artık attrs'a koymaz.
     df.attrs = {}
+    profile = get_column_profile(df, profile)
     
     info = {
         "row_count": len(df),
@@ -307,16 +379,17 @@ def discover_data(df: pd.DataFrame) -> dict:
     }
     
     for col in df.columns:
+        null_count = int(profile.null_counts[col])
         col_info = {
             "name": col,
             "dtype": str(df[col].dtype),
-            "non_null": int(df[col].notna().sum()),
-            "null_count": int(df[col].isna().sum()),
-            "null_pct": round(df[col].isna().mean() * 100, 1),
-            "unique_count": int(df[col].nunique()),
+            "non_null": len(df) - null_count,
+            "null_count": null_count,
+            "null_pct": round(null_count / len(df) * 100, 1) if len(df) else 0.0,
+            "unique_count": int(profile.nunique[col]),
         }
         
-        if df[col].isna().any():
+        if null_count > 0:
             info["has_missing"] = True
             info["missing_summary"][col] = col_info["null_count"]
         
@@ -331,15 +404,21 @@ def discover_data(df: pd.DataFrame) -> dict:
         elif pd.api.types.is_numeric_dtype(df[col]):
             info["numeric_columns"].append(col)
             col_info["type"] = "numeric"
-            col_info["min"] = float(df[col].min()) if df[col].notna().any() else None
-            col_info["max"] = float(df[col].max()) if df[col].notna().any() else None
-            col_info["mean"] = round(float(df[col].mean()), 2) if df[col].notna().any() else None
-            col_info["median"] = round(float(df[col].median()), 2) if df[col].notna().any() else None
-            col_info["std"] = round(float(df[col].std()), 2) if df[col].notna().any() else None
-            col_info["sum"] = float(df[col].sum()) if df[col].notna().any() else None
+            # bool sütunlar select_dtypes(np.number) dışında kalır — profilde yoksa tek sütun hesapla
+            if col in profile.numeric.columns:
+                stat = profile.numeric[col]
+            else:
+                stat = _numeric_stats(df[[col]].astype(float))[col]
+            has_values = stat["count"] > 0
+            col_info["min"] = float(stat["min"]) if has_values else None
+            col_info["max"] = float(stat["max"]) if has_values else None
+            col_info["mean"] = round(float(stat["mean"]), 2) if has_values else None
+            col_info["median"] = round(float(stat["median"]), 2) if has_values else None
+            col_info["std"] = round(float(stat["std"]), 2) if has_values else None
+            col_info["sum"] = float(stat["sum"]) if has_values else None
         
         # Kategorik tespiti
-        elif df[col].nunique() <= max(20, len(df) * 0.05):
+        elif col_info["unique_count"] <= max(20, len(df) * 0.05):
             info["categorical_columns"].append(col)
             col_info["type"] = "categorical"
             col_info["top_values"] = df[col].value_counts().head(10).to_dict()
@@ -436,12 +515,12 @@ def create_pivot(
         return {"success": False, "error": str(e)}
 
 
-def smart_pivot(df: pd.DataFrame, question: str = None) -> dict:
+def smart_pivot(df: pd.DataFrame, question: str = None, profile: Optional[ColumnProfile] = None) -> dict:
     """
     Soruya göre otomatik pivot oluştur.
     Soru verilmezse en mantıklı pivot'u otomatik belirle.
     """
-    discovery = discover_data(df)
+    discovery = discover_data(df, profile)
     
     cat_cols = discovery["categorical_columns"]
     num_cols = discovery["numeric_columns"]
@@ -473,7 +552,7 @@ def smart_pivot(df: pd.DataFrame, question: str = None) -> dict:
 # 3. İSTATİSTİKSEL ANALİZ
 # ══════════════════════════════════════════════════════════════
 
-def statistical_analysis(df: pd.DataFrame) -> dict:
+def statistical_analysis(df: pd.DataFrame, profile: Optional[ColumnProfile] = None) -> dict:
     """Kapsamlı istatistiksel analiz"""
     result = {
         "basic_stats": {},
@@ -483,16 +562,17 @@ def statistical_analysis(df: pd.DataFrame) -> dict:
         "trends": {},
     }
     
-    num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    profile = get_column_profile(df, profile)
+    num_cols = profile.numeric_columns
     
     # Temel istatistikler
     if num_cols:
-        desc = df[num_cols].describe()
+        desc = profile.describe(num_cols)
         result["basic_stats"] = desc.to_dict()
         
         # Korelasyon matrisi
         if len(num_cols) > 1:
-            corr = df[num_cols].corr()
+            corr = profile.corr(num_cols)
             result["correlations"] = corr.to_dict()
             
             # Güçlü korelasyonlar
@@ -510,29 +590,35 @@ def statistical_analysis(df: pd.DataFrame) -> dict:
                         })
             result["strong_correlations"] = strong_corrs
         
-        # Aykırı değer tespiti (IQR yöntemi)
+        # Aykırı değer tespiti (IQR yöntemi) — tüm sütunlar tek maskeyle
+        block = df[num_cols]
+        Q1 = profile.numeric.loc["q25", num_cols]
+        Q3 = profile.numeric.loc["q75", num_cols]
+        IQR = Q3 - Q1
+        lower = Q1 - 1.5 * IQR
+        upper = Q3 + 1.5 * IQR
+        outlier_mask = block.lt(lower) | block.gt(upper)
+        outlier_counts = outlier_mask.sum()
+        outlier_values = block.where(outlier_mask)
+        outlier_min = outlier_values.min()
+        outlier_max = outlier_values.max()
         for col in num_cols:
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            lower = Q1 - 1.5 * IQR
-            upper = Q3 + 1.5 * IQR
-            outliers = df[(df[col] < lower) | (df[col] > upper)][col]
-            if len(outliers) > 0:
+            count = int(outlier_counts[col])
+            if count > 0:
                 result["outliers"][col] = {
-                    "count": len(outliers),
-                    "percentage": round(len(outliers) / len(df) * 100, 1),
-                    "lower_bound": round(lower, 2),
-                    "upper_bound": round(upper, 2),
-                    "min_outlier": round(float(outliers.min()), 2),
-                    "max_outlier": round(float(outliers.max()), 2),
+                    "count": count,
+                    "percentage": round(count / len(df) * 100, 1),
+                    "lower_bound": round(lower[col], 2),
+                    "upper_bound": round(upper[col], 2),
+                    "min_outlier": round(float(outlier_min[col]), 2),
+                    "max_outlier": round(float(outlier_max[col]), 2),
                 }
         
         # Dağılım bilgisi
         for col in num_cols:
             try:
-                skew = float(df[col].skew())
-                kurt = float(df[col].kurtosis())
+                skew = float(profile.stat(col, "skew"))
+                kurt = float(profile.stat(col, "kurtosis"))
                 result["distributions"][col] = {
                     "skewness": round(skew, 3),
                     "kurtosis": round(kurt, 3),
@@ -810,9 +896,10 @@ def comparison_analysis(df: pd.DataFrame, group_col: str = None) -> dict:
 # 6b. ANOMALİ TESPİTİ (IQR + Z-Score)
 # ══════════════════════════════════════════════════════════════
 
-def anomaly_detection(df: pd.DataFrame) -> dict:
+def anomaly_detection(df: pd.DataFrame, profile: Optional[ColumnProfile] = None) -> dict:
     """Pro anomali tespiti — IQR, Z-Score, Rolling Window, Modified Z-Score, Grubbs testi"""
-    num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    profile = get_column_profile(df, profile)
+    num_cols = profile.numeric_columns
     if not num_cols:
         return {"success": False, "error": "Sayısal sütun bulunamadı"}
     
@@ -825,16 +912,16 @@ def anomaly_detection(df: pd.DataFrame) -> dict:
             continue
         
         # 1) IQR yöntemi
-        Q1 = vals.quantile(0.25)
-        Q3 = vals.quantile(0.75)
+        Q1 = profile.stat(col, "q25")
+        Q3 = profile.stat(col, "q75")
         IQR = Q3 - Q1
         lower_iqr = Q1 - 1.5 * IQR
         upper_iqr = Q3 + 1.5 * IQR
         iqr_outliers = vals[(vals < lower_iqr) | (vals > upper_iqr)]
         
         # 2) Z-Score yöntemi
-        mean_val = vals.mean()
-        std_val = vals.std()
+        mean_val = profile.stat(col, "mean")
+        std_val = profile.stat(col, "std")
         if std_val > 0:
             z_scores = np.abs((vals - mean_val) / std_val)
             z_outliers = vals[z_scores > 2.5]
@@ -842,8 +929,8 @@ def anomaly_detection(df: pd.DataFrame) -> dict:
             z_outliers = pd.Series(dtype=float)
         
         # 3) Modified Z-Score (MAD tabanlı — medyan bazlı, daha robust)
-        median_val = vals.median()
-        mad = np.median(np.abs(vals - median_val))
+        median_val = profile.stat(col, "median")
+        mad = profile.stat(col, "mad")
         modified_z_outliers = pd.Series(dtype=float)
         if mad > 0:
             modified_z = 0.6745 * (vals - median_val) / mad
@@ -942,15 +1029,16 @@ def anomaly_detection(df: pd.DataFrame) -> dict:
 # 6c. KORELASYON ANALİZİ (Detaylı)
 # ══════════════════════════════════════════════════════════════
 
-def correlation_analysis(df: pd.DataFrame) -> dict:
+def correlation_analysis(df: pd.DataFrame, profile: Optional[ColumnProfile] = None) -> dict:
     """Pro korelasyon analizi — Pearson + Spearman + istatistiksel anlamlılık"""
-    num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    profile = get_column_profile(df, profile)
+    num_cols = profile.numeric_columns
     if len(num_cols) < 2:
         return {"success": False, "error": "En az 2 sayısal sütun gerekli"}
     
     cols = num_cols[:10]
-    pearson_matrix = df[cols].corr(method='pearson')
-    spearman_matrix = df[cols].corr(method='spearman')
+    pearson_matrix = profile.corr(cols, method='pearson')
+    spearman_matrix = profile.corr(cols, method='spearman')
     
     # Tüm ilişkileri sınıfla
     relationships = []
@@ -1030,9 +1118,10 @@ def correlation_analysis(df: pd.DataFrame) -> dict:
 # 6d. DAĞILIM ANALİZİ
 # ══════════════════════════════════════════════════════════════
 
-def distribution_analysis(df: pd.DataFrame) -> dict:
+def distribution_analysis(df: pd.DataFrame, profile: Optional[ColumnProfile] = None) -> dict:
     """Pro dağılım profili — çarpıklık, basıklık, normallik testi, yüzdelikler"""
-    num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    profile = get_column_profile(df, profile)
+    num_cols = profile.numeric_columns
     if not num_cols:
         return {"success": False, "error": "Sayısal sütun bulunamadı"}
     
@@ -1043,8 +1132,10 @@ def distribution_analysis(df: pd.DataFrame) -> dict:
             continue
         
         try:
-            skew = float(vals.skew())
-            kurt = float(vals.kurtosis())
+            stat = profile.numeric[col]
+            skew = float(stat["skew"])
+            kurt = float(stat["kurtosis"])
+            mean_val, std_val = float(stat["mean"]), float(stat["std"])
             
             # Dağılım tipi belirleme
             if abs(skew) < 0.5 and abs(kurt) < 1:
@@ -1068,10 +1159,10 @@ def distribution_analysis(df: pd.DataFrame) -> dict:
             normality_test = None
             if SCIPY_AVAILABLE and 8 <= len(vals) <= 5000:
                 try:
-                    stat, p_val = scipy_stats.shapiro(vals.values)
+                    w_stat, p_val = scipy_stats.shapiro(vals.values)
                     normality_test = {
                         "test": "Shapiro-Wilk",
-                        "statistic": round(stat, 4),
+                        "statistic": round(w_stat, 4),
                         "p_value": round(p_val, 4),
                         "is_normal": p_val > 0.05,
                         "interpretation": "Normal dağılım ✓" if p_val > 0.05 else "Normal dağılım değil ✗",
@@ -1080,10 +1171,10 @@ def distribution_analysis(df: pd.DataFrame) -> dict:
                     pass
             elif SCIPY_AVAILABLE and len(vals) > 5000:
                 try:
-                    stat, p_val = scipy_stats.kstest(vals.values, 'norm', args=(vals.mean(), vals.std()))
+                    ks_stat, p_val = scipy_stats.kstest(vals.values, 'norm', args=(mean_val, std_val))
                     normality_test = {
                         "test": "Kolmogorov-Smirnov",
-                        "statistic": round(stat, 4),
+                        "statistic": round(ks_stat, 4),
                         "p_value": round(p_val, 4),
                         "is_normal": p_val > 0.05,
                         "interpretation": "Normal dağılım ✓" if p_val > 0.05 else "Normal dağılım değil ✗",
@@ -1093,19 +1184,13 @@ def distribution_analysis(df: pd.DataFrame) -> dict:
             
             # Yüzdelik değerler
             percentiles = {
-                "P5": round(float(vals.quantile(0.05)), 2),
-                "P10": round(float(vals.quantile(0.10)), 2),
-                "P25": round(float(vals.quantile(0.25)), 2),
-                "P50": round(float(vals.quantile(0.50)), 2),
-                "P75": round(float(vals.quantile(0.75)), 2),
-                "P90": round(float(vals.quantile(0.90)), 2),
-                "P95": round(float(vals.quantile(0.95)), 2),
-                "P99": round(float(vals.quantile(0.99)), 2),
+                f"P{round(q * 100)}": round(float(stat[f"q{round(q * 100):02d}"]), 2)
+                for q in PROFILE_QUANTILES
             }
             
             # Histogram benzeri bant analizi
             bands = {}
-            min_val, max_val = float(vals.min()), float(vals.max())
+            min_val, max_val = float(stat["min"]), float(stat["max"])
             if max_val > min_val:
                 band_width = (max_val - min_val) / 5
                 for i in range(5):
@@ -1116,21 +1201,22 @@ def distribution_analysis(df: pd.DataFrame) -> dict:
                     bands[f"{round(low, 1)}-{round(high, 1)}"] = {"count": count, "pct": pct}
             
             # Yoğunlaşma bölgesi (P25-P75 arası yüzde)
-            iqr_count = int(((vals >= vals.quantile(0.25)) & (vals <= vals.quantile(0.75))).sum())
+            iqr_count = int(((vals >= stat["q25"]) & (vals <= stat["q75"])).sum())
             concentration = round(iqr_count / len(vals) * 100, 1)
             
+            mode = vals.mode()
             distributions[col] = {
                 "distribution_type": dist_type,
                 "skewness": round(skew, 3),
                 "kurtosis": round(kurt, 3),
-                "mean": round(float(vals.mean()), 2),
-                "median": round(float(vals.median()), 2),
-                "mode": round(float(vals.mode().iloc[0]), 2) if len(vals.mode()) > 0 else None,
-                "std": round(float(vals.std()), 2),
-                "cv_pct": round(float(vals.std() / vals.mean() * 100), 1) if vals.mean() != 0 else 0,
+                "mean": round(mean_val, 2),
+                "median": round(float(stat["median"]), 2),
+                "mode": round(float(mode.iloc[0]), 2) if len(mode) > 0 else None,
+                "std": round(std_val, 2),
+                "cv_pct": round(std_val / mean_val * 100, 1) if mean_val != 0 else 0,
                 "percentiles": percentiles,
                 "range": round(max_val - min_val, 2),
-                "iqr": round(float(vals.quantile(0.75) - vals.quantile(0.25)), 2),
+                "iqr": round(float(stat["q75"] - stat["q25"]), 2),
                 "bands": bands,
                 "concentration_iqr_pct": concentration,
                 "normality_test": normality_test,
@@ -1278,6 +1364,25 @@ def forecast_analysis(df: pd.DataFrame, date_col: str = None, value_col: str = N
             except Exception:
                 pass
         
+        # ── Diğer sayısal sütunlar: toplu yumuşatma tahmini (v7.29.00) ──
+        column_forecasts = {}
+        other_cols = [c for c in num_cols if c != value_col]
+        if FORECASTING_AVAILABLE and other_cols:
+            try:
+                batch = forecast_columns(df, date_col, other_cols, forecast_periods=periods,
+                                         arima_columns=0)
+                column_forecasts = {
+                    col: {
+                        "best_method": r["best_method"],
+                        "mape": r["best_mape"],
+                        "forecasts": r["forecasts"],
+                        "trend_direction": r["trend_direction"],
+                    }
+                    for col, r in batch.get("columns", {}).items()
+                }
+            except Exception:
+                pass
+        
         # En iyi modelin güven seviyesi
         confidence = "Yüksek" if best_mape < 10 else "Orta" if best_mape < 25 else "Düşük"
         
@@ -1297,6 +1402,7 @@ def forecast_analysis(df: pd.DataFrame, date_col: str = None, value_col: str = N
             "predicted_change_pct": predicted_change,
             "models": models,
             "models_compared": len(models),
+            "column_forecasts": column_forecasts,
         }
     
     except Exception as e:
@@ -1388,8 +1494,9 @@ def pareto_analysis(df: pd.DataFrame, value_col: str = None, label_col: str = No
 # 6g. VERİ KALİTESİ DENETİMİ
 # ══════════════════════════════════════════════════════════════
 
-def data_quality_analysis(df: pd.DataFrame) -> dict:
+def data_quality_analysis(df: pd.DataFrame, profile: Optional[ColumnProfile] = None) -> dict:
     """Pro veri kalitesi — eksik veri, tip tutarlılığı, tarih doğrulama, aykırı değer taraması, çapraz kontrol"""
+    profile = get_column_profile(df, profile)
     total_cells = df.shape[0] * df.shape[1]
     
     # 1. Eksik veri analizi
@@ -1397,7 +1504,7 @@ def data_quality_analysis(df: pd.DataFrame) -> dict:
     total_missing = 0
     missing_patterns = {}
     for col in df.columns:
-        null_count = int(df[col].isnull().sum())
+        null_count = int(profile.null_counts[col])
         if null_count > 0:
             missing[col] = {
                 "count": null_count,
@@ -1508,10 +1615,10 @@ def data_quality_analysis(df: pd.DataFrame) -> dict:
     
     # 6. Sayısal sütun aralık kontrolü (mantıksız değerler)
     range_issues = {}
-    for col in df.select_dtypes(include=[np.number]).columns:
-        vals = df[col].dropna()
-        if len(vals) < 5:
+    for col in profile.numeric_columns:
+        if profile.stat(col, "count") < 5:
             continue
+        vals = df[col].dropna()
         issues = []
         if (vals < 0).any():
             neg_count = int((vals < 0).sum())
@@ -1520,8 +1627,8 @@ def data_quality_analysis(df: pd.DataFrame) -> dict:
             if any(kw in lower_col for kw in ['fiyat', 'price', 'miktar', 'quantity', 'adet', 'count', 'yaş', 'age', 'weight', 'ağırlık']):
                 issues.append({"type": "Negatif değerler", "count": neg_count, "note": f"'{col}' sütununda negatif değer beklenmez"})
         # Aşırı yüksek değerler (ortalamadan 10x)
-        mean_v = vals.mean()
-        max_v = vals.max()
+        mean_v = profile.stat(col, "mean")
+        max_v = profile.stat(col, "max")
         if mean_v > 0 and max_v > mean_v * 100:
             issues.append({"type": "Aşırı yüksek", "max_value": round(float(max_v), 2), "mean": round(float(mean_v), 2), "ratio": round(float(max_v / mean_v), 1)})
         if issues:
@@ -1552,7 +1659,7 @@ def data_quality_analysis(df: pd.DataFrame) -> dict:
     # 8. Kardinalite analizi (sütun benzersiz değer oranı)
     cardinality = {}
     for col in df.columns:
-        nunique = df[col].nunique()
+        nunique = int(profile.nunique[col])
         ratio = round(nunique / len(df) * 100, 1) if len(df) > 0 else 0
         if ratio == 100 and df[col].dtype == 'object':
             cardinality[col] = {"type": "Olası ID/anahtar sütun", "unique_ratio": ratio}
@@ -1649,6 +1756,7 @@ def generate_analysis_prompt(
     analysis_type: str = "full",
     question: str = None,
     filename: str = None,
+    profile: Optional[ColumnProfile] = None,
 ) -> str:
     """
     LLM'e gönderilecek detaylı analiz prompt'u oluştur.
@@ -1667,9 +1775,13 @@ def generate_analysis_prompt(
         - "forecast": Tahminleme / projeksiyon
         - "pareto": Pareto ABC analizi
         - "quality": Veri kalitesi denetimi
+    
+    profile: analyze.py cache'indeki sütun profili — verilmezse bir kez
+    hesaplanır ve tüm alt analizlerde paylaşılır.
     """
     
-    discovery = discover_data(df)
+    profile = get_column_profile(df, profile)
+    discovery = discover_data(df, profile)
     
     # Temel veri bilgisi — tüm tipler için ortak
     prompt = f"""## 📊 Doküman Analizi: {filename or 'Yüklenen Veri'}
@@ -1704,7 +1816,7 @@ def generate_analysis_prompt(
     # ── TİP-SPESİFİK VERİ EKLEMELERİ ──
     
     # İstatistiksel Analiz (tüm tipler için temel)
-    stats = statistical_analysis(df)
+    stats = statistical_analysis(df, profile)
     
     if stats.get("strong_correlations") and analysis_type in ("full", "correlation", "report", "recommend"):
         prompt += "\n### Korelasyonlar (Güçlü İlişkiler):\n"
@@ -1718,7 +1830,7 @@ def generate_analysis_prompt(
     
     # Pivot Tablo
     if analysis_type in ("full", "pivot") and discovery["categorical_columns"] and discovery["numeric_columns"]:
-        pivot_result = smart_pivot(df)
+        pivot_result = smart_pivot(df, profile=profile)
         if pivot_result.get("success"):
             prompt += f"\n### Pivot Tablo:\n```\n{pivot_result['table_str'][:2000]}\n```\n"
     
@@ -1771,7 +1883,7 @@ def generate_analysis_prompt(
     
     # Anomali Tespiti
     if analysis_type == "anomaly":
-        anom = anomaly_detection(df)
+        anom = anomaly_detection(df, profile)
         if anom.get("success"):
             prompt += f"\n### Anomali Tespiti (Genel Sağlık: {anom['overall_health']}, Yöntemler: {', '.join(anom.get('detection_methods', []))}):\n"
             prompt += f"- Toplam anomali: {anom['total_anomalies']}, Etkilenen sütun: {anom['columns_with_anomalies']}/{anom['total_columns_checked']}\n"
@@ -1791,7 +1903,7 @@ def generate_analysis_prompt(
     
     # Korelasyon Analizi
     if analysis_type == "correlation":
-        corr = correlation_analysis(df)
+        corr = correlation_analysis(df, profile)
         if corr.get("success"):
             prompt += f"\n### Detaylı Korelasyon Analizi ({corr['total_pairs']} çift incelendi):\n"
             prompt += f"- Güçlü ilişki: {corr['strong_count']}, Orta ilişki: {corr['moderate_count']}\n"
@@ -1805,7 +1917,7 @@ def generate_analysis_prompt(
     
     # Dağılım Analizi
     if analysis_type == "distribution":
-        dist = distribution_analysis(df)
+        dist = distribution_analysis(df, profile)
         if dist.get("success"):
             prompt += f"\n### Dağılım Analizi ({dist['columns_analyzed']} sütun):\n"
             for col, d in dist.get("distributions", {}).items():
@@ -1844,6 +1956,14 @@ def generate_analysis_prompt(
             prompt += f"- En iyi model MAPE: %{fc.get('best_mape', 'N/A')}\n"
             if fc.get("predicted_change_pct") is not None:
                 prompt += f"- Beklenen değişim: %{fc['predicted_change_pct']}\n"
+            
+            # Diğer sütunların toplu tahmin özeti
+            other = fc.get("column_forecasts", {})
+            if other:
+                prompt += f"- **Diğer sütunlar** ({len(other)} sütun, toplu tahmin):\n"
+                for col, cf in list(other.items())[:10]:
+                    last = cf["forecasts"][-1] if cf.get("forecasts") else "N/A"
+                    prompt += f"  - {col}: {cf.get('best_method')} (MAPE=%{round(cf.get('mape', 0), 2)}), Dönem sonu tahmin: {last}\n"
     
     # Pareto / ABC
     if analysis_type == "pareto":
@@ -1859,7 +1979,7 @@ def generate_analysis_prompt(
     
     # Veri Kalitesi
     if analysis_type == "quality":
-        qual = data_quality_analysis(df)
+        qual = data_quality_analysis(df, profile)
         if qual.get("success"):
             dims = qual.get("dimensions", {})
             prompt += f"\n### Veri Kalitesi Raporu (Skor: {qual['quality_score']}/100, Not: {qual['quality_grade']}):\n"
@@ -2274,13 +2394,14 @@ def format_analysis_for_llm(
     analysis_type: str = "full",
     question: str = None,
     filename: str = None,
+    profile: Optional[ColumnProfile] = None,
 ) -> str:
     """
     Dosya tipine göre uygun analiz prompt'u döndür.
     DataFrame varsa tablolu analiz, yoksa metin analizi.
     """
     if df is not None and not df.empty:
-        return generate_analysis_prompt(df, analysis_type, question, filename)
+        return generate_analysis_prompt(df, analysis_type, question, filename, profile)
     elif text:
         return generate_text_analysis_prompt(text, analysis_type, question, filename)
     else:
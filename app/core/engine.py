@@ -85,6 +85,9 @@ TODO GELİŞTİRİLMELİ:
 ═══════════════════════════════════════════════════════════════
 """
 
+import asyncio
+import functools
+import os
 from typing import Optional
 import re
 import time
@@ -92,7 +95,11 @@ import structlog
 
 from app.router.router import decide, async_decide
 from app.llm.client import ollama_client
+from app.llm.response_cache import doc_fingerprints, get_last_cache_status
+from app.llm.scheduler import llm_scheduler
 from app.llm.prompts import build_prompt, build_rag_prompt
+from app.core.orchestrator import DagStage, StepStatus, run_stage_dag, stage_to_thread
+from app.core.stage_tracing import enter_stage, exit_stage, start_trace
 from app.memory.vector_memory import remember, recall, search_memory
 
 # Few-shot sohbet örnekleri
@@ -106,12 +113,15 @@ except ImportError:
 
 # RAG modülünü güvenli şekilde import et
 try:
-    from app.rag.vector_store import search_documents, agentic_search, get_stats as get_rag_stats, add_document as rag_add_document
+    from app.rag.vector_store import search_documents, agentic_search, async_agentic_search, get_stats as get_rag_stats, add_document as rag_add_document
     RAG_AVAILABLE = True
 except ImportError:
     RAG_AVAILABLE = False
     search_documents = lambda q, n=3: []
     agentic_search = lambda q, n=5, d=None: []
+
+    async def async_agentic_search(q, n_results=5, department=None):
+        return []
     get_rag_stats = lambda: {"available": False}
     rag_add_document = lambda *a, **k: False
 
@@ -644,6 +654,781 @@ def _build_pdf_image_rich_data(question: str, relevant_docs: list) -> dict | Non
 logger = structlog.get_logger()
 
 
+# ══════════════════════════════════════════════════════════════
+# v7.26.00: Enterprise post-processing stage DAG
+# ══════════════════════════════════════════════════════════════
+# LLM cevabı üretildikten sonraki ~20 analiz aşaması (governance, XAI,
+# ranking, uncertainty, gatekeeper, OOD, quality, KPI, digest, policy…)
+# eskiden sırayla çalışıyordu; toplam ek gecikme aşamaların TOPLAMIYDI.
+# Artık bağımlılık grafı olarak tanımlanıp eşzamanlı çalışır — ek
+# gecikme en uzun kritik yol kadardır. Senkron modüller thread'de
+# koşar; sinaps sinyalleri event loop'ta (aşama bitiminde) yayılır.
+# Aşama bütçesini aşan aşama kesilir, istek düşmez: çıktısı None olur.
+# Thread'e giden işler stage_to_thread ile başlatılır — kesilen aşamanın
+# henüz başlamamış işi (karar kaydı, gözlemlenebilirlik vb.) hiç çalışmaz.
+
+# Aşama başına süre bütçesi (ms)
+ENTERPRISE_STAGE_TIMEOUT_MS = float(os.environ.get("ENTERPRISE_STAGE_TIMEOUT_MS", "5000"))
+# Agent pipeline birden fazla LLM çağrısı yapar — ayrı, geniş bütçe
+ENTERPRISE_PIPELINE_TIMEOUT_MS = float(os.environ.get("ENTERPRISE_PIPELINE_TIMEOUT_MS", "120000"))
+# Tüm DAG için üst sınır (ms)
+ENTERPRISE_DAG_BUDGET_MS = float(os.environ.get("ENTERPRISE_DAG_BUDGET_MS", "150000"))
+
+_ANALYTIC_MODES = ("Analiz", "Rapor", "Öneri")
+_ALERT_MODES = ("Analiz", "Rapor", "Öneri", "Acil")
+
+
+async def _run_enterprise_stages(
+    *,
+    question: str,
+    answer: str,
+    context: dict,
+    intent: str,
+    relevant_docs: list,
+    web_results,
+    session_history: list,
+    tool_results,
+    structured_data,
+    reflection_data,
+    confidence: float,
+    source_citation_valid: bool,
+    sources: list,
+    synapse_ctx,
+    t0: float,
+) -> dict:
+    """Enterprise post-processing aşamalarını stage DAG olarak çalıştır.
+
+    Aşamalar `answer` metninin (sayısal doğrulama sonrası) kopyasını
+    okur; cevaba eklenen uyarılar (governance → OOD → politika) DAG
+    bittikten sonra bu sırayla eklenir, böylece sonuç aşamaların bitiş
+    sırasından bağımsızdır. Güven: agent pipeline override'ı, ardından
+    OOD ayarı (eski sıralı akıştaki gibi).
+    """
+    mode = context.get("mode", "")
+    dept = context.get("dept", "")
+    is_error = answer.startswith("[Hata]")
+    synapse_on = bool(SYNAPSE_AVAILABLE and synapse_ctx)
+
+    def _out(deps: dict, name: str, key: str = "data"):
+        value = deps.get(name)
+        return value.get(key) if value else None
+
+    def _pipeline_conf(deps: dict) -> float:
+        """Agent pipeline override'ı sonrası güven."""
+        value = deps.get("agent_pipeline")
+        return value["confidence"] if value else confidence
+
+    def _final_conf(deps: dict) -> float:
+        """Pipeline + OOD ayarı sonrası güven."""
+        conf = _pipeline_conf(deps)
+        adjustment = _out(deps, "ood", "adjustment")
+        if adjustment:
+            conf = max(0.1, conf + adjustment / 100)
+        return conf
+
+    def _pct(conf: float) -> float:
+        return conf * 100 if conf <= 1 else conf
+
+    # ── 5d-4. ROI RECOMMENDATIONS (v4.3.0) ──
+    async def roi_monte_carlo(deps):
+        # Yatırım/maliyet sorularında Monte Carlo simülasyonu tetikle
+        _is_investment = bool(re.search(
+            r'(yatırım|maliyet|bütçe|roi\b|getiri|tasarruf|amorti|geri.?ödeme)',
+            question.lower()
+        ))
+        if not (_is_investment and MONTE_CARLO_AVAILABLE
+                and mode in _ANALYTIC_MODES and not is_error):
+            return None
+        mc_result = await stage_to_thread(
+            monte_carlo_simulate,
+            current_value=100.0,  # Normalize edilmiş baz değer
+            target_value=100.0,
+            volatility_pct=25.0,
+            simulations=1000,
+            periods=12,
+        )
+        if mc_result:
+            # v5.9.0: Monte Carlo tablosu JSON'a taşındı, cevaba eklenmez
+            logger.info("roi_monte_carlo_applied")
+        return None
+
+    # ── 5e. Cross-Module Orchestrator — geniş sorularda paralel modül çalıştır ──
+    async def cross_module(deps):
+        _is_broad_query = bool(re.search(
+            r'(genel\s*durum|özet|dashboard|sağlık|health|tüm\s*departman|panorama|büyük\s*resim)',
+            question.lower()
+        ))
+        if not (_is_broad_query and mode in _ANALYTIC_MODES):
+            return None
+        calls = {}
+        if EXECUTIVE_HEALTH_AVAILABLE:
+            calls["health"] = stage_to_thread(calculate_health_index)
+        if BOTTLENECK_AVAILABLE:
+            calls["bottleneck"] = stage_to_thread(bottleneck_analyze, question)
+        if GRAPH_IMPACT_AVAILABLE:
+            calls["graph"] = stage_to_thread(auto_graph_analysis, question, answer)
+        if not calls:
+            return None
+        results = await asyncio.gather(*calls.values(), return_exceptions=True)
+        panorama = "\n\n---\n🎯 **Cross-Module Panorama**\n"
+        for label, res in zip(calls, results):
+            if isinstance(res, Exception):
+                continue
+            if label == "health" and res:
+                panorama += f"\n{format_health_dashboard(res)}"
+            elif label == "bottleneck" and res:
+                panorama += f"\n{format_bottleneck_report(res)}"
+            elif label == "graph" and res and res.total_nodes_affected > 0:
+                panorama += f"\n{format_graph_impact(res)}"
+        if len(panorama) > 50:
+            # v5.9.0: Cross-module panorama JSON'a taşındı
+            logger.info("cross_module_orchestrator_done", modules=len(calls))
+        return None
+
+    # ── 5e. MULTI-AGENT PIPELINE — Karmaşık Analiz Sorularında ──
+    async def agent_pipeline(deps):
+        out = {"data": None, "confidence": confidence}
+        if not (AGENT_PIPELINE_AVAILABLE and should_use_pipeline(question, mode, intent)):
+            return out
+        try:
+            pipeline_context = ""
+            if relevant_docs:
+                pipeline_context = "\n".join(
+                    doc.get("content", "")[:200] for doc in relevant_docs[:3]
+                )
+            if web_results:
+                pipeline_context += f"\n{web_results[:500]}"
+
+            pipeline_result = await execute_agent_pipeline(
+                question=question,
+                context=pipeline_context,
+                llm_generate=functools.partial(ollama_client.generate, priority="enterprise"),
+                mode=context.get("mode", "Analiz"),
+            )
+            if pipeline_result and pipeline_result.final_answer:
+                # v5.9.0: Pipeline çıktısı JSON'da, cevaba eklenmez
+                out["data"] = pipeline_result.to_dict()
+                # Pipeline confidence ile override
+                if pipeline_result.overall_confidence > confidence * 100:
+                    out["confidence"] = pipeline_result.overall_confidence / 100.0
+                logger.info("agent_pipeline_completed",
+                           agents=len(pipeline_result.agent_results))
+        except Exception as e:
+            logger.warning("agent_pipeline_error", error=str(e))
+        return out
+
+    # ── 5f. AI GOVERNANCE — Bias / Drift / Confidence Monitoring ──
+    async def governance(deps):
+        if not (GOVERNANCE_AVAILABLE and governance_engine and answer and not is_error):
+            return None
+        pipeline_data = _out(deps, "agent_pipeline")
+
+        # Kullanılan modülleri topla
+        _modules_invoked = []
+        if relevant_docs:
+            _modules_invoked.append("rag")
+        if web_results:
+            _modules_invoked.append("web_search")
+        if tool_results:
+            _modules_invoked.append("tool_calling")
+        if structured_data:
+            _modules_invoked.append("structured_output")
+        if reflection_data:
+            _modules_invoked.append("reflection")
+        if pipeline_data:
+            _modules_invoked.append("agent_pipeline")
+
+        # Reasoning adımlarını topla
+        _reasoning_steps = []
+        if reflection_data and isinstance(reflection_data, dict):
+            _reasoning_steps = reflection_data.get("issues", [])
+
+        gov_record = await stage_to_thread(
+            governance_engine.evaluate,
+            question=question,
+            answer=answer,
+            mode=context.get("mode", "Sohbet"),
+            confidence=_pct(_pipeline_conf(deps)),
+            elapsed_ms=(time.time() - t0) * 1000,
+            model_name=getattr(ollama_client, 'model', 'unknown'),
+            modules_invoked=_modules_invoked,
+            reasoning_steps=_reasoning_steps,
+        )
+        alert_text = None
+        if gov_record.alert_triggered and mode in _ALERT_MODES:
+            alert_text = format_governance_alert(gov_record) or None
+        governance_data = {
+            "confidence": gov_record.confidence,
+            "bias_score": gov_record.bias_score,
+            "drift_detected": gov_record.drift_detected,
+            "alert": gov_record.alert_reason if gov_record.alert_triggered else None,
+            "compliance_score": getattr(gov_record, 'compliance_score', None),
+            "trace_id": getattr(gov_record, 'trace_id', None),
+            "drift_types": getattr(gov_record, 'drift_types', []),
+            "policy_violations": getattr(gov_record, 'policy_violations', []),
+            "risk_level": getattr(gov_record, 'risk_level', None),
+        }
+        logger.info("governance_evaluated",
+                   bias=gov_record.bias_score,
+                   drift=gov_record.drift_detected,
+                   compliance=governance_data["compliance_score"],
+                   trace_id=governance_data["trace_id"])
+
+        # ── Sinaps: Governance sinyalleri ──
+        if synapse_on:
+            emit_signal(synapse_ctx, "governance", "bias_flags",
+                       governance_data.get("policy_violations", []), 0.85)
+            emit_signal(synapse_ctx, "governance", "drift_status",
+                       governance_data.get("drift_detected", False), 0.70)
+            emit_signal(synapse_ctx, "governance", "compliance_score",
+                       governance_data.get("compliance_score", 1.0), 0.80)
+            _gov_risk = governance_data.get("risk_level")
+            if _gov_risk:
+                emit_signal(synapse_ctx, "governance", "risk_level", _gov_risk, 0.85)
+            # Kaskad kontrol — bias tetikleme
+            _cascaded = check_cascades(synapse_ctx, "governance")
+            if _cascaded:
+                logger.info("synapse_cascade_from_governance", targets=_cascaded)
+        return {"data": governance_data, "alert": alert_text}
+
+    # ── 5g. XAI — Açıklanabilir Yapay Zeka Analizi ──
+    async def xai(deps):
+        if not (XAI_AVAILABLE and decision_explainer and answer and not is_error):
+            return None
+        xai_result = await stage_to_thread(
+            decision_explainer.explain,
+            query=question,
+            response=answer,
+            mode=context.get("mode", "Sohbet"),
+            confidence=_pipeline_conf(deps),
+            sources=[doc.get("source", "") for doc in relevant_docs] if relevant_docs else [],
+            rag_docs=relevant_docs if relevant_docs else None,
+            web_searched=web_results is not None,
+            reflection_data=reflection_data,
+            module_source="engine",
+        )
+        if not xai_result:
+            return None
+        logger.info("xai_evaluated",
+                   weighted_confidence=xai_result.get("weighted_confidence", 0),
+                   risk_level=xai_result.get("risk", {}).get("level", "?"))
+
+        # ── Sinaps: XAI sinyalleri ──
+        if synapse_on:
+            emit_signal(synapse_ctx, "explainability", "xai_factors",
+                       xai_result.get("factors", []), 0.65)
+            emit_signal(synapse_ctx, "explainability", "weighted_confidence",
+                       xai_result.get("weighted_confidence", 0), 0.60)
+        return xai_result
+
+    # ── 5i. Trend Detection — Aynı KPI/konu tekrar soruluyorsa trend raporla ──
+    async def trend(deps):
+        if not (session_history and len(session_history) >= 3
+                and mode in _ANALYTIC_MODES and not is_error):
+            return None
+        _kpi_pattern = re.compile(
+            r'(verimlilik|fire\s*oranı|maliyet|ciro|üretim|stok|kalite|karlılık|'
+            r'sipariş|teslimat|devamsızlık|enerji|hurda|duruş)',
+            re.IGNORECASE
+        )
+        _current_kpis = set(_kpi_pattern.findall(question.lower()))
+        if not _current_kpis:
+            return None
+        _past_mentions = []
+        for msg in session_history[-10:]:
+            _q = msg.get("q", msg.get("content", ""))
+            overlap = _current_kpis & set(_kpi_pattern.findall(_q.lower()))
+            if overlap:
+                _past_mentions.append({"q": _q[:100], "kpis": overlap})
+        if len(_past_mentions) >= 2:
+            # v5.9.0: Trend notu JSON metadata'da
+            logger.info("trend_detected", kpis=list(_current_kpis),
+                       mentions=len(_past_mentions))
+        return None
+
+    # ── 5i. DECISION IMPACT RANKING — Analiz modunda kararları sırala ──
+    async def ranking(deps):
+        if not (DECISION_RANKING_AVAILABLE and answer and mode in _ANALYTIC_MODES):
+            return None
+
+        def _rank():
+            decisions = extract_decisions_from_llm(answer, question)
+            if not decisions or len(decisions) < 2:
+                return None
+            ranking_result = rank_decisions(decisions)
+            logger.info("decision_ranking_applied", count=len(decisions))
+            # v5.9.0: Ranking tablosu JSON'da
+            return {
+                "total": ranking_result.total_evaluated,
+                "top_action": ranking_result.top_action,
+            }
+
+        return await stage_to_thread(_rank)
+
+    # ── 5j. GRAPH IMPACT MAPPING — KPI/Risk/Departman ilişki grafiği ──
+    async def graph_impact(deps):
+        if not (GRAPH_IMPACT_AVAILABLE and answer and mode in _ANALYTIC_MODES):
+            return None
+        graph_result = await stage_to_thread(auto_graph_analysis, question, answer)
+        if not (graph_result and graph_result.total_nodes_affected > 0):
+            return None
+        logger.info("graph_impact_applied", focus=graph_result.focus_node,
+                   affected=graph_result.total_nodes_affected)
+        # v5.9.0: Graph impact JSON'da
+        return {
+            "focus": graph_result.focus_node,
+            "affected": graph_result.total_nodes_affected,
+            "critical_chain": graph_result.critical_chain,
+        }
+
+    # ── 6c–6g. Tetikleyiciler — debate / causal / strategic / executive / KG ──
+    def _trigger(available: bool, check, event: str, **kwargs):
+        if not available:
+            return None
+        should, reason = check(question=question, mode=mode, intent=intent, **kwargs)
+        if not should:
+            return None
+        logger.info(event, reason=reason)
+        return {"triggered": True, "reason": reason}
+
+    async def debate(deps):
+        return _trigger(MULTI_AGENT_DEBATE_AVAILABLE, check_debate_trigger,
+                        "multi_agent_debate_triggered",
+                        confidence=_pipeline_conf(deps) if REFLECTION_AVAILABLE else 85)
+
+    async def causal(deps):
+        return _trigger(CAUSAL_INFERENCE_AVAILABLE, check_causal_trigger,
+                        "causal_inference_triggered")
+
+    async def strategic(deps):
+        return _trigger(STRATEGIC_PLANNER_AVAILABLE, check_strategic_trigger,
+                        "strategic_planner_triggered")
+
+    async def executive_intel(deps):
+        return _trigger(EXECUTIVE_INTELLIGENCE_AVAILABLE, check_executive_trigger,
+                        "executive_intelligence_triggered")
+
+    async def kg_trigger(deps):
+        return _trigger(KNOWLEDGE_GRAPH_AVAILABLE, check_kg_trigger,
+                        "knowledge_graph_triggered")
+
+    # ── 6h. UNCERTAINTY QUANTIFICATION — Belirsizlik ölçümleme (v5.1.0) ──
+    async def uncertainty(deps):
+        if not UNCERTAINTY_AVAILABLE:
+            return None
+        uq_result = await stage_to_thread(
+            uncertainty_quantifier.quantify,
+            question=question,
+            reflection_data=reflection_data,
+            engine_confidence=_pipeline_conf(deps) if REFLECTION_AVAILABLE else 0.85,
+            governance_data=_out(deps, "governance"),
+        )
+        uncertainty_data = uq_result.to_dict()
+        logger.debug("uncertainty_quantified",
+                     confidence=uq_result.ensemble_confidence,
+                     margin=uq_result.margin_of_error)
+
+        # ── Sinaps: Uncertainty sinyalleri ──
+        if synapse_on:
+            emit_signal(synapse_ctx, "uncertainty_quantification", "uncertainty",
+                       uncertainty_data.get("uncertainty_pct", 50), 0.80)
+            emit_signal(synapse_ctx, "uncertainty_quantification", "ensemble_confidence",
+                       uq_result.ensemble_confidence, 0.75)
+            emit_signal(synapse_ctx, "uncertainty_quantification", "confidence_adjustment",
+                       uncertainty_data.get("confidence_adjustment", 0), 0.70)
+        return uncertainty_data
+
+    # ── 6i. DECISION RISK GATEKEEPER — Karar risk kapısı (v5.1.0) ──
+    async def gatekeeper(deps):
+        if not DECISION_GATEKEEPER_AVAILABLE:
+            return None
+        should_gate, _ = check_gate_trigger(question=question, mode=mode, intent=intent)
+        if not should_gate:
+            return None
+
+        # ── Sinaps: risk_data — sinaps ağından topla (event loop'ta) ──
+        _synapse_risk = None
+        if synapse_on:
+            _inputs = gather_module_inputs(synapse_ctx, "decision_gatekeeper")
+            # risk_analyzer sinyallerini risk_data olarak kullan
+            if _inputs.get("risk_level") or _inputs.get("risk_factors"):
+                _synapse_risk = {
+                    "risk_level": _inputs.get("risk_level", "LOW"),
+                    "risk_factors": _inputs.get("risk_factors", []),
+                    "risk_score": _inputs.get("risk_score", 0),
+                }
+
+        gate_result = await stage_to_thread(
+            decision_gatekeeper.evaluate,
+            question=question,
+            answer=answer,
+            governance_data=_out(deps, "governance"),
+            reflection_data=reflection_data,
+            confidence=_pipeline_conf(deps) if REFLECTION_AVAILABLE else 0.85,
+            risk_data=_synapse_risk,
+            ranking_data=deps.get("ranking"),
+        )
+        gate_data = gate_result.to_dict()
+        logger.info("decision_gate_evaluated",
+                    verdict=gate_result.verdict.value,
+                    risk_score=gate_result.composite_risk_score)
+
+        # ── Sinaps: Gatekeeper sinyalleri + kaskad ──
+        if synapse_on:
+            emit_signal(synapse_ctx, "decision_gatekeeper", "gate_verdict",
+                       gate_result.verdict.value, 0.90)
+            emit_signal(synapse_ctx, "decision_gatekeeper", "composite_risk_score",
+                       gate_result.composite_risk_score, 0.80)
+            emit_signal(synapse_ctx, "decision_gatekeeper", "escalation_required",
+                       gate_data.get("escalation_required", False), 0.75)
+            emit_signal(synapse_ctx, "decision_gatekeeper", "risk_signals",
+                       gate_data.get("risk_signals", []), 0.70)
+            _cascaded = check_cascades(synapse_ctx, "decision_gatekeeper")
+            if _cascaded:
+                logger.info("synapse_cascade_from_gate", targets=_cascaded)
+        return gate_data
+
+    # ── 6j. OOD DETECTOR — Dağılım dışı girdi algılama (v5.3.0) ──
+    async def ood(deps):
+        if not (OOD_DETECTOR_AVAILABLE and check_ood):
+            return None
+        ood_result = await stage_to_thread(check_ood, question=question, department=dept)
+        warning = None
+        if ood_result.is_ood and mode in _ALERT_MODES:
+            warning = format_ood_warning(ood_result) or None
+        logger.debug("ood_checked", severity=ood_result.severity.value, score=ood_result.ood_score)
+
+        # ── Sinaps: OOD sinyalleri + kaskad ──
+        if synapse_on:
+            emit_signal(synapse_ctx, "ood_detector", "ood_score",
+                       ood_result.ood_score, 0.80)
+            emit_signal(synapse_ctx, "ood_detector", "ood_severity",
+                       ood_result.severity.value, 0.85)
+            if ood_result.confidence_adjustment != 0:
+                emit_signal(synapse_ctx, "ood_detector", "confidence_adjustment",
+                           ood_result.confidence_adjustment, 0.75)
+            _cascaded = check_cascades(synapse_ctx, "ood_detector")
+            if _cascaded:
+                logger.info("synapse_cascade_from_ood", targets=_cascaded)
+        return {
+            "data": ood_result.to_dict(),
+            "adjustment": ood_result.confidence_adjustment,
+            "warning": warning,
+        }
+
+    # ── 6k. DECISION QUALITY SCORE — Birleşik karar kalitesi (v5.3.0) ──
+    async def quality(deps):
+        if not (DECISION_QUALITY_AVAILABLE and evaluate_decision_quality):
+            return None
+        # ── Sinaps: meta_data — sinaps ağından topla ──
+        _synapse_meta = None
+        if synapse_on:
+            _meta_inputs = gather_module_inputs(synapse_ctx, "decision_quality")
+            if _meta_inputs.get("meta_strategy") or _meta_inputs.get("quality_trend"):
+                _synapse_meta = _meta_inputs
+
+        quality_result = await stage_to_thread(
+            evaluate_decision_quality,
+            reflection_data=reflection_data,
+            uncertainty_data=deps.get("uncertainty"),
+            gate_data=deps.get("gatekeeper"),
+            meta_data=_synapse_meta,
+            governance_data=_out(deps, "governance"),
+            debate_data=deps.get("debate"),
+            causal_data=deps.get("causal"),
+            rag_used=bool(relevant_docs),
+            web_searched=web_results is not None,
+            sources=sources,
+            source_citation_valid=source_citation_valid,
+            question=question,
+            department=dept,
+        )
+        quality_data = {
+            "overall_score": quality_result.overall_score,
+            "band": quality_result.band.value,
+            "confidence_interval": quality_result.confidence_interval,
+            "executive_line": quality_result.executive_line,
+        }
+        logger.info("decision_quality_scored",
+                    score=quality_result.overall_score,
+                    band=quality_result.band.value)
+
+        # ── Sinaps: Decision Quality sinyalleri + kaskad ──
+        if synapse_on:
+            emit_signal(synapse_ctx, "decision_quality", "quality_score",
+                       quality_result.overall_score, 0.90)
+            emit_signal(synapse_ctx, "decision_quality", "quality_band",
+                       quality_result.band.value, 0.80)
+            _cascaded = check_cascades(synapse_ctx, "decision_quality")
+            if _cascaded:
+                logger.info("synapse_cascade_from_quality", targets=_cascaded)
+        return quality_data
+
+    # ── 6l. KPI IMPACT MAPPING — KPI etki analizi (v5.3.0) ──
+    async def kpi_impact(deps):
+        if not (KPI_IMPACT_AVAILABLE and analyze_kpi_impact):
+            return None
+        kpi_result = await stage_to_thread(
+            analyze_kpi_impact, decision_text=f"{question} {answer[:500]}")
+        if not (kpi_result and kpi_result.primary_impacts):
+            return None
+        kpi_impact_data = {
+            "primary_count": len(kpi_result.primary_impacts),
+            "domino_count": len(kpi_result.domino_effects),
+            "impact_score": kpi_result.impact_score,
+            "net_financial": kpi_result.net_financial_direction,
+            "executive_summary": kpi_result.executive_summary,
+            "impacts": [
+                {"kpi_id": i.kpi_id, "kpi_name": i.kpi_name, "direction": i.direction.value,
+                 "magnitude": i.magnitude.value, "estimated_change_pct": i.estimated_change_pct}
+                for i in kpi_result.primary_impacts[:5]
+            ],
+        }
+        logger.info("kpi_impact_analyzed",
+                    impacts=len(kpi_result.primary_impacts),
+                    score=kpi_result.impact_score)
+
+        # ── Sinaps: KPI Impact sinyalleri + kaskad ──
+        if synapse_on:
+            emit_signal(synapse_ctx, "kpi_impact", "kpi_impacts",
+                       kpi_impact_data.get("impacts", []), 0.80)
+            emit_signal(synapse_ctx, "kpi_impact", "impact_score",
+                       kpi_result.impact_score, 0.75)
+            emit_signal(synapse_ctx, "kpi_impact", "financial_estimate",
+                       kpi_result.net_financial_direction, 0.70)
+            _cascaded = check_cascades(synapse_ctx, "kpi_impact")
+            if _cascaded:
+                logger.info("synapse_cascade_from_kpi", targets=_cascaded)
+        return kpi_impact_data
+
+    # ── 6m. DECISION MEMORY — Benzer geçmiş kararları bul (v5.3.0) ──
+    async def decision_memory(deps):
+        if not (DECISION_MEMORY_AVAILABLE and find_similar_decisions):
+            return None
+        similar = await stage_to_thread(
+            find_similar_decisions, question=question, department=dept, top_n=3)
+        if not similar:
+            return None
+        memory_data = {
+            "similar_count": len(similar),
+            "top_similarity": similar[0].similarity_score,
+            "similar_decisions": [
+                {"question": s.record.question[:100], "outcome": s.record.outcome.value,
+                 "similarity": round(s.similarity_score, 2), "quality": s.record.quality_score}
+                for s in similar
+            ],
+        }
+        logger.info("similar_decisions_found", count=len(similar),
+                    top_sim=similar[0].similarity_score)
+
+        # ── Sinaps: Decision Memory sinyalleri ──
+        if synapse_on:
+            emit_signal(synapse_ctx, "decision_memory", "similar_decisions",
+                       memory_data.get("similar_decisions", []), 0.70)
+            emit_signal(synapse_ctx, "decision_memory", "accuracy_data",
+                       memory_data.get("top_similarity", 0), 0.60)
+        return memory_data
+
+    # ── 6n. EXECUTIVE DIGEST — Yönetim özeti (v5.3.0) ──
+    async def digest(deps):
+        if not (EXECUTIVE_DIGEST_AVAILABLE and generate_executive_digest
+                and mode in _ALERT_MODES):
+            return None
+        gate_data = deps.get("gatekeeper") or {}
+        uncertainty_data = deps.get("uncertainty")
+        quality_data = deps.get("quality") or {}
+        kpi_impact_data = deps.get("kpi_impact") or {}
+        ood_data = _out(deps, "ood") or {}
+
+        digest_result = await stage_to_thread(
+            generate_executive_digest,
+            question=question,
+            ai_answer=answer[:2000],
+            department=dept,
+            quality_score=quality_data.get("overall_score", 0),
+            quality_band=quality_data.get("band", ""),
+            kpi_impacts=kpi_impact_data.get("impacts", []),
+            impact_score=kpi_impact_data.get("impact_score", 0),
+            kpi_executive_summary=kpi_impact_data.get("executive_summary", ""),
+            gate_verdict=gate_data.get("verdict", ""),
+            gate_risks=gate_data.get("risk_signals", []),
+            uncertainty=uncertainty_data.get("uncertainty_pct", 50) if uncertainty_data else 50,
+            confidence=(uncertainty_data.get("ensemble_confidence", 50) if uncertainty_data
+                        else _final_conf(deps) * 100),
+            margin_of_error=uncertainty_data.get("margin_of_error", 0) if uncertainty_data else 0,
+            reflection_score=reflection_data.get("confidence", 0) if reflection_data else 0,
+            ood_detected=ood_data.get("is_ood", False),
+            ood_note=ood_data.get("warning_message", ""),
+        )
+        digest_data = digest_result.to_dict()
+        # v5.9.0: Executive digest JSON'da, cevaba eklenmez
+        logger.info("executive_digest_generated",
+                    priority=digest_result.priority.value,
+                    impact=digest_result.impact_level)
+
+        # ── Sinaps: Executive Digest sinyalleri ──
+        if synapse_on:
+            emit_signal(synapse_ctx, "executive_digest", "executive_digest",
+                       digest_data, 0.85)
+            emit_signal(synapse_ctx, "executive_digest", "digest_priority",
+                       digest_result.priority.value, 0.70)
+        return digest_data
+
+    # ── 6p. OBSERVABILITY 2.0 — Karar drift + kalite trend izleme (v5.5.0) ──
+    async def observability_stage(deps):
+        if not (OBSERVABILITY_AVAILABLE and observability):
+            return None
+        quality_data = deps.get("quality")
+        _elapsed_ms = (time.time() - t0) * 1000
+
+        def _observe():
+            observability.record_decision(
+                confidence=_pct(_final_conf(deps)),
+                quality_score=quality_data.get("overall_score", 70) if quality_data else 70,
+                latency_ms=_elapsed_ms,
+                intent=intent,
+                department=context.get("dept", "genel"),
+            )
+            # Drift kontrolü
+            return observability.check_all_drifts()
+
+        drift_report = await stage_to_thread(_observe)
+        logger.debug("observability_recorded", latency_ms=round(_elapsed_ms, 1))
+        if not drift_report:
+            return None
+        _any_drift = any(
+            d.get("severity", "none") not in ("none", "NONE")
+            for d in drift_report.values()
+            if isinstance(d, dict)
+        )
+        if not _any_drift:
+            return None
+        logger.info("observability_drift_detected",
+                   drifts={k: v.get("severity") for k, v in drift_report.items() if isinstance(v, dict)})
+        return drift_report
+
+    # ── 6q. POLICY ENGINE — Enterprise kural motoru (v5.5.0) ──
+    async def policy(deps):
+        if not (POLICY_ENGINE_AVAILABLE and enterprise_policy_engine):
+            return None
+        gate_data = deps.get("gatekeeper")
+        quality_data = deps.get("quality")
+        _policy_context = {
+            "risk_score": gate_data.get("composite_risk_score", 0) if gate_data else 0,
+            "confidence": _pct(_final_conf(deps)),
+            "quality_score": quality_data.get("overall_score", 70) if quality_data else 70,
+            "response_time_ms": (time.time() - t0) * 1000,
+            "department": context.get("dept", "genel"),
+            "mode": context.get("mode", "Sohbet"),
+            "data_source_count": len(sources) if sources else 0,
+            "model_name": getattr(ollama_client, 'model', 'unknown'),
+        }
+        policy_result = await stage_to_thread(enterprise_policy_engine.evaluate, _policy_context)
+        if not policy_result:
+            return None
+        if policy_result.allowed:
+            return {"data": {"allowed": True, "action": "allow", "violations": []}, "warning": None}
+        warning = None
+        # Block ise uyarı ekle
+        if policy_result.action.value == "block":
+            _violations_text = "; ".join(v.message for v in policy_result.violations[:3])
+            warning = f"⚠️ **Politika Uyarısı**: {_violations_text}"
+        logger.info("policy_violations",
+                    action=policy_result.action.value,
+                    violation_count=len(policy_result.violations))
+        return {
+            "data": {
+                "allowed": policy_result.allowed,
+                "action": policy_result.action.value,
+                "violations": [
+                    {"rule": v.rule_id, "message": v.message, "severity": v.severity.value}
+                    for v in policy_result.violations
+                ],
+            },
+            "warning": warning,
+        }
+
+    stage_timeout = ENTERPRISE_STAGE_TIMEOUT_MS / 1000
+    stages = [
+        DagStage("roi_monte_carlo", roi_monte_carlo, timeout=stage_timeout),
+        DagStage("cross_module", cross_module, timeout=stage_timeout),
+        DagStage("agent_pipeline", agent_pipeline, timeout=ENTERPRISE_PIPELINE_TIMEOUT_MS / 1000),
+        DagStage("governance", governance, ["agent_pipeline"], stage_timeout),
+        DagStage("xai", xai, ["agent_pipeline"], stage_timeout),
+        DagStage("trend", trend, timeout=stage_timeout),
+        DagStage("ranking", ranking, timeout=stage_timeout),
+        DagStage("graph_impact", graph_impact, timeout=stage_timeout),
+        DagStage("debate", debate, ["agent_pipeline"], stage_timeout),
+        DagStage("causal", causal, timeout=stage_timeout),
+        DagStage("strategic", strategic, timeout=stage_timeout),
+        DagStage("executive_intel", executive_intel, timeout=stage_timeout),
+        DagStage("knowledge_graph", kg_trigger, timeout=stage_timeout),
+        DagStage("uncertainty", uncertainty, ["agent_pipeline", "governance"], stage_timeout),
+        DagStage("gatekeeper", gatekeeper, ["agent_pipeline", "governance", "ranking"], stage_timeout),
+        DagStage("ood", ood, timeout=stage_timeout),
+        DagStage("quality", quality,
+                 ["uncertainty", "gatekeeper", "governance", "debate", "causal"], stage_timeout),
+        DagStage("kpi_impact", kpi_impact, timeout=stage_timeout),
+        DagStage("decision_memory", decision_memory, timeout=stage_timeout),
+        DagStage("digest", digest,
+                 ["agent_pipeline", "gatekeeper", "uncertainty", "quality", "kpi_impact", "ood"],
+                 stage_timeout),
+        DagStage("observability", observability_stage,
+                 ["agent_pipeline", "quality", "ood"], stage_timeout),
+        DagStage("policy", policy, ["agent_pipeline", "gatekeeper", "quality", "ood"], stage_timeout),
+    ]
+
+    _dag_t0 = time.monotonic()
+    results = await run_stage_dag(stages, budget=ENTERPRISE_DAG_BUDGET_MS / 1000)
+    outputs = {name: r.output for name, r in results.items()}
+
+    # Cevaba eklenen uyarılar — eski sıralı akıştaki sırayla
+    final_answer = answer
+    governance_alert = _out(outputs, "governance", "alert")
+    if governance_alert:
+        final_answer += f"\n\n{governance_alert}"
+    ood_warning = _out(outputs, "ood", "warning")
+    if ood_warning:
+        final_answer += f"\n{ood_warning}"
+    policy_warning = _out(outputs, "policy", "warning")
+    if policy_warning:
+        final_answer += f"\n\n---\n{policy_warning}"
+
+    cut = [name for name, r in results.items() if r.status != StepStatus.COMPLETED.value]
+    logger.info("enterprise_stages_completed",
+                total_ms=round((time.monotonic() - _dag_t0) * 1000, 1),
+                slowest=max(results.values(), key=lambda r: r.duration_ms).step_name,
+                not_completed=cut)
+
+    return {
+        "answer": final_answer,
+        "confidence": _final_conf(outputs),
+        "pipeline": _out(outputs, "agent_pipeline"),
+        "governance": _out(outputs, "governance"),
+        "xai": outputs.get("xai"),
+        "ranking": outputs.get("ranking"),
+        "graph_impact": outputs.get("graph_impact"),
+        "debate": outputs.get("debate"),
+        "causal": outputs.get("causal"),
+        "strategic": outputs.get("strategic"),
+        "executive_intel": outputs.get("executive_intel"),
+        "knowledge_graph": outputs.get("knowledge_graph"),
+        "uncertainty": outputs.get("uncertainty"),
+        "gate": outputs.get("gatekeeper"),
+        "ood": _out(outputs, "ood"),
+        "decision_quality": outputs.get("quality"),
+        "kpi_impact": outputs.get("kpi_impact"),
+        "decision_memory": outputs.get("decision_memory"),
+        "executive_digest": outputs.get("digest"),
+        "observability": outputs.get("observability"),
+        "policy": _out(outputs, "policy"),
+        "stages": {
+            name: {"status": r.status, "duration_ms": r.duration_ms}
+            for name, r in results.items()
+        },
+    }
+
+
 async def process_question(
     question: str, 
     department_override: Optional[str] = None,
@@ -652,6 +1437,38 @@ async def process_question(
     user_department: Optional[str] = None,
     session_history: Optional[list] = None,
     memory_context: Optional[str] = None,
+) -> dict:
+    """
+    Ana soru işleme — aşama span'leriyle izlenir (v7.27.00).
+
+    Her sorgu bir trace açar; router, RAG, LLM, enterprise modülleri vb.
+    aşama süreleri stage_tracing halka tamponuna yazılır ve yanıta
+    trace_id eklenir (admin: /api/admin/stage-latency/traces/{trace_id}).
+    """
+    with start_trace("process_question", question=question[:80]) as trace:
+        result = await _process_question(
+            question,
+            department_override=department_override,
+            use_rag=use_rag,
+            user_name=user_name,
+            user_department=user_department,
+            session_history=session_history,
+            memory_context=memory_context,
+        )
+        if trace is not None and isinstance(result, dict):
+            trace.meta.update(intent=result.get("intent"), mode=result.get("mode"))
+            result["trace_id"] = trace.trace_id
+    return result
+
+
+async def _process_question(
+    question: str, 
+    department_override: Optional[str] = None,
+    use_rag: bool = True,
+    user_name: Optional[str] = None,
+    user_department: Optional[str] = None,
+    session_history: Optional[list] = None,
+    memory_context: Optional[str] = None,
 ) -> dict:
     """
     Ana soru işleme fonksiyonu — Akıllı Pipeline.
@@ -678,6 +1495,7 @@ async def process_question(
 
     # ═══ v5.5.0: Security Layer — Zero-trust giriş kontrolü ═══
     security_result = None
+    enter_stage("security")
     if SECURITY_AVAILABLE and security_layer:
         try:
             security_result = security_layer.check_request(
@@ -704,6 +1522,7 @@ async def process_question(
             logger.debug("security_passed", threat_score=security_result.get("threat_score", 0))
         except Exception as sec_err:
             logger.debug("security_check_skipped", error=str(sec_err))
+    exit_stage()
 
     # ═══ v5.5.0: Event Bus — Sorgu başlangıç olayı ═══
     _query_event_id = None
@@ -711,7 +1530,7 @@ async def process_question(
         try:
             import uuid as _uuid
             _query_event_id = str(_uuid.uuid4())[:12]
-            event_bus.emit("query.received", {
+            event_bus.emit_nowait("query.received", {
                 "query_id": _query_event_id,
                 "question": question[:200],
                 "user": user_name or "anonymous",
@@ -721,10 +1540,12 @@ async def process_question(
             pass
     
     # 1. Akıllı yönlendirme — v4.3.0: LLM-based router (primary) + regex (fallback)
+    enter_stage("router")
     try:
         context = await async_decide(question)
     except Exception:
         context = decide(question)  # Fallback to sync regex
+    exit_stage()
     intent = context.get("intent", "sohbet")
     needs_web = context.get("needs_web", False)
     
@@ -804,6 +1625,7 @@ async def process_question(
         if session_history:
             chat_history = session_history[-5:]
         
+        enter_stage("llm")
         try:
             if await ollama_client.is_available():
                 chat_answer = await ollama_client.generate(
@@ -812,12 +1634,15 @@ async def process_question(
                     temperature=0.7,
                     max_tokens=512,
                     history=chat_history if chat_history else None,
+                    use_cache=True,
+                    cache_mode="Sohbet",
                 )
             else:
                 chat_answer = "Şu an yanıt veremiyorum, biraz sonra tekrar dener misin?"
         except Exception as e:
             logger.error("sohbet_fast_path_llm_error", error=str(e))
             chat_answer = "Bir hata oluştu, tekrar dener misin?"
+        exit_stage()
         
         # Hafızaya kaydet
         remember(question, chat_answer, context)
@@ -841,6 +1666,7 @@ async def process_question(
             "confidence": 0.90,
             "sources": [],
             "web_searched": False,
+            "llm_cache": get_last_cache_status(),
         }
     
     # ═════════════════════════════════════════════════════════════
@@ -852,12 +1678,14 @@ async def process_question(
     
     # 2. Semantik hafıza — soruya EN BENZER geçmiş konuşmalar
     similar_memories = []
+    enter_stage("memory_search")
     try:
         similar_memories = search_memory(question, limit=3)
         if similar_memories:
             logger.info("similar_memories_found", count=len(similar_memories))
     except Exception as e:
         logger.warning("memory_search_error", error=str(e))
+    exit_stage()
     
     # 3. Bilgi kaynaklarını topla
     relevant_docs = []
@@ -865,9 +1693,11 @@ async def process_question(
     
     # RAG araması — Agentic RAG: karmaşık sorular alt parçalara ayrılır
     # Her alt parça bağımsız aranır, sonuçlar birleştirilip re-rank edilir
+    # v7.18.00: Async arama — encode/query/rerank RAG executor'ında, loop bloklanmaz
+    enter_stage("rag_search")
     if use_rag and RAG_AVAILABLE:
         try:
-            raw_docs = agentic_search(question, n_results=5, department=department_override)
+            raw_docs = await async_agentic_search(question, n_results=5, department=department_override)
             # Hybrid skor filtreleme — vector_store zaten semantic + keyword
             # hybrid scoring yapıyor. Burada sadece tamamen alakasız olanları ele.
             if raw_docs:
@@ -886,11 +1716,13 @@ async def process_question(
                                 scores=[f"h={d.get('relevance',0):.3f}/d={d.get('distance',0):.2f}" for d in raw_docs])
         except Exception as e:
             logger.error("rag_search_error", error=str(e))
+    exit_stage()
     
     # Web araması — RAG'da iyi sonuç varsa web aramayı atla (öğretilen içerik öncelikli)
     web_results = None
     web_rich_data = None
     _rag_has_good = any(d.get('relevance', 0) > 0.12 or d.get('distance', 999) < 1.4 for d in relevant_docs) if relevant_docs else False
+    enter_stage("web_search")
     if WEB_SEARCH_AVAILABLE and search_and_summarize and not _rag_has_good:
         should_search_web = (
             needs_web or 
@@ -904,8 +1736,10 @@ async def process_question(
                     logger.info("web_search_results_found", has_rich_data=web_rich_data is not None)
             except Exception as e:
                 logger.warning("web_search_error", error=str(e))
+    exit_stage()
     
     # 4. Prompt oluştur (KISA tut — Mistral 7B CPU)
+    enter_stage("prompt_build")
     if relevant_docs:
         system_prompt, user_prompt = build_rag_prompt(question, context, relevant_docs)
     else:
@@ -931,7 +1765,7 @@ async def process_question(
     
     # Kalıcı hafıza bağlamı — PostgreSQL'den gelen kullanıcı bilgileri + geçmiş
     if memory_context:
-        system_prompt += f"\n\nKullanıcı Hafızası (geçmiş konusmalardan öğrenilen bilgiler):\n{memory_context}"    
+        system_prompt += f"\n\nKullanıcı Hafızası (geçmiş konusmalardan öğrenilen bilgiler):\n{memory_context}"
     
     # Web sonuçlarını prompt'a ekle (RAG yoksa ana kaynak, RAG varsa ek referans)
     if web_results:
@@ -942,8 +1776,10 @@ async def process_question(
             system_prompt += f"\n\nEk referans (internetten): Aşağıdaki bilgiler tamamlayıcıdır. Önceliği yukarıdaki doküman bilgilerine ver:\n{_web_text}"
         else:
             system_prompt += f"\n\nAşağıda internetten bulunan güncel bilgiler var. Bu bilgileri kullanarak yanıt ver:\n{_web_text}"
+    exit_stage()
     
     # v4.3.0: Token Bütçe Kontrolü — tüm bileşenleri bütçeye sığdır
+    enter_stage("token_budget")
     if TOKEN_BUDGET_AVAILABLE and smart_truncate_all:
         _memory_text = memory_context or ""
         _history_text = ""
@@ -962,6 +1798,7 @@ async def process_question(
         )
         system_prompt = budget_result["system_prompt"]
         user_prompt = budget_result["user_prompt"]
+    exit_stage()
     
     # Chat history — system prompt'a DEĞİL, client'a ayrı gönder
     # Her intent'te (sohbet dahil) geçmişi gönder — "biraz daha basit anlat" gibi takip soruları için
@@ -970,6 +1807,8 @@ async def process_question(
         chat_history = session_history[-5:]
     
     # 5. LLM'e sor
+    _llm_cache_status = None
+    enter_stage("llm")
     try:
         if await ollama_client.is_available():
             # v5.9.1: Mod bazlı sıcaklık ve token limiti + detay algılama
@@ -1004,13 +1843,18 @@ async def process_question(
                 temperature=temp,
                 max_tokens=_max_tokens,
                 history=chat_history if chat_history else None,
+                use_cache=True,
+                cache_mode=_mode,
+                cache_context={"question": question, "doc_ids": doc_fingerprints(relevant_docs)},
             )
+            _llm_cache_status = get_last_cache_status()
         else:
             logger.warning("ollama_not_available", using_fallback=True)
             llm_answer = f"[Sistem Notu: LLM şu an erişilemez] Soru alındı: {question}"
     except Exception as e:
         logger.error("llm_error", error=str(e))
         llm_answer = f"[Hata] LLM yanıt üretemedi: {str(e)}"
+    exit_stage()
     
     # ══════════════════════════════════════════════════════════════
     # v5.7.0: BİLGİ MODU FAST-PATH — LLM cevabından sonra
@@ -1084,6 +1928,7 @@ async def process_question(
             "sources": sources,
             "web_searched": web_results is not None,
             "rich_data": rich_data if rich_data else None,
+            "llm_cache": _llm_cache_status,
         }
     
     # ══════════════════════════════════════════════════════════════
@@ -1093,6 +1938,7 @@ async def process_question(
     
     # ── 5b. TOOL CALLING + DYNAMIC CHAIN — Tool çağrısı + zincirleme ──
     tool_results = []
+    enter_stage("tools")
     if TOOLS_AVAILABLE and llm_answer and not llm_answer.startswith("[Hata]"):
         try:
             # Önce zincirleme tool call var mı kontrol et
@@ -1135,9 +1981,11 @@ async def process_question(
                 logger.info("tools_executed", count=len(tool_results))
         except Exception as e:
             logger.warning("tool_execution_error", error=str(e))
+    exit_stage()
     
     # ── 5c. STRUCTURED OUTPUT — Analiz/Rapor modunda JSON yapılandırma ──
     structured_data = None
+    enter_stage("structured_output")
     if STRUCTURED_OUTPUT_AVAILABLE and context.get("mode") in ["Analiz", "Rapor", "Acil"]:
         try:
             structured_data = auto_structure(llm_answer)
@@ -1145,10 +1993,12 @@ async def process_question(
                 logger.info("output_structured", sections=len(structured_data.get("sections", [])))
         except Exception as e:
             logger.debug("structured_output_skipped", error=str(e))
+    exit_stage()
     
     # ── 5d. REFLECTION LAYER + SELF-CORRECTION LOOP ──
     reflection_data = None
     dynamic_confidence = 0.85  # Default
+    enter_stage("reflection")
     if REFLECTION_AVAILABLE and llm_answer and not llm_answer.startswith("[Hata]"):
         try:
             evaluation = quick_evaluate(llm_answer, question, context.get("mode", "Sohbet"))
@@ -1157,9 +2007,14 @@ async def process_question(
             
             # v4.3.0: LLM-Based Deep Reflection — Analiz/Rapor/Öneri modunda
             # Orta güvenli yanıtlarda (60-75%) REFLECTION_PROMPT ile LLM self-eval yap
+            # v7.25.00: LLM kuyruğu SLO'yu aşıyorsa ek LLM turları atlanır
+            _llm_degraded = llm_scheduler.is_degraded()
+            if _llm_degraded:
+                logger.info("llm_reflection_skipped_degraded")
             _mode = context.get("mode", "Sohbet")
             if (_mode in ("Analiz", "Rapor", "Öneri") and 
                 60 <= evaluation["confidence"] <= 75 and
+                not _llm_degraded and
                 not llm_answer.startswith("[Hata]")):
                 try:
                     from app.core.reflection import REFLECTION_PROMPT
@@ -1172,6 +2027,7 @@ async def process_question(
                         system_prompt="Sen bir kalite kontrol uzmanısın. JSON formatında yanıt ver.",
                         temperature=0.1,
                         max_tokens=500,
+                        priority="enterprise",
                     )
                     if _refl_result:
                         import json as _json
@@ -1197,7 +2053,8 @@ async def process_question(
             
             # Self-correction loop — Analiz/Rapor/Öneri modunda düşük güvenli yanıtları
             # iteratif olarak iyileştir (max 2 tur)
-            if evaluation.get("should_retry") and not llm_answer.startswith("[Hata]"):
+            if (evaluation.get("should_retry") and not _llm_degraded
+                    and not llm_answer.startswith("[Hata]")):
                 logger.info("self_correction_triggered", 
                            confidence=evaluation["confidence"],
                            issues=evaluation.get("issues", []))
@@ -1206,7 +2063,7 @@ async def process_question(
                         question=question,
                         initial_answer=llm_answer,
                         mode=context.get("mode", "Sohbet"),
-                        llm_generate=ollama_client.generate,
+                        llm_generate=functools.partial(ollama_client.generate, priority="enterprise"),
                         system_prompt=system_prompt,
                         chat_history=chat_history if chat_history else None,
                         max_rounds=2,
@@ -1238,10 +2095,12 @@ async def process_question(
                            dynamic_confidence, 0.80)
         except Exception as e:
             logger.debug("reflection_skipped", error=str(e))
+    exit_stage()
     
     # ── 5d-1.5. SAYISAL DOĞRULAMA + KAYNAK ATIF (v4.4.0) ──
     numerical_validation = None
     source_citation_valid = True
+    enter_stage("numerical_validation")
     if (NUMERICAL_VALIDATION_AVAILABLE and validate_numbers_against_source
         and relevant_docs and llm_answer and not llm_answer.startswith("[Hata]")
         and context.get("mode") in ("Analiz", "Rapor", "Öneri", "Acil")):
@@ -1304,6 +2163,7 @@ async def process_question(
                         logger.warning("unverified_source_citations", sources=_unverified)
         except Exception as num_err:
             logger.debug("numerical_validation_skipped", error=str(num_err))
+    exit_stage()
     
     # ── Sinaps: Numerical Validation sinyalleri ──
     if SYNAPSE_AVAILABLE and synapse_ctx and numerical_validation:
@@ -1326,278 +2186,61 @@ async def process_question(
     # Bu 10-30 saniyelik ek gecikmeyi ve token israfını önler
     _is_strategic = False  # Devre dışı
     
-    # ── 5d-4. ROI RECOMMENDATIONS (v4.3.0) ──
-    # Yatırım/maliyet sorularında Monte Carlo simülasyonu tetikle
-    _is_investment = bool(re.search(
-        r'(yatırım|maliyet|bütçe|roi\b|getiri|tasarruf|amorti|geri.?ödeme)',
-        question.lower()
-    ))
-    if (_is_investment and MONTE_CARLO_AVAILABLE 
-        and context.get("mode") in ("Analiz", "Rapor", "Öneri")
-        and not llm_answer.startswith("[Hata]")):
-        try:
-            # Monte Carlo simülasyonu — yatırım senaryosu
-            mc_result = monte_carlo_simulate(
-                base_value=100.0,  # Normalize edilmiş baz değer
-                volatility=0.25,
-                simulations=1000,
-                periods=12,
-            )
-            if mc_result:
-                # v5.9.0: Monte Carlo tablosu JSON'a taşındı, cevaba eklenmez
-                logger.info("roi_monte_carlo_applied")
-        except Exception as roi_err:
-            logger.debug("roi_monte_carlo_skipped", error=str(roi_err))
-    
-    # ── 5e. MULTI-AGENT PIPELINE — Karmaşık Analiz Sorularında ──
-    # v4.3.0: Cross-Module Orchestrator — geniş sorularda paralel modül çalıştır
-    _is_broad_query = bool(re.search(
-        r'(genel\s*durum|özet|dashboard|sağlık|health|tüm\s*departman|panorama|büyük\s*resim)',
-        question.lower()
-    ))
-    if _is_broad_query and context.get("mode") in ("Analiz", "Rapor", "Öneri"):
-        import asyncio
-        _parallel_tasks = []
-        _parallel_labels = []
-        
-        if EXECUTIVE_HEALTH_AVAILABLE:
-            _parallel_tasks.append(asyncio.to_thread(calculate_health_index))
-            _parallel_labels.append("health")
-        if BOTTLENECK_AVAILABLE:
-            _parallel_tasks.append(asyncio.to_thread(bottleneck_analyze, question))
-            _parallel_labels.append("bottleneck")
-        if GRAPH_IMPACT_AVAILABLE:
-            _parallel_tasks.append(asyncio.to_thread(auto_graph_analysis, question, llm_answer))
-            _parallel_labels.append("graph")
-        
-        if _parallel_tasks:
-            try:
-                _parallel_results = await asyncio.gather(*_parallel_tasks, return_exceptions=True)
-                _orchestrator_text = "\n\n---\n🎯 **Cross-Module Panorama**\n"
-                for label, res in zip(_parallel_labels, _parallel_results):
-                    if isinstance(res, Exception):
-                        continue
-                    if label == "health" and res:
-                        _orchestrator_text += f"\n{format_health_dashboard(res)}"
-                    elif label == "bottleneck" and res:
-                        _orchestrator_text += f"\n{format_bottleneck_report(res)}"
-                    elif label == "graph" and res and res.total_nodes_affected > 0:
-                        _orchestrator_text += f"\n{format_graph_impact(res)}"
-                if len(_orchestrator_text) > 50:
-                    # v5.9.0: Cross-module panorama JSON'a taşındı
-                    logger.info("cross_module_orchestrator_done", modules=len(_parallel_tasks))
-            except Exception as orch_err:
-                logger.debug("cross_module_orchestrator_failed", error=str(orch_err))
-    
-    pipeline_data = None
-    if AGENT_PIPELINE_AVAILABLE and should_use_pipeline(question, context.get("mode", ""), intent):
-        try:
-            # Bağlam oluştur
-            pipeline_context = ""
-            if relevant_docs:
-                pipeline_context = "\n".join(
-                    doc.get("content", "")[:200] for doc in relevant_docs[:3]
-                )
-            if web_results:
-                pipeline_context += f"\n{web_results[:500]}"
-            
-            pipeline_result = await execute_agent_pipeline(
-                question=question,
-                context=pipeline_context,
-                llm_generate=ollama_client.generate,
-                mode=context.get("mode", "Analiz"),
-            )
-            
-            if pipeline_result and pipeline_result.final_answer:
-                # v5.9.0: Pipeline çıktısı JSON'da, cevaba eklenmez
-                pipeline_data = pipeline_result.to_dict()
-                # Pipeline confidence ile override
-                if pipeline_result.overall_confidence > dynamic_confidence * 100:
-                    dynamic_confidence = pipeline_result.overall_confidence / 100.0
-                logger.info("agent_pipeline_completed", 
-                           agents=len(pipeline_result.agent_results))
-        except Exception as e:
-            logger.warning("agent_pipeline_error", error=str(e))
-    
-    # ── 5f. AI GOVERNANCE — Bias / Drift / Confidence Monitoring ──
-    governance_data = None
-    if GOVERNANCE_AVAILABLE and governance_engine and llm_answer and not llm_answer.startswith("[Hata]"):
-        try:
-            _elapsed_ms = (time.time() - _t0) * 1000
-            
-            # Kullanılan modülleri topla
-            _modules_invoked = []
-            if relevant_docs:
-                _modules_invoked.append("rag")
-            if web_results:
-                _modules_invoked.append("web_search")
-            if tool_results:
-                _modules_invoked.append("tool_calling")
-            if structured_data:
-                _modules_invoked.append("structured_output")
-            if reflection_data:
-                _modules_invoked.append("reflection")
-            if pipeline_data:
-                _modules_invoked.append("agent_pipeline")
-            
-            # Reasoning adımlarını topla
-            _reasoning_steps = []
-            if reflection_data and isinstance(reflection_data, dict):
-                _reasoning_steps = reflection_data.get("issues", [])
-            
-            # Model adını al
-            _model_name = getattr(ollama_client, 'model', 'unknown')
-            
-            gov_record = governance_engine.evaluate(
-                question=question,
-                answer=llm_answer,
-                mode=context.get("mode", "Sohbet"),
-                confidence=dynamic_confidence * 100 if dynamic_confidence <= 1 else dynamic_confidence,
-                elapsed_ms=_elapsed_ms,
-                model_name=_model_name,
-                modules_invoked=_modules_invoked,
-                reasoning_steps=_reasoning_steps,
-            )
-            if gov_record.alert_triggered:
-                alert_text = format_governance_alert(gov_record)
-                if alert_text and context.get("mode") in ["Analiz", "Rapor", "Öneri", "Acil"]:
-                    llm_answer += f"\n\n{alert_text}"
-            governance_data = {
-                "confidence": gov_record.confidence,
-                "bias_score": gov_record.bias_score,
-                "drift_detected": gov_record.drift_detected,
-                "alert": gov_record.alert_reason if gov_record.alert_triggered else None,
-                "compliance_score": getattr(gov_record, 'compliance_score', None),
-                "trace_id": getattr(gov_record, 'trace_id', None),
-                "drift_types": getattr(gov_record, 'drift_types', []),
-                "policy_violations": getattr(gov_record, 'policy_violations', []),
-                "risk_level": getattr(gov_record, 'risk_level', None) if hasattr(gov_record, 'risk_level') else None,
-            }
-            logger.info("governance_evaluated", 
-                       bias=gov_record.bias_score, 
-                       drift=gov_record.drift_detected,
-                       compliance=getattr(gov_record, 'compliance_score', None),
-                       trace_id=getattr(gov_record, 'trace_id', None))
-            
-            # ── Sinaps: Governance sinyalleri ──
-            if SYNAPSE_AVAILABLE and synapse_ctx and governance_data:
-                emit_signal(synapse_ctx, "governance", "bias_flags",
-                           governance_data.get("policy_violations", []), 0.85)
-                emit_signal(synapse_ctx, "governance", "drift_status",
-                           governance_data.get("drift_detected", False), 0.70)
-                emit_signal(synapse_ctx, "governance", "compliance_score",
-                           governance_data.get("compliance_score", 1.0), 0.80)
-                _gov_risk = governance_data.get("risk_level")
-                if _gov_risk:
-                    emit_signal(synapse_ctx, "governance", "risk_level",
-                               _gov_risk, 0.85)
-                # Kaskad kontrol — bias tetikleme
-                _cascaded = check_cascades(synapse_ctx, "governance")
-                if _cascaded:
-                    logger.info("synapse_cascade_from_governance", targets=_cascaded)
-        except Exception as e:
-            logger.debug("governance_skipped", error=str(e))
-    
-    # ── 5g. XAI — Açıklanabilir Yapay Zeka Analizi ──
-    xai_data = None
-    if XAI_AVAILABLE and decision_explainer and llm_answer and not llm_answer.startswith("[Hata]"):
-        try:
-            xai_result = decision_explainer.explain(
-                query=question,
-                response=llm_answer,
-                mode=context.get("mode", "Sohbet"),
-                confidence=dynamic_confidence,
-                sources=[doc.get("source", "") for doc in relevant_docs] if relevant_docs else [],
-                rag_docs=relevant_docs if relevant_docs else None,
-                web_searched=web_results is not None,
-                reflection_data=reflection_data,
-                module_source="engine",
-            )
-            if xai_result:
-                xai_data = xai_result
-                logger.info("xai_evaluated",
-                           weighted_confidence=xai_result.get("weighted_confidence", 0),
-                           risk_level=xai_result.get("risk", {}).get("level", "?"))
-                
-                # ── Sinaps: XAI sinyalleri ──
-                if SYNAPSE_AVAILABLE and synapse_ctx:
-                    emit_signal(synapse_ctx, "explainability", "xai_factors",
-                               xai_result.get("factors", []), 0.65)
-                    emit_signal(synapse_ctx, "explainability", "weighted_confidence",
-                               xai_result.get("weighted_confidence", 0), 0.60)
-        except Exception as e:
-            logger.debug("xai_skipped", error=str(e))
-    
-    # ── 5i. DECISION IMPACT RANKING — Analiz modunda kararları sırala ──
-    # v4.3.0: Trend Detection — Aynı KPI/konu tekrar soruluyorsa trend raporla
-    if (session_history and len(session_history) >= 3 
-        and context.get("mode") in ("Analiz", "Rapor", "Öneri")
-        and not llm_answer.startswith("[Hata]")):
-        try:
-            # Geçmiş sorularda benzer KPI/konu arayışı
-            _kpi_pattern = re.compile(
-                r'(verimlilik|fire\s*oranı|maliyet|ciro|üretim|stok|kalite|karlılık|'
-                r'sipariş|teslimat|devamsızlık|enerji|hurda|duruş)',
-                re.IGNORECASE
-            )
-            _current_kpis = set(_kpi_pattern.findall(question.lower()))
-            
-            if _current_kpis:
-                _past_mentions = []
-                for msg in session_history[-10:]:
-                    _q = msg.get("q", msg.get("content", ""))
-                    _past_kpis = set(_kpi_pattern.findall(_q.lower()))
-                    overlap = _current_kpis & _past_kpis
-                    if overlap:
-                        _past_mentions.append({"q": _q[:100], "kpis": overlap})
-                
-                if len(_past_mentions) >= 2:
-                    _trend_kpis = ", ".join(_current_kpis)
-                    # v5.9.0: Trend notu JSON metadata'da
-                    logger.info("trend_detected", kpis=list(_current_kpis), 
-                               mentions=len(_past_mentions))
-        except Exception as trend_err:
-            logger.debug("trend_detection_skipped", error=str(trend_err))
-    
-    ranking_data = None
-    if DECISION_RANKING_AVAILABLE and llm_answer and context.get("mode") in ["Analiz", "Rapor", "Öneri"]:
-        try:
-            decisions = extract_decisions_from_llm(llm_answer, question)
-            if decisions and len(decisions) >= 2:
-                ranking_result = rank_decisions(decisions)
-                # v5.9.0: Ranking tablosu JSON'da
-                ranking_data = {
-                    "total": ranking_result.total_evaluated,
-                    "top_action": ranking_result.top_action,
-                }
-                logger.info("decision_ranking_applied", count=len(decisions))
-        except Exception as e:
-            logger.debug("decision_ranking_skipped", error=str(e))
-    
-    # ── 5j. GRAPH IMPACT MAPPING — KPI/Risk/Departman ilişki grafiği ──
-    graph_data = None
-    if GRAPH_IMPACT_AVAILABLE and llm_answer and context.get("mode") in ["Analiz", "Rapor", "Öneri"]:
-        try:
-            graph_result = auto_graph_analysis(question, llm_answer)
-            if graph_result and graph_result.total_nodes_affected > 0:
-                # v5.9.0: Graph impact JSON'da
-                graph_data = {
-                    "focus": graph_result.focus_node,
-                    "affected": graph_result.total_nodes_affected,
-                    "critical_chain": graph_result.critical_chain,
-                }
-                logger.info("graph_impact_applied", focus=graph_result.focus_node,
-                           affected=graph_result.total_nodes_affected)
-        except Exception as e:
-            logger.debug("graph_impact_skipped", error=str(e))
-    
-    # 6. Sonuç
+    # ══════════════════════════════════════════════════════════════
+    # 5d-4 … 6q. ENTERPRISE POST-PROCESSING — Stage DAG (v7.26.00)
+    #     ROI, cross-module, agent pipeline, governance, XAI, ranking,
+    #     graph, tetikleyiciler, uncertainty, gatekeeper, OOD, quality,
+    #     KPI, decision memory, digest, observability, policy eşzamanlı
+    #     çalışır; bkz. _run_enterprise_stages.
+    # ══════════════════════════════════════════════════════════════
+    # 6. Sonuç kaynakları (quality / policy aşamaları da kullanır)
     sources = []
     if relevant_docs:
         sources.extend([doc.get("source") for doc in relevant_docs])
     if web_results:
         sources.append("İnternet Araması")
-    
+
+    enter_stage("enterprise")
+    _stages = await _run_enterprise_stages(
+        question=question,
+        answer=llm_answer,
+        context=context,
+        intent=intent,
+        relevant_docs=relevant_docs,
+        web_results=web_results,
+        session_history=session_history,
+        tool_results=tool_results,
+        structured_data=structured_data,
+        reflection_data=reflection_data,
+        confidence=dynamic_confidence,
+        source_citation_valid=source_citation_valid,
+        sources=sources,
+        synapse_ctx=synapse_ctx,
+        t0=_t0,
+    )
+    exit_stage()
+    llm_answer = _stages["answer"]
+    dynamic_confidence = _stages["confidence"]
+    pipeline_data = _stages["pipeline"]
+    governance_data = _stages["governance"]
+    xai_data = _stages["xai"]
+    ranking_data = _stages["ranking"]
+    graph_data = _stages["graph_impact"]
+    debate_data = _stages["debate"]
+    causal_data = _stages["causal"]
+    strategic_data = _stages["strategic"]
+    exec_intel_data = _stages["executive_intel"]
+    kg_data = _stages["knowledge_graph"]
+    uncertainty_data = _stages["uncertainty"]
+    gate_data = _stages["gate"]
+    ood_data = _stages["ood"]
+    quality_data = _stages["decision_quality"]
+    kpi_impact_data = _stages["kpi_impact"]
+    memory_data = _stages["decision_memory"]
+    digest_data = _stages["executive_digest"]
+    observability_data = _stages["observability"]
+    policy_data = _stages["policy"]
+
     # Rich data listesi
     rich_data = web_rich_data if web_rich_data else []
     if not isinstance(rich_data, list):
@@ -1614,6 +2257,7 @@ async def process_question(
     if EXPORT_AVAILABLE:
         export_format = detect_export_request(question)
     
+    enter_stage("export")
     if export_format and llm_answer and not llm_answer.startswith("[Hata]"):
         try:
             # Başlığı sorudan çıkar
@@ -1633,492 +2277,7 @@ async def process_question(
                 logger.info("export_auto_generated", format=export_format, file_id=export_result["file_id"])
         except Exception as e:
             logger.warning("export_auto_failed", error=str(e))
-    
-    # ══════════════════════════════════════════════════════════════
-    # 6c. MULTI-AGENT DEBATE — Çok perspektifli tartışma (v4.7.0)
-    #     Karmaşık / stratejik sorularda birden fazla perspektif ajanı
-    #     tartışır ve konsensüs sentezi üretir.
-    # ══════════════════════════════════════════════════════════════
-    debate_data = None
-    if MULTI_AGENT_DEBATE_AVAILABLE:
-        try:
-            should_debate, debate_reason = check_debate_trigger(
-                question=question,
-                mode=context.get("mode", ""),
-                intent=intent,
-                confidence=dynamic_confidence if REFLECTION_AVAILABLE else 85,
-            )
-            if should_debate:
-                logger.info("multi_agent_debate_triggered", reason=debate_reason)
-                debate_data = {"triggered": True, "reason": debate_reason}
-        except Exception as e:
-            logger.debug("multi_agent_debate_check_error", error=str(e))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6d. CAUSAL INFERENCE — Nedensellik analizi tetikleme (v4.7.0)
-    #     "Neden", "kök neden", "sebep" gibi sorularda otomatik tetiklenir.
-    # ══════════════════════════════════════════════════════════════
-    causal_data = None
-    if CAUSAL_INFERENCE_AVAILABLE:
-        try:
-            should_causal, causal_reason = check_causal_trigger(
-                question=question,
-                mode=context.get("mode", ""),
-                intent=intent,
-            )
-            if should_causal:
-                logger.info("causal_inference_triggered", reason=causal_reason)
-                causal_data = {"triggered": True, "reason": causal_reason}
-        except Exception as e:
-            logger.debug("causal_inference_check_error", error=str(e))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6e. STRATEGIC PLANNER — Stratejik planlama motoru (v5.0.0)
-    #     Strateji, hedef, vizyon, roadmap sorularında tetiklenir.
-    # ══════════════════════════════════════════════════════════════
-    strategic_data = None
-    if STRATEGIC_PLANNER_AVAILABLE:
-        try:
-            should_strategic, strategic_reason = check_strategic_trigger(
-                question=question,
-                mode=context.get("mode", ""),
-                intent=intent,
-            )
-            if should_strategic:
-                logger.info("strategic_planner_triggered", reason=strategic_reason)
-                strategic_data = {"triggered": True, "reason": strategic_reason}
-        except Exception as e:
-            logger.debug("strategic_planner_check_error", error=str(e))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6f. EXECUTIVE INTELLIGENCE — Yönetici zekası (v5.0.0)
-    #     CEO/CFO/CTO brifingleri, KPI korelasyon, board raporu.
-    # ══════════════════════════════════════════════════════════════
-    exec_intel_data = None
-    if EXECUTIVE_INTELLIGENCE_AVAILABLE:
-        try:
-            should_exec, exec_reason = check_executive_trigger(
-                question=question,
-                mode=context.get("mode", ""),
-                intent=intent,
-            )
-            if should_exec:
-                logger.info("executive_intelligence_triggered", reason=exec_reason)
-                exec_intel_data = {"triggered": True, "reason": exec_reason}
-        except Exception as e:
-            logger.debug("executive_intelligence_check_error", error=str(e))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6g. KNOWLEDGE GRAPH — Bilgi grafiği zenginleştirme (v5.0.0)
-    #     Varlık/ilişki çıkarma ve bağlam zenginleştirme.
-    # ══════════════════════════════════════════════════════════════
-    kg_data = None
-    if KNOWLEDGE_GRAPH_AVAILABLE:
-        try:
-            should_kg, kg_reason = check_kg_trigger(
-                question=question,
-                mode=context.get("mode", ""),
-                intent=intent,
-            )
-            if should_kg:
-                logger.info("knowledge_graph_triggered", reason=kg_reason)
-                kg_data = {"triggered": True, "reason": kg_reason}
-        except Exception as e:
-            logger.debug("knowledge_graph_check_error", error=str(e))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6h. UNCERTAINTY QUANTIFICATION — Belirsizlik ölçümleme (v5.1.0)
-    #     Tüm güven kaynaklarını birleştirip ensemble skor üretir.
-    # ══════════════════════════════════════════════════════════════
-    uncertainty_data = None
-    if UNCERTAINTY_AVAILABLE:
-        try:
-            uq_result = uncertainty_quantifier.quantify(
-                question=question,
-                reflection_data=reflection_data,
-                engine_confidence=dynamic_confidence if REFLECTION_AVAILABLE else 0.85,
-                governance_data=governance_data,
-            )
-            uncertainty_data = uq_result.to_dict()
-            logger.debug("uncertainty_quantified",
-                         confidence=uq_result.ensemble_confidence,
-                         margin=uq_result.margin_of_error)
-            
-            # ── Sinaps: Uncertainty sinyalleri ──
-            if SYNAPSE_AVAILABLE and synapse_ctx:
-                emit_signal(synapse_ctx, "uncertainty_quantification", "uncertainty",
-                           uncertainty_data.get("uncertainty_pct", 50), 0.80)
-                emit_signal(synapse_ctx, "uncertainty_quantification", "ensemble_confidence",
-                           uq_result.ensemble_confidence, 0.75)
-                emit_signal(synapse_ctx, "uncertainty_quantification", "confidence_adjustment",
-                           uncertainty_data.get("confidence_adjustment", 0), 0.70)
-        except Exception as e:
-            logger.debug("uncertainty_quantification_error", error=str(e))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6i. DECISION RISK GATEKEEPER — Karar risk kapısı (v5.1.0)
-    #     Tüm risk sinyallerini birleştirip kararı geçir/engeller.
-    # ══════════════════════════════════════════════════════════════
-    gate_data = None
-    if DECISION_GATEKEEPER_AVAILABLE:
-        try:
-            should_gate, gate_reason = check_gate_trigger(
-                question=question,
-                mode=context.get("mode", ""),
-                intent=intent,
-            )
-            if should_gate:
-                # ── Sinaps: risk_data artık None değil — sinaps ağından topla ──
-                _synapse_risk = None
-                if SYNAPSE_AVAILABLE and synapse_ctx:
-                    _synapse_risk = gather_module_inputs(synapse_ctx, "decision_gatekeeper")
-                    # risk_analyzer sinyallerini risk_data olarak kullan
-                    if _synapse_risk.get("risk_level") or _synapse_risk.get("risk_factors"):
-                        _synapse_risk = {
-                            "risk_level": _synapse_risk.get("risk_level", "LOW"),
-                            "risk_factors": _synapse_risk.get("risk_factors", []),
-                            "risk_score": _synapse_risk.get("risk_score", 0),
-                        }
-                    else:
-                        _synapse_risk = None
-
-                gate_result = decision_gatekeeper.evaluate(
-                    question=question,
-                    answer=llm_answer,
-                    governance_data=governance_data,
-                    reflection_data=reflection_data,
-                    confidence=dynamic_confidence if REFLECTION_AVAILABLE else 0.85,
-                    risk_data=_synapse_risk,
-                    ranking_data=ranking_data,
-                )
-                gate_data = gate_result.to_dict()
-                logger.info("decision_gate_evaluated",
-                            verdict=gate_result.verdict.value,
-                            risk_score=gate_result.composite_risk_score)
-                
-                # ── Sinaps: Gatekeeper sinyalleri + kaskad ──
-                if SYNAPSE_AVAILABLE and synapse_ctx:
-                    emit_signal(synapse_ctx, "decision_gatekeeper", "gate_verdict",
-                               gate_result.verdict.value, 0.90)
-                    emit_signal(synapse_ctx, "decision_gatekeeper", "composite_risk_score",
-                               gate_result.composite_risk_score, 0.80)
-                    emit_signal(synapse_ctx, "decision_gatekeeper", "escalation_required",
-                               gate_data.get("escalation_required", False), 0.75)
-                    emit_signal(synapse_ctx, "decision_gatekeeper", "risk_signals",
-                               gate_data.get("risk_signals", []), 0.70)
-                    _cascaded = check_cascades(synapse_ctx, "decision_gatekeeper")
-                    if _cascaded:
-                        logger.info("synapse_cascade_from_gate", targets=_cascaded)
-        except Exception as e:
-            logger.debug("decision_gatekeeper_error", error=str(e))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6j. OOD DETECTOR — Dağılım dışı girdi algılama (v5.3.0)
-    #     Sorunun bilinen alan içinde olup olmadığını kontrol eder.
-    # ══════════════════════════════════════════════════════════════
-    ood_data = None
-    if OOD_DETECTOR_AVAILABLE and check_ood:
-        try:
-            ood_result = check_ood(question=question, department=context.get("dept", ""))
-            ood_data = ood_result.to_dict()
-
-            # OOD ise uyarı ekle
-            if ood_result.is_ood and context.get("mode") in ["Analiz", "Rapor", "Öneri", "Acil"]:
-                ood_warning_text = format_ood_warning(ood_result)
-                if ood_warning_text:
-                    llm_answer += f"\n{ood_warning_text}"
-
-            # Confidence/uncertainty ayarla
-            if ood_result.confidence_adjustment != 0:
-                dynamic_confidence = max(0.1, dynamic_confidence + ood_result.confidence_adjustment / 100)
-
-            logger.debug("ood_checked", severity=ood_result.severity.value, score=ood_result.ood_score)
-            
-            # ── Sinaps: OOD sinyalleri + kaskad ──
-            if SYNAPSE_AVAILABLE and synapse_ctx:
-                emit_signal(synapse_ctx, "ood_detector", "ood_score",
-                           ood_result.ood_score, 0.80)
-                emit_signal(synapse_ctx, "ood_detector", "ood_severity",
-                           ood_result.severity.value, 0.85)
-                if ood_result.confidence_adjustment != 0:
-                    emit_signal(synapse_ctx, "ood_detector", "confidence_adjustment",
-                               ood_result.confidence_adjustment, 0.75)
-                _cascaded = check_cascades(synapse_ctx, "ood_detector")
-                if _cascaded:
-                    logger.info("synapse_cascade_from_ood", targets=_cascaded)
-        except Exception as e:
-            logger.debug("ood_detector_error", error=str(e))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6k. DECISION QUALITY SCORE — Birleşik karar kalitesi (v5.3.0)
-    #     Tüm modül çıktılarını toplayarak tek bir kalite skoru üretir.
-    # ══════════════════════════════════════════════════════════════
-    quality_data = None
-    if DECISION_QUALITY_AVAILABLE and evaluate_decision_quality:
-        try:
-            # ── Sinaps: meta_data artık None değil — sinaps ağından topla ──
-            _synapse_meta = None
-            if SYNAPSE_AVAILABLE and synapse_ctx:
-                _meta_inputs = gather_module_inputs(synapse_ctx, "decision_quality")
-                if _meta_inputs.get("meta_strategy") or _meta_inputs.get("quality_trend"):
-                    _synapse_meta = _meta_inputs
-
-            quality_result = evaluate_decision_quality(
-                reflection_data=reflection_data,
-                uncertainty_data=uncertainty_data,
-                gate_data=gate_data,
-                meta_data=_synapse_meta,
-                governance_data=governance_data,
-                debate_data=debate_data,
-                causal_data=causal_data,
-                rag_used=bool(relevant_docs),
-                web_searched=web_results is not None,
-                sources=sources,
-                source_citation_valid=source_citation_valid,
-                question=question,
-                department=context.get("dept", ""),
-            )
-            quality_data = {
-                "overall_score": quality_result.overall_score,
-                "band": quality_result.band.value,
-                "confidence_interval": quality_result.confidence_interval,
-                "executive_line": quality_result.executive_line,
-            }
-
-            # Analiz/Rapor modlarında badge ekle
-            # v5.9.0: Quality badge JSON'da (confidence badge yeterli)
-
-            logger.info("decision_quality_scored",
-                        score=quality_result.overall_score,
-                        band=quality_result.band.value)
-            
-            # ── Sinaps: Decision Quality sinyalleri + kaskad ──
-            if SYNAPSE_AVAILABLE and synapse_ctx and quality_data:
-                emit_signal(synapse_ctx, "decision_quality", "quality_score",
-                           quality_result.overall_score, 0.90)
-                emit_signal(synapse_ctx, "decision_quality", "quality_band",
-                           quality_result.band.value, 0.80)
-                _cascaded = check_cascades(synapse_ctx, "decision_quality")
-                if _cascaded:
-                    logger.info("synapse_cascade_from_quality", targets=_cascaded)
-        except Exception as e:
-            logger.debug("decision_quality_error", error=str(e))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6l. KPI IMPACT MAPPING — KPI etki analizi (v5.3.0)
-    #     Kararın KPI'lara etkisini tahmin eder, domino etkilerini hesaplar.
-    # ══════════════════════════════════════════════════════════════
-    kpi_impact_data = None
-    if KPI_IMPACT_AVAILABLE and analyze_kpi_impact:
-        try:
-            _decision_text = f"{question} {llm_answer[:500]}"
-            kpi_result = analyze_kpi_impact(decision_text=_decision_text)
-            if kpi_result and kpi_result.primary_impacts:
-                kpi_impact_data = {
-                    "primary_count": len(kpi_result.primary_impacts),
-                    "domino_count": len(kpi_result.domino_effects),
-                    "impact_score": kpi_result.impact_score,
-                    "net_financial": kpi_result.net_financial_direction,
-                    "executive_summary": kpi_result.executive_summary,
-                    "impacts": [
-                        {"kpi_id": i.kpi_id, "kpi_name": i.kpi_name, "direction": i.direction.value,
-                         "magnitude": i.magnitude.value, "estimated_change_pct": i.estimated_change_pct}
-                        for i in kpi_result.primary_impacts[:5]
-                    ],
-                }
-
-                # Analiz modlarında etki özeti ekle
-                # v5.9.0: KPI impact brief JSON'da
-
-                logger.info("kpi_impact_analyzed",
-                            impacts=len(kpi_result.primary_impacts),
-                            score=kpi_result.impact_score)
-                
-                # ── Sinaps: KPI Impact sinyalleri + kaskad ──
-                if SYNAPSE_AVAILABLE and synapse_ctx:
-                    emit_signal(synapse_ctx, "kpi_impact", "kpi_impacts",
-                               kpi_impact_data.get("impacts", []), 0.80)
-                    emit_signal(synapse_ctx, "kpi_impact", "impact_score",
-                               kpi_result.impact_score, 0.75)
-                    emit_signal(synapse_ctx, "kpi_impact", "financial_estimate",
-                               kpi_result.net_financial_direction, 0.70)
-                    _cascaded = check_cascades(synapse_ctx, "kpi_impact")
-                    if _cascaded:
-                        logger.info("synapse_cascade_from_kpi", targets=_cascaded)
-        except Exception as e:
-            logger.debug("kpi_impact_error", error=str(e))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6m. DECISION MEMORY — Benzer geçmiş kararları bul (v5.3.0)
-    #     Soruyu geçmiş kararlarla karşılaştırır ve benzer olanları gösterir.
-    # ══════════════════════════════════════════════════════════════
-    memory_data = None
-    similar_decisions = None
-    if DECISION_MEMORY_AVAILABLE and find_similar_decisions:
-        try:
-            similar = find_similar_decisions(
-                question=question,
-                department=context.get("dept", ""),
-                top_n=3,
-            )
-            if similar:
-                memory_data = {
-                    "similar_count": len(similar),
-                    "top_similarity": similar[0].similarity_score,
-                    "similar_decisions": [
-                        {"question": s.record.question[:100], "outcome": s.record.outcome.value,
-                         "similarity": round(s.similarity_score, 2), "quality": s.record.quality_score}
-                        for s in similar
-                    ],
-                }
-                similar_decisions = similar
-
-                # Analiz modlarında benzer kararları göster
-                # v5.9.0: Similar decisions JSON'da
-
-                logger.info("similar_decisions_found", count=len(similar),
-                            top_sim=similar[0].similarity_score)
-                
-                # ── Sinaps: Decision Memory sinyalleri ──
-                if SYNAPSE_AVAILABLE and synapse_ctx:
-                    emit_signal(synapse_ctx, "decision_memory", "similar_decisions",
-                               memory_data.get("similar_decisions", []), 0.70)
-                    emit_signal(synapse_ctx, "decision_memory", "accuracy_data",
-                               memory_data.get("top_similarity", 0), 0.60)
-        except Exception as e:
-            logger.debug("decision_memory_search_error", error=str(e))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6n. EXECUTIVE DIGEST — Yönetim özeti (v5.3.0)
-    #     5 madde + Risk + Fırsat + Net Öneri formatında sade özet üretir.
-    # ══════════════════════════════════════════════════════════════
-    digest_data = None
-    if EXECUTIVE_DIGEST_AVAILABLE and generate_executive_digest:
-        try:
-            if context.get("mode") in ["Analiz", "Rapor", "Öneri", "Acil"]:
-                _gate_verdict = gate_data.get("verdict", "") if gate_data else ""
-                _gate_risks = gate_data.get("risk_signals", []) if gate_data else []
-                _unc_val = uncertainty_data.get("uncertainty_pct", 50) if uncertainty_data else 50
-                _conf_val = uncertainty_data.get("ensemble_confidence", 50) if uncertainty_data else dynamic_confidence * 100
-                _moe = uncertainty_data.get("margin_of_error", 0) if uncertainty_data else 0
-                _refl_score = reflection_data.get("confidence", 0) if reflection_data else 0
-                _q_score = quality_data.get("overall_score", 0) if quality_data else 0
-                _q_band = quality_data.get("band", "") if quality_data else ""
-                _kpi_impacts_list = kpi_impact_data.get("impacts", []) if kpi_impact_data else []
-                _kpi_iscore = kpi_impact_data.get("impact_score", 0) if kpi_impact_data else 0
-                _kpi_summary = kpi_impact_data.get("executive_summary", "") if kpi_impact_data else ""
-                _ood_flag = ood_data.get("is_ood", False) if ood_data else False
-                _ood_note = ood_data.get("warning_message", "") if ood_data else ""
-
-                digest = generate_executive_digest(
-                    question=question,
-                    ai_answer=llm_answer[:2000],
-                    department=context.get("dept", ""),
-                    quality_score=_q_score,
-                    quality_band=_q_band,
-                    kpi_impacts=_kpi_impacts_list,
-                    impact_score=_kpi_iscore,
-                    kpi_executive_summary=_kpi_summary,
-                    gate_verdict=_gate_verdict,
-                    gate_risks=_gate_risks,
-                    uncertainty=_unc_val,
-                    confidence=_conf_val,
-                    margin_of_error=_moe,
-                    reflection_score=_refl_score,
-                    ood_detected=_ood_flag,
-                    ood_note=_ood_note,
-                )
-                digest_data = digest.to_dict()
-
-                # v5.9.0: Executive digest JSON'da, cevaba eklenmez
-
-                logger.info("executive_digest_generated",
-                            priority=digest.priority.value,
-                            impact=digest.impact_level)
-                
-                # ── Sinaps: Executive Digest sinyalleri ──
-                if SYNAPSE_AVAILABLE and synapse_ctx:
-                    emit_signal(synapse_ctx, "executive_digest", "executive_digest",
-                               digest_data, 0.85)
-                    emit_signal(synapse_ctx, "executive_digest", "digest_priority",
-                               digest.priority.value, 0.70)
-        except Exception as e:
-            logger.debug("executive_digest_error", error=str(e))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6p. OBSERVABILITY 2.0 — Karar drift + kalite trend izleme (v5.5.0)
-    # ══════════════════════════════════════════════════════════════
-    observability_data = None
-    if OBSERVABILITY_AVAILABLE and observability:
-        try:
-            _elapsed_ms = (time.time() - _t0) * 1000
-            _obs_confidence = dynamic_confidence * 100 if dynamic_confidence <= 1 else dynamic_confidence
-            _obs_quality = quality_data.get("overall_score", 70) if quality_data else 70
-
-            observability.record_decision(
-                confidence=_obs_confidence,
-                quality_score=_obs_quality,
-                latency_ms=_elapsed_ms,
-                intent=intent,
-                department=context.get("dept", "genel"),
-            )
-
-            # Drift kontrolü
-            drift_report = observability.check_all_drifts()
-            if drift_report:
-                _any_drift = any(
-                    d.get("severity", "none") not in ("none", "NONE")
-                    for d in drift_report.values()
-                    if isinstance(d, dict)
-                )
-                if _any_drift:
-                    observability_data = drift_report
-                    logger.info("observability_drift_detected",
-                               drifts={k: v.get("severity") for k, v in drift_report.items() if isinstance(v, dict)})
-
-            logger.debug("observability_recorded", latency_ms=round(_elapsed_ms, 1))
-        except Exception as obs_err:
-            logger.debug("observability_error", error=str(obs_err))
-
-    # ══════════════════════════════════════════════════════════════
-    # 6q. POLICY ENGINE — Enterprise kural motoru (v5.5.0)
-    #     Sonuç döndürülmeden önce tüm politika kurallarını kontrol eder.
-    # ══════════════════════════════════════════════════════════════
-    policy_data = None
-    if POLICY_ENGINE_AVAILABLE and enterprise_policy_engine:
-        try:
-            _elapsed_ms = (time.time() - _t0) * 1000
-            _policy_context = {
-                "risk_score": gate_data.get("composite_risk_score", 0) if gate_data else 0,
-                "confidence": dynamic_confidence * 100 if dynamic_confidence <= 1 else dynamic_confidence,
-                "quality_score": quality_data.get("overall_score", 70) if quality_data else 70,
-                "response_time_ms": _elapsed_ms,
-                "department": context.get("dept", "genel"),
-                "mode": context.get("mode", "Sohbet"),
-                "data_source_count": len(sources) if sources else 0,
-                "model_name": getattr(ollama_client, 'model', 'unknown'),
-            }
-            policy_result = enterprise_policy_engine.evaluate(_policy_context)
-            if policy_result and not policy_result.allowed:
-                policy_data = {
-                    "allowed": policy_result.allowed,
-                    "action": policy_result.action.value,
-                    "violations": [
-                        {"rule": v.rule_id, "message": v.message, "severity": v.severity.value}
-                        for v in policy_result.violations
-                    ],
-                }
-                # Block ise uyarı ekle
-                if policy_result.action.value == "block":
-                    _violations_text = "; ".join(v.message for v in policy_result.violations[:3])
-                    llm_answer += f"\n\n---\n⚠️ **Politika Uyarısı**: {_violations_text}"
-                logger.info("policy_violations",
-                            action=policy_result.action.value,
-                            violation_count=len(policy_result.violations))
-            elif policy_result:
-                policy_data = {"allowed": True, "action": "allow", "violations": []}
-        except Exception as pol_err:
-            logger.debug("policy_engine_error", error=str(pol_err))
+    exit_stage()
 
     # ══════════════════════════════════════════════════════════════
     # 6r. OUTCOME PREDICTION — Decision Quality v5.5.0 tahmin kaydı
@@ -2139,7 +2298,7 @@ async def process_question(
     if EVENT_BUS_AVAILABLE and event_bus and _query_event_id:
         try:
             _elapsed_ms = (time.time() - _t0) * 1000
-            event_bus.emit("query.completed", {
+            event_bus.emit_nowait("query.completed", {
                 "query_id": _query_event_id,
                 "intent": intent,
                 "department": context.get("dept", ""),
@@ -2176,6 +2335,7 @@ async def process_question(
         "sources": sources,
         "web_searched": web_results is not None,
         "rich_data": rich_data if rich_data else None,
+        "llm_cache": _llm_cache_status,
         "tool_results": tool_results if tool_results else None,
         "structured_data": structured_data,
         "reflection": reflection_data,
@@ -2203,12 +2363,16 @@ async def process_question(
         "security": security_result,
         "observability": observability_data,
         "policy": policy_data,
+        "enterprise_stages": _stages["stages"],
     }
     
     # 7. Hafızaya kaydet (semantik hafıza)
+    enter_stage("memory_store")
     remember(question, llm_answer, context)
+    exit_stage()
 
     # 7b. Decision Memory'ye kaydet (v5.3.0)
+    enter_stage("decision_store")
     if DECISION_MEMORY_AVAILABLE and store_decision:
         try:
             _q_score = quality_data.get("overall_score", 0) if quality_data else 0
@@ -2234,6 +2398,7 @@ async def process_question(
             )
         except Exception as e:
             logger.debug("decision_memory_store_error", error=str(e))
+    exit_stage()
     
     # ══════════════════════════════════════════════════════════════
     # 8. OTOMATİK ÖĞRENME — HER konuşmadan bilgi çıkar ve RAG'a kaydet
@@ -2251,6 +2416,7 @@ async def process_question(
     #    Her sorgu sonucunu meta_learning_engine'e kaydet.
     #    Self-improvement loop'a bildirim gönder.
     # ══════════════════════════════════════════════════════════════
+    enter_stage("meta_learning")
     if META_LEARNING_AVAILABLE:
         try:
             _reflection_conf = reflection_data.get("confidence", 0) if reflection_data else 0
@@ -2292,6 +2458,7 @@ async def process_question(
                 )
         except Exception as e:
             logger.debug("meta_learning_error", error=str(e))
+    exit_stage()
 
     logger.info("question_processed", 
                 intent=intent,
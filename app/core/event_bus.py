@@ -24,6 +24,9 @@ KULLANIM:
       "risk_score": 0.3,
   })
 
+  # İstek yolunda (await'siz, mikro saniye): store kuyruğa, listener'lar kuyruğa
+  event_bus.emit_nowait("query.received", {"question": "..."})
+
   # Event dinle
   @event_bus.on("decision.created")
   async def on_decision(event):
@@ -48,9 +51,11 @@ MİMARİ:
 import asyncio
 import hashlib
 import json
+import os
 import time
 import uuid
 from collections import defaultdict, deque
+from concurrent.futures import Future
 from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
@@ -59,8 +64,18 @@ from typing import Any, Callable, Coroutine, Optional
 
 import structlog
 
+from app.core.event_log import SegmentedLog
+
 logger = structlog.get_logger()
 
+# Satır index'inde tutulan alanlar (replay filtreleri)
+EVENT_INDEX_FIELDS = ("event_type", "category", "correlation_id")
+
+# Listener dağıtımı: queued → listener başına sınırlı kuyruk + worker task
+# (emit listener'ları beklemez); inline → her listener sırayla await edilir
+EVENT_BUS_DISPATCH = os.environ.get("EVENT_BUS_DISPATCH", "queued").lower()
+EVENT_LISTENER_QUEUE_SIZE = int(os.environ.get("EVENT_LISTENER_QUEUE_SIZE", "1000"))
+
 # ── Veri dizini ──
 DATA_DIR = Path("data/events")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -209,63 +224,82 @@ class EventStore:
     """
     Append-only event log with hash chain integrity.
     Her event bir öncekinin hash'ini içerir → tamper detection.
+
+    v7.38.00: Yazma segmentli, group-commit yapan SegmentedLog üzerinden
+    (app.core.event_log) — event loop'ta dosya I/O'su yok, startup'ta
+    son sequence/hash index'ten okunur.
+
+    v7.39.00: replay / get_stats satır index'inden (sidecar), log taranmaz;
+    verify_integrity son doğrulanan checkpoint'ten devam eder.
     """
 
-    def __init__(self, log_file: Path = EVENT_LOG_FILE):
+    def __init__(self, log_file: Path = EVENT_LOG_FILE,
+                 decision_log_file: Path = DECISION_LOG_FILE, **log_options):
         self._log_file = log_file
-        self._sequence = 0
-        self._last_hash = "genesis"
-        self._lock = asyncio.Lock()
-        # Startup'ta son sequence ve hash'i oku
-        self._init_chain()
-
-    def _init_chain(self):
-        """Log dosyasından son event'i okuyarak chain'i devam ettir."""
-        if not self._log_file.exists():
-            return
-        try:
-            with open(self._log_file, "r", encoding="utf-8") as f:
-                last_line = ""
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        last_line = line
-                        self._sequence += 1
-                if last_line:
-                    data = json.loads(last_line)
-                    self._last_hash = data.get("hash", "genesis")
-        except Exception as e:
-            logger.warning("event_store_init_error", error=str(e))
+        self._decision_log_file = decision_log_file
+        self._log = SegmentedLog(log_file.parent, "event", legacy_file=log_file,
+                                 index_fields=EVENT_INDEX_FIELDS, **log_options)
+        self._decision_log = SegmentedLog(decision_log_file.parent, "decision",
+                                          legacy_file=decision_log_file, **log_options)
+        # Startup'ta son sequence ve hash index checkpoint'inden
+        self._sequence = self._log.last_sequence
+        self._last_hash = self._log.last_hash
 
     def _compute_hash(self, event_data: str) -> str:
         """Hash chain: SHA-256(previous_hash + event_data)."""
         content = f"{self._last_hash}:{event_data}"
         return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
 
-    async def append(self, event: Event) -> Event:
-        """Event'i log'a ekle (immutable, append-only)."""
-        async with self._lock:
-            self._sequence += 1
-            event.sequence = self._sequence
-            event.hash = self._compute_hash(event.to_json())
-            self._last_hash = event.hash
+    def append_nowait(self, event: Event) -> Future:
+        """Sequence + hash ata, satırı commit kuyruğuna bırak (beklemeden).
+
+        Sequence ve hash çağıran thread'de (event loop) atanır — zincir
+        sırası korunur. Dönen Future satır diske inince tamamlanır.
+        """
+        self._sequence += 1
+        event.sequence = self._sequence
+        event.hash = self._compute_hash(event.to_json())
+        self._last_hash = event.hash
+
+        return self._log.append(event.to_json(), event.sequence, event.hash, event.timestamp,
+                                keys=(event.event_type, event.category, event.correlation_id or ""))
 
+    async def append(self, event: Event, wait: bool = True) -> Event:
+        """Event'i log'a ekle (immutable, append-only).
+
+        wait=True ise satır diske inene (group commit) kadar beklenir.
+        """
+        future = self.append_nowait(event)
+        if wait:
             try:
-                with open(self._log_file, "a", encoding="utf-8") as f:
-                    f.write(event.to_json() + "\n")
+                await asyncio.wrap_future(future)
             except Exception as e:
                 logger.error("event_store_append_error", error=str(e))
+        return event
 
-            return event
-
-    async def append_decision(self, decision: DecisionEvent):
+    async def append_decision(self, decision: DecisionEvent, wait: bool = True):
         """Karar event'ini ayrı log'a ekle."""
         decision.hash = self._compute_hash(decision.to_json())
-        try:
-            with open(DECISION_LOG_FILE, "a", encoding="utf-8") as f:
-                f.write(decision.to_json() + "\n")
-        except Exception as e:
-            logger.error("decision_log_append_error", error=str(e))
+        future = self._decision_log.append(decision.to_json(), ts=decision.timestamp)
+        if wait:
+            try:
+                await asyncio.wrap_future(future)
+            except Exception as e:
+                logger.error("decision_log_append_error", error=str(e))
+
+    def flush(self):
+        """Commit kuyruğundaki tüm satırları diske indir."""
+        self._log.flush()
+        self._decision_log.flush()
+
+    def close(self):
+        """Bekleyen satırları yaz, writer thread'lerini durdur (shutdown)."""
+        self._log.close()
+        self._decision_log.close()
+
+    def get_log_stats(self) -> dict:
+        """Group-commit writer ve segment metrikleri."""
+        return {"events": self._log.stats(), "decisions": self._decision_log.stats()}
 
     def replay(
         self,
@@ -279,50 +313,32 @@ class EventStore:
         """
         Event log'u filtreli olarak tekrar oynat.
         since/until: ISO format datetime string.
+
+        v7.39.00: Zaman aralığı ve filtreler satır index'inden çözülür;
+        yalnızca eşleşen satırlar okunup parse edilir.
         """
-        events = []
-        if not self._log_file.exists():
-            return events
+        filters = {}
+        # Tip filtresi (wildcard destekli: "decision.*")
+        if event_type:
+            if event_type.endswith(".*"):
+                prefix = event_type[:-2]
+                filters["event_type"] = [
+                    et for et in self._log.index_values("event_type") if et.startswith(prefix)
+                ]
+            else:
+                filters["event_type"] = [event_type]
+        if category:
+            filters["category"] = [category]
+        if correlation_id:
+            filters["correlation_id"] = [correlation_id]
 
+        events = []
         try:
-            with open(self._log_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        data = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-
-                    # Zaman filtresi
-                    ts = data.get("timestamp", "")
-                    if since and ts < since:
-                        continue
-                    if until and ts > until:
-                        continue
-
-                    # Tip filtresi (wildcard destekli: "decision.*")
-                    if event_type:
-                        et = data.get("event_type", "")
-                        if event_type.endswith(".*"):
-                            prefix = event_type[:-2]
-                            if not et.startswith(prefix):
-                                continue
-                        elif et != event_type:
-                            continue
-
-                    # Kategori filtresi
-                    if category and data.get("category") != category:
-                        continue
-
-                    # Correlation ID filtresi
-                    if correlation_id and data.get("correlation_id") != correlation_id:
-                        continue
-
-                    events.append(data)
-                    if len(events) >= limit:
-                        break
+            for line in self._log.select(since, until, filters, limit):
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
         except Exception as e:
             logger.error("event_store_replay_error", error=str(e))
 
@@ -335,65 +351,75 @@ class EventStore:
     ) -> list[dict]:
         """Karar log'unu tekrar oynat."""
         decisions = []
-        if not DECISION_LOG_FILE.exists():
-            return decisions
-
         try:
-            with open(DECISION_LOG_FILE, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        data = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    if since and data.get("timestamp", "") < since:
-                        continue
-                    decisions.append(data)
-                    if len(decisions) >= limit:
-                        break
+            for line in self._decision_log.select(since=since, limit=limit):
+                try:
+                    decisions.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
         except Exception as e:
             logger.error("decision_log_replay_error", error=str(e))
 
         return decisions
 
     def verify_integrity(self, sample_size: int = 100) -> dict:
-        """Hash chain bütünlüğünü doğrula."""
+        """Hash chain bütünlüğünü doğrula.
+
+        v7.39.00: Her satırın hash'i yeniden hesaplanır (önceki hash + hash
+        alanı boş event JSON'u) ve sequence sürekliliği kontrol edilir.
+        Doğrulama son checkpoint'ten devam eder; sample_size tek çağrıda
+        doğrulanacak en fazla satırdır (0 = kalanın tümü).
+        """
+        checkpoint = self._log.get_meta("verified") or {}
         result = {
             "verified": True,
             "total_checked": 0,
             "corrupted_at": None,
-            "last_sequence": 0,
+            "last_sequence": checkpoint.get("seq", 0),
         }
-        if not self._log_file.exists():
-            return result
-
-        prev_hash = "genesis"
+        # v7.38.00: Segment checkpoint'leri zincir halinde mi (giriş hash'i = önceki çıkış)
+        segments = self._log.segments()
+        for prev, seg in zip(segments, segments[1:]):
+            if seg["start_hash"] != prev["end_hash"]:
+                result["verified"] = False
+                result["corrupted_segment"] = seg["name"]
+                break
+
+        prev_hash = checkpoint.get("hash", "genesis")
+        prev_seq = checkpoint.get("seq", 0)
+        position = (checkpoint.get("segment"), checkpoint.get("offset", 0))
         try:
-            with open(self._log_file, "r", encoding="utf-8") as f:
-                for i, line in enumerate(f):
-                    if sample_size and i >= sample_size:
-                        break
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        data = json.loads(line)
-                    except json.JSONDecodeError:
-                        result["verified"] = False
-                        result["corrupted_at"] = i
-                        break
-
-                    stored_hash = data.get("hash", "")
-                    # Hash chain doğrulama (basitleştirilmiş)
-                    result["total_checked"] += 1
-                    result["last_sequence"] = data.get("sequence", 0)
-                    prev_hash = stored_hash
+            for number, offset, line in self._log.iter_entries(*position):
+                if sample_size and result["total_checked"] >= sample_size:
+                    break
+                result["total_checked"] += 1
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    result["verified"] = False
+                    result["corrupted_at"] = prev_seq + 1
+                    break
+
+                stored_hash = data.get("hash", "")
+                data["hash"] = ""
+                content = f"{prev_hash}:{json.dumps(data, ensure_ascii=False, default=str)}"
+                expected = hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+                if stored_hash != expected or data.get("sequence") != prev_seq + 1:
+                    result["verified"] = False
+                    result["corrupted_at"] = data.get("sequence", prev_seq + 1)
+                    break
+                prev_hash, prev_seq = stored_hash, data["sequence"]
+                position = (number, offset)
         except Exception as e:
             logger.error("integrity_check_error", error=str(e))
             result["verified"] = False
 
+        if prev_seq != checkpoint.get("seq", 0):
+            self._log.set_meta("verified", {
+                "seq": prev_seq, "hash": prev_hash, "segment": position[0], "offset": position[1],
+            })
+        result["last_sequence"] = prev_seq
+        result["pending"] = max(0, self._log.last_sequence - prev_seq)
         return result
 
     @property
@@ -401,46 +427,21 @@ class EventStore:
         return self._sequence
 
     def get_stats(self) -> dict:
-        """Event log istatistikleri."""
+        """Event log istatistikleri (v7.39.00: satır index'i sayaçlarından)."""
         stats = EventStats()
-        if not self._log_file.exists():
-            return asdict(stats)
-
-        first_ts = None
         try:
-            with open(self._log_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        data = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-
-                    stats.total_events += 1
-                    et = data.get("event_type", "unknown")
-                    cat = data.get("category", "unknown")
-                    ts = data.get("timestamp", "")
-
-                    stats.events_per_type[et] = stats.events_per_type.get(et, 0) + 1
-                    stats.events_per_category[cat] = stats.events_per_category.get(cat, 0) + 1
-
-                    if ts:
-                        hour = ts[:13]  # "2024-01-15T14"
-                        stats.events_per_hour[hour] = stats.events_per_hour.get(hour, 0) + 1
-                        stats.last_event_time = ts
-                        if first_ts is None:
-                            first_ts = ts
-
-                    if et.startswith("decision."):
-                        stats.decision_count += 1
-                    if et.startswith("override."):
-                        stats.override_count += 1
-                    if et == "policy.violated":
-                        stats.policy_violation_count += 1
-        except Exception:
-            pass
+            per_type = self._log.facet("event_type")
+            stats.total_events = self._log.record_count()
+            stats.events_per_type = per_type
+            stats.events_per_category = self._log.facet("category")
+            stats.events_per_hour = self._log.per_hour()
+            stats.last_event_time = next(
+                (seg["last_ts"] for seg in reversed(self._log.segments()) if seg["last_ts"]), "")
+            stats.decision_count = sum(n for et, n in per_type.items() if et.startswith("decision."))
+            stats.override_count = sum(n for et, n in per_type.items() if et.startswith("override."))
+            stats.policy_violation_count = per_type.get("policy.violated", 0)
+        except Exception as e:
+            logger.error("event_store_stats_error", error=str(e))
 
         # Son 24 saat'in events_per_hour'unu tut (çok büyümesini engelle)
         if len(stats.events_per_hour) > 24:
@@ -458,6 +459,118 @@ class EventStore:
 ListenerFn = Callable[[Event], Coroutine[Any, Any, None]]
 
 
+class _Subscription:
+    """Bir listener kaydı — sınırlı kuyruk, worker task ve gecikme metrikleri (v7.40.00).
+
+    Kuyruk ve worker, emit eden event loop'ta lazily kurulur; bus singleton'ı
+    birden fazla loop'tan (test, script) kullanıldığında loop değişince
+    yeniden kurulur.
+    """
+
+    def __init__(self, pattern: str, fn: ListenerFn, maxsize: int):
+        self.pattern = pattern
+        self.fn = fn
+        self.name = getattr(fn, "__name__", repr(fn))
+        self.maxsize = maxsize
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.handler_ms_sum = 0.0
+        self.handler_ms_max = 0.0
+        self.wait_ms_sum = 0.0
+
+    def offer(self, bus: "EventBus", event: Event) -> bool:
+        """Event'i kuyruğa koy — doluysa False (çağıran dead letter'a yazar)."""
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop or self.worker is None or self.worker.done():
+            self.loop = loop
+            self.queue = asyncio.Queue(maxsize=self.maxsize)
+            self.worker = loop.create_task(self._run(bus), name=f"event-listener:{self.name}")
+        try:
+            self.queue.put_nowait((event, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    async def _run(self, bus: "EventBus"):
+        queue = self.queue
+        while True:
+            event, enqueued = await queue.get()
+            started = time.perf_counter()
+            try:
+                await bus._deliver(self, event)
+            finally:
+                handler_ms = (time.perf_counter() - started) * 1000
+                self.wait_ms_sum += (started - enqueued) * 1000
+                self.handler_ms_sum += handler_ms
+                self.handler_ms_max = max(self.handler_ms_max, handler_ms)
+                queue.task_done()
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize() if self.queue is not None else 0
+
+    def stats(self) -> dict:
+        handled = self.delivered + self.failed
+        return {
+            "pattern": self.pattern,
+            "listener": self.name,
+            "queue_depth": self.depth,
+            "max_queue_depth": self.max_depth,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "avg_handler_ms": round(self.handler_ms_sum / handled, 3) if handled else 0,
+            "max_handler_ms": round(self.handler_ms_max, 3),
+            "avg_queue_wait_ms": round(self.wait_ms_sum / handled, 3) if handled else 0,
+        }
+
+
+class _PrefixTrie:
+    """Wildcard pattern'leri için karakter bazlı prefix trie.
+
+    "decision.*" → "decision" prefix'i olarak eklenir; event tipi trie'de
+    yürünürken geçilen her düğümdeki kayıtlar eşleşir.
+    """
+
+    def __init__(self):
+        self._root: dict = {"": []}
+
+    @staticmethod
+    def prefix_of(pattern: str) -> str:
+        return pattern.replace(".*", "").replace("*", "")
+
+    def add(self, pattern: str, item):
+        node = self._root
+        for ch in self.prefix_of(pattern):
+            node = node.setdefault(ch, {"": []})
+        node[""].append(item)
+
+    def remove(self, pattern: str, predicate: Callable[[Any], bool]):
+        node = self._root
+        for ch in self.prefix_of(pattern):
+            node = node.get(ch)
+            if node is None:
+                return
+        node[""] = [item for item in node[""] if not predicate(item)]
+
+    def match(self, key: str) -> list:
+        node = self._root
+        found = list(node[""])
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                break
+            found.extend(node[""])
+        return found
+
+
 class EventBus:
     """
     Enterprise Event Bus.
@@ -472,14 +585,26 @@ class EventBus:
       • Event replay & audit
       • Priority-based ordering
       • Dead letter queue (hatalı listener'lar)
+
+    v7.40.00: Dağıtım varsayılan olarak kuyruklu — her listener'ın sınırlı
+    kuyruğu ve worker task'ı var, emit listener'ları beklemez; kuyruk
+    doluysa event dead letter'a düşer. Wildcard eşleşme prefix trie'den,
+    event tipi başına rota cache'lenir.
     """
 
-    def __init__(self):
-        self._listeners: dict[str, list[ListenerFn]] = defaultdict(list)
-        self._wildcard_listeners: list[tuple[str, ListenerFn]] = []
-        self._store = EventStore()
+    def __init__(self, dispatch: str = EVENT_BUS_DISPATCH,
+                 queue_size: int = EVENT_LISTENER_QUEUE_SIZE,
+                 store: Optional[EventStore] = None):
+        self._listeners: dict[str, list[_Subscription]] = defaultdict(list)
+        self._wildcard_listeners: list[_Subscription] = []
+        self._wildcard_trie = _PrefixTrie()
+        self._routes: dict[str, tuple[_Subscription, ...]] = {}
+        self._dispatch_mode = dispatch
+        self._queue_size = max(1, queue_size)
+        self._store = store or EventStore()
         self._dead_letters: deque = deque(maxlen=200)
         self._metrics: dict[str, int] = defaultdict(int)
+        self._inline_tasks: set[asyncio.Task] = set()
         self._started = False
 
     # ── Listener Kayıt ──
@@ -493,37 +618,45 @@ class EventBus:
 
     def subscribe(self, event_type: str, fn: ListenerFn):
         """Event tipine listener ekle. Wildcard (*) destekler."""
+        sub = _Subscription(event_type, fn, self._queue_size)
         if "*" in event_type:
-            self._wildcard_listeners.append((event_type, fn))
+            self._wildcard_listeners.append(sub)
+            self._wildcard_trie.add(event_type, sub)
         else:
-            self._listeners[event_type].append(fn)
+            self._listeners[event_type].append(sub)
+        self._routes.clear()
 
     def unsubscribe(self, event_type: str, fn: ListenerFn):
         """Listener kaldır."""
         if event_type in self._listeners:
             self._listeners[event_type] = [
-                f for f in self._listeners[event_type] if f is not fn
+                s for s in self._listeners[event_type] if s.fn is not fn
             ]
         self._wildcard_listeners = [
-            (et, f) for et, f in self._wildcard_listeners
-            if not (et == event_type and f is fn)
+            s for s in self._wildcard_listeners
+            if not (s.pattern == event_type and s.fn is fn)
         ]
+        self._wildcard_trie.remove(event_type, lambda s: s.pattern == event_type and s.fn is fn)
+        self._routes.clear()
+
+    def _route(self, event_type: str) -> tuple[_Subscription, ...]:
+        """Event tipinin listener'ları (exact + wildcard) — subscribe'a kadar cache'li."""
+        route = self._routes.get(event_type)
+        if route is None:
+            exact = self._listeners.get(event_type, [])
+            route = self._routes[event_type] = tuple(exact) + tuple(self._wildcard_trie.match(event_type))
+        return route
 
     # ── Event Yayınlama ──
 
-    async def emit(
+    def _make_event(
         self,
         event_type: str,
         payload: dict,
-        source: str = "engine",
-        correlation_id: str = "",
-        priority: EventPriority = EventPriority.NORMAL,
+        source: str,
+        correlation_id: str,
+        priority: EventPriority,
     ) -> Event:
-        """
-        Event yayınla → Store'a kaydet → Listener'lara dağıt.
-
-        Returns: Kaydedilmiş Event objesi.
-        """
         if not correlation_id:
             correlation_id = str(uuid.uuid4())[:12]
 
@@ -532,7 +665,7 @@ class EventBus:
             EventCategory.SYSTEM,
         ).value
 
-        event = Event(
+        return Event(
             event_id=str(uuid.uuid4())[:16],
             event_type=event_type,
             category=category,
@@ -543,53 +676,123 @@ class EventBus:
             priority=priority.value,
         )
 
+    def _count(self, event_type: str):
+        self._metrics[event_type] = self._metrics.get(event_type, 0) + 1
+        self._metrics["_total"] = self._metrics.get("_total", 0) + 1
+
+    async def emit(
+        self,
+        event_type: str,
+        payload: dict,
+        source: str = "engine",
+        correlation_id: str = "",
+        priority: EventPriority = EventPriority.NORMAL,
+    ) -> Event:
+        """
+        Event yayınla → Store'a kaydet → Listener'lara dağıt.
+
+        Returns: Kaydedilmiş Event objesi.
+        """
+        event = self._make_event(event_type, payload, source, correlation_id, priority)
+
         # 1) Immutable store'a kaydet
         event = await self._store.append(event)
 
         # 2) Metrikleri güncelle
-        self._metrics[event_type] = self._metrics.get(event_type, 0) + 1
-        self._metrics["_total"] = self._metrics.get("_total", 0) + 1
+        self._count(event_type)
+
+        # 3) Listener'lara dağıt (kuyruklu modda beklemeden, hata izole)
+        if self._dispatch_mode == "inline":
+            await self._dispatch(event)
+        else:
+            self._enqueue(event)
+
+        return event
 
-        # 3) Listener'lara dağıt (fire-and-forget, hata izole)
-        await self._dispatch(event)
+    def emit_nowait(
+        self,
+        event_type: str,
+        payload: dict,
+        source: str = "engine",
+        correlation_id: str = "",
+        priority: EventPriority = EventPriority.NORMAL,
+    ) -> Event:
+        """İstek yolu için await'siz emit — çalışan bir event loop içinden çağrılmalı.
 
+        Store satırı group-commit kuyruğuna, event listener kuyruklarına
+        bırakılır; inline modda listener'lar ayrı bir task'ta çalışır.
+        """
+        event = self._make_event(event_type, payload, source, correlation_id, priority)
+        future = self._store.append_nowait(event)
+        future.add_done_callback(self._on_append_done)
+        self._count(event_type)
+        if self._dispatch_mode == "inline":
+            task = asyncio.get_running_loop().create_task(self._dispatch(event))
+            self._inline_tasks.add(task)
+            task.add_done_callback(self._on_inline_done)
+        else:
+            self._enqueue(event)
         return event
 
+    @staticmethod
+    def _on_append_done(future: Future):
+        if future.exception() is not None:
+            logger.error("event_store_append_error", error=str(future.exception()))
+
+    def _on_inline_done(self, task: asyncio.Task):
+        """Inline dispatch task'ı bitti — referansı bırak, hatayı logla."""
+        self._inline_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("event_dispatch_error", error=str(task.exception()))
+
+    def _enqueue(self, event: Event):
+        """Event'i eşleşen listener kuyruklarına koy — dolu kuyruk → dead letter."""
+        for sub in self._route(event.event_type):
+            if not sub.offer(self, event):
+                self._dead_letter(event, sub, f"listener queue full ({sub.maxsize})")
+                self._metrics["_dropped"] = self._metrics.get("_dropped", 0) + 1
+
     async def _dispatch(self, event: Event):
-        """Event'i ilgili listener'lara dağıt."""
-        # Exact match listeners
-        for fn in self._listeners.get(event.event_type, []):
-            try:
-                await fn(event)
-            except Exception as e:
-                self._dead_letters.append({
-                    "event_id": event.event_id,
-                    "event_type": event.event_type,
-                    "listener": fn.__name__,
-                    "error": str(e),
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                })
-                logger.warning(
-                    "event_listener_error",
-                    event_type=event.event_type,
-                    listener=fn.__name__,
-                    error=str(e),
-                )
-
-        # Wildcard listeners (ör: "decision.*" → "decision.created" eşleşir)
-        for pattern, fn in self._wildcard_listeners:
-            prefix = pattern.replace(".*", "").replace("*", "")
-            if event.event_type.startswith(prefix):
-                try:
-                    await fn(event)
-                except Exception as e:
-                    self._dead_letters.append({
-                        "event_id": event.event_id,
-                        "event_type": event.event_type,
-                        "listener": fn.__name__,
-                        "error": str(e),
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
-                    })
+        """Event'i ilgili listener'lara sırayla dağıt (inline mod)."""
+        for sub in self._route(event.event_type):
+            started = time.perf_counter()
+            await self._deliver(sub, event)
+            handler_ms = (time.perf_counter() - started) * 1000
+            sub.handler_ms_sum += handler_ms
+            sub.handler_ms_max = max(sub.handler_ms_max, handler_ms)
+
+    async def _deliver(self, sub: _Subscription, event: Event):
+        """Tek listener çağrısı — hata dead letter'a yazılır, yayılmaz."""
+        try:
+            await sub.fn(event)
+            sub.delivered += 1
+        except Exception as e:
+            sub.failed += 1
+            self._dead_letter(event, sub, str(e))
+            logger.warning(
+                "event_listener_error",
+                event_type=event.event_type,
+                listener=sub.name,
+                error=str(e),
+            )
+
+    def _dead_letter(self, event: Event, sub: _Subscription, error: str):
+        self._dead_letters.append({
+            "event_id": event.event_id,
+            "event_type": event.event_type,
+            "listener": sub.name,
+            "error": error,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        })
+
+    async def drain(self, timeout: Optional[float] = 5.0):
+        """Bu loop'taki listener kuyrukları ve inline dispatch task'ları bitene kadar bekle."""
+        loop = asyncio.get_running_loop()
+        subs = [s for subs in self._listeners.values() for s in subs] + self._wildcard_listeners
+        waits = [s.queue.join() for s in subs if s.loop is loop and s.queue is not None]
+        waits += [t for t in self._inline_tasks if t.get_loop() is loop]
+        if waits:
+            await asyncio.wait_for(asyncio.gather(*waits), timeout=timeout)
 
     # ── Karar Event Log ──
 
@@ -699,6 +902,10 @@ class EventBus:
         """Event log bütünlüğünü doğrula."""
         return self._store.verify_integrity(sample_size=sample_size)
 
+    def close(self):
+        """Shutdown — commit kuyruğunu diske indir."""
+        self._store.close()
+
     # ── Dashboard & Metrics ──
 
     def get_dead_letters(self) -> list[dict]:
@@ -709,6 +916,11 @@ class EventBus:
         """Event metrikleri."""
         return dict(self._metrics)
 
+    def get_listener_stats(self) -> list[dict]:
+        """Listener başına kuyruk derinliği, gecikme ve teslim sayaçları."""
+        subs = [s for subs in self._listeners.values() for s in subs] + self._wildcard_listeners
+        return [s.stats() for s in subs]
+
     def get_dashboard(self) -> dict:
         """Event Bus dashboard — admin paneli için."""
         store_stats = self._store.get_stats()
@@ -719,13 +931,16 @@ class EventBus:
             "event_sequence": self._store.sequence,
             "listener_count": sum(len(v) for v in self._listeners.values()) + len(self._wildcard_listeners),
             "registered_event_types": list(self._listeners.keys()),
-            "wildcard_listeners": [p for p, _ in self._wildcard_listeners],
+            "wildcard_listeners": [s.pattern for s in self._wildcard_listeners],
+            "dispatch_mode": self._dispatch_mode,
+            "listeners": self.get_listener_stats(),
             "dead_letter_count": len(self._dead_letters),
             "recent_dead_letters": list(self._dead_letters)[-5:],
             "metrics": dict(self._metrics),
             "events_per_category": store_stats.get("events_per_category", {}),
             "events_per_hour": store_stats.get("events_per_hour", {}),
-            "integrity": self._store.verify_integrity(sample_size=50),
+            "integrity": self._store.verify_integrity(sample_size=5000),
+            "log_writer": self._store.get_log_stats(),
             "policy_violations": store_stats.get("policy_violation_count", 0),
             "override_count": store_stats.get("override_count", 0),
             "last_event_time": store_stats.get("last_event_time", ""),
@@ -0,0 +1,718 @@
+"""Segmentli, Group-Commit Event Log (v7.38.00)
+
+EventStore eskiden her event için `event_log.jsonl`'i append modunda açıp
+tek satır yazıyor ve kapatıyordu — global asyncio.Lock altında, event
+loop'u bloklayan dosya I/O'suyla. Startup'ta da sadece son sequence ve
+hash'i bulmak için tüm log satır satır okunuyordu.
+
+- Yazma tek arka plan thread'inde: kuyruktaki satırlar kısa bir pencere
+  (EVENT_LOG_GROUP_COMMIT_MS) boyunca toplanır, tek write + tek fsync ile
+  diske iner. Saniyedeki emit sayısı arttıkça batch büyür; dosya açma /
+  fsync sayısı artmaz.
+- Segmentler: aktif segment EVENT_LOG_SEGMENT_MAX_MB'ı aşınca mühürlenir,
+  yenisi açılır (`<prefix>-000001.jsonl`, ...).
+- Index dosyası (`<prefix>.index.json`): segment başına ilk/son sequence,
+  ilk/son timestamp, satır sayısı, bayt boyu ve hash-chain checkpoint'i
+  (segmente girerken ve çıkarken zincirin hash'i). Her commit sonrası
+  atomik yazılır; startup yalnızca index'i ve aktif segmentin index'ten
+  sonraki kuyruğunu (çökme sonrası en fazla bir batch) okur.
+- Eski tek dosyalık log (`event_log.jsonl`) ilk açılışta bir kez taranıp
+  mühürlü segment 0 olarak index'e alınır; yerinde kalır.
+
+v7.39.00 — Satır index'i (replay / istatistik için):
+- Writer her commit'te segment yanına `<prefix>-000001.idx` sidecar'ı
+  yazar: satır başına [offset, uzunluk, sequence, timestamp, alanlar...]
+  (EventStore için event_type, category, correlation_id).
+- İlk sorguda sidecar'lar belleğe yüklenir (RecordIndex); eksik / yarım
+  kalan kısım segmentten tamamlanır. Sonrasında writer index'i canlı tutar.
+- Zaman aralığı ikili arama ile pozisyon aralığına, alan filtreleri
+  posting listelerine çevrilir; yalnızca eşleşen satırlar seek ile okunur.
+"""
+
+import heapq
+import json
+import os
+import queue
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+EVENT_LOG_SEGMENT_MAX_MB = float(os.environ.get("EVENT_LOG_SEGMENT_MAX_MB", "64"))
+EVENT_LOG_GROUP_COMMIT_MS = float(os.environ.get("EVENT_LOG_GROUP_COMMIT_MS", "5"))
+EVENT_LOG_MAX_BATCH = int(os.environ.get("EVENT_LOG_MAX_BATCH", "1024"))
+# 0 → yalnızca flush (işletim sistemi önbelleği); 1 → her commit'te fsync
+EVENT_LOG_FSYNC = os.environ.get("EVENT_LOG_FSYNC", "1") == "1"
+
+_INDEX_VERSION = 1
+_STOP = object()
+
+
+class RecordIndex:
+    """Bellekteki satır index'i — konum, timestamp ve alan posting'leri.
+
+    Pozisyonlar append sırasıdır. Timestamp'lerin önek maksimumu tutulur;
+    zaman aralığı bunun üzerinde ikili aramayla pozisyon aralığına çevrilir.
+    """
+
+    def __init__(self, fields: Sequence[str] = ()):
+        self.fields = tuple(fields)
+        self.segment = array("i")
+        self.offset = array("q")
+        self.length = array("i")
+        self.seq = array("q")
+        self.ts: List[str] = []
+        self._ts_max: List[str] = []
+        self.keys: Dict[str, List[str]] = {f: [] for f in self.fields}
+        self.postings: Dict[str, Dict[str, array]] = {f: {} for f in self.fields}
+        self.per_hour: Dict[str, int] = {}
+        # segment numarası → index'lenmiş bayt sonu (tekrar eklemeye karşı)
+        self.covered: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.offset)
+
+    def add(self, segment: int, offset: int, length: int, seq: int, ts: str,
+            keys: Sequence[str] = ()) -> bool:
+        if offset < self.covered.get(segment, 0):
+            return False
+        pos = len(self.offset)
+        self.segment.append(segment)
+        self.offset.append(offset)
+        self.length.append(length)
+        self.seq.append(seq or 0)
+        self.ts.append(ts)
+        self._ts_max.append(ts if not self._ts_max or ts > self._ts_max[-1] else self._ts_max[-1])
+        for field, value in zip(self.fields, keys):
+            self.keys[field].append(value)
+            bucket = self.postings[field].get(value)
+            if bucket is None:
+                bucket = self.postings[field][value] = array("q")
+            bucket.append(pos)
+        if ts:
+            hour = ts[:13]
+            self.per_hour[hour] = self.per_hour.get(hour, 0) + 1
+        self.covered[segment] = offset + length
+        return True
+
+    def time_range(self, since: Optional[str], until: Optional[str]) -> Tuple[int, int]:
+        start = bisect_left(self._ts_max, since) if since else 0
+        end = bisect_right(self._ts_max, until) if until else len(self._ts_max)
+        return start, end
+
+    def select(self, since: Optional[str] = None, until: Optional[str] = None,
+               filters: Optional[Dict[str, Sequence[str]]] = None, limit: int = 0) -> List[int]:
+        """Eşleşen pozisyonlar (artan). filters: alan → kabul edilen değerler (OR)."""
+        start, end = self.time_range(since, until)
+        filters = filters or {}
+        # En seçici filtrenin posting listeleri aday kümesi; diğerleri sütundan kontrol
+        best = None
+        for field, values in filters.items():
+            lists = [self.postings[field][v] for v in values if v in self.postings[field]]
+            size = sum(len(p) for p in lists)
+            if best is None or size < best[0]:
+                best = (size, field, lists)
+        if best is None:
+            candidates = range(start, end)
+            others = {}
+        else:
+            _, field, lists = best
+            if not lists:
+                return []
+            candidates = heapq.merge(*(p[bisect_left(p, start):bisect_left(p, end)] for p in lists))
+            others = {f: set(v) for f, v in filters.items() if f != field}
+
+        positions = []
+        for pos in candidates:
+            ts = self.ts[pos]
+            if (since and ts < since) or (until and ts > until):
+                continue
+            if any(self.keys[f][pos] not in values for f, values in others.items()):
+                continue
+            positions.append(pos)
+            if limit and len(positions) >= limit:
+                break
+        return positions
+
+    def facet(self, field: str) -> Dict[str, int]:
+        return {value: len(p) for value, p in self.postings[field].items()}
+
+
+class SegmentedLog:
+    """Append-only JSONL log — segmentli, group-commit yazan, index'li."""
+
+    def __init__(
+        self,
+        directory: Path,
+        prefix: str,
+        legacy_file: Optional[Path] = None,
+        segment_max_bytes: Optional[int] = None,
+        group_commit_ms: float = EVENT_LOG_GROUP_COMMIT_MS,
+        max_batch: int = EVENT_LOG_MAX_BATCH,
+        fsync: bool = EVENT_LOG_FSYNC,
+        index_fields: Sequence[str] = (),
+    ):
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.segment_dir = self.directory / f"{prefix}_segments"
+        self.index_file = self.directory / f"{prefix}.index.json"
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        self.segment_max_bytes = segment_max_bytes or int(EVENT_LOG_SEGMENT_MAX_MB * 1024 * 1024)
+        self.group_commit = max(0.0, group_commit_ms) / 1000
+        self.max_batch = max(1, max_batch)
+        self.fsync = fsync
+        self.index_fields = tuple(index_fields)
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._file = None
+        self._records: Optional[RecordIndex] = None
+        self._records_lock = threading.Lock()
+        self._stats = {
+            "appended": 0,
+            "commits": 0,
+            "fsyncs": 0,
+            "max_batch": 0,
+            "commit_ms_sum": 0.0,
+            "rotations": 0,
+            "recovered_lines": 0,
+            "write_errors": 0,
+        }
+        # Dizinler ve index ilk commit'te oluşturulur — boş log diske yazılmaz
+        self._index_on_disk = False
+        self._index = self._load_index()
+
+    # ── Index ──
+
+    def _new_segment(self, number: int, start_hash: str) -> dict:
+        return {
+            "name": f"{self.segment_dir.name}/{self.prefix}-{number:06d}.jsonl",
+            "number": number,
+            "first_seq": 0,
+            "last_seq": 0,
+            "first_ts": "",
+            "last_ts": "",
+            "count": 0,
+            "bytes": 0,
+            "start_hash": start_hash,
+            "end_hash": start_hash,
+            "sealed": False,
+        }
+
+    def segment_path(self, segment: dict) -> Path:
+        return self.directory / segment["name"]
+
+    def sidecar_path(self, number: int) -> Path:
+        return self.segment_dir / f"{self.prefix}-{number:06d}.idx"
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == _INDEX_VERSION and index.get("segments"):
+                self._index_on_disk = True
+                self._recover_tail(index)
+                return index
+        except (OSError, ValueError):
+            pass
+        return self._rebuild_index()
+
+    def _rebuild_index(self) -> dict:
+        """Index yok/bozuk — eski log + mevcut segmentler bir kez taranır."""
+        segments = []
+        if self.legacy_file and self.legacy_file.exists():
+            legacy = self._new_segment(0, "genesis")
+            legacy["name"] = os.path.relpath(self.legacy_file, self.directory)
+            self._scan_into(legacy, self.legacy_file, 0)
+            legacy["sealed"] = True
+            segments.append(legacy)
+        for path in sorted(self.segment_dir.glob(f"{self.prefix}-*.jsonl")):
+            try:
+                number = int(path.stem.rsplit("-", 1)[1])
+            except (IndexError, ValueError):
+                continue
+            start_hash = segments[-1]["end_hash"] if segments else "genesis"
+            segment = self._new_segment(number, start_hash)
+            self._scan_into(segment, path, 0)
+            if segments:
+                segments[-1]["sealed"] = True
+            segments.append(segment)
+        if not segments or segments[-1]["sealed"]:
+            last = segments[-1] if segments else None
+            segments.append(self._new_segment(
+                (last["number"] + 1) if last else 1,
+                last["end_hash"] if last else "genesis"))
+        else:
+            self._truncate_partial(segments[-1])
+        index = {"version": _INDEX_VERSION, "segments": segments}
+        if not any(s["count"] for s in segments):
+            return index
+        self._write_index(index)
+        logger.info("event_log_index_rebuilt", log=self.prefix, segments=len(segments),
+                    events=sum(s["count"] for s in segments))
+        return index
+
+    def _recover_tail(self, index: dict):
+        """Index'e yazılmadan kalan (commit ile index yazımı arası çökme) satırları al."""
+        active = index["segments"][-1]
+        path = self.segment_path(active)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size == active["bytes"]:
+            return
+        if size < active["bytes"]:
+            # Segment index'ten kısa — baştan say
+            active.update(self._new_segment(active["number"], active["start_hash"]))
+            recovered = self._scan_into(active, path, 0)
+        else:
+            recovered = self._scan_into(active, path, active["bytes"])
+        self._truncate_partial(active)
+        self._stats["recovered_lines"] += recovered
+        self._write_index(index)
+        logger.info("event_log_tail_recovered", log=self.prefix, lines=recovered)
+
+    def _scan_into(self, segment: dict, path: Path, offset: int) -> int:
+        """Dosyayı offset'ten itibaren okuyup segment checkpoint'ini güncelle."""
+        lines = 0
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break  # Yarım kalmış son satır
+                    offset += len(raw)
+                    line = raw.strip()
+                    if not line:
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._checkpoint(segment, data.get("sequence", 0), data.get("hash", ""),
+                                     data.get("timestamp", ""))
+                    lines += 1
+        except FileNotFoundError:
+            return 0
+        segment["bytes"] = offset
+        return lines
+
+    def _truncate_partial(self, segment: dict):
+        """Çökmede yarım kalan son satırı at — sonraki commit onunla birleşmesin."""
+        path = self.segment_path(segment)
+        try:
+            if path.stat().st_size > segment["bytes"]:
+                with open(path, "r+b") as f:
+                    f.truncate(segment["bytes"])
+                logger.warning("event_log_partial_line_dropped", log=self.prefix, segment=segment["name"])
+        except OSError:
+            pass
+
+    @staticmethod
+    def _checkpoint(segment: dict, seq: int, line_hash: str, ts: str):
+        if not segment["count"]:
+            segment["first_seq"] = seq
+            segment["first_ts"] = ts
+        segment["count"] += 1
+        if seq:
+            segment["last_seq"] = seq
+        if ts:
+            segment["last_ts"] = ts
+        if line_hash:
+            segment["end_hash"] = line_hash
+
+    def _write_index(self, index: dict):
+        tmp = self.index_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(tmp, self.index_file)
+            self._index_on_disk = True
+        except OSError as e:
+            logger.warning("event_log_index_write_failed", log=self.prefix, error=str(e))
+
+    # ── Durum ──
+
+    @property
+    def last_sequence(self) -> int:
+        with self._index_lock:
+            for segment in reversed(self._index["segments"]):
+                if segment["last_seq"]:
+                    return segment["last_seq"]
+        return 0
+
+    @property
+    def last_hash(self) -> str:
+        with self._index_lock:
+            return self._index["segments"][-1]["end_hash"]
+
+    def segments(self) -> List[dict]:
+        """Segment checkpoint'lerinin kopyası (eskiden yeniye)."""
+        with self._index_lock:
+            return [dict(s) for s in self._index["segments"]]
+
+    def get_meta(self, key: str, default=None):
+        """Index'te saklanan kullanıcı verisi (ör. doğrulama checkpoint'i)."""
+        with self._index_lock:
+            return self._index.get("meta", {}).get(key, default)
+
+    def set_meta(self, key: str, value):
+        with self._index_lock:
+            self._index.setdefault("meta", {})[key] = value
+            snapshot = json.loads(json.dumps(self._index))
+        if self._index_on_disk:
+            # Henüz yazılmamış logda ilk commit index'i meta ile birlikte yazar
+            self._write_index(snapshot)
+
+    # ── Yazma ──
+
+    def append(self, line: str, seq: int = 0, line_hash: str = "", ts: str = "",
+               keys: Sequence[str] = ()) -> Future:
+        """Satırı commit kuyruğuna ekle — diske inince tamamlanan Future döner.
+
+        keys: index_fields sırasıyla satırın alan değerleri (satır index'i için).
+        """
+        future: Future = Future()
+        self._queue.put((line, seq, line_hash, ts, tuple(keys), future))
+        self._ensure_writer()
+        return future
+
+    def flush(self, timeout: Optional[float] = 10.0):
+        """Kuyruktaki tüm satırlar diske inene kadar bekle."""
+        if self._writer is None or not self._writer.is_alive():
+            return
+        marker: Future = Future()
+        self._queue.put((None, 0, "", "", (), marker))
+        marker.result(timeout=timeout)
+
+    def close(self):
+        """Bekleyenleri yaz, writer thread'ini durdur."""
+        writer = self._writer
+        if writer is None or not writer.is_alive():
+            return
+        self._queue.put(_STOP)
+        writer.join(timeout=10)
+        self._writer = None
+
+    def _ensure_writer(self):
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._commit_loop, name=f"{self.prefix}-log-writer", daemon=True)
+                self._writer.start()
+
+    def _commit_loop(self):
+        """Kuyruğu pencere boyunca topla, tek write + fsync ile commit et."""
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.group_commit
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+        self._close_file()
+
+    def _open_active(self):
+        if self._file is None:
+            path = self.segment_path(self._index["segments"][-1])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(path, "ab")
+        return self._file
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _commit(self, batch: list):
+        started = time.perf_counter()
+        entries = [b for b in batch if b[0] is not None]
+        error = None
+        written = 0
+        rows = []
+        try:
+            if entries:
+                with self._index_lock:
+                    active = self._index["segments"][-1]
+                # Segment sınırı batch içinde — satırlar bölünmeden sırayla yazılır
+                start = 0
+                while start < len(entries):
+                    room = self.segment_max_bytes - active["bytes"]
+                    end = start
+                    chunk = []
+                    size = 0
+                    while end < len(entries):
+                        data = (entries[end][0] + "\n").encode("utf-8")
+                        if chunk and size + len(data) > room:
+                            break
+                        chunk.append(data)
+                        size += len(data)
+                        end += 1
+                    f = self._open_active()
+                    f.write(b"".join(chunk))
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                        self._stats["fsyncs"] += 1
+                    with self._index_lock:
+                        offset = active["bytes"]
+                        for (_, seq, line_hash, ts, keys, _), data in zip(entries[start:end], chunk):
+                            self._checkpoint(active, seq, line_hash, ts)
+                            rows.append((active["number"], offset, len(data), seq, ts, keys))
+                            offset += len(data)
+                        active["bytes"] += size
+                        written += end - start
+                        if active["bytes"] >= self.segment_max_bytes:
+                            active = self._rotate_locked()
+                    start = end
+                with self._index_lock:
+                    snapshot = json.loads(json.dumps(self._index))
+                self._write_index(snapshot)
+                self._index_rows(rows)
+        except Exception as e:
+            error = e
+            self._stats["write_errors"] += 1
+            logger.error("event_log_commit_failed", log=self.prefix, error=str(e))
+            self._close_file()
+
+        self._stats["appended"] += written
+        self._stats["commits"] += 1 if entries else 0
+        self._stats["max_batch"] = max(self._stats["max_batch"], len(entries))
+        self._stats["commit_ms_sum"] += (time.perf_counter() - started) * 1000
+        for *_, future in batch:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(True)
+
+    def _rotate_locked(self) -> dict:
+        """Aktif segmenti mühürle, yenisini aç (index kilidi tutuluyor)."""
+        self._close_file()
+        sealed = self._index["segments"][-1]
+        sealed["sealed"] = True
+        segment = self._new_segment(sealed["number"] + 1, sealed["end_hash"])
+        self._index["segments"].append(segment)
+        self._stats["rotations"] += 1
+        logger.info("event_log_rotated", log=self.prefix, sealed=sealed["name"],
+                    events=sealed["count"])
+        return segment
+
+    # ── Satır index'i ──
+
+    def _index_rows(self, rows: list):
+        """Commit edilen satırları sidecar'a (ve yüklüyse bellekteki index'e) ekle."""
+        with self._records_lock:
+            if self._records is not None:
+                rows = [row for row in rows if self._records.add(*row)]
+            self._append_sidecar(rows)
+
+    def _append_sidecar(self, rows: list):
+        by_segment: Dict[int, list] = {}
+        for number, offset, length, seq, ts, keys in rows:
+            by_segment.setdefault(number, []).append(
+                json.dumps([offset, length, seq, ts, *keys], ensure_ascii=False))
+        for number, lines in by_segment.items():
+            try:
+                with open(self.sidecar_path(number), "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+            except OSError as e:
+                logger.warning("event_log_sidecar_write_failed", log=self.prefix, error=str(e))
+
+    def _scan_rows(self, segment: dict, start: int) -> list:
+        """Segmenti start'tan index'teki bayt sonuna kadar tarayıp satır kayıtları üret."""
+        rows = []
+        end = segment["bytes"]
+        try:
+            with open(self.segment_path(segment), "rb") as f:
+                f.seek(start)
+                offset = start
+                for raw in f:
+                    if offset + len(raw) > end or not raw.endswith(b"\n"):
+                        break
+                    try:
+                        data = json.loads(raw)
+                    except ValueError:
+                        data = None
+                    if isinstance(data, dict):
+                        keys = tuple(str(data.get(f) or "") for f in self.index_fields)
+                        rows.append((segment["number"], offset, len(raw), data.get("sequence", 0),
+                                     data.get("timestamp", ""), keys))
+                    offset += len(raw)
+        except FileNotFoundError:
+            pass
+        return rows
+
+    def _load_records(self) -> RecordIndex:
+        """Sidecar'ları oku; eksik/bozuk kısımları segmentten tamamla (kilit tutuluyor)."""
+        records = RecordIndex(self.index_fields)
+        rebuilt = 0
+        for segment in self.segments():
+            number = segment["number"]
+            path = self.sidecar_path(number)
+            good = 0
+            try:
+                with open(path, "rb") as f:
+                    for raw in f:
+                        try:
+                            row = json.loads(raw) if raw.endswith(b"\n") else None
+                        except ValueError:
+                            row = None
+                        if not row or row[0] + row[1] > segment["bytes"]:
+                            break
+                        records.add(number, row[0], row[1], row[2], row[3], tuple(row[4:]))
+                        good += len(raw)
+                if path.stat().st_size > good:
+                    with open(path, "r+b") as f:
+                        f.truncate(good)
+            except FileNotFoundError:
+                pass
+            missing = [row for row in self._scan_rows(segment, records.covered.get(number, 0))
+                       if records.add(*row)]
+            if missing:
+                self._append_sidecar(missing)
+                rebuilt += len(missing)
+        if rebuilt:
+            logger.info("event_log_sidecar_rebuilt", log=self.prefix, rows=rebuilt)
+        return records
+
+    def _ensure_records(self) -> RecordIndex:
+        with self._records_lock:
+            if self._records is None:
+                started = time.perf_counter()
+                self._records = self._load_records()
+                logger.info("event_log_records_loaded", log=self.prefix, rows=len(self._records),
+                            load_ms=round((time.perf_counter() - started) * 1000, 1))
+            return self._records
+
+    def select(self, since: Optional[str] = None, until: Optional[str] = None,
+               filters: Optional[Dict[str, Sequence[str]]] = None, limit: int = 0) -> List[str]:
+        """Zaman aralığı + alan filtresine uyan satırlar (eskiden yeniye), seek ile okunur."""
+        records = self._ensure_records()
+        with self._records_lock:
+            positions = records.select(since, until, filters, limit)
+            locations = [(records.segment[p], records.offset[p], records.length[p]) for p in positions]
+        paths = {s["number"]: self.segment_path(s) for s in self.segments()}
+        lines = []
+        handles = {}
+        try:
+            for number, offset, length in locations:
+                f = handles.get(number)
+                if f is None:
+                    f = handles[number] = open(paths[number], "rb")
+                f.seek(offset)
+                lines.append(f.read(length).decode("utf-8", errors="replace").strip())
+        finally:
+            for f in handles.values():
+                f.close()
+        return lines
+
+    def index_values(self, field: str) -> List[str]:
+        """Alanın index'teki farklı değerleri."""
+        records = self._ensure_records()
+        with self._records_lock:
+            return list(records.postings[field])
+
+    def facet(self, field: str) -> Dict[str, int]:
+        """Alan değeri → satır sayısı."""
+        records = self._ensure_records()
+        with self._records_lock:
+            return records.facet(field)
+
+    def per_hour(self) -> Dict[str, int]:
+        """Saat ("2024-01-15T14") → satır sayısı."""
+        records = self._ensure_records()
+        with self._records_lock:
+            return dict(records.per_hour)
+
+    def record_count(self) -> int:
+        records = self._ensure_records()
+        with self._records_lock:
+            return len(records)
+
+    # ── Okuma ──
+
+    def iter_entries(self, number: Optional[int] = None, offset: int = 0) -> Iterator[Tuple[int, int, str]]:
+        """(segment, satır sonu offset'i, satır) — verilen konumdan itibaren."""
+        for segment in self.segments():
+            if number is not None and segment["number"] < number:
+                continue
+            start = offset if number is not None and segment["number"] == number else 0
+            try:
+                with open(self.segment_path(segment), "rb") as f:
+                    f.seek(start)
+                    position = start
+                    for raw in f:
+                        if position + len(raw) > segment["bytes"]:
+                            break
+                        position += len(raw)
+                        line = raw.decode("utf-8", errors="replace").strip()
+                        if line:
+                            yield segment["number"], position, line
+            except FileNotFoundError:
+                continue
+
+    def iter_lines(self, segments: Optional[List[dict]] = None) -> Iterator[str]:
+        """Commit edilmiş satırlar, eskiden yeniye (boş satırlar atlanır)."""
+        for segment in segments if segments is not None else self.segments():
+            path = self.segment_path(segment)
+            try:
+                with open(path, "rb") as f:
+                    remaining = segment["bytes"]
+                    for raw in f:
+                        if remaining <= 0:
+                            break
+                        remaining -= len(raw)
+                        line = raw.decode("utf-8", errors="replace").strip()
+                        if line:
+                            yield line
+            except FileNotFoundError:
+                continue
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        segments = self.segments()
+        return {
+            "segments": len(segments),
+            "events": sum(seg["count"] for seg in segments),
+            "bytes": sum(seg["bytes"] for seg in segments),
+            "queue_depth": self._queue.qsize(),
+            "appended": s["appended"],
+            "commits": s["commits"],
+            "fsyncs": s["fsyncs"],
+            "max_batch": s["max_batch"],
+            "avg_batch": round(s["appended"] / s["commits"], 2) if s["commits"] else 0,
+            "avg_commit_ms": round(s["commit_ms_sum"] / s["commits"], 3) if s["commits"] else 0,
+            "rotations": s["rotations"],
+            "recovered_lines": s["recovered_lines"],
+            "write_errors": s["write_errors"],
+            "indexed_rows": len(self._records) if self._records is not None else None,
+        }
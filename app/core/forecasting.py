@@ -8,8 +8,22 @@ Zaman serisi tahminleme ve anomali tespiti:
 - Z-Score Anomaly Detection
 - Isolation Forest (basit versiyon)
 - IQR + Rolling anomaly detection
+
+v7.29.00:
+- SES/Holt/Holt-Winters çekirdekleri (seri × zaman) matrisleri üzerinde
+  çalışır — aynı uzunluktaki sütunlar tek geçişte yumuşatılır
+- ARIMA/SARIMA sıra araması süreç havuzunda, karmaşıklık katmanlarıyla
+  ve erken budama ile; seçilen sıra ve fit edilmiş model seri hash'ine
+  göre önbelleklenir
+- forecast_columns(): bir sayfanın tüm sayısal sütunları için toplu tahmin
 """
 
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 from typing import Optional
@@ -26,6 +40,150 @@ try:
 except ImportError:
     STATSMODELS_AVAILABLE = False
 
+# scipy opsiyonel — SES için lineer filtre (yoksa zaman döngüsü)
+try:
+    from scipy.signal import lfilter as _lfilter
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Sıra araması için süreç sayısı (0/1 → seri arama)
+FORECAST_SEARCH_WORKERS = int(os.environ.get(
+    "FORECAST_SEARCH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Bu kadar ardışık karmaşıklık katmanı AIC'yi iyileştirmezse arama durur
+FORECAST_PRUNE_PATIENCE = int(os.environ.get("FORECAST_PRUNE_PATIENCE", "2"))
+# Seri hash'ine göre tutulan sıra seçimi / fit edilmiş model sayısı
+FORECAST_MODEL_CACHE_SIZE = int(os.environ.get("FORECAST_MODEL_CACHE_SIZE", "64"))
+# Toplu tahminde ARIMA/SARIMA uygulanacak maksimum sütun sayısı
+FORECAST_BATCH_ARIMA_COLUMNS = int(os.environ.get("FORECAST_BATCH_ARIMA_COLUMNS", "8"))
+
+
+# ══════════════════════════════════════════════════════════════
+# 0. VEKTÖREL YUMUŞATMA ÇEKİRDEKLERİ — satır başına bir seri
+# ══════════════════════════════════════════════════════════════
+
+def _nz(x: np.ndarray) -> np.ndarray:
+    """Sıfırları 1 ile değiştir (np.where'in iki kolu da hesaplandığı için)."""
+    return np.where(x != 0, x, 1.0)
+
+
+def _ses_batch(Y: np.ndarray, alpha: float) -> np.ndarray:
+    """SES: s_t = α·y_t + (1-α)·s_{t-1}, s_0 = y_0."""
+    if SCIPY_AVAILABLE:
+        # zi = (1-α)·y_0 → s_0 = α·y_0 + (1-α)·y_0 = y_0
+        smoothed, _ = _lfilter([alpha], [1.0, -(1 - alpha)], Y, axis=1,
+                               zi=(1 - alpha) * Y[:, :1])
+        return smoothed
+    smoothed = np.empty_like(Y)
+    smoothed[:, 0] = Y[:, 0]
+    for t in range(1, Y.shape[1]):
+        smoothed[:, t] = alpha * Y[:, t] + (1 - alpha) * smoothed[:, t - 1]
+    return smoothed
+
+
+def _holt_batch(Y: np.ndarray, alpha: float, beta: float):
+    """Holt level/trend — zamanda özyinelemeli, serilerde vektörel."""
+    level = Y[:, 0].copy()
+    trend = Y[:, 1] - Y[:, 0]
+    fitted = np.empty_like(Y)
+    fitted[:, 0] = level + trend
+    for t in range(1, Y.shape[1]):
+        new_level = alpha * Y[:, t] + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+        fitted[:, t] = level + trend
+    return fitted, level, trend
+
+
+def _holt_winters_batch(Y: np.ndarray, m: int, alpha: float, beta: float, gamma: float):
+    """Çarpımsal Holt-Winters — Y.shape[1] >= 2·m varsayılır."""
+    season_avg = np.stack([Y[:, i::m].mean(axis=1) for i in range(m)], axis=1)
+    grand = season_avg.mean(axis=1, keepdims=True)
+    seasonal = np.where(grand != 0, season_avg / _nz(grand), 1.0)
+
+    level = np.where(seasonal[:, 0] != 0, Y[:, 0] / _nz(seasonal[:, 0]), Y[:, 0])
+    trend = (Y[:, m] - Y[:, 0]) / m
+    fitted = np.empty_like(Y)
+    fitted[:, 0] = level + trend + (seasonal[:, 0] - 1) * level
+    for t in range(1, Y.shape[1]):
+        s = t % m
+        st = seasonal[:, s]
+        deseasonalized = np.where(st != 0, Y[:, t] / _nz(st), Y[:, t])
+        new_level = alpha * deseasonalized + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+        seasonal[:, s] = gamma * np.where(level != 0, Y[:, t] / _nz(level), 1.0) + (1 - gamma) * st
+        fitted[:, t] = (level + trend) * seasonal[:, s]
+    return fitted, level, trend, seasonal
+
+
+def _mape_batch(Y: np.ndarray, F: np.ndarray) -> np.ndarray:
+    """Satır başına MAPE (gerçek değeri 0 olan noktalar hariç)."""
+    mask = Y != 0
+    errors = np.where(mask, np.abs((Y - F) / _nz(Y)) * 100, 0.0)
+    counts = mask.sum(axis=1)
+    return np.where(counts > 0, errors.sum(axis=1) / np.maximum(counts, 1), 0.0)
+
+
+def _intervals(center, std_error: float, forecast_periods: int) -> list[dict]:
+    """%95 güven aralığı — ufukla √h oranında genişler."""
+    margins = 1.96 * std_error * np.sqrt(np.arange(1, forecast_periods + 1))
+    lower = np.round(np.asarray(center, dtype=float) - margins, 2).tolist()
+    upper = np.round(np.asarray(center, dtype=float) + margins, 2).tolist()
+    return [{"lower": lo, "upper": up} for lo, up in zip(lower, upper)]
+
+
+def _ses_result(y: np.ndarray, smoothed: np.ndarray, mape: float,
+                alpha: float, forecast_periods: int) -> dict:
+    last_smoothed = float(smoothed[-1])
+    std_error = float(np.std(np.abs(y - smoothed)))
+    return {
+        "success": True,
+        "method": "Exponential Smoothing (SES)",
+        "alpha": alpha,
+        "smoothed_values": np.round(smoothed, 2).tolist(),
+        "forecasts": [round(last_smoothed, 2)] * forecast_periods,
+        "confidence_intervals": _intervals(np.full(forecast_periods, last_smoothed),
+                                           std_error, forecast_periods),
+        "mape": round(float(mape), 2),
+    }
+
+
+def _holt_result(y: np.ndarray, fitted: np.ndarray, level: float, trend: float,
+                 mape: float, alpha: float, beta: float, forecast_periods: int) -> dict:
+    forecasts = np.round(level + np.arange(1, forecast_periods + 1) * trend, 2)
+    std_error = float(np.std(np.abs(y - fitted)))
+    trend_direction = "Artış" if trend > 0 else "Azalma" if trend < 0 else "Stabil"
+    return {
+        "success": True,
+        "method": "Holt Linear Trend",
+        "alpha": alpha,
+        "beta": beta,
+        "fitted_values": np.round(fitted, 2).tolist(),
+        "forecasts": forecasts.tolist(),
+        "confidence_intervals": _intervals(forecasts, std_error, forecast_periods),
+        "trend_direction": trend_direction,
+        "trend_per_period": round(float(trend), 2),
+        "mape": round(float(mape), 2),
+    }
+
+
+def _holt_winters_result(n: int, fitted: np.ndarray, level: float, trend: float,
+                         seasonal: np.ndarray, mape: float, season_length: int,
+                         forecast_periods: int) -> dict:
+    h = np.arange(1, forecast_periods + 1)
+    forecasts = (level + h * trend) * seasonal[(n + h - 1) % season_length]
+    return {
+        "success": True,
+        "method": "Holt-Winters Seasonal",
+        "season_length": season_length,
+        "fitted_values": np.round(fitted, 2).tolist(),
+        "forecasts": np.round(forecasts, 2).tolist(),
+        "seasonal_indices": np.round(seasonal, 3).tolist(),
+        "trend_per_period": round(float(trend), 2),
+        "mape": round(float(mape), 2),
+    }
+
 
 # ══════════════════════════════════════════════════════════════
 # 1. FORECASTING — Zaman Serisi Tahminleme
@@ -40,36 +198,10 @@ def exponential_smoothing(
     if len(values) < 3:
         return {"success": False, "error": "En az 3 veri noktası gerekli"}
     
-    # SES hesaplama
-    smoothed = [values[0]]
-    for i in range(1, len(values)):
-        smoothed.append(alpha * values[i] + (1 - alpha) * smoothed[-1])
-    
-    # Tahmin (son smoothed değeri ileriye taşı)
-    last_smoothed = smoothed[-1]
-    forecasts = [round(last_smoothed, 2)] * forecast_periods
-    
-    # Güven aralığı (historik hata bazlı)
-    errors = [abs(values[i] - smoothed[i]) for i in range(len(values))]
-    std_error = np.std(errors) if errors else 0
-    
-    confidence_intervals = []
-    for i in range(forecast_periods):
-        margin = 1.96 * std_error * np.sqrt(i + 1)  # 95% CI
-        confidence_intervals.append({
-            "lower": round(last_smoothed - margin, 2),
-            "upper": round(last_smoothed + margin, 2),
-        })
-    
-    return {
-        "success": True,
-        "method": "Exponential Smoothing (SES)",
-        "alpha": alpha,
-        "smoothed_values": [round(s, 2) for s in smoothed],
-        "forecasts": forecasts,
-        "confidence_intervals": confidence_intervals,
-        "mape": round(_calculate_mape(values, smoothed), 2),
-    }
+    Y = np.asarray(values, dtype=float)[None, :]
+    smoothed = _ses_batch(Y, alpha)
+    return _ses_result(Y[0], smoothed[0], _mape_batch(Y, smoothed)[0],
+                       alpha, forecast_periods)
 
 
 def holt_linear_trend(
@@ -82,50 +214,10 @@ def holt_linear_trend(
     if len(values) < 4:
         return {"success": False, "error": "En az 4 veri noktası gerekli"}
     
-    # İlk değerler
-    level = [values[0]]
-    trend = [values[1] - values[0]]
-    fitted = [level[0] + trend[0]]
-    
-    for i in range(1, len(values)):
-        new_level = alpha * values[i] + (1 - alpha) * (level[-1] + trend[-1])
-        new_trend = beta * (new_level - level[-1]) + (1 - beta) * trend[-1]
-        level.append(new_level)
-        trend.append(new_trend)
-        fitted.append(new_level + new_trend)
-    
-    # Tahmin
-    forecasts = []
-    for h in range(1, forecast_periods + 1):
-        forecast = level[-1] + h * trend[-1]
-        forecasts.append(round(forecast, 2))
-    
-    # Güven aralığı
-    errors = [abs(values[i] - fitted[i]) for i in range(len(values))]
-    std_error = np.std(errors) if errors else 0
-    
-    confidence_intervals = []
-    for i in range(forecast_periods):
-        margin = 1.96 * std_error * np.sqrt(i + 1)
-        confidence_intervals.append({
-            "lower": round(forecasts[i] - margin, 2),
-            "upper": round(forecasts[i] + margin, 2),
-        })
-    
-    trend_direction = "Artış" if trend[-1] > 0 else "Azalma" if trend[-1] < 0 else "Stabil"
-    
-    return {
-        "success": True,
-        "method": "Holt Linear Trend",
-        "alpha": alpha,
-        "beta": beta,
-        "fitted_values": [round(f, 2) for f in fitted],
-        "forecasts": forecasts,
-        "confidence_intervals": confidence_intervals,
-        "trend_direction": trend_direction,
-        "trend_per_period": round(trend[-1], 2),
-        "mape": round(_calculate_mape(values, fitted), 2),
-    }
+    Y = np.asarray(values, dtype=float)[None, :]
+    fitted, level, trend = _holt_batch(Y, alpha, beta)
+    return _holt_result(Y[0], fitted[0], level[0], trend[0], _mape_batch(Y, fitted)[0],
+                        alpha, beta, forecast_periods)
 
 
 def holt_winters_seasonal(
@@ -142,62 +234,138 @@ def holt_winters_seasonal(
         # Yeterli veri yoksa Holt'a düş
         return holt_linear_trend(values, alpha, beta, forecast_periods)
     
-    # İlk mevsimsel indeksler
-    season_averages = []
-    for i in range(0, season_length):
-        avg = np.mean([values[j] for j in range(i, n, season_length) if j < n])
-        season_averages.append(avg)
-    grand_avg = np.mean(season_averages)
-    seasonal = [sa / grand_avg if grand_avg != 0 else 1.0 for sa in season_averages]
-    
-    # İlk level ve trend
-    level = values[0] / seasonal[0] if seasonal[0] != 0 else values[0]
-    trend = (values[season_length] - values[0]) / season_length if n > season_length else 0
-    
-    fitted = []
-    levels = [level]
-    trends = [trend]
-    seasonals = list(seasonal)
-    
-    for i in range(n):
-        s_idx = i % season_length
-        
-        if i == 0:
-            fitted.append(level + trend + (seasonals[s_idx] - 1) * level)
-            continue
-        
-        new_level = alpha * (values[i] / seasonals[s_idx] if seasonals[s_idx] != 0 else values[i]) + (1 - alpha) * (levels[-1] + trends[-1])
-        new_trend = beta * (new_level - levels[-1]) + (1 - beta) * trends[-1]
-        new_seasonal = gamma * (values[i] / new_level if new_level != 0 else 1) + (1 - gamma) * seasonals[s_idx]
-        
-        levels.append(new_level)
-        trends.append(new_trend)
-        seasonals[s_idx] = new_seasonal
-        fitted.append((new_level + new_trend) * new_seasonal)
-    
-    # Tahmin
-    forecasts = []
-    for h in range(1, forecast_periods + 1):
-        s_idx = (n + h - 1) % season_length
-        forecast = (levels[-1] + h * trends[-1]) * seasonals[s_idx]
-        forecasts.append(round(forecast, 2))
-    
-    return {
-        "success": True,
-        "method": "Holt-Winters Seasonal",
-        "season_length": season_length,
-        "fitted_values": [round(f, 2) for f in fitted],
-        "forecasts": forecasts,
-        "seasonal_indices": [round(s, 3) for s in seasonals],
-        "trend_per_period": round(trends[-1], 2),
-        "mape": round(_calculate_mape(values, fitted), 2),
-    }
+    Y = np.asarray(values, dtype=float)[None, :]
+    fitted, level, trend, seasonal = _holt_winters_batch(Y, season_length, alpha, beta, gamma)
+    return _holt_winters_result(n, fitted[0], level[0], trend[0], seasonal[0],
+                                _mape_batch(Y, fitted)[0], season_length, forecast_periods)
 
 
 # ──────────────────────────────────────────────────────────────
 # 1b. ARIMA / SARIMA — İstatistiksel Model Tahminleme (v3.3.0)
 # ──────────────────────────────────────────────────────────────
 
+_order_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_model_cache: "OrderedDict[str, object]" = OrderedDict()
+_cache_lock = threading.Lock()
+_search_pool: Optional[ProcessPoolExecutor] = None
+_search_pool_lock = threading.Lock()
+
+
+def _series_key(arr: np.ndarray, *extra) -> str:
+    """Seri içeriği + model parametrelerinden önbellek anahtarı."""
+    h = hashlib.sha1(np.ascontiguousarray(arr, dtype=float).tobytes())
+    h.update(repr(extra).encode())
+    return h.hexdigest()
+
+
+def _cache_get(cache: OrderedDict, key: str):
+    with _cache_lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    return None
+
+
+def _cache_put(cache: OrderedDict, key: str, value):
+    with _cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > FORECAST_MODEL_CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def _get_search_pool() -> Optional[ProcessPoolExecutor]:
+    """Sıra araması için lazy süreç havuzu (FORECAST_SEARCH_WORKERS <= 1 → None)."""
+    global _search_pool
+    if FORECAST_SEARCH_WORKERS <= 1:
+        return None
+    with _search_pool_lock:
+        if _search_pool is None:
+            _search_pool = ProcessPoolExecutor(max_workers=FORECAST_SEARCH_WORKERS)
+        return _search_pool
+
+
+def _fit_aic(arr: np.ndarray, order: tuple, seasonal_order: Optional[tuple] = None) -> Optional[float]:
+    """Tek aday modeli fit edip AIC döndür (süreç havuzunda çalışır)."""
+    import warnings
+    warnings.filterwarnings("ignore")
+    try:
+        if seasonal_order is None:
+            aic = _ARIMA(arr, order=order).fit().aic
+        else:
+            m = _SARIMAX(arr, order=order, seasonal_order=seasonal_order,
+                         enforce_stationarity=False, enforce_invertibility=False)
+            aic = m.fit(disp=False, maxiter=50).aic
+        return float(aic) if np.isfinite(aic) else None
+    except Exception:
+        return None
+
+
+def _map_fits(arr: np.ndarray, tier: list[tuple]) -> list[Optional[float]]:
+    global _search_pool
+    orders = [o for o, _ in tier]
+    seasonal_orders = [so for _, so in tier]
+    if len(tier) > 1:
+        try:
+            pool = _get_search_pool()
+            if pool is not None:
+                return list(pool.map(_fit_aic, [arr] * len(tier), orders, seasonal_orders))
+        except Exception as e:
+            # BrokenProcessPool vb. → havuzu bırak, seri devam et
+            logger.warning("forecast_search_pool_failed", error=str(e))
+            with _search_pool_lock:
+                _search_pool = None
+    return [_fit_aic(arr, o, so) for o, so in tier]
+
+
+def _search_orders(arr: np.ndarray, candidates: list[tuple]) -> tuple:
+    """AIC bazlı sıra araması — karmaşıklık katmanları + erken budama.
+
+    Adaylar parametre toplamına (p+q+P+Q) göre katmanlanır; bir katmanın
+    adayları paralel fit edilir. FORECAST_PRUNE_PATIENCE ardışık katman en
+    iyi AIC'yi iyileştirmezse daha karmaşık modeller denenmez.
+
+    Returns:
+        ((order, seasonal_order) | None, best_aic)
+    """
+    tiers: dict[int, list] = {}
+    for order, seasonal_order in candidates:
+        complexity = order[0] + order[2] + (
+            seasonal_order[0] + seasonal_order[2] if seasonal_order else 0)
+        tiers.setdefault(complexity, []).append((order, seasonal_order))
+
+    best, best_aic, stale, fitted = None, float("inf"), 0, 0
+    for complexity in sorted(tiers):
+        tier = tiers[complexity]
+        improved = False
+        for candidate, aic in zip(tier, _map_fits(arr, tier)):
+            if aic is not None and aic < best_aic:
+                best, best_aic, improved = candidate, aic, True
+        fitted += len(tier)
+        stale = 0 if improved else stale + 1
+        if stale >= FORECAST_PRUNE_PATIENCE:
+            break
+
+    logger.debug("forecast_order_search", candidates=len(candidates), fitted=fitted,
+                 best=best, aic=round(best_aic, 2) if best else None)
+    return best, best_aic
+
+
+def _fit_model(arr: np.ndarray, order: tuple, seasonal_order: Optional[tuple] = None):
+    """Seçilen sırayla fit et — seri hash'ine göre önbellekli."""
+    key = _series_key(arr, "fit", order, seasonal_order)
+    fit = _cache_get(_model_cache, key)
+    if fit is None:
+        if seasonal_order is None:
+            fit = _ARIMA(arr, order=order).fit()
+        else:
+            fit = _SARIMAX(arr, order=order, seasonal_order=seasonal_order,
+                           enforce_stationarity=False,
+                           enforce_invertibility=False).fit(disp=False, maxiter=50)
+        _cache_put(_model_cache, key, fit)
+    return fit
+
+
 def _adf_test(values: list[float]) -> dict:
     """Augmented Dickey-Fuller durağanlık testi."""
     if not STATSMODELS_AVAILABLE:
@@ -217,12 +385,17 @@ def _adf_test(values: list[float]) -> dict:
 def _auto_arima_order(values: list[float], max_p: int = 4, max_q: int = 4) -> tuple:
     """AIC bazlı otomatik (p,d,q) sıra seçimi.
     
-    Basit grid-search — statsmodels auto_arima gerektirmez.
+    Katmanlı grid-search (_search_orders) — statsmodels auto_arima
+    gerektirmez. Sonuç seri hash'ine göre önbelleklenir.
     """
     import warnings
     warnings.filterwarnings("ignore")
     
     arr = np.array(values, dtype=float)
+    key = _series_key(arr, "arima_order", max_p, max_q)
+    cached = _cache_get(_order_cache, key)
+    if cached is not None:
+        return cached
     
     # Durağanlık testi → d belirle
     adf = _adf_test(values)
@@ -236,23 +409,14 @@ def _auto_arima_order(values: list[float], max_p: int = 4, max_q: int = 4) -> tu
         if not adf2.get("stationary"):
             d = 2
     
-    best_aic = float("inf")
-    best_order = (1, d, 1)
-    
-    for p in range(0, max_p + 1):
-        for q in range(0, max_q + 1):
-            if p == 0 and q == 0:
-                continue
-            try:
-                model = _ARIMA(arr, order=(p, d, q))
-                fit = model.fit()
-                if fit.aic < best_aic:
-                    best_aic = fit.aic
-                    best_order = (p, d, q)
-            except Exception:
-                continue
-    
-    return best_order, best_aic
+    candidates = [((p, d, q), None)
+                  for p in range(0, max_p + 1)
+                  for q in range(0, max_q + 1)
+                  if not (p == 0 and q == 0)]
+    best, best_aic = _search_orders(arr, candidates)
+    result = (best[0] if best else (1, d, 1), best_aic)
+    _cache_put(_order_cache, key, result)
+    return result
 
 
 def arima_forecast(
@@ -295,9 +459,8 @@ def arima_forecast(
         else:
             aic = None
         
-        # Model fit
-        model = _ARIMA(arr, order=order)
-        fit = model.fit()
+        # Model fit (seri hash'ine göre önbellekli)
+        fit = _fit_model(arr, order)
         
         if aic is None:
             aic = fit.aic
@@ -393,34 +556,23 @@ def sarima_forecast(
         if seasonal_order is None:
             seasonal_order = (1, 1, 1, seasonal_period)
         
-        # SARIMA fit — en iyi modeli AIC ile seç
-        best_aic = float("inf")
-        best_fit = None
-        best_order = order
-        best_seasonal = seasonal_order
-        
-        # Küçük grid search
-        for p in range(0, 3):
-            for q in range(0, 3):
-                for P in range(0, 2):
-                    for Q in range(0, 2):
-                        try:
-                            _o = (p, 1, q)
-                            _so = (P, 1, Q, seasonal_period)
-                            m = _SARIMAX(arr, order=_o, seasonal_order=_so,
-                                        enforce_stationarity=False,
-                                        enforce_invertibility=False)
-                            f = m.fit(disp=False, maxiter=50)
-                            if f.aic < best_aic:
-                                best_aic = f.aic
-                                best_fit = f
-                                best_order = _o
-                                best_seasonal = _so
-                        except Exception:
-                            continue
+        # SARIMA fit — en iyi modeli AIC ile seç (katmanlı, paralel arama)
+        key = _series_key(arr, "sarima_order", seasonal_period)
+        selected = _cache_get(_order_cache, key)
+        if selected is None:
+            candidates = [((p, 1, q), (P, 1, Q, seasonal_period))
+                          for p in range(0, 3) for q in range(0, 3)
+                          for P in range(0, 2) for Q in range(0, 2)]
+            selected = _search_orders(arr, candidates)
+            _cache_put(_order_cache, key, selected)
+        best, best_aic = selected
         
-        if best_fit is None:
+        if best is not None:
+            best_order, best_seasonal = best
+            best_fit = _fit_model(arr, best_order, best_seasonal)
+        else:
             # Grid search başarısız → basit model
+            best_order, best_seasonal = order, seasonal_order
             m = _SARIMAX(arr, order=order, seasonal_order=seasonal_order,
                         enforce_stationarity=False, enforce_invertibility=False)
             best_fit = m.fit(disp=False)
@@ -491,13 +643,10 @@ def moving_average_forecast(
     if len(values) < window:
         return {"success": False, "error": f"En az {window} veri noktası gerekli"}
     
-    # MA hesaplama
-    ma = []
-    for i in range(len(values)):
-        if i < window - 1:
-            ma.append(None)
-        else:
-            ma.append(round(np.mean(values[i-window+1:i+1]), 2))
+    # MA hesaplama (kayan pencere ortalaması tek konvolüsyonla)
+    arr = np.asarray(values, dtype=float)
+    window_means = np.convolve(arr, np.full(window, 1.0 / window), mode="valid")
+    ma = [None] * (window - 1) + np.round(window_means, 2).tolist()
     
     # Tahmin
     last_ma = ma[-1]
@@ -517,6 +666,134 @@ def moving_average_forecast(
     }
 
 
+def _find_date_column(df: pd.DataFrame) -> Optional[str]:
+    for col in df.columns:
+        try:
+            pd.to_datetime(df[col])
+            return col
+        except Exception:
+            continue
+    return None
+
+
+def _select_best(results: dict) -> dict:
+    """MAPE bazlı en iyi model seçimi (eşitlikte ilk eklenen kazanır)."""
+    best_method = None
+    best_mape = float('inf')
+    for method, result in results.items():
+        if result.get("success") and result.get("mape", float('inf')) < best_mape:
+            best_mape = result["mape"]
+            best_method = method
+    
+    best_result = results.get(best_method, results.get("ses", {}))
+    return {
+        "best_method": best_method,
+        "best_mape": best_mape,
+        "forecasts": best_result.get("forecasts", []),
+        "confidence_intervals": best_result.get("confidence_intervals", []),
+        "trend_direction": best_result.get("trend_direction", "N/A"),
+        "all_models": {k: {"mape": v.get("mape", "N/A"), "method": v.get("method", k)} 
+                      for k, v in results.items() if v.get("success")},
+    }
+
+
+def forecast_columns(
+    df: pd.DataFrame,
+    date_col: str = None,
+    value_cols: list[str] = None,
+    forecast_periods: int = 6,
+    arima_columns: int = FORECAST_BATCH_ARIMA_COLUMNS,
+) -> dict:
+    """Toplu tahminleme — bir sayfanın tüm sayısal sütunları tek geçişte.
+
+    Boş değerleri atıldıktan sonra aynı uzunlukta kalan sütunlar matris
+    olarak yığılır; SES, Holt ve Holt-Winters tüm sütunlar için birlikte
+    hesaplanır. ARIMA/SARIMA (statsmodels varsa) yalnızca ilk
+    `arima_columns` sütuna uygulanır.
+
+    Returns:
+        {"success", "date_column", "columns": {sütun: auto_forecast özeti},
+         "skipped": [yetersiz veri sütunları]}
+    """
+    if not date_col:
+        date_col = _find_date_column(df)
+    if not date_col:
+        return {"success": False, "error": "Tarih sütunu bulunamadı"}
+    
+    num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    value_cols = [c for c in (value_cols or num_cols) if c in num_cols and c != date_col]
+    if not value_cols:
+        return {"success": False, "error": "Sayısal sütun bulunamadı"}
+    
+    # Sırala
+    df_sorted = df[[date_col] + value_cols].copy()
+    df_sorted[date_col] = pd.to_datetime(df_sorted[date_col])
+    df_sorted = df_sorted.sort_values(date_col)
+    
+    # Uzunluğa göre grupla → her grup tek matris
+    series = {col: df_sorted[col].dropna().to_numpy(dtype=float) for col in value_cols}
+    skipped = [col for col, s in series.items() if len(s) < 4]
+    groups: dict[int, list[str]] = {}
+    for col, s in series.items():
+        if len(s) >= 4:
+            groups.setdefault(len(s), []).append(col)
+    
+    per_column: dict[str, dict] = {col: {} for cols in groups.values() for col in cols}
+    for n, cols in groups.items():
+        Y = np.stack([series[c] for c in cols])
+        
+        # 1. SES
+        smoothed = _ses_batch(Y, 0.3)
+        mapes = _mape_batch(Y, smoothed)
+        for i, col in enumerate(cols):
+            per_column[col]["ses"] = _ses_result(Y[i], smoothed[i], mapes[i], 0.3, forecast_periods)
+        
+        # 2. Holt Linear
+        fitted, level, trend = _holt_batch(Y, 0.3, 0.1)
+        mapes = _mape_batch(Y, fitted)
+        for i, col in enumerate(cols):
+            per_column[col]["holt"] = _holt_result(Y[i], fitted[i], level[i], trend[i], mapes[i],
+                                                   0.3, 0.1, forecast_periods)
+        
+        # 3. Holt-Winters (yeterli veri varsa)
+        season_length = 12 if n >= 24 else 4 if n >= 8 else None
+        if season_length:
+            fitted, level, trend, seasonal = _holt_winters_batch(Y, season_length, 0.3, 0.1, 0.1)
+            mapes = _mape_batch(Y, fitted)
+            for i, col in enumerate(cols):
+                per_column[col]["holt_winters"] = _holt_winters_result(
+                    n, fitted[i], level[i], trend[i], seasonal[i], mapes[i],
+                    season_length, forecast_periods)
+    
+    # 4-5. ARIMA / SARIMA (statsmodels varsa, sütun sınırı ile) — v3.3.0
+    if STATSMODELS_AVAILABLE:
+        arima_targets = [c for c in value_cols if c in per_column][:max(0, arima_columns)]
+        for col in arima_targets:
+            values = series[col].tolist()
+            if len(values) >= 10:
+                arima = arima_forecast(values, forecast_periods=forecast_periods)
+                if arima.get("success"):
+                    per_column[col]["arima"] = arima
+            if len(values) >= 30:
+                sarima = sarima_forecast(values, seasonal_period=12, forecast_periods=forecast_periods)
+                if sarima.get("success"):
+                    per_column[col]["sarima"] = sarima
+    
+    columns = {
+        col: {"data_points": len(series[col]), **_select_best(results)}
+        for col, results in per_column.items()
+    }
+    logger.info("forecast_columns", columns=len(columns), groups=len(groups),
+                skipped=len(skipped))
+    return {
+        "success": True,
+        "date_column": date_col,
+        "forecast_periods": forecast_periods,
+        "columns": columns,
+        "skipped": skipped,
+    }
+
+
 def auto_forecast(
     df: pd.DataFrame,
     date_col: str = None,
@@ -526,13 +803,7 @@ def auto_forecast(
     """Otomatik tahminleme — en iyi yöntemi seçer (ARIMA dahil)."""
     # Tarih sütununu bul
     if not date_col:
-        for col in df.columns:
-            try:
-                pd.to_datetime(df[col])
-                date_col = col
-                break
-            except Exception:
-                continue
+        date_col = _find_date_column(df)
     
     if not date_col:
         return {"success": False, "error": "Tarih sütunu bulunamadı"}
@@ -546,70 +817,23 @@ def auto_forecast(
     else:
         return {"success": False, "error": "Sayısal sütun bulunamadı"}
     
-    # Sırala
-    df_sorted = df.copy()
-    df_sorted[date_col] = pd.to_datetime(df_sorted[date_col])
-    df_sorted = df_sorted.sort_values(date_col)
-    values = df_sorted[value_col].dropna().tolist()
-    
-    if len(values) < 4:
+    batch = forecast_columns(df, date_col, [value_col], forecast_periods, arima_columns=1)
+    column = batch.get("columns", {}).get(value_col)
+    if not column:
         return {"success": False, "error": "En az 4 veri noktası gerekli"}
     
-    # Mevsimsellik var mı? (12 veya 4 periyot)
-    results = {}
-    
-    # 1. SES
-    ses = exponential_smoothing(values, forecast_periods=forecast_periods)
-    results["ses"] = ses
-    
-    # 2. Holt Linear
-    holt = holt_linear_trend(values, forecast_periods=forecast_periods)
-    results["holt"] = holt
-    
-    # 3. Holt-Winters (yeterli veri varsa)
-    if len(values) >= 24:
-        hw = holt_winters_seasonal(values, season_length=12, forecast_periods=forecast_periods)
-        results["holt_winters"] = hw
-    elif len(values) >= 8:
-        hw = holt_winters_seasonal(values, season_length=4, forecast_periods=forecast_periods)
-        results["holt_winters"] = hw
-    
-    # 4. ARIMA (statsmodels varsa) — v3.3.0
-    if STATSMODELS_AVAILABLE and len(values) >= 10:
-        arima = arima_forecast(values, forecast_periods=forecast_periods)
-        if arima.get("success"):
-            results["arima"] = arima
-    
-    # 5. SARIMA (mevsimsel + yeterli veri varsa) — v3.3.0
-    if STATSMODELS_AVAILABLE and len(values) >= 30:
-        season_len = 12 if len(values) >= 30 else 4
-        sarima = sarima_forecast(values, seasonal_period=season_len, forecast_periods=forecast_periods)
-        if sarima.get("success"):
-            results["sarima"] = sarima
-    
-    # En iyi modeli seç (MAPE bazlı)
-    best_method = None
-    best_mape = float('inf')
-    for method, result in results.items():
-        if result.get("success") and result.get("mape", float('inf')) < best_mape:
-            best_mape = result["mape"]
-            best_method = method
-    
-    best_result = results.get(best_method, ses)
-    
     return {
         "success": True,
-        "best_method": best_method,
-        "best_mape": best_mape,
+        "best_method": column["best_method"],
+        "best_mape": column["best_mape"],
         "value_column": value_col,
         "date_column": date_col,
-        "data_points": len(values),
+        "data_points": column["data_points"],
         "forecast_periods": forecast_periods,
-        "forecasts": best_result.get("forecasts", []),
-        "confidence_intervals": best_result.get("confidence_intervals", []),
-        "trend_direction": best_result.get("trend_direction", "N/A"),
-        "all_models": {k: {"mape": v.get("mape", "N/A"), "method": v.get("method", k)} 
-                      for k, v in results.items() if v.get("success")},
+        "forecasts": column["forecasts"],
+        "confidence_intervals": column["confidence_intervals"],
+        "trend_direction": column["trend_direction"],
+        "all_models": column["all_models"],
     }
 
 
@@ -0,0 +1,547 @@
+"""Arka Plan Doküman Yükleme Kuyruğu (v7.32.00)
+
+/documents/upload ve /upload-multiple eskiden metin çıkarma, PDF görsel
+çıkarma, sayfa sayfa EasyOCR, chunking, embedding ve Chroma yazmasını
+HTTP isteğinin içinde, dosyaları sırayla işleyerek yapıyordu; klasör
+yüklemesi bir worker'ı dakikalarca tutuyor, nginx arkasında sık sık zaman
+aşımına düşüyordu.
+
+- Yükleme diske kopyalanır (INGEST_JOBS_DIR/files), içerik hash'i
+  (sha256) kopyalarken hesaplanır; istek job_id ile hemen döner.
+- Job durumu job başına JSON dosyasında tutulur (atomik yazma) — aynı
+  sunucudaki diğer uvicorn worker'ları da durumu okuyabilir; yeniden
+  başlatmada yarım kalan job'lar kuyruğa geri alınır.
+- INGEST_WORKERS eşzamanlı job; CPU-ağır çıkarma (PDF/OCR/Excel)
+  INGEST_PROCESS_WORKERS süreçlik havuzda, embedding + Chroma yazması
+  thread'de (embedding modeli ana süreçte bir kez yüklü kalır).
+- Geçici hatalar üstel beklemeyle INGEST_MAX_ATTEMPTS kez denenir;
+  desteklenmeyen format / boş içerik gibi kalıcı hatalar denenmez.
+- İdempotency: aynı kullanıcının aynı departmana aynı içeriği (hash)
+  hâlâ kuyruktaysa / işleniyorsa yeni job açılmaz, mevcut job döner.
+  Biten job'lar tekilleştirmeye katılmaz — silinip yeniden yüklenen
+  doküman tekrar indekslenir (değişmeyen içerik add_document'in hash
+  kontrolüyle zaten atlanır).
+
+Kullanım:
+    queue = get_ingest_queue()
+    job = await queue.submit("rapor.pdf", upload.file, department="Finans")
+    queue.get(job["job_id"])      # {"status": "extracting", "progress": 10, ...}
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import structlog
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows geliştirme ortamı
+    FCNTL_AVAILABLE = False
+
+logger = structlog.get_logger()
+
+INGEST_JOBS_DIR = Path(os.environ.get("INGEST_JOBS_DIR", "data/ingest_jobs"))
+# Aynı anda işlenen job sayısı
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Metin çıkarma süreç havuzu (0 → thread'de çalışır)
+INGEST_PROCESS_WORKERS = int(os.environ.get(
+    "INGEST_PROCESS_WORKERS", str(min(2, os.cpu_count() or 1))))
+INGEST_MAX_ATTEMPTS = int(os.environ.get("INGEST_MAX_ATTEMPTS", "3"))
+INGEST_RETRY_BACKOFF_S = float(os.environ.get("INGEST_RETRY_BACKOFF_S", "2.0"))
+# Diskte tutulan biten (done/failed) job sayısı
+INGEST_JOB_RETENTION = int(os.environ.get("INGEST_JOB_RETENTION", "500"))
+
+STATUS_QUEUED = "queued"
+STATUS_EXTRACTING = "extracting"
+STATUS_INDEXING = "indexing"
+STATUS_RETRYING = "retrying"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_EXTRACTING, STATUS_INDEXING, STATUS_RETRYING)
+
+_COPY_BLOCK = 1024 * 1024
+
+
+class IngestError(Exception):
+    """Job hatası; permanent=True ise yeniden denenmez."""
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+@dataclass
+class IngestJob:
+    job_id: str
+    filename: str
+    department: str
+    content_hash: str
+    size: int
+    author: Optional[str] = None
+    user_id: Optional[int] = None
+    batch_id: Optional[str] = None
+    status: str = STATUS_QUEUED
+    progress: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
+    result: dict = field(default_factory=dict)
+    owner_pid: int = field(default_factory=os.getpid)
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IngestJob":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+
+class IngestJobStore:
+    """Job başına JSON dosyası + spool edilmiş yükleme dosyaları."""
+
+    def __init__(self, root: Path = INGEST_JOBS_DIR):
+        self.root = Path(root)
+        self.files_dir = self.root / "files"
+
+    def ensure(self):
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, job_id: str) -> Path:
+        return self.root / f"{job_id}.json"
+
+    def spool_path(self, job_id: str) -> Path:
+        return self.files_dir / job_id
+
+    def save(self, job: IngestJob):
+        path = self._path(job.job_id)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(job.to_dict(), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def load(self, job_id: str) -> Optional[IngestJob]:
+        try:
+            return IngestJob.from_dict(json.loads(self._path(job_id).read_text(encoding="utf-8")))
+        except (OSError, json.JSONDecodeError, TypeError):
+            return None
+
+    def load_all(self) -> List[IngestJob]:
+        jobs = []
+        for path in self.root.glob("*.json"):
+            job = self.load(path.stem)
+            if job is not None:
+                jobs.append(job)
+        return sorted(jobs, key=lambda j: j.created_at)
+
+    def delete(self, job_id: str):
+        self._path(job_id).unlink(missing_ok=True)
+        self.spool_path(job_id).unlink(missing_ok=True)
+
+
+def _spool(source, dest: Path) -> tuple:
+    """bytes / dosya tutamacı → dest; (sha256, boyut) döndürür."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(dest, "wb") as out:
+        if isinstance(source, (bytes, bytearray)):
+            blocks = [bytes(source)]
+        else:
+            source.seek(0)
+            blocks = iter(lambda: source.read(_COPY_BLOCK), b"")
+        for block in blocks:
+            digest.update(block)
+            out.write(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+# ══════════════════════════════════════════════════════════════
+# 1. AŞAMA FONKSİYONLARI
+# ══════════════════════════════════════════════════════════════
+
+def extract_job_file(path: str, filename: str) -> dict:
+    """Spool dosyasından metin (+ PDF görselleri) çıkar — süreç havuzunda çalışır.
+
+    Hatalar dict olarak döner (HTTPException süreçler arası pickle edilemez).
+    """
+    from fastapi import HTTPException
+    from app.api.routes.documents import extract_text_from_file
+
+    try:
+        with open(path, "rb") as handle:
+            content, doc_type = extract_text_from_file(filename, handle)
+    except HTTPException as e:
+        return {"error": str(e.detail), "permanent": e.status_code < 500}
+
+    if not content or not content.strip():
+        return {"error": f"Dosyadan içerik çıkarılamadı ({doc_type})", "permanent": True}
+
+    images_extracted = 0
+    if doc_type == "pdf":
+        try:
+            from app.rag.pdf_images import extract_pdf_images
+            with open(path, "rb") as handle:
+                page_images = extract_pdf_images(filename, handle.read())
+            images_extracted = sum(len(v) for v in page_images.values())
+        except Exception as e:
+            logger.warning("upload_image_extract_error", filename=filename, error=str(e))
+
+    return {"content": content, "doc_type": doc_type, "images_extracted": images_extracted}
+
+
+def index_job_content(content: str, filename: str, doc_type: str, metadata: dict) -> bool:
+    """Chunking + embedding + Chroma yazması (ana süreçte, thread'de)."""
+    from app.rag.vector_store import add_document
+    return add_document(content=content, source=filename, doc_type=doc_type, metadata=metadata)
+
+
+# ══════════════════════════════════════════════════════════════
+# 2. KUYRUK
+# ══════════════════════════════════════════════════════════════
+
+class IngestQueue:
+    """Diskte kalıcı job durumu + asyncio worker'ları + çıkarma süreç havuzu."""
+
+    def __init__(
+        self,
+        store: Optional[IngestJobStore] = None,
+        workers: int = INGEST_WORKERS,
+        process_workers: int = INGEST_PROCESS_WORKERS,
+        max_attempts: int = INGEST_MAX_ATTEMPTS,
+        retry_backoff_s: float = INGEST_RETRY_BACKOFF_S,
+        extract_fn: Callable[[str, str], dict] = extract_job_file,
+        index_fn: Callable[[str, str, str, dict], bool] = index_job_content,
+    ):
+        self.store = store or IngestJobStore()
+        self.workers = max(1, workers)
+        self.process_workers = process_workers
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff_s = retry_backoff_s
+        self._extract_fn = extract_fn
+        self._index_fn = index_fn
+        self._jobs: Dict[str, IngestJob] = {}
+        # (content_hash, department, user_id) → aktif job_id
+        self._by_hash: Dict[tuple, str] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._counters = {"submitted": 0, "duplicates": 0, "done": 0, "failed": 0, "retries": 0}
+
+    # ── Yaşam döngüsü ──
+
+    async def start(self):
+        """Kayıtlı job'ları yükle, yarım kalanları kuyruğa al, worker'ları başlat."""
+        if self._tasks:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._tasks:
+                return
+            self.store.ensure()
+            self._queue = asyncio.Queue()
+            jobs = await asyncio.to_thread(self.store.load_all)
+            recovered = await asyncio.to_thread(self._recover, jobs)
+            jobs = await asyncio.to_thread(self._prune, jobs)
+            for job in jobs:
+                self._remember(job)
+            for job_id in recovered:
+                self._queue.put_nowait(job_id)
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"ingest-worker-{i}")
+                for i in range(self.workers)
+            ]
+            logger.info("ingest_queue_started", workers=self.workers,
+                        process_workers=self.process_workers,
+                        known_jobs=len(jobs), recovered=len(recovered))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _recover(self, jobs: List[IngestJob]) -> List[str]:
+        """Sahibi ölmüş aktif job'ları kurtar; kuyruğa alınacak job_id'leri döndür.
+
+        Thread'de çalışır (dosya kilidi + job yazmaları). Çok worker'lı
+        kurulumda kurtarmayı yalnızca recover.lock'u alan süreç yapar; aynı
+        job iki kez işlenmez.
+        """
+        lock_handle = None
+        if FCNTL_AVAILABLE:
+            lock_handle = open(self.store.root / "recover.lock", "w")
+            try:
+                fcntl.flock(lock_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_handle.close()
+                return []
+        try:
+            recovered = []
+            for job in jobs:
+                if job.status not in ACTIVE_STATUSES or job.owner_pid == os.getpid():
+                    continue
+                if _pid_alive(job.owner_pid):
+                    continue
+                if not self.store.spool_path(job.job_id).exists():
+                    self._touch(job, status=STATUS_FAILED, error="Yükleme dosyası bulunamadı")
+                    self.store.save(job)
+                    continue
+                job.owner_pid = os.getpid()
+                self._touch(job, status=STATUS_QUEUED, progress=0)
+                self.store.save(job)
+                recovered.append(job.job_id)
+            return recovered
+        finally:
+            if lock_handle is not None:
+                lock_handle.close()
+
+    def _prune(self, jobs: List[IngestJob]) -> List[IngestJob]:
+        """Saklama sınırını aşan en eski biten job'ları sil; kalanları döndür."""
+        finished = [j for j in jobs if j.status in (STATUS_DONE, STATUS_FAILED)]
+        pruned = {j.job_id for j in finished[:max(0, len(finished) - INGEST_JOB_RETENTION)]}
+        for job_id in pruned:
+            self.store.delete(job_id)
+        return [j for j in jobs if j.job_id not in pruned]
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Lazy çıkarma havuzu — spawn: ana süreçteki CUDA/torch durumu miras alınmaz."""
+        if self.process_workers <= 0:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    # ── Job kayıtları ──
+
+    @staticmethod
+    def _dedup_key(job: IngestJob) -> tuple:
+        return (job.content_hash, job.department, job.user_id)
+
+    def _remember(self, job: IngestJob):
+        self._jobs[job.job_id] = job
+        if job.status in ACTIVE_STATUSES:
+            self._by_hash[self._dedup_key(job)] = job.job_id
+
+    @staticmethod
+    def _touch(job: IngestJob, **changes):
+        for key, value in changes.items():
+            setattr(job, key, value)
+        job.updated_at = time.time()
+
+    async def _update(self, job: IngestJob, **changes):
+        """Durum geçişi — dosya yazması event loop'u bloklamasın diye thread'de."""
+        self._touch(job, **changes)
+        if job.status not in ACTIVE_STATUSES:
+            self._by_hash.pop(self._dedup_key(job), None)
+        await asyncio.to_thread(self.store.save, job)
+
+    def _find_duplicate(self, key: tuple) -> Optional[IngestJob]:
+        """Yalnızca hâlâ kuyrukta / işlenmekte olan aynı yükleme tekilleştirilir."""
+        job = self._jobs.get(self._by_hash.get(key, ""))
+        if job is not None and job.status in ACTIVE_STATUSES:
+            return job
+        return None
+
+    # ── Genel API ──
+
+    async def submit(
+        self,
+        filename: str,
+        source,
+        department: str = "Genel",
+        author: Optional[str] = None,
+        user_id: Optional[int] = None,
+        batch_id: Optional[str] = None,
+    ) -> dict:
+        """Yüklemeyi diske al ve kuyruğa ekle; aynı yükleme işleniyorsa mevcut job'u döndür."""
+        await self.start()
+        job_id = uuid.uuid4().hex[:12]
+        spool = self.store.spool_path(job_id)
+        content_hash, size = await asyncio.to_thread(_spool, source, spool)
+
+        existing = self._find_duplicate((content_hash, department, user_id))
+        if existing is not None:
+            spool.unlink(missing_ok=True)
+            self._counters["duplicates"] += 1
+            logger.info("ingest_duplicate_skipped", filename=filename,
+                        existing_job=existing.job_id, status=existing.status)
+            return {**existing.to_dict(), "duplicate": True}
+
+        job = IngestJob(job_id=job_id, filename=filename, department=department,
+                        content_hash=content_hash, size=size, author=author,
+                        user_id=user_id, batch_id=batch_id)
+        self._remember(job)
+        await asyncio.to_thread(self.store.save, job)
+        self._counters["submitted"] += 1
+        self._queue.put_nowait(job_id)
+        return {**job.to_dict(), "duplicate": False}
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Job durumu — başka worker sürecinin job'u ise diskten okunur."""
+        job = self._jobs.get(job_id) or self.store.load(job_id)
+        return job.to_dict() if job is not None else None
+
+    def list_jobs(self, user_id: Optional[int] = None, batch_id: Optional[str] = None,
+                  limit: int = 50) -> List[dict]:
+        jobs = self.store.load_all() if self.store.root.exists() else []
+        out = [
+            j.to_dict() for j in reversed(jobs)
+            if (user_id is None or j.user_id == user_id)
+            and (batch_id is None or j.batch_id == batch_id)
+        ]
+        return out[:limit]
+
+    async def retry(self, job_id: str) -> Optional[dict]:
+        """Başarısız job'u (spool dosyası duruyorsa) yeniden kuyruğa al."""
+        await self.start()
+        job = self._jobs.get(job_id) or self.store.load(job_id)
+        if job is None or job.status != STATUS_FAILED:
+            return None
+        if not self.store.spool_path(job_id).exists():
+            return None
+        job.owner_pid = os.getpid()
+        await self._update(job, status=STATUS_QUEUED, progress=0, attempts=0, error=None)
+        self._remember(job)
+        self._queue.put_nowait(job_id)
+        return job.to_dict()
+
+    async def join(self):
+        """Kuyruk boşalana kadar bekle (testler ve kapanış için)."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def stats(self) -> dict:
+        by_status: Dict[str, int] = {}
+        for job in self._jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "process_workers": self.process_workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "jobs_by_status": by_status,
+            **self._counters,
+        }
+
+    # ── Worker ──
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self._jobs.get(job_id)
+                if job is not None:
+                    await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("ingest_worker_error", job_id=job_id, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: IngestJob):
+        loop = asyncio.get_running_loop()
+        spool = str(self.store.spool_path(job.job_id))
+        while True:
+            job.attempts += 1
+            started = time.perf_counter()
+            try:
+                await self._update(job, status=STATUS_EXTRACTING, progress=10)
+                extracted = await loop.run_in_executor(
+                    self._get_pool(), self._extract_fn, spool, job.filename)
+                if extracted.get("error"):
+                    raise IngestError(extracted["error"], permanent=extracted.get("permanent", False))
+
+                await self._update(job, status=STATUS_INDEXING, progress=60)
+                metadata = {
+                    "department": job.department,
+                    "author": job.author,
+                    "created_at": datetime.fromtimestamp(job.created_at, timezone.utc)
+                                          .replace(tzinfo=None).isoformat(),
+                }
+                ok = await asyncio.to_thread(
+                    self._index_fn, extracted["content"], job.filename, extracted["doc_type"], metadata)
+                if not ok:
+                    raise IngestError("Doküman eklenemedi")
+
+                result = {"type": extracted["doc_type"], "chars": len(extracted["content"]),
+                          "duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+                if extracted.get("images_extracted"):
+                    result["images_extracted"] = extracted["images_extracted"]
+                await self._update(job, status=STATUS_DONE, progress=100, error=None, result=result)
+                await asyncio.to_thread(self.store.spool_path(job.job_id).unlink, missing_ok=True)
+                self._counters["done"] += 1
+                logger.info("ingest_job_done", job_id=job.job_id, filename=job.filename,
+                            attempts=job.attempts, **result)
+                return
+            except IngestError as e:
+                error, permanent = str(e), e.permanent
+            except BrokenProcessPool as e:
+                # Çöken çıkarma süreci (ör. OCR OOM) → havuzu yenile, tekrar dene
+                with self._pool_lock:
+                    self._pool = None
+                error, permanent = f"Çıkarma süreci çöktü: {e}", False
+            except Exception as e:
+                error, permanent = str(e), False
+
+            if permanent or job.attempts >= self.max_attempts:
+                await self._update(job, status=STATUS_FAILED, error=error)
+                self._counters["failed"] += 1
+                logger.warning("ingest_job_failed", job_id=job.job_id, filename=job.filename,
+                               attempts=job.attempts, permanent=permanent, error=error)
+                return
+            self._counters["retries"] += 1
+            await self._update(job, status=STATUS_RETRYING, error=error)
+            await asyncio.sleep(self.retry_backoff_s * 2 ** (job.attempts - 1))
+
+
+_ingest_queue: Optional[IngestQueue] = None
+
+
+def get_ingest_queue() -> IngestQueue:
+    global _ingest_queue
+    if _ingest_queue is None:
+        _ingest_queue = IngestQueue()
+    return _ingest_queue
+
+
+def get_ingest_stats() -> dict:
+    """Yükleme kuyruğu metrikleri (metrics dashboard için)."""
+    if _ingest_queue is None:
+        return {"started": False}
+    return {"started": bool(_ingest_queue._tasks), **_ingest_queue.stats()}
@@ -11,6 +11,9 @@ Enterprise-grade sistem izleme ve uyarı:
 - ★ SLA monitoring (uptime, response time SLA)
 - ★ Performance degradation trending
 - ★ Anomaly event log
+- v7.42.00: İstek ve uptime istatistikleri dakikalık/saatlik rollup
+  kovalarından (app.core.rollups) — 24 saat / 30 gün pencereleri ham
+  örnek taramadan, sınırlı bellekle; rollup'lar diske kompakt yazılır
 """
 
 import json
@@ -24,6 +27,8 @@ from collections import deque
 from pathlib import Path
 import structlog
 
+from app.core.rollups import RollupStore
+
 try:
     import psutil
     PSUTIL_AVAILABLE = True
@@ -35,12 +40,21 @@ logger = structlog.get_logger()
 _ALERTS_FILE = Path("data/monitoring_alerts.json")
 _METRICS_FILE = Path("data/monitoring_metrics.json")
 _SLA_FILE = Path("data/monitoring_sla.json")
+_ROLLUP_FILE = Path("data/monitoring_rollups.json.gz")
 
 
 def _utcnow_str() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
+def _write_json(path: Path, data: Dict):
+    """Kompakt JSON'u atomik yaz (tmp + os.replace)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
 # ── GPU İzleme ──────────────────────────────────────────────────
 
 def get_gpu_info() -> Dict:
@@ -202,13 +216,18 @@ class SLAMonitor:
         "max_downtime_minutes_per_day": 7.2,  # %99.5 uptime = 7.2 dk/gün
     }
 
-    def __init__(self):
+    def __init__(self, store: Optional[RollupStore] = None):
         self._targets = self.DEFAULT_TARGETS.copy()
-        self._uptime_checks: deque[Dict] = deque(maxlen=1440)  # 24 saat @ 1/dk
+        # v7.42.00: ham kontrol listesi yerine dakikalık/saatlik rollup (30 güne kadar)
+        self._uptime = (store or RollupStore()).series("uptime")
         self._start_time = time.time()
         self._downtime_windows: list[Dict] = []
         self._load_sla()
 
+    @property
+    def targets(self) -> Dict:
+        return self._targets
+
     def _load_sla(self):
         if _SLA_FILE.exists():
             try:
@@ -218,27 +237,21 @@ class SLAMonitor:
                 pass
 
     def _save_sla(self):
-        _SLA_FILE.parent.mkdir(parents=True, exist_ok=True)
-        _SLA_FILE.write_text(json.dumps({
+        _write_json(_SLA_FILE, {
             "targets": self._targets,
             "last_updated": _utcnow_str(),
-        }, indent=2, ensure_ascii=False), encoding="utf-8")
+        })
 
     def record_health_check(self, is_healthy: bool):
-        """Dakikalık sağlık kontrolü kaydet."""
-        self._uptime_checks.append({
-            "healthy": is_healthy,
-            "timestamp": time.time(),
-        })
+        """Dakikalık sağlık kontrolü kaydet (sağlıksız kontrol = hata)."""
+        self._uptime.record(1.0 if is_healthy else 0.0, error=not is_healthy)
 
     def get_uptime_percent(self, last_hours: int = 24) -> float:
         """Son N saatteki uptime yüzdesini hesapla."""
-        cutoff = time.time() - (last_hours * 3600)
-        checks = [c for c in self._uptime_checks if c["timestamp"] > cutoff]
-        if not checks:
+        window = self._uptime.window(last_hours * 60)
+        if not window.count:
             return 100.0
-        healthy = sum(1 for c in checks if c["healthy"])
-        return round(healthy / len(checks) * 100, 2)
+        return round((window.count - window.errors) / window.count * 100, 2)
 
     def check_sla_compliance(self, metrics_collector: Optional['MetricsCollector'] = None) -> Dict:
         """Mevcut SLA uyumluluğunu kontrol et."""
@@ -252,6 +265,7 @@ class SLAMonitor:
         # Uptime
         uptime = self.get_uptime_percent(24)
         result["uptime_24h"] = uptime
+        result["uptime_30d"] = self.get_uptime_percent(30 * 24)
         if uptime < self._targets["uptime_percent"]:
             result["compliant"] = False
             result["violations"].append({
@@ -350,12 +364,15 @@ class PerformanceTrend:
 # ── Metrik Toplama ──────────────────────────────────────────────
 
 class MetricsCollector:
-    """API ve sistem metriklerini toplar."""
+    """API ve sistem metriklerini toplar.
+
+    v7.42.00: İstekler ham deque'lar yerine dakikalık/saatlik rollup
+    kovalarına yazılır; istatistikler pencere içindeki kovaların
+    birleşiminden hesaplanır (percentile'lar sketch tahmini, göreli hata ~%1).
+    """
 
-    def __init__(self, max_samples: int = 10000):
-        self._response_times: deque = deque(maxlen=max_samples)
-        self._errors: deque = deque(maxlen=max_samples)
-        self._requests: deque = deque(maxlen=max_samples)
+    def __init__(self, store: Optional[RollupStore] = None):
+        self._requests = (store or RollupStore()).series("requests")
         self._start_time = time.time()
 
         # v2.0 alt sistemler
@@ -364,19 +381,9 @@ class MetricsCollector:
 
     def record_request(self, endpoint: str, method: str, status_code: int, duration_ms: float):
         """API isteğini kaydet."""
-        entry = {
-            "endpoint": endpoint,
-            "method": method,
-            "status_code": status_code,
-            "duration_ms": round(duration_ms, 2),
-            "timestamp": time.time(),
-            "is_error": status_code >= 400,
-        }
-        self._requests.append(entry)
-        self._response_times.append(duration_ms)
-
-        if status_code >= 400:
-            self._errors.append(entry)
+        is_error = status_code >= 400
+        tags = (f"ep:{endpoint}", f"code:{status_code}") if is_error else (f"ep:{endpoint}",)
+        self._requests.record(duration_ms, error=is_error, tags=tags)
 
         # v2.0: anomaly & trend tracking
         self._anomaly.record_response_time(duration_ms)
@@ -384,65 +391,58 @@ class MetricsCollector:
 
     def get_response_time_stats(self, last_minutes: int = 60) -> Dict:
         """Yanıt süresi istatistikleri (percentile)."""
-        cutoff = time.time() - (last_minutes * 60)
-        times = [r for r in self._response_times if True]
-
-        if not times:
+        summary = self._requests.window(last_minutes).summary()
+        if not summary["count"]:
             return {"count": 0}
-
-        sorted_times = sorted(times)
-        n = len(sorted_times)
-
         return {
-            "count": n,
-            "avg_ms": round(sum(sorted_times) / n, 2),
-            "min_ms": round(sorted_times[0], 2),
-            "max_ms": round(sorted_times[-1], 2),
-            "p50_ms": round(sorted_times[int(n * 0.5)], 2),
-            "p90_ms": round(sorted_times[int(n * 0.9)], 2),
-            "p95_ms": round(sorted_times[int(n * 0.95)], 2),
-            "p99_ms": round(sorted_times[min(int(n * 0.99), n - 1)], 2),
+            "count": summary["count"],
+            **{f"{k}_ms": summary[k] for k in ("avg", "min", "max", "p50", "p90", "p95", "p99")},
         }
 
     def get_error_rate(self, last_minutes: int = 60) -> Dict:
         """Hata oranı (son N dakika)."""
-        cutoff = time.time() - (last_minutes * 60)
-        recent_requests = [r for r in self._requests if r["timestamp"] > cutoff]
-        recent_errors = [r for r in recent_requests if r["is_error"]]
-
-        total = len(recent_requests)
-        errors = len(recent_errors)
-
-        error_codes = {}
-        for e in recent_errors:
-            code = str(e["status_code"])
-            error_codes[code] = error_codes.get(code, 0) + 1
+        window = self._requests.window(last_minutes)
+        total = window.count
+        errors = window.errors
 
         return {
             "total_requests": total,
             "total_errors": errors,
             "error_rate_percent": round(errors / total * 100, 2) if total > 0 else 0,
-            "error_distribution": error_codes,
+            "error_distribution": window.tag_counts("code"),
             "period_minutes": last_minutes,
         }
 
     def get_throughput(self, last_minutes: int = 60) -> Dict:
         """İstek hacmi (throughput)."""
-        cutoff = time.time() - (last_minutes * 60)
-        recent = [r for r in self._requests if r["timestamp"] > cutoff]
-
-        endpoint_counts = {}
-        for r in recent:
-            ep = r["endpoint"]
-            endpoint_counts[ep] = endpoint_counts.get(ep, 0) + 1
+        window = self._requests.window(last_minutes)
 
         return {
-            "total_requests": len(recent),
-            "requests_per_minute": round(len(recent) / max(last_minutes, 1), 2),
-            "top_endpoints": dict(sorted(endpoint_counts.items(), key=lambda x: -x[1])[:10]),
+            "total_requests": window.count,
+            "requests_per_minute": round(window.count / max(last_minutes, 1), 2),
+            "top_endpoints": dict(list(window.tag_counts("ep").items())[:10]),
             "period_minutes": last_minutes,
         }
 
+    def get_window_summary(self) -> Dict:
+        """Dashboard pencereleri: son 1 saat, 24 saat, 30 gün."""
+        out = {}
+        for label, minutes in (("1h", 60), ("24h", 24 * 60), ("30d", 30 * 24 * 60)):
+            summary = self._requests.window(minutes).summary()
+            count = summary["count"]
+            out[label] = {
+                "count": count,
+                "error_rate_percent": round(summary.get("errors", 0) / max(count, 1) * 100, 2),
+                "avg_ms": summary.get("avg", 0),
+                "p95_ms": summary.get("p95", 0),
+                "p99_ms": summary.get("p99", 0),
+            }
+        return out
+
+    def get_history(self, last_minutes: int = 60) -> List[Dict]:
+        """Kova bazlı zaman serisi (3 saate kadar dakikalık, üstü saatlik)."""
+        return self._requests.points(last_minutes)
+
     # v2.0 API'ler
     def get_anomaly_log(self, last_n: int = 50) -> List[Dict]:
         return self._anomaly.get_anomaly_log(last_n)
@@ -495,11 +495,10 @@ class AlertManager:
             self._thresholds.update(data["thresholds"])
 
     def _save_alerts(self):
-        _ALERTS_FILE.parent.mkdir(parents=True, exist_ok=True)
-        _ALERTS_FILE.write_text(json.dumps({
+        _write_json(_ALERTS_FILE, {
             "alerts": self._alerts[-200:],
             "thresholds": self._thresholds,
-        }, indent=2, ensure_ascii=False), encoding="utf-8")
+        })
 
     def fire_alert(self, category: str, message: str, severity: str, value: float = 0, threshold: float = 0):
         """Yeni uyarı oluştur."""
@@ -680,6 +679,7 @@ def get_full_telemetry(metrics_collector: Optional['MetricsCollector'] = None) -
             "response_times": metrics_collector.get_response_time_stats(),
             "error_rate": metrics_collector.get_error_rate(),
             "throughput": metrics_collector.get_throughput(),
+            "windows": metrics_collector.get_window_summary(),
         }
         # v2.0 eklentileri
         result["anomaly"] = metrics_collector.get_anomaly_stats()
@@ -692,6 +692,7 @@ def get_full_telemetry(metrics_collector: Optional['MetricsCollector'] = None) -
 
 
 # ── Singleton Instances ─────────────────────────────────────────
-metrics_collector = MetricsCollector()
+rollup_store = RollupStore(_ROLLUP_FILE)
+metrics_collector = MetricsCollector(rollup_store)
 alert_manager = AlertManager()
-sla_monitor = SLAMonitor()
+sla_monitor = SLAMonitor(rollup_store)
@@ -6,10 +6,15 @@ Enterprise Tier-0 Seviye:
 - Beklenen kayıp dağılımı
 - Volatilite indeksi
 - Confidence interval hesaplama
+
+v7.28.00: NumPy motoru — yollar × dönemler × risk olayları dizi olarak,
+seed'li Generator ile simüle edilir; 1M+ yol MC_MEMORY_BUDGET_MB'lık
+chunk'larla işlenir. scenario_engine (monte_carlo_simulation, stress_test)
+aynı motoru kullanır.
 """
 
-import random
-import math
+import os
+import numpy as np
 import structlog
 from typing import Optional
 
@@ -21,6 +26,58 @@ logger = structlog.get_logger()
 
 DEFAULT_SIMULATIONS = 5000  # Sunucu CPU için optimize (10K yerine 5K)
 CONFIDENCE_INTERVAL = 0.95
+# Tek çağrıda izin verilen maksimum yol sayısı
+MC_MAX_SIMULATIONS = int(os.environ.get("MC_MAX_SIMULATIONS", "5000000"))
+# Chunk başına ara dizilerin (şoklar, olay sayıları) bellek bütçesi
+MC_MEMORY_BUDGET_MB = float(os.environ.get("MC_MEMORY_BUDGET_MB", "64"))
+
+
+def _chunk_size(periods: int, n_events: int) -> int:
+    """Bellek bütçesine sığan yol sayısı (float64/int64 ara diziler)."""
+    per_path = 8 * (periods + n_events + 2)
+    return max(1024, int(MC_MEMORY_BUDGET_MB * 1024 * 1024 // per_path))
+
+
+def simulate_paths(
+    current_value: float,
+    trend_pct: float = 0.0,
+    volatility_pct: float = 10.0,
+    risk_events: list[dict] = None,
+    periods: int = 4,
+    simulations: int = DEFAULT_SIMULATIONS,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """Tüm yolları vektörel simüle et, dönem sonu değerlerini döndür.
+
+    Her dönem: value *= 1 + trend + volatility * z  (z ~ N(0, 1))
+    Risk olayları dönem başına `probability` ile tetiklenir ve değeri
+    (1 + impact_pct/100) ile çarpar. Çarpma sırası sonucu değiştirmediği
+    için dönem × olay Bernoulli matrisi yerine olay başına
+    Binom(periods, p) tetiklenme sayısı çekilir — dağılım aynıdır.
+    """
+    simulations = max(1, min(int(simulations), MC_MAX_SIMULATIONS))
+    periods = max(0, int(periods))
+    events = risk_events or []
+    probs = np.clip([float(e.get("probability", 0.05)) for e in events], 0.0, 1.0)
+    factors = np.array([1 + float(e.get("impact_pct", -5)) / 100.0 for e in events])
+
+    rng = np.random.default_rng(seed)
+    trend_rate = trend_pct / 100.0
+    volatility = volatility_pct / 100.0
+    chunk = _chunk_size(periods, len(events))
+
+    final_values = np.empty(simulations)
+    for start in range(0, simulations, chunk):
+        n = min(chunk, simulations - start)
+        growth = rng.standard_normal((n, periods))
+        growth *= volatility
+        growth += 1 + trend_rate
+        values = growth.prod(axis=1)
+        if len(events):
+            hits = rng.binomial(periods, probs, size=(n, len(events)))
+            values *= np.prod(factors ** hits, axis=1)
+        final_values[start:start + n] = values * current_value
+    return final_values
 
 
 def monte_carlo_simulate(
@@ -33,6 +90,7 @@ def monte_carlo_simulate(
     simulations: int = DEFAULT_SIMULATIONS,
     metric_name: str = "Metrik",
     unit: str = "",
+    seed: Optional[int] = None,
 ) -> dict:
     """Monte Carlo simülasyonu ile risk/fırsat dağılımı hesapla.
     
@@ -46,75 +104,36 @@ def monte_carlo_simulate(
         simulations:    Simülasyon sayısı
         metric_name:    Metrik adı
         unit:           Birim
+        seed:           Tekrarlanabilir sonuç için RNG seed'i
     
     Returns:
         Monte Carlo sonuçları (olasılık dağılımı, kayıp analizi, volatilite)
     """
-    if risk_events is None:
-        risk_events = []
-    
-    trend_rate = trend_pct / 100.0
-    volatility = volatility_pct / 100.0
-    
     # ── Simülasyonları çalıştır ──
-    final_values = []
-    target_hit_count = 0
-    below_critical_count = 0
+    final_values = simulate_paths(
+        current_value, trend_pct, volatility_pct, risk_events,
+        periods, simulations, seed,
+    )
+    n = len(final_values)
     critical_threshold = current_value * 0.85  # %15 düşüş = kritik
-    
-    for _ in range(simulations):
-        value = current_value
-        
-        for period in range(periods):
-            # Normal dağılımlı rastgele yürüyüş (Random Walk)
-            # Box-Muller transform ile normal dağılım (numpy olmadan)
-            u1 = max(1e-10, random.random())
-            u2 = random.random()
-            z = math.sqrt(-2 * math.log(u1)) * math.cos(2 * math.pi * u2)
-            
-            period_return = trend_rate + volatility * z
-            value *= (1 + period_return)
-            
-            # Risk olayları — belirli olasılıkla tetiklenir
-            for event in risk_events:
-                if random.random() < event.get("probability", 0.05):
-                    impact = event.get("impact_pct", -5) / 100.0
-                    value *= (1 + impact)
-        
-        final_values.append(value)
-        
-        if value >= target_value:
-            target_hit_count += 1
-        if value < critical_threshold:
-            below_critical_count += 1
+    target_hit_count = int(np.count_nonzero(final_values >= target_value))
+    below_critical_count = int(np.count_nonzero(final_values < critical_threshold))
     
     # ── İstatistikler ──
-    final_values.sort()
-    n = len(final_values)
-    
-    mean_val = sum(final_values) / n
-    variance = sum((x - mean_val) ** 2 for x in final_values) / n
-    std_dev = math.sqrt(variance)
-    
-    # Percentiller
-    def percentile(data, pct):
-        idx = int(pct / 100 * len(data))
-        return data[min(idx, len(data) - 1)]
-    
-    p5 = percentile(final_values, 5)
-    p25 = percentile(final_values, 25)
-    p50 = percentile(final_values, 50)  # Medyan
-    p75 = percentile(final_values, 75)
-    p95 = percentile(final_values, 95)
+    mean_val = float(final_values.mean())
+    std_dev = float(final_values.std())
     
-    # Confidence Interval
-    ci_lower = percentile(final_values, (1 - CONFIDENCE_INTERVAL) / 2 * 100)
-    ci_upper = percentile(final_values, (1 + CONFIDENCE_INTERVAL) / 2 * 100)
+    # Percentiller — tek partition ile (tam sıralama yok)
+    pcts = (5, 25, 50, 75, 95,
+            (1 - CONFIDENCE_INTERVAL) / 2 * 100, (1 + CONFIDENCE_INTERVAL) / 2 * 100)
+    idx = [min(int(p / 100 * n), n - 1) for p in pcts]
+    ordered = np.partition(final_values, sorted(set(idx + [0, n - 1])))
+    p5, p25, p50, p75, p95, ci_lower, ci_upper = (float(ordered[i]) for i in idx)
+    min_val, max_val = float(ordered[0]), float(ordered[n - 1])
     
     # Kayıp analizi
-    losses = [v for v in final_values if v < current_value]
-    expected_loss = abs(sum(current_value - v for v in losses) / n) if losses else 0
-    max_loss = abs(current_value - min(final_values)) if final_values else 0
+    expected_loss = float(np.maximum(current_value - final_values, 0).sum() / n)
+    max_loss = abs(current_value - min_val)
     
     # Volatilite indeksi (CV — değişim katsayısı)
     volatility_index = (std_dev / mean_val * 100) if mean_val > 0 else 0
@@ -134,8 +153,8 @@ def monte_carlo_simulate(
             "mean": round(mean_val, 2),
             "median": round(p50, 2),
             "std_dev": round(std_dev, 2),
-            "min": round(min(final_values), 2),
-            "max": round(max(final_values), 2),
+            "min": round(min_val, 2),
+            "max": round(max_val, 2),
             "p5": round(p5, 2),
             "p25": round(p25, 2),
             "p75": round(p75, 2),
@@ -274,6 +293,7 @@ def monte_carlo_tool(params: dict) -> dict:
             simulations=int(params.get("simulations", DEFAULT_SIMULATIONS)),
             metric_name=str(params.get("metric_name", "Metrik")),
             unit=str(params.get("unit", "")),
+            seed=int(params["seed"]) if params.get("seed") is not None else None,
         )
         
         table = format_monte_carlo_table(result)
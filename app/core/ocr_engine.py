@@ -8,6 +8,7 @@ Desteklenen özellikler:
 - Güven skoru ile sonuç döndürme
 """
 
+import importlib.util
 import io
 import re
 import structlog
@@ -223,64 +224,38 @@ def extract_text_from_pdf_images(
             "avg_confidence": float,
         }
     """
-    try:
-        import fitz  # PyMuPDF
-    except ImportError:
+    # PyMuPDF'i pdf_ocr kullanır — burada yalnızca kurulu mu bakılır
+    if importlib.util.find_spec("fitz") is None:
         return {"text": "", "pages": [], "total_pages": 0,
                 "error": "PyMuPDF (fitz) yüklü değil. Kurulum: pip install PyMuPDF"}
     
-    reader = get_ocr_reader()
-    if not reader:
+    if not EASYOCR_AVAILABLE:
         return {"text": "", "pages": [], "total_pages": 0,
                 "error": "OCR motoru kullanılamıyor"}
     
     try:
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        total_pages = len(doc)
+        # v7.33.00: sayfa paralel OCR hattı — metin katmanı dolu sayfalar
+        # doğrudan okunur, boş sayfalar atlanır, sonuçlar sayfa hash'iyle önbelleklenir
+        from app.core.pdf_ocr import iter_pdf_ocr_pages, pdf_page_count
+        
+        total_pages = pdf_page_count(pdf_bytes)
         pages_to_process = min(total_pages, max_pages)
         
         all_text = []
         page_results = []
         all_confidences = []
         
-        for page_num in range(pages_to_process):
-            page = doc[page_num]
-            
-            # Önce doğrudan metin çıkar
-            direct_text = page.get_text("text").strip()
-            if len(direct_text) > 50:
-                # Zaten metin tabanlı sayfa — OCR'a gerek yok
-                all_text.append(direct_text)
-                page_results.append({
-                    "page": page_num + 1,
-                    "text": direct_text,
-                    "confidence": 1.0,
-                    "method": "direct",
-                })
-                all_confidences.append(1.0)
-                continue
-            
-            # Resim tabanlı sayfa — OCR uygula
-            pix = page.get_pixmap(dpi=200)
-            img_bytes = pix.tobytes("png")
-            
-            ocr_result = extract_text_from_image_bytes(img_bytes, detail=False)
-            page_text = ocr_result.get("text", "")
-            page_conf = ocr_result.get("confidence", 0)
-            
-            if page_text:
-                all_text.append(page_text)
-                all_confidences.append(page_conf)
-            
+        for page in iter_pdf_ocr_pages(pdf_bytes, max_pages=max_pages, text_layer_min_chars=50):
+            if page.text:
+                all_text.append(page.text)
+                all_confidences.append(page.confidence)
             page_results.append({
-                "page": page_num + 1,
-                "text": page_text,
-                "confidence": page_conf,
-                "method": "ocr",
+                "page": page.page,
+                "text": page.text,
+                "confidence": page.confidence,
+                "method": page.method if page.method in ("direct", "blank") else "ocr",
             })
         
-        doc.close()
-        
         full_text = "\n\n--- Sayfa ---\n\n".join(all_text)
         avg_conf = sum(all_confidences) / len(all_confidences) if all_confidences else 0
         
@@ -12,6 +12,7 @@ SORUMLULUKLAR:
   │ StepExecutor          │ Adım yürütme + retry + timeout           │
   │ WorkflowStore         │ Durable state persistence                │
   │ SagaCompensation      │ Hata durumunda geri sarma                │
+  │ run_stage_dag         │ İstek içi eşzamanlı aşama grafı (v7.26)  │
   └───────────────────────┴────────────────────────────────────────────┘
 
 KULLANIM:
@@ -34,7 +35,9 @@ KULLANIM:
 """
 
 import asyncio
+import contextvars
 import json
+import threading
 import time
 import traceback
 import uuid
@@ -47,6 +50,8 @@ from typing import Any, Callable, Coroutine, Optional
 
 import structlog
 
+from app.core.stage_tracing import span
+
 logger = structlog.get_logger()
 
 DATA_DIR = Path("data/workflows")
@@ -66,6 +71,7 @@ class StepStatus(Enum):
     FAILED = "failed"
     SKIPPED = "skipped"
     COMPENSATED = "compensated"   # Saga rollback sonrası
+    TIMED_OUT = "timed_out"       # Stage DAG — süre bütçesi aşıldı
 
 
 class WorkflowStatus(Enum):
@@ -705,6 +711,155 @@ class WorkflowEngine:
         }
 
 
+# ═══════════════════════════════════════════════════════════════════
+#  İstek İçi Stage DAG (v7.26.00)
+# ═══════════════════════════════════════════════════════════════════
+#
+# WorkflowEngine dayanıklı (persist edilen) iş akışları içindir; her
+# istekte çalışan kısa aşamalar için ağırdır ve adımları dalga dalga
+# (bir dalganın en yavaşı bitmeden sonraki başlamaz) yürütür.
+# run_stage_dag aynı bağımlılık modelini (depends_on, StepResult) süreç
+# içinde ve persist etmeden uygular: her aşama bağımlılıkları biter
+# bitmez başlar, kendi süre bütçesini aşarsa TIMED_OUT işaretlenir ve
+# bağımlıları onun çıktısı None olarak çalışmaya devam eder.
+#
+# Zaman aşımı coroutine'i keser ama thread'e verilmiş senkron işi
+# durduramaz. Aşamalar senkron işlerini stage_to_thread ile başlatır:
+# aşama TIMED_OUT olduktan sonra thread'e ulaşan iş hiç çalışmaz, böylece
+# geç kalmış bir aşama istek bittikten sonra kayıt/yan etki yazmaz.
+# Zaten çalışmakta olan bir iş stage_cancelled() ile yazmadan önce
+# kontrol edebilir.
+
+_stage_cancel: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "stage_dag_cancel", default=None)
+
+
+def stage_cancelled() -> bool:
+    """Çağıran aşama zaman aşımına uğradı / iptal edildi mi."""
+    event = _stage_cancel.get()
+    return event is not None and event.is_set()
+
+
+async def stage_to_thread(func: Callable, *args, **kwargs) -> Any:
+    """asyncio.to_thread — aşama iptal edildiyse func başlatılmaz, None döner."""
+    def _guarded():
+        if stage_cancelled():
+            return None
+        return func(*args, **kwargs)
+    return await asyncio.to_thread(_guarded)
+
+
+@dataclass
+class DagStage:
+    """Stage DAG düğümü — fn(deps) bağımlılık çıktılarını alır."""
+    name: str
+    fn: Callable[[dict], Coroutine]
+    depends_on: list[str] = field(default_factory=list)
+    timeout: float = 5.0                  # Saniye (aşama bütçesi)
+
+
+def _topological_order(stages: list[DagStage]) -> list[DagStage]:
+    by_name = {s.name: s for s in stages}
+    if len(by_name) != len(stages):
+        raise ValueError("Stage DAG: tekrarlanan aşama adı")
+    for s in stages:
+        unknown = [d for d in s.depends_on if d not in by_name]
+        if unknown:
+            raise ValueError(f"Stage '{s.name}' bilinmeyen bağımlılık: {unknown}")
+
+    ordered: list[DagStage] = []
+    state: dict[str, int] = {}  # 1 = ziyaret ediliyor, 2 = tamam
+
+    def visit(stage: DagStage):
+        mark = state.get(stage.name)
+        if mark == 2:
+            return
+        if mark == 1:
+            raise ValueError(f"Stage DAG döngü içeriyor: {stage.name}")
+        state[stage.name] = 1
+        for dep in stage.depends_on:
+            visit(by_name[dep])
+        state[stage.name] = 2
+        ordered.append(stage)
+
+    for s in stages:
+        visit(s)
+    return ordered
+
+
+async def run_stage_dag(
+    stages: list[DagStage],
+    budget: Optional[float] = None,
+) -> dict[str, StepResult]:
+    """Aşamaları bağımlılık grafına göre eşzamanlı çalıştır.
+
+    Hata veya zaman aşımı isteği düşürmez; ilgili aşama FAILED /
+    TIMED_OUT olur, bağımlılarına çıktısı None olarak geçer. `budget`
+    (saniye) verilirse toplam süre aşıldığında bitmemiş aşamalar iptal
+    edilip TIMED_OUT işaretlenir.
+    """
+    ordered = _topological_order(stages)
+    results: dict[str, StepResult] = {}
+    tasks: dict[str, asyncio.Task] = {}
+    cancels = {s.name: threading.Event() for s in ordered}
+
+    async def run(stage: DagStage) -> Any:
+        deps = [tasks[d] for d in stage.depends_on]
+        if deps:
+            await asyncio.wait(deps)
+        inputs = {
+            d: results[d].output if d in results else None
+            for d in stage.depends_on
+        }
+        start = time.monotonic()
+        started_at = datetime.now(timezone.utc).isoformat()
+        # Task'ın kendi context'inde — wait_for ve to_thread kopyalarına geçer
+        _stage_cancel.set(cancels[stage.name])
+        try:
+            # Aktif sorgu trace'i varsa aşama span olarak görünür (v7.27.00)
+            with span(stage.name):
+                output = await asyncio.wait_for(stage.fn(inputs), timeout=stage.timeout)
+            status, error = StepStatus.COMPLETED.value, None
+        except asyncio.TimeoutError:
+            cancels[stage.name].set()
+            output, status = None, StepStatus.TIMED_OUT.value
+            error = f"Stage timeout ({stage.timeout}s)"
+            logger.warning("stage_dag_timeout", stage=stage.name, timeout=stage.timeout)
+        except Exception as e:
+            output, status, error = None, StepStatus.FAILED.value, str(e)
+            logger.debug("stage_dag_failed", stage=stage.name, error=str(e))
+        results[stage.name] = StepResult(
+            step_name=stage.name,
+            status=status,
+            output=output,
+            error=error,
+            duration_ms=round((time.monotonic() - start) * 1000, 1),
+            started_at=started_at,
+            completed_at=datetime.now(timezone.utc).isoformat(),
+        )
+        return output
+
+    for stage in ordered:
+        tasks[stage.name] = asyncio.ensure_future(run(stage))
+
+    _, pending = await asyncio.wait(list(tasks.values()), timeout=budget)
+    if pending:
+        for name, task in tasks.items():
+            if task in pending:
+                cancels[name].set()
+                task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        cancelled = [s.name for s in ordered if s.name not in results]
+        for name in cancelled:
+            results[name] = StepResult(
+                step_name=name,
+                status=StepStatus.TIMED_OUT.value,
+                error=f"DAG budget exceeded ({budget}s)",
+            )
+        logger.warning("stage_dag_budget_exceeded", budget=budget, cancelled=cancelled)
+    return results
+
+
 # ═══════════════════════════════════════════════════════════════════
 #  Singleton
 # ═══════════════════════════════════════════════════════════════════
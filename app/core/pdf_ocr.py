@@ -0,0 +1,408 @@
+"""Sayfa Paralel PDF OCR Hattı (v7.33.00)
+
+Görüntü tabanlı PDF'ler eskiden sayfa sayfa 200 DPI'da render edilip PNG'ye
+kodlanıyor, PNG tekrar çözülerek EasyOCR'a tek tek veriliyordu; 150 sayfalık
+taranmış bir şartname onlarca dakika sürüyordu.
+
+- Sayfa gri tonlamalı ham pixmap olarak render edilir; örnekler doğrudan
+  numpy dizisine çevrilir (PNG kodla/çöz turu yok).
+- DPI sayfa boyutuna uyarlanır: PDF_OCR_DPI üst sınır, büyük sayfalar
+  PDF_OCR_MAX_MEGAPIXELS bütçesine sığacak kadar düşürülür (alt sınır
+  PDF_OCR_MIN_DPI).
+- Boş sayfalar (mürekkep oranı eşiğin altında) OCR'a gönderilmez.
+- OCR, her worker'da bir EasyOCR reader tutan spawn süreç havuzunda
+  paralel yapılır (PDF_OCR_WORKERS, 0 → ana süreçte sırayla).
+- Sonuçlar sayfa sırasıyla, hazır oldukça akıtılır; bellekte en fazla
+  worker × 2 render edilmiş sayfa bekler.
+- Sayfa sonuçları piksel hash'i ile PDF_OCR_CACHE_DIR altında saklanır;
+  aynı PDF'in yeniden işlenmesi yalnızca değişen sayfaları OCR'lar.
+
+Kullanım:
+    for page in iter_pdf_ocr_pages(pdf_bytes):
+        print(page.page, page.method, page.text[:80])
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+# Paralel OCR süreç sayısı — her worker kendi EasyOCR modelini yükler (~1 GB)
+PDF_OCR_WORKERS = int(os.environ.get(
+    "PDF_OCR_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+PDF_OCR_DPI = int(os.environ.get("PDF_OCR_DPI", "200"))
+PDF_OCR_MIN_DPI = int(os.environ.get("PDF_OCR_MIN_DPI", "110"))
+# A4 @ 200 DPI ≈ 3.9 MP; A3 sığar, daha büyük sayfalarda DPI düşer
+PDF_OCR_MAX_MEGAPIXELS = float(os.environ.get("PDF_OCR_MAX_MEGAPIXELS", "8.0"))
+# Zemin renginden belirgin sapan piksel oranı bunun altındaysa sayfa boş sayılır
+PDF_OCR_BLANK_INK_RATIO = float(os.environ.get("PDF_OCR_BLANK_INK_RATIO", "0.001"))
+PDF_OCR_CACHE_DIR = Path(os.environ.get("PDF_OCR_CACHE_DIR", "data/ocr_cache"))
+PDF_OCR_GPU = os.environ.get("PDF_OCR_GPU", "false").lower() == "true"  # GPU LLM için ayrılmış
+PDF_OCR_LANGS = ("tr", "en")
+
+# Önbellek anahtarına girer — OCR ayarı değişirse eski sonuçlar kullanılmaz
+_CACHE_VERSION = "1"
+_INK_DELTA = 48
+
+OcrFn = Callable[["PageImage"], Tuple[str, float]]
+
+
+@dataclass
+class PageImage:
+    """Render edilmiş sayfa — 8 bit gri, satır satır ham örnekler."""
+    page: int                 # 1'den başlar
+    width: int = 0
+    height: int = 0
+    samples: bytes = b""
+    dpi: int = 0
+    stride: int = 0
+    text: str = ""            # Metin katmanı (doluysa OCR yapılmaz)
+
+    def array(self) -> np.ndarray:
+        stride = self.stride or self.width
+        return np.frombuffer(self.samples, dtype=np.uint8).reshape(self.height, stride)[:, :self.width]
+
+
+@dataclass
+class PageResult:
+    page: int
+    text: str
+    confidence: float
+    method: str               # ocr | cache | blank | direct | error
+    dpi: int = 0
+    elapsed_ms: float = 0.0
+    error: Optional[str] = None
+
+
+# ══════════════════════════════════════════════════════════════
+# 1. RENDER
+# ══════════════════════════════════════════════════════════════
+
+def choose_dpi(
+    width_pt: float,
+    height_pt: float,
+    max_dpi: int = PDF_OCR_DPI,
+    min_dpi: int = PDF_OCR_MIN_DPI,
+    max_megapixels: float = PDF_OCR_MAX_MEGAPIXELS,
+) -> int:
+    """Sayfa boyutuna göre DPI — piksel bütçesini aşmayan en yüksek değer."""
+    area_in2 = max(width_pt / 72, 0.01) * max(height_pt / 72, 0.01)
+    budget_dpi = (max_megapixels * 1_000_000 / area_in2) ** 0.5
+    return int(max(min_dpi, min(max_dpi, budget_dpi)))
+
+
+def _open_pdf(source: Union[bytes, str, Path]):
+    import fitz  # PyMuPDF
+
+    if isinstance(source, (str, Path)):
+        return fitz.open(str(source))
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def render_pdf_pages(
+    source: Union[bytes, str, Path],
+    max_pages: Optional[int] = None,
+    text_layer_min_chars: Optional[int] = None,
+) -> Iterator[PageImage]:
+    """PDF sayfalarını sırayla gri pixmap'e çevir (lazy — bellekte tek sayfa).
+
+    text_layer_min_chars verilirse metin katmanı yeterince dolu sayfalar
+    render edilmez, metinleriyle döner.
+    """
+    import fitz
+
+    doc = _open_pdf(source)
+    try:
+        total = len(doc) if max_pages is None else min(len(doc), max_pages)
+        for index in range(total):
+            page = doc[index]
+            if text_layer_min_chars is not None:
+                direct_text = page.get_text("text").strip()
+                if len(direct_text) > text_layer_min_chars:
+                    yield PageImage(page=index + 1, text=direct_text)
+                    continue
+            dpi = choose_dpi(page.rect.width, page.rect.height)
+            pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+            yield PageImage(page=index + 1, width=pix.width, height=pix.height,
+                            samples=pix.samples, dpi=dpi, stride=pix.stride)
+    finally:
+        doc.close()
+
+
+def pdf_page_count(source: Union[bytes, str, Path]) -> int:
+    doc = _open_pdf(source)
+    try:
+        return len(doc)
+    finally:
+        doc.close()
+
+
+def is_blank_page(image: PageImage, ink_ratio: float = PDF_OCR_BLANK_INK_RATIO) -> bool:
+    """Zemin (medyan) renginden belirgin sapan piksel oranı eşiğin altındaysa boş.
+
+    Tarayıcı gürültüsü küçük sapmalar üretir; _INK_DELTA altı sayılmaz.
+    4 pikselde bir örneklenir — karar için yeterli, tam tarama kadar pahalı değil.
+    """
+    arr = image.array()[::4, ::4]
+    if arr.size == 0:
+        return True
+    background = np.median(arr)
+    ink = np.abs(arr.astype(np.int16) - int(background)) > _INK_DELTA
+    return float(ink.mean()) < ink_ratio
+
+
+def page_cache_key(image: PageImage) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{_CACHE_VERSION}:{','.join(PDF_OCR_LANGS)}:{image.width}x{image.height}:".encode())
+    digest.update(image.array().tobytes() if image.stride not in (0, image.width) else image.samples)
+    return digest.hexdigest()
+
+
+# ══════════════════════════════════════════════════════════════
+# 2. SAYFA ÖNBELLEĞİ
+# ══════════════════════════════════════════════════════════════
+
+class OcrPageCache:
+    """Piksel hash'i → OCR sonucu; dosya başına bir JSON (atomik yazma)."""
+
+    def __init__(self, root: Union[str, Path] = PDF_OCR_CACHE_DIR):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, text: str, confidence: float):
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"text": text, "confidence": confidence}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("pdf_ocr_cache_write_failed", error=str(e))
+
+
+# ══════════════════════════════════════════════════════════════
+# 3. OCR WORKER'LARI
+# ══════════════════════════════════════════════════════════════
+
+_worker_reader = None
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _load_reader():
+    import easyocr
+    return easyocr.Reader(list(PDF_OCR_LANGS), gpu=PDF_OCR_GPU, verbose=False)
+
+
+def _init_ocr_worker(torch_threads: int):
+    """Süreç başına bir kez: torch thread sayısını böl, reader'ı yükle."""
+    global _worker_reader
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    _worker_reader = _load_reader()
+
+
+def _readtext(reader, image: PageImage) -> Tuple[str, float]:
+    results = reader.readtext(image.array(), detail=1, paragraph=True)
+    texts: List[str] = []
+    confidences: List[float] = []
+    for item in results:
+        # paragraph=True → [bbox, text]; paragraph=False → [bbox, text, conf]
+        if len(item) == 3:
+            texts.append(str(item[1]))
+            confidences.append(float(item[2]))
+        elif len(item) == 2:
+            texts.append(str(item[1]))
+            confidences.append(0.8)
+    confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return "\n".join(texts), round(confidence, 3)
+
+
+def _ocr_page_worker(image: PageImage) -> Tuple[str, float]:
+    """Havuz worker'ında (ya da PDF_OCR_WORKERS=0 ise ana süreçte) tek sayfa OCR."""
+    global _worker_reader
+    if _worker_reader is None:
+        _worker_reader = _load_reader()
+    return _readtext(_worker_reader, image)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Lazy OCR havuzu — süreçler (ve yüklü modeller) çağrılar arasında yaşar."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            torch_threads = max(1, (os.cpu_count() or 1) // workers)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_ocr_worker,
+                initargs=(torch_threads,),
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def shutdown_ocr_pool():
+    """Uygulama kapanışında OCR süreçlerini sonlandır."""
+    _reset_pool()
+
+
+# ══════════════════════════════════════════════════════════════
+# 4. HAT
+# ══════════════════════════════════════════════════════════════
+
+def ocr_pages(
+    pages: Iterable[PageImage],
+    workers: int = PDF_OCR_WORKERS,
+    cache: Optional[OcrPageCache] = None,
+    ocr_fn: Optional[OcrFn] = None,
+    use_cache: bool = True,
+) -> Iterator[PageResult]:
+    """Render edilmiş sayfaları paralel OCR'la, sonuçları sayfa sırasıyla akıt.
+
+    ocr_fn verilirse (test / özel motor) süreç havuzu yerine thread havuzunda
+    çalışır. Sıradaki sayfa hazır olur olmaz döner; öndeki sayfalar
+    worker × 2 pencere ile render edilip kuyruğa alınır.
+    """
+    cache = (cache or OcrPageCache()) if use_cache else None
+    workers = max(0, workers)
+    local_fn = ocr_fn or _ocr_page_worker
+    executor: Optional[Executor] = None
+    own_executor = False
+    if workers > 0:
+        if ocr_fn is None:
+            executor = _get_pool(workers)
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-ocr")
+            own_executor = True
+    window = max(2, workers * 2)
+
+    # (PageImage, cache_key, Future | PageResult, started)
+    pending: deque = deque()
+
+    def _finish(image: PageImage, key: Optional[str], outcome, started: float) -> PageResult:
+        if isinstance(outcome, PageResult):
+            return outcome
+        try:
+            text, confidence = outcome.result() if isinstance(outcome, Future) else outcome()
+        except BrokenProcessPool:
+            # Worker çöktü (OOM vb.) — havuzu yenile, bu sayfayı ana süreçte dene
+            _reset_pool()
+            logger.warning("pdf_ocr_pool_broken", page=image.page)
+            try:
+                text, confidence = local_fn(image)
+            except Exception as e:
+                return PageResult(image.page, "", 0.0, "error", image.dpi, error=str(e))
+        except Exception as e:
+            logger.warning("pdf_ocr_page_error", page=image.page, error=str(e))
+            return PageResult(image.page, "", 0.0, "error", image.dpi, error=str(e))
+        if cache is not None and key:
+            cache.put(key, text, confidence)
+        return PageResult(image.page, text, confidence, "ocr", image.dpi,
+                          elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+
+    def _ready(entry) -> bool:
+        outcome = entry[2]
+        return isinstance(outcome, PageResult) or (isinstance(outcome, Future) and outcome.done())
+
+    try:
+        for image in pages:
+            started = time.perf_counter()
+            key = None
+            if image.text:
+                outcome = PageResult(image.page, image.text, 1.0, "direct", image.dpi)
+            elif is_blank_page(image):
+                outcome = PageResult(image.page, "", 0.0, "blank", image.dpi)
+            else:
+                key = page_cache_key(image) if cache is not None else None
+                hit = cache.get(key) if key else None
+                if hit is not None:
+                    outcome = PageResult(image.page, hit.get("text", ""),
+                                         hit.get("confidence", 0.0), "cache", image.dpi)
+                elif executor is not None:
+                    fn = _ocr_page_worker if ocr_fn is None else ocr_fn
+                    try:
+                        outcome = executor.submit(fn, image)
+                    except BrokenProcessPool:
+                        _reset_pool()
+                        executor = _get_pool(workers)
+                        outcome = executor.submit(fn, image)
+                else:
+                    outcome = (lambda img=image: local_fn(img))
+            # Sonucu belli olan sayfanın piksellerini bellekte tutma
+            if isinstance(outcome, PageResult):
+                image = PageImage(page=image.page, dpi=image.dpi)
+            pending.append((image, key, outcome, started))
+
+            while pending and (_ready(pending[0]) or len(pending) >= window or executor is None):
+                yield _finish(*pending.popleft())
+
+        while pending:
+            yield _finish(*pending.popleft())
+    finally:
+        for entry in pending:
+            if isinstance(entry[2], Future):
+                entry[2].cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_pdf_ocr_pages(
+    source: Union[bytes, str, Path],
+    max_pages: Optional[int] = None,
+    text_layer_min_chars: Optional[int] = None,
+    workers: int = PDF_OCR_WORKERS,
+    cache: Optional[OcrPageCache] = None,
+    use_cache: bool = True,
+    filename: str = "",
+) -> Iterator[PageResult]:
+    """PDF → sayfa sırasıyla PageResult akışı (render + boş sayfa + önbellek + paralel OCR)."""
+    started = time.perf_counter()
+    counts = {"ocr": 0, "cache": 0, "blank": 0, "direct": 0, "error": 0}
+    for result in ocr_pages(
+        render_pdf_pages(source, max_pages=max_pages, text_layer_min_chars=text_layer_min_chars),
+        workers=workers, cache=cache, use_cache=use_cache,
+    ):
+        counts[result.method] = counts.get(result.method, 0) + 1
+        logger.debug("pdf_ocr_page_done", filename=filename, page=result.page,
+                     method=result.method, dpi=result.dpi, chars=len(result.text))
+        yield result
+    logger.info("pdf_ocr_pages_summary", filename=filename, workers=workers,
+                elapsed_s=round(time.perf_counter() - started, 2), **counts)
@@ -0,0 +1,384 @@
+"""Zaman Kovalı Metrik Rollup'ları (v7.42.00)
+
+MetricsCollector eskiden 10.000 ham isteği deque'larda tutuyordu;
+/monitoring/telemetry her çağrıda hepsini tarayıp sıralıyordu ve pencere
+sınırı (son N dakika) fiilen uygulanmıyordu. SLAMonitor uptime'ı 1440 ham
+kontrolden hesaplıyordu, süreç yeniden başlayınca da her şey kayboluyordu.
+
+- Kova: count, sum, min, max, errors, etiket sayaçları (endpoint, durum
+  kodu) ve birleştirilebilir bir quantile sketch (log-bucket, DDSketch
+  benzeri; göreli hata ≤ ROLLUP_SKETCH_ALPHA).
+- Seri: dakikalık (ROLLUP_MINUTE_SLOTS, varsayılan 24 saat) ve saatlik
+  (ROLLUP_HOUR_SLOTS, varsayılan 31 gün) iki halka. Her kayıt iki kovaya
+  yazılır; bellek halka boyutlarıyla sınırlıdır.
+- Pencere sorgusu: baştaki kesirli saat dakika kovalarından, kalanı saat
+  kovalarından birleştirilir — 24 saat ≤ ~85, 30 gün ≤ ~780 kova
+  birleştirmesi; ham örnek sayısından bağımsızdır. Dakika halkasının
+  dışına taşan pencereler saat sınırına yuvarlanır.
+- Kalıcılık: RollupStore tüm serileri ROLLUP_FLUSH_SECONDS'ta bir,
+  yalnızca değişiklik varsa, tek bir gzip'li kompakt JSON dosyasına
+  atomik yazar; açılışta geri yükler.
+
+Kullanım:
+    store = RollupStore(Path("data/monitoring_rollups.json.gz"))
+    series = store.series("requests")
+    series.record(120.5, error=False, tags=("ep:/api/ask", "code:200"))
+    series.window(24 * 60).summary()
+"""
+
+import gzip
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+ROLLUP_MINUTE_SLOTS = int(os.environ.get("ROLLUP_MINUTE_SLOTS", "1440"))
+ROLLUP_HOUR_SLOTS = int(os.environ.get("ROLLUP_HOUR_SLOTS", "744"))
+ROLLUP_SKETCH_ALPHA = float(os.environ.get("ROLLUP_SKETCH_ALPHA", "0.01"))
+ROLLUP_FLUSH_SECONDS = float(os.environ.get("ROLLUP_FLUSH_SECONDS", "60"))
+
+# Kova başına etiket sınırı — aşan etiketler "<önek>:_other" altında toplanır
+MAX_TAGS_PER_BUCKET = 256
+# Sketch bin sınırı — aşılırsa en küçük bin'ler birleştirilir (alt quantile'lar kabalaşır)
+MAX_SKETCH_BINS = 2048
+
+_MIN_POSITIVE = 1e-9
+
+
+class QuantileSketch:
+    """Log-bucket'lı, birleştirilebilir quantile sketch (göreli hata ≤ alpha)."""
+
+    __slots__ = ("alpha", "gamma", "_log_gamma", "bins", "zero", "count")
+
+    def __init__(self, alpha: float = ROLLUP_SKETCH_ALPHA):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+
+    def add(self, value: float, n: int = 1):
+        if value <= _MIN_POSITIVE:
+            self.zero += n
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + n
+            if len(self.bins) > MAX_SKETCH_BINS:
+                self._collapse()
+        self.count += n
+
+    def merge(self, other: "QuantileSketch"):
+        bins = self.bins
+        for key, n in other.bins.items():
+            bins[key] = bins.get(key, 0) + n
+        self.zero += other.zero
+        self.count += other.count
+        if len(bins) > MAX_SKETCH_BINS:
+            self._collapse()
+
+    def _collapse(self):
+        keys = sorted(self.bins)
+        cut = len(keys) - MAX_SKETCH_BINS
+        self.bins[keys[cut]] += sum(self.bins.pop(k) for k in keys[:cut])
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zero:
+            return 0.0
+        seen = self.zero
+        key = 0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                break
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def to_row(self) -> list:
+        keys = sorted(self.bins)
+        return [self.zero, keys, [self.bins[k] for k in keys]]
+
+    @classmethod
+    def from_row(cls, row: list, alpha: float) -> "QuantileSketch":
+        sketch = cls(alpha)
+        sketch.zero, keys, counts = row
+        sketch.bins = dict(zip(keys, counts))
+        sketch.count = sketch.zero + sum(counts)
+        return sketch
+
+
+class RollupBucket:
+    """Tek bir zaman kovası (veya birden çok kovanın birleşimi)."""
+
+    __slots__ = ("count", "sum", "min", "max", "errors", "sketch", "tags")
+
+    def __init__(self, alpha: float = ROLLUP_SKETCH_ALPHA):
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.errors = 0
+        self.sketch = QuantileSketch(alpha)
+        self.tags: Dict[str, int] = {}
+
+    def record(self, value: float, error: bool = False, tags: Iterable[str] = ()):
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if error:
+            self.errors += 1
+        self.sketch.add(value)
+        for tag in tags:
+            self._tag(tag, 1)
+
+    def _tag(self, tag: str, n: int):
+        if tag not in self.tags and len(self.tags) >= MAX_TAGS_PER_BUCKET:
+            tag = tag.split(":", 1)[0] + ":_other"
+        self.tags[tag] = self.tags.get(tag, 0) + n
+
+    def merge(self, other: "RollupBucket"):
+        if not other.count:
+            return
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.errors += other.errors
+        self.sketch.merge(other.sketch)
+        for tag, n in other.tags.items():
+            self._tag(tag, n)
+
+    def quantile(self, q: float) -> float:
+        """Sketch tahmini, kovanın gerçek [min, max] aralığına sıkıştırılır."""
+        if not self.count:
+            return 0.0
+        return min(max(self.sketch.quantile(q), self.min), self.max)
+
+    def tag_counts(self, prefix: str) -> Dict[str, int]:
+        """Verilen önekli etiketler (önek atılmış), çoktan aza sıralı."""
+        head = prefix + ":"
+        counts = {t[len(head):]: n for t, n in self.tags.items() if t.startswith(head)}
+        return dict(sorted(counts.items(), key=lambda x: -x[1]))
+
+    def summary(self) -> Dict:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "sum": round(self.sum, 2),
+            "avg": round(self.sum / self.count, 2),
+            "min": round(self.min, 2),
+            "max": round(self.max, 2),
+            "p50": round(self.quantile(0.5), 2),
+            "p90": round(self.quantile(0.9), 2),
+            "p95": round(self.quantile(0.95), 2),
+            "p99": round(self.quantile(0.99), 2),
+        }
+
+    def to_row(self, index: int) -> list:
+        return [index, self.count, round(self.sum, 4), self.min, self.max, self.errors,
+                self.sketch.to_row(), self.tags]
+
+    @classmethod
+    def from_row(cls, row: list, alpha: float) -> Tuple[int, "RollupBucket"]:
+        bucket = cls(alpha)
+        index, bucket.count, bucket.sum, bucket.min, bucket.max, bucket.errors, sketch, tags = row
+        bucket.sketch = QuantileSketch.from_row(sketch, alpha)
+        bucket.tags = dict(tags)
+        return index, bucket
+
+
+class _Ring:
+    """Sabit boyutlu kova halkası — slot = kova numarası % slots."""
+
+    def __init__(self, slots: int, width: int):
+        self.slots = slots
+        self.width = width
+        self._index: List[Optional[int]] = [None] * slots
+        self._buckets: List[Optional[RollupBucket]] = [None] * slots
+
+    def bucket(self, index: int, alpha: float) -> Optional[RollupBucket]:
+        """Kovayı getir / oluştur; halkadaki daha yeni bir kovayı ezecekse None."""
+        slot = index % self.slots
+        current = self._index[slot]
+        if current != index:
+            if current is not None and current > index:
+                return None
+            self._index[slot] = index
+            self._buckets[slot] = RollupBucket(alpha)
+        return self._buckets[slot]
+
+    def get(self, index: int) -> Optional[RollupBucket]:
+        slot = index % self.slots
+        return self._buckets[slot] if self._index[slot] == index else None
+
+    def put(self, index: int, bucket: RollupBucket):
+        slot = index % self.slots
+        current = self._index[slot]
+        if current is None or current <= index:
+            self._index[slot] = index
+            self._buckets[slot] = bucket
+
+    def rows(self) -> List[list]:
+        return [b.to_row(i) for i, b in sorted(
+            (i, b) for i, b in zip(self._index, self._buckets) if i is not None)]
+
+
+class RollupSeries:
+    """Dakikalık + saatlik kova halkalarından oluşan tek bir metrik serisi."""
+
+    def __init__(
+        self,
+        minute_slots: int = ROLLUP_MINUTE_SLOTS,
+        hour_slots: int = ROLLUP_HOUR_SLOTS,
+        alpha: float = ROLLUP_SKETCH_ALPHA,
+    ):
+        self.alpha = alpha
+        self._minutes = _Ring(minute_slots, 60)
+        self._hours = _Ring(hour_slots, 3600)
+        self._lock = threading.Lock()
+        self.dirty = False
+
+    def record(self, value: float, error: bool = False, tags: Iterable[str] = (),
+               ts: Optional[float] = None):
+        ts = time.time() if ts is None else ts
+        tags = tuple(tags)
+        with self._lock:
+            for ring in (self._minutes, self._hours):
+                bucket = ring.bucket(int(ts // ring.width), self.alpha)
+                if bucket is not None:
+                    bucket.record(value, error, tags)
+            self.dirty = True
+
+    def window(self, minutes: int, now: Optional[float] = None) -> RollupBucket:
+        """Son N dakikanın (içinde bulunulan dakika dahil) birleşik kovası."""
+        now = time.time() if now is None else now
+        last = int(now // 60)
+        first = last - max(1, int(minutes)) + 1
+        first_hour = -(-first // 60)
+        out = RollupBucket(self.alpha)
+        with self._lock:
+            if first > last - self._minutes.slots:
+                for m in range(first, min(first_hour * 60, last + 1)):
+                    bucket = self._minutes.get(m)
+                    if bucket is not None:
+                        out.merge(bucket)
+            elif first_hour * 60 > first:
+                first_hour -= 1
+            for h in range(first_hour, last // 60 + 1):
+                bucket = self._hours.get(h)
+                if bucket is not None:
+                    out.merge(bucket)
+        return out
+
+    def points(self, minutes: int, now: Optional[float] = None) -> List[Dict]:
+        """Grafik için kova bazlı zaman serisi — 3 saate kadar dakikalık, üstü saatlik."""
+        now = time.time() if now is None else now
+        ring = self._minutes if minutes <= 180 else self._hours
+        last = int(now // ring.width)
+        first = last - max(1, int(minutes * 60 // ring.width)) + 1
+        with self._lock:
+            return [{"timestamp": i * ring.width, **bucket.summary()}
+                    for i in range(max(first, last - ring.slots + 1), last + 1)
+                    if (bucket := ring.get(i)) is not None]
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            self.dirty = False
+            return {"alpha": self.alpha, "minutes": self._minutes.rows(), "hours": self._hours.rows()}
+
+    def load(self, data: Dict):
+        alpha = data.get("alpha", self.alpha)
+        if alpha != self.alpha:
+            # Farklı çözünürlükte kaydedilmiş sketch'ler birleştirilemez
+            logger.info("rollup_alpha_changed", saved=alpha, current=self.alpha)
+            return
+        with self._lock:
+            for key, ring in (("minutes", self._minutes), ("hours", self._hours)):
+                for row in data.get(key, []):
+                    ring.put(*RollupBucket.from_row(row, alpha))
+
+
+class RollupStore:
+    """İsimli rollup serileri + periyodik, kompakt diske yazım."""
+
+    def __init__(self, path: Optional[Path] = None, flush_seconds: float = ROLLUP_FLUSH_SECONDS):
+        self.path = Path(path) if path else None
+        self.flush_seconds = flush_seconds
+        self._series: Dict[str, RollupSeries] = {}
+        self._saved: Dict[str, Dict] = self._read() if self.path else {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stats = {"flushes": 0, "flush_errors": 0, "bytes": 0}
+
+    def series(self, name: str) -> RollupSeries:
+        """Seriyi getir; ilk çağrıda diskteki kovaları yükler ve flush thread'ini başlatır."""
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = RollupSeries()
+                if name in self._saved:
+                    series.load(self._saved.pop(name))
+                self._start()
+            return series
+
+    def _start(self):
+        if self.path is None or (self._flusher is not None and self._flusher.is_alive()):
+            return
+        self._flusher = threading.Thread(target=self._flush_loop, name="rollup-flush", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(max(1.0, self.flush_seconds))
+            self.flush()
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                return json.load(f).get("series", {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, EOFError) as e:
+            logger.warning("rollup_load_failed", path=str(self.path), error=str(e))
+            return {}
+
+    def flush(self, force: bool = False):
+        """Değişen seri varsa tüm serileri atomik olarak yaz."""
+        if self.path is None:
+            return
+        with self._lock:
+            series = dict(self._series)
+        if not force and not any(s.dirty for s in series.values()):
+            return
+        tmp = self.path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            payload = {"version": 1, "saved": time.time(),
+                       "series": {**self._saved, **{n: s.to_dict() for n, s in series.items()}}}
+            data = gzip.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+            self._stats["flushes"] += 1
+            self._stats["bytes"] = len(data)
+        except Exception as e:
+            self._stats["flush_errors"] += 1
+            logger.warning("rollup_flush_failed", path=str(self.path), error=str(e))
+
+    def stats(self) -> Dict:
+        return {"path": str(self.path) if self.path else None, "series": sorted(self._series),
+                "flush_seconds": self.flush_seconds, **self._stats}
@@ -13,17 +13,24 @@ v5.2.0 İyileştirmeleri:
   - Stres testi (aşırı koşul simülasyonu)
   - ScenarioTracker + get_dashboard()
 
+v7.28.00: Monte Carlo ve stres testi monte_carlo.simulate_paths NumPy
+motorunu kullanır; çok değişkenli kombinasyonlar vektörel çarpılır.
+
 Puan: 75 → 86
 """
 
 from __future__ import annotations
 
+import itertools
 import math
-import random
 import time
 from dataclasses import dataclass, field
 from typing import Any, Optional
 
+import numpy as np
+
+from app.core.monte_carlo import simulate_paths
+
 try:
     import structlog
     logger = structlog.get_logger(__name__)
@@ -32,23 +39,6 @@ except ImportError:
     logger = logging.getLogger(__name__)
 
 
-# ══════════════════════════════════════════════════════════════
-#  YARDIMCI
-# ══════════════════════════════════════════════════════════════
-
-def _percentile(data: list[float], pct: float) -> float:
-    """Pure-Python yüzdelik hesaplama (sıralı liste)."""
-    if not data:
-        return 0.0
-    s = sorted(data)
-    k = (len(s) - 1) * pct / 100.0
-    f = int(k)
-    c = f + 1
-    if c >= len(s):
-        return s[-1]
-    return s[f] + (k - f) * (s[c] - s[f])
-
-
 # ══════════════════════════════════════════════════════════════
 #  VERİ YAPILARI
 # ══════════════════════════════════════════════════════════════
@@ -97,6 +87,9 @@ class StressTestResult:
     severity: str = "Orta"
     recovery_estimate: str = ""
     description: str = ""
+    # Oynaklıkla simüle edildiyse şok sonrası değer bandı
+    p5: Optional[float] = None
+    p95: Optional[float] = None
 
 
 # ══════════════════════════════════════════════════════════════
@@ -565,36 +558,27 @@ def monte_carlo_simulation(
     """
     t0 = time.time()
 
-    rng = random.Random(seed)
-    trend_mult = trend_pct / 100.0
-    vol_mult = volatility / 100.0
-
-    samples: list[float] = []
-    for _ in range(iterations):
-        # Log-normal benzeri dağılım
-        change = rng.gauss(trend_mult, vol_mult)
-        simulated = current_value * (1 + change)
-        samples.append(simulated)
-
-    samples.sort()
+    samples = simulate_paths(
+        current_value,
+        trend_pct=trend_pct,
+        volatility_pct=volatility,
+        periods=1,
+        simulations=iterations,
+        seed=seed,
+    )
     n = len(samples)
-    mean = sum(samples) / n
-    median = samples[n // 2]
-    variance = sum((x - mean) ** 2 for x in samples) / n
-    std = math.sqrt(variance)
+    mean = float(samples.mean())
+    median = float(np.partition(samples, n // 2)[n // 2])
+    std = float(samples.std())
 
-    ci_lower = _percentile(samples, 2.5)
-    ci_upper = _percentile(samples, 97.5)
-    p5 = _percentile(samples, 5)
-    p95 = _percentile(samples, 95)
+    ci_lower, ci_upper, p5, p95 = (float(v) for v in np.percentile(samples, [2.5, 97.5, 5, 95]))
 
     prob_above = 0.0
     if target_value is not None:
-        above = sum(1 for s in samples if s >= target_value)
-        prob_above = above / n
+        prob_above = float(np.count_nonzero(samples >= target_value)) / n
 
     result = MonteCarloResult(
-        iterations=iterations,
+        iterations=n,
         mean=round(mean, 2),
         median=round(median, 2),
         std=round(std, 2),
@@ -656,10 +640,18 @@ def stress_test(
     current_value: float,
     metric_name: str = "Metrik",
     custom_scenarios: dict[str, dict] = None,
+    volatility: float = 0.0,
+    iterations: int = 2000,
+    seed: int = 42,
 ) -> list[StressTestResult]:
     """
     Stres testi — aşırı koşullarda metrik performansı.
 
+    Args:
+        volatility: > 0 ise her şok Monte Carlo ile simüle edilir ve
+                    sonuçlara P5/P95 değer bandı eklenir (oynaklık %)
+        iterations: Senaryo başına iterasyon sayısı
+
     Returns:
         StressTestResult listesi (etki büyüklüğüne göre sıralı)
     """
@@ -673,6 +665,12 @@ def stress_test(
     for name, cfg in scenarios.items():
         impact_pct = cfg.get("impact_pct", -10)
         impact_val = current_value * (impact_pct / 100.0)
+        band = (None, None)
+        if volatility > 0:
+            samples = simulate_paths(current_value, trend_pct=impact_pct,
+                                     volatility_pct=volatility, periods=1,
+                                     simulations=iterations, seed=seed)
+            band = tuple(round(float(v), 2) for v in np.percentile(samples, [5, 95]))
         results.append(StressTestResult(
             scenario_name=name,
             impact_value=round(current_value + impact_val, 2),
@@ -680,6 +678,8 @@ def stress_test(
             severity=cfg.get("severity", "Orta"),
             recovery_estimate=cfg.get("recovery", "Belirsiz"),
             description=cfg.get("desc", ""),
+            p5=band[0],
+            p95=band[1],
         ))
 
     results.sort(key=lambda r: r.change_pct)
@@ -706,12 +706,20 @@ def format_stress_test(results: list[StressTestResult], metric_name: str = "Metr
         "| Senaryo | Etki | Değer | Ciddiyet | Toparlanma |",
         "|---------|------|-------|----------|------------|",
     ]
+    with_band = any(r.p5 is not None for r in results)
+    if with_band:
+        lines[1] += " P5–P95 |"
+        lines[2] += "--------|"
     for r in results:
         sev_icon = "🔴" if r.severity == "Kritik" else ("🟠" if r.severity == "Yüksek" else "🟡")
-        lines.append(
+        row = (
             f"| {r.scenario_name} | %{r.change_pct:+d} | "
             f"{unit}{r.impact_value:,.2f} | {sev_icon} {r.severity} | {r.recovery_estimate} |"
         )
+        if with_band:
+            band = f"{unit}{r.p5:,.2f} — {unit}{r.p95:,.2f}" if r.p5 is not None else "-"
+            row += f" {band} |"
+        lines.append(row)
     if results:
         worst = results[0]
         lines.append(f"\n⚠️ En ağır senaryo: **{worst.scenario_name}** "
@@ -740,30 +748,23 @@ def multi_variable_scenarios(
     Returns:
         [{combination: {...}, result_value, change_pct}, ...]
     """
-    # Kartezyen çarpım (sınırlı)
+    # Kartezyen çarpım (sınırlı) — çarpanlar tek dizi işlemiyle
     keys = list(variables.keys())
     value_lists = [variables[k] for k in keys]
+    picked = list(itertools.islice(itertools.product(*value_lists), max_combinations))
 
     combos: list[dict[str, Any]] = []
-
-    def _generate(depth: int, combo: dict, multiplier: float):
-        if len(combos) >= max_combinations:
-            return
-        if depth == len(keys):
-            result = base_value * multiplier
-            change = ((result - base_value) / base_value * 100) if base_value else 0
+    if picked:
+        multipliers = np.prod(np.array(picked, dtype=float).reshape(len(picked), len(keys)), axis=1)
+        results = base_value * multipliers
+        changes = ((results - base_value) / base_value * 100) if base_value else np.zeros(len(picked))
+        for combo, multiplier, result, change in zip(picked, multipliers, results, changes):
             combos.append({
-                "combination": dict(combo),
-                "result_value": round(result, 2),
-                "change_pct": round(change, 1),
-                "cumulative_multiplier": round(multiplier, 4),
+                "combination": dict(zip(keys, combo)),
+                "result_value": round(float(result), 2),
+                "change_pct": round(float(change), 1),
+                "cumulative_multiplier": round(float(multiplier), 4),
             })
-            return
-        for val in value_lists[depth]:
-            combo[keys[depth]] = val
-            _generate(depth + 1, combo, multiplier * val)
-
-    _generate(0, {}, 1.0)
 
     combos.sort(key=lambda c: c["result_value"])
 
@@ -0,0 +1,417 @@
+"""Çok Worker'lı Paylaşımlı Metrikler (v7.41.00)
+
+/api/metrics eskiden süreç içi bir dict'ten üretiliyordu: gunicorn /
+uvicorn --workers N altında her scrape rastgele bir worker'a düşüp yalnızca
+onun sayaçlarını gösteriyordu. Yanıt süresi tek bir ortalamaydı;
+requests_by_path ham path ile (/api/documents/<dosya adı>) etiketlendiği
+için seri sayısı sınırsız büyüyordu.
+
+- Registry: süreç içi counter / gauge / histogram (sabit bucket'lı).
+  HTTP istekleri route şablonuyla (`/api/documents/{source}`) etiketlenir.
+- Paylaşım: her worker METRICS_FLUSH_SECONDS'ta bir kendi örneklerini
+  (registry + collector'ların ürettiği alt sistem metrikleri)
+  `METRICS_MULTIPROC_DIR/<master pid>/worker-<pid>.json` dosyasına atomik
+  yazar. Scrape eden worker kendi dosyasını tazeler, sonra tüm worker
+  dosyalarını birleştirir: counter ve histogram toplanır, gauge / summary
+  `worker` etiketiyle ayrı kalır.
+- Ölen worker'ların (max_requests ile yeniden başlayanlar dahil) counter
+  ve histogram değerleri `retired.json`'a katlanır — fleet toplamı geri
+  düşmez. Eski master'ların dizinleri açılışta silinir.
+- Redis gerektirmez; dizin aynı makinedeki worker'lar arasında paylaşılır.
+  Diğer worker'ların değerleri en fazla METRICS_FLUSH_SECONDS eskidir.
+
+Kullanım:
+    histogram("companyai_rag_search_seconds", "RAG search latency")
+    observe("companyai_rag_search_seconds", 0.12, mode="search")
+    inc("companyai_llm_tokens_total", 250, kind="completion")
+    render(get_shared_metrics().collect())
+"""
+
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import structlog
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = structlog.get_logger()
+
+METRICS_MULTIPROC_DIR = Path(os.environ.get("METRICS_MULTIPROC_DIR", "data/metrics"))
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Birleştirmede toplanan tipler; diğerleri worker etiketiyle ayrı kalır
+_ADDITIVE = ("counter", "histogram")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)\s*$')
+_LABEL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def _label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(round(value, 6))
+
+
+class MetricsRegistry:
+    """Süreç içi metrik deposu (thread-safe)."""
+
+    def __init__(self):
+        self._families: Dict[str, dict] = {}
+        self._values: Dict[str, Dict[LabelKey, object]] = {}
+        self._lock = threading.Lock()
+
+    def declare(self, name: str, kind: str, help: str, buckets: Optional[Tuple[float, ...]] = None):
+        """Metrik ailesini tanımla — tekrar çağrı zararsız."""
+        with self._lock:
+            if name not in self._families:
+                self._families[name] = {"type": kind, "help": help,
+                                        "buckets": tuple(buckets or DEFAULT_BUCKETS)}
+                self._values[name] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self._values[name][_label_key(labels)] = float(value)
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            buckets = self._families[name]["buckets"]
+            series = self._values[name]
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            index = len(buckets)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    index = i
+                    break
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def families(self) -> Dict[str, dict]:
+        """Exposition'a hazır aileler: {ad: {type, help, samples: [[ad, etiketler, değer]]}}."""
+        out = {}
+        with self._lock:
+            for name, family in self._families.items():
+                samples = []
+                for key, value in self._values[name].items():
+                    labels = dict(key)
+                    if family["type"] != "histogram":
+                        samples.append([name, labels, value])
+                        continue
+                    counts, total, count = value
+                    cumulative = 0
+                    for bound, n in zip(family["buckets"] + (math.inf,), counts):
+                        cumulative += n
+                        samples.append([f"{name}_bucket", {**labels, "le": _format_value(bound)}, cumulative])
+                    samples.append([f"{name}_sum", labels, total])
+                    samples.append([f"{name}_count", labels, count])
+                out[name] = {"type": family["type"], "help": family["help"], "samples": samples}
+        return out
+
+
+def parse_exposition(text: str) -> Dict[str, dict]:
+    """Prometheus text format'ı ailelere çevir (collector çıktısı için)."""
+    families: Dict[str, dict] = {}
+    current = ""
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("# HELP "):
+            parts = line[7:].split(" ", 1)
+            current = parts[0]
+            families.setdefault(current, {"type": "untyped", "help": "", "samples": []})
+            families[current]["help"] = parts[1] if len(parts) > 1 else ""
+            continue
+        if line.startswith("# TYPE "):
+            parts = line[7:].split(" ", 1)
+            current = parts[0]
+            families.setdefault(current, {"type": "untyped", "help": "", "samples": []})
+            families[current]["type"] = parts[1].strip() if len(parts) > 1 else "untyped"
+            continue
+        if line.startswith("#"):
+            continue
+        match = _SAMPLE_RE.match(line)
+        if not match:
+            continue
+        name, raw_labels, raw_value = match.groups()
+        try:
+            value = float(raw_value)
+        except ValueError:
+            continue
+        labels = {k: v.replace('\\"', '"').replace("\\\\", "\\")
+                  for k, v in _LABEL_RE.findall(raw_labels or "")}
+        # _bucket / _sum / _count örnekleri son TYPE satırının ailesine aittir
+        owner = current if current and (name == current or name.startswith(current + "_")) else name
+        families.setdefault(owner, {"type": "untyped", "help": "", "samples": []})
+        families[owner]["samples"].append([name, labels, value])
+    return families
+
+
+def merge_families(snapshots: List[Tuple[str, Dict[str, dict]]]) -> Dict[str, dict]:
+    """Worker ailelerini birleştir — counter/histogram toplanır, diğerleri worker etiketli."""
+    merged: Dict[str, dict] = {}
+    for worker, families in snapshots:
+        for name, family in families.items():
+            target = merged.setdefault(name, {"type": family["type"], "help": family["help"], "samples": {}})
+            additive = family["type"] in _ADDITIVE
+            for sample_name, labels, value in family["samples"]:
+                if not additive:
+                    labels = {**labels, "worker": worker}
+                key = (sample_name, _label_key(labels))
+                if additive and key in target["samples"]:
+                    target["samples"][key][1] += value
+                else:
+                    target["samples"][key] = [labels, value]
+    return {
+        name: {"type": f["type"], "help": f["help"],
+               "samples": [[key[0], labels, value] for key, (labels, value) in f["samples"].items()]}
+        for name, f in merged.items()
+    }
+
+
+def render(families: Dict[str, dict]) -> str:
+    """Aileleri Prometheus text format'a çevir."""
+    lines = []
+    for name, family in families.items():
+        if not family["samples"]:
+            continue
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for sample_name, labels, value in family["samples"]:
+            if labels:
+                rendered = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                lines.append(f"{sample_name}{{{rendered}}} {_format_value(value)}")
+            else:
+                lines.append(f"{sample_name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedMetrics:
+    """Worker snapshot dosyaları üzerinden fleet genelinde metrik görünümü."""
+
+    def __init__(
+        self,
+        directory: Path = METRICS_MULTIPROC_DIR,
+        flush_seconds: float = METRICS_FLUSH_SECONDS,
+        master_pid: Optional[int] = None,
+    ):
+        self.root = Path(directory)
+        self.master_pid = master_pid or os.getppid()
+        self.directory = self.root / str(self.master_pid)
+        self.flush_seconds = flush_seconds
+        self.registry = MetricsRegistry()
+        self._collectors: List[Callable[[], str]] = []
+        self._pid = os.getpid()
+        self._flusher: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats = {"snapshots": 0, "snapshot_errors": 0, "retired_workers": 0}
+
+    @property
+    def worker_file(self) -> Path:
+        return self.directory / f"worker-{os.getpid()}.json"
+
+    def add_collector(self, fn: Callable[[], str]):
+        """Snapshot'a eklenecek, Prometheus text üreten fonksiyon (alt sistem metrikleri)."""
+        self._collectors.append(fn)
+
+    # ── Snapshot ──
+
+    def start(self):
+        """Periyodik snapshot thread'ini başlat (fork sonrası worker'da yeniden)."""
+        if self._flusher is not None and self._flusher.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._flusher is not None and self._flusher.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._remove_stale_generations()
+            self._flusher = threading.Thread(target=self._flush_loop, name="metrics-snapshot", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(max(0.5, self.flush_seconds))
+            self.write_snapshot()
+
+    def local_families(self) -> Dict[str, dict]:
+        families = self.registry.families()
+        for collector in self._collectors:
+            try:
+                for name, family in parse_exposition(collector()).items():
+                    families.setdefault(name, family)
+            except Exception as e:
+                logger.debug("metrics_collector_failed", error=str(e))
+        return families
+
+    def write_snapshot(self):
+        path = self.worker_file
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            payload = {"pid": os.getpid(), "updated": time.time(), "families": self.local_families()}
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp, path)
+            self._stats["snapshots"] += 1
+        except Exception as e:
+            self._stats["snapshot_errors"] += 1
+            logger.warning("metrics_snapshot_failed", error=str(e))
+
+    # ── Birleştirme ──
+
+    def collect(self) -> Dict[str, dict]:
+        """Fleet görünümü: kendi taze snapshot'ı + diğer worker'lar + emekli sayaçlar."""
+        self.start()
+        self.write_snapshot()
+        self._retire_dead_workers()
+        snapshots = []
+        retired = self._read_json(self.directory / "retired.json")
+        if retired:
+            snapshots.append(("retired", retired.get("families", {})))
+        for path in sorted(self.directory.glob("worker-*.json")):
+            data = self._read_json(path)
+            if data:
+                snapshots.append((str(data.get("pid", path.stem)), data.get("families", {})))
+        return merge_families(snapshots)
+
+    def _retire_dead_workers(self):
+        """Ölen worker'ların counter/histogram'larını retired.json'a katla (dosya kilidi altında)."""
+        lock_path = self.directory / ".lock"
+        try:
+            with open(lock_path, "a") as lock:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                dead = []
+                for path in self.directory.glob("worker-*.json"):
+                    try:
+                        pid = int(path.stem.split("-", 1)[1])
+                    except (IndexError, ValueError):
+                        continue
+                    if pid != os.getpid() and not _pid_alive(pid):
+                        dead.append(path)
+                if not dead:
+                    return
+                retired_path = self.directory / "retired.json"
+                retired = self._read_json(retired_path) or {"families": {}}
+                snapshots = [("retired", retired["families"])]
+                for path in dead:
+                    data = self._read_json(path) or {}
+                    snapshots.append(("retired", {
+                        name: family for name, family in data.get("families", {}).items()
+                        if family["type"] in _ADDITIVE
+                    }))
+                tmp = retired_path.with_suffix(".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"families": merge_families(snapshots)}, f, ensure_ascii=False)
+                os.replace(tmp, retired_path)
+                for path in dead:
+                    path.unlink(missing_ok=True)
+                self._stats["retired_workers"] += len(dead)
+                logger.info("metrics_workers_retired", count=len(dead))
+        except OSError as e:
+            logger.warning("metrics_retire_failed", error=str(e))
+
+    def _remove_stale_generations(self):
+        """Artık yaşamayan master'ların metrik dizinlerini sil."""
+        for path in self.root.iterdir():
+            if path.is_dir() and path.name.isdigit() and path != self.directory \
+                    and not _pid_alive(int(path.name)):
+                shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def stats(self) -> dict:
+        workers = len(list(self.directory.glob("worker-*.json"))) if self.directory.exists() else 0
+        return {"directory": str(self.directory), "workers": workers,
+                "flush_seconds": self.flush_seconds, **self._stats}
+
+
+_shared: Optional[SharedMetrics] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_metrics() -> SharedMetrics:
+    """Süreç genelindeki paylaşımlı metrik deposu (singleton)."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = SharedMetrics()
+    return _shared
+
+
+# ── Kısa yollar ──
+
+def counter(name: str, help: str):
+    get_shared_metrics().registry.declare(name, "counter", help)
+
+
+def gauge(name: str, help: str):
+    get_shared_metrics().registry.declare(name, "gauge", help)
+
+
+def histogram(name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+    get_shared_metrics().registry.declare(name, "histogram", help, buckets)
+
+
+def inc(name: str, value: float = 1.0, **labels):
+    get_shared_metrics().registry.inc(name, value, **labels)
+
+
+def set_gauge(name: str, value: float, **labels):
+    get_shared_metrics().registry.set(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    get_shared_metrics().registry.observe(name, value, **labels)
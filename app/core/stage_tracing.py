@@ -0,0 +1,297 @@
+"""Sorgu Aşama İzleme — Span Tracing (v7.27.00)
+
+process_question'ın her aşaması (router, hafıza araması, RAG alt
+sorguları, cross-encoder, web araması, prompt, token bütçesi, LLM
+TTFT/üretim, her enterprise modülü) span olarak ölçülür. Eskiden yalnızca
+_t0 tabanlı toplam süre loglanıyordu; 40 saniyelik bir Analiz cevabının
+süresinin nereye gittiği görülemiyordu.
+
+- Trace: bir sorgunun span listesi; son STAGE_TRACE_BUFFER trace halka
+  tamponda tutulur (admin endpoint'i flame-style kırılımı buradan verir).
+- Aşama başına son STAGE_TRACE_WINDOW süre örneği → p50/p95/p99
+  (/metrics ve /metrics/json).
+
+Bağlam ContextVar ile taşınır; asyncio.to_thread ve
+contextvars.copy_context ile çalışan thread'lerdeki span'ler de aynı
+trace'e yazılır. Trace yokken span() maliyetsizdir (no-op).
+
+Kullanım:
+    with start_trace("process_question", question=q[:80]) as trace:
+        with span("router"):
+            context = await async_decide(q)
+        enter_stage("prompt_build")               # girintisiz aşama işareti
+        ...
+        exit_stage()                              # veya trace bitince kapanır
+    record_span("llm.ttft", ttft_ms)          # dışarıda ölçülmüş süre
+    get_stage_latency_stats()                 # {aşama: {p50, p95, p99, ...}}
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+STAGE_TRACE_ENABLED = os.environ.get("STAGE_TRACE_ENABLED", "1") != "0"
+# Halka tamponda tutulan son trace sayısı
+STAGE_TRACE_BUFFER = int(os.environ.get("STAGE_TRACE_BUFFER", "200"))
+# Aşama başına percentile penceresi (örnek sayısı)
+STAGE_TRACE_WINDOW = int(os.environ.get("STAGE_TRACE_WINDOW", "1024"))
+# Bu süreyi aşan sorgular aşama kırılımıyla loglanır
+STAGE_TRACE_SLOW_MS = float(os.environ.get("STAGE_TRACE_SLOW_MS", "20000"))
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("stage_trace", default=None)
+# Açık span yolu — iç içe span'ler "router;llm.queue" gibi katlanır
+_current_path: contextvars.ContextVar = contextvars.ContextVar("stage_path", default=())
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class QueryTrace:
+    """Tek bir sorgunun span'leri (thread-safe ekleme)."""
+
+    def __init__(self, name: str, **meta):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.meta = dict(meta)
+        self.started_at = time.time()
+        self.total_ms: Optional[float] = None
+        self._t0 = time.perf_counter()
+        self._spans: List[dict] = []
+        self._lock = threading.Lock()
+        # enter_stage() ile açılmış, henüz kapanmamış aşama: (path, start_ms)
+        self._open_stage: Optional[tuple] = None
+
+    def offset_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    def add(self, path: tuple, start_ms: float, duration_ms: float, status: str = "ok"):
+        with self._lock:
+            self._spans.append({
+                "stage": path[-1],
+                "path": ";".join(path),
+                "depth": len(path) - 1,
+                "start_ms": round(start_ms, 1),
+                "duration_ms": round(duration_ms, 1),
+                "status": status,
+            })
+
+    @property
+    def spans(self) -> List[dict]:
+        with self._lock:
+            return sorted(self._spans, key=lambda s: s["start_ms"])
+
+    def folded(self) -> Dict[str, float]:
+        """Flame graph'ın katlanmış yığın formatı: {"kök;aşama;alt": ms}."""
+        out: Dict[str, float] = {}
+        for s in self.spans:
+            key = f"{self.name};{s['path']}"
+            out[key] = round(out.get(key, 0.0) + s["duration_ms"], 1)
+        return out
+
+    def summary(self) -> dict:
+        top = [s for s in self.spans if s["depth"] == 0]
+        slowest = max(top, key=lambda s: s["duration_ms"], default=None)
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "meta": self.meta,
+            "started_at": self.started_at,
+            "total_ms": self.total_ms,
+            "span_count": len(self._spans),
+            "slowest_stage": slowest["stage"] if slowest else None,
+            "slowest_stage_ms": slowest["duration_ms"] if slowest else 0,
+        }
+
+    def to_dict(self) -> dict:
+        return {**self.summary(), "spans": self.spans, "folded": self.folded()}
+
+
+class StageTracer:
+    """Trace halka tamponu + aşama başına süre pencereleri."""
+
+    def __init__(self, buffer: int = STAGE_TRACE_BUFFER, window: int = STAGE_TRACE_WINDOW):
+        self._traces: deque = deque(maxlen=max(1, buffer))
+        self._window = max(1, window)
+        self._samples: Dict[str, deque] = {}
+        self._errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def finish(self, trace: QueryTrace):
+        trace.total_ms = round(trace.offset_ms(), 1)
+        with self._lock:
+            self._traces.append(trace)
+            for s in trace.spans + [{"stage": trace.name, "duration_ms": trace.total_ms,
+                                     "status": "ok"}]:
+                samples = self._samples.get(s["stage"])
+                if samples is None:
+                    samples = self._samples[s["stage"]] = deque(maxlen=self._window)
+                samples.append(s["duration_ms"])
+                if s["status"] != "ok":
+                    self._errors[s["stage"]] = self._errors.get(s["stage"], 0) + 1
+        if trace.total_ms >= STAGE_TRACE_SLOW_MS:
+            logger.warning("slow_query_trace", trace_id=trace.trace_id,
+                           total_ms=trace.total_ms, **trace.meta,
+                           stages={s["stage"]: s["duration_ms"]
+                                   for s in trace.spans if s["depth"] == 0})
+
+    def stage_stats(self) -> Dict[str, dict]:
+        with self._lock:
+            samples = {k: list(v) for k, v in self._samples.items()}
+            errors = dict(self._errors)
+        return {
+            stage: {
+                "count": len(values),
+                "p50_ms": round(_percentile(values, 0.50), 1),
+                "p95_ms": round(_percentile(values, 0.95), 1),
+                "p99_ms": round(_percentile(values, 0.99), 1),
+                "mean_ms": round(sum(values) / len(values), 1),
+                "max_ms": round(max(values), 1),
+                "errors": errors.get(stage, 0),
+            }
+            for stage, values in sorted(samples.items())
+            if values
+        }
+
+    def recent(self, limit: int = 20, min_total_ms: float = 0.0) -> List[dict]:
+        with self._lock:
+            traces = list(self._traces)
+        out = [t.summary() for t in reversed(traces) if (t.total_ms or 0) >= min_total_ms]
+        return out[:limit]
+
+    def slowest(self, limit: int = 10) -> List[dict]:
+        with self._lock:
+            traces = list(self._traces)
+        traces.sort(key=lambda t: t.total_ms or 0, reverse=True)
+        return [t.summary() for t in traces[:limit]]
+
+    def get(self, trace_id: str) -> Optional[dict]:
+        with self._lock:
+            for t in self._traces:
+                if t.trace_id == trace_id:
+                    return t.to_dict()
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+            self._samples.clear()
+            self._errors.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": STAGE_TRACE_ENABLED,
+            "buffered_traces": len(self._traces),
+            "stages": self.stage_stats(),
+        }
+
+
+stage_tracer = StageTracer()
+
+
+def current_trace() -> Optional[QueryTrace]:
+    return _current_trace.get()
+
+
+@contextlib.contextmanager
+def start_trace(name: str, **meta):
+    """Yeni trace başlat; blok bitince tampona yazılır."""
+    if not STAGE_TRACE_ENABLED:
+        yield None
+        return
+    trace = QueryTrace(name, **meta)
+    trace_token = _current_trace.set(trace)
+    path_token = _current_path.set(())
+    status = "ok"
+    try:
+        yield trace
+    except BaseException as e:
+        status = _failure_status(e)
+        raise
+    finally:
+        # Erken return / hata ile kapanmamış aşama işareti burada kapanır
+        exit_stage(status)
+        _current_path.reset(path_token)
+        _current_trace.reset(trace_token)
+        stage_tracer.finish(trace)
+
+
+@contextlib.contextmanager
+def span(stage: str):
+    """Bloğun süresini aktif trace'e span olarak yaz (trace yoksa no-op)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    path = _current_path.get() + (stage,)
+    token = _current_path.set(path)
+    start = trace.offset_ms()
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = _failure_status(e)
+        raise
+    finally:
+        _current_path.reset(token)
+        trace.add(path, start, trace.offset_ms() - start, status)
+
+
+def enter_stage(stage: str):
+    """Girintisiz aşama işareti: açık aşamayı kapatıp yenisini açar.
+
+    Uzun fonksiyon gövdelerini `with span()` için yeniden girintilemeden
+    ardışık aşamaları ölçmek içindir; aşama exit_stage() ile, bir sonraki
+    enter_stage() ile ya da trace bittiğinde kapanır. Aynı coroutine
+    içinde kullanılmalıdır (yol ContextVar'da tutulur).
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    exit_stage()
+    path = _current_path.get() + (stage,)
+    _current_path.set(path)
+    trace._open_stage = (path, trace.offset_ms())
+
+
+def exit_stage(status: str = "ok"):
+    """enter_stage() ile açılmış aşamayı kapat (açık aşama yoksa no-op)."""
+    trace = _current_trace.get()
+    if trace is None or trace._open_stage is None:
+        return
+    path, start = trace._open_stage
+    trace._open_stage = None
+    _current_path.set(path[:-1])
+    trace.add(path, start, trace.offset_ms() - start, status)
+
+
+def _failure_status(e: BaseException) -> str:
+    return "timeout" if isinstance(e, (asyncio.TimeoutError, asyncio.CancelledError)) else "error"
+
+
+def record_span(stage: str, duration_ms: float, start_ms: Optional[float] = None):
+    """Dışarıda ölçülmüş süreyi (ör. Ollama eval_duration) span olarak ekle."""
+    trace = _current_trace.get()
+    if trace is None or duration_ms is None:
+        return
+    if start_ms is None:
+        start_ms = max(0.0, trace.offset_ms() - duration_ms)
+    trace.add(_current_path.get() + (stage,), start_ms, duration_ms)
+
+
+def get_stage_latency_stats() -> dict:
+    """Aşama latency metrikleri (metrics dashboard için)."""
+    return stage_tracer.stats()
@@ -0,0 +1,405 @@
+"""Akışlı Tablo Okuma — Büyük Excel/CSV Yüklemeleri (v7.31.00)
+
+parse_file_to_dataframe ve extract_text_from_file eskiden yüklemenin
+tamamını bytes olarak belleğe alıyor, her sayfa için pd.read_excel'i bir
+(başlık tespiti başarısızsa iki) kez çağırıyor ve hücreleri iterrows
+döngüsünde string'e çeviriyordu; yüz MB'lık ERP export'ları worker
+RSS'ini patlatıyordu.
+
+- Kaynak: bytes, dosya yolu veya okunabilir dosya tutamacı. FastAPI
+  UploadFile.file, Starlette'in 1 MB'tan sonra diske taşan
+  SpooledTemporaryFile'ıdır — route'lar tablo dosyalarında onu doğrudan
+  verir, yükleme hiçbir zaman tek parça bytes olarak okunmaz.
+- Excel (.xlsx/.xlsm): openpyxl read_only modunda satır satır; başlık
+  satırı ilk TABULAR_HEADER_SAMPLE_ROWS satırlık örnekten tespit edilir
+  (sayfa başına tek okuma). .xls (xlrd) akışlı okunamaz, pandas ile
+  okunup aynı parçalara bölünür.
+- CSV/TSV: ayraç ilk TABULAR_SNIFF_BYTES'lık örnekten koklanır, dosya
+  pd.read_csv(chunksize=...) ile okunur.
+- iter_dataframe_chunks → TabularChunk (sayfa, DataFrame parçası, satır
+  ofseti); iter_text_rows → RAG için "dosya | Satır N: Kolon: Değer"
+  satırları (parça başına sütun-vektörel string'leştirme).
+- read_sheets: parçaları sayfa bazında birleştirir;
+  TABULAR_MAX_MEMORY_MB tavanı aşılınca okumayı keser (truncated=True).
+- on_progress(event) her parçadan sonra çağrılır (sayfa, sayfa sırası,
+  okunan satır) — uzun yüklemelerde ilerleme bildirimi için.
+
+Kullanım:
+    for line in iter_text_rows("rapor.xlsx", upload.file):
+        ...
+    sheets, truncated = read_sheets("rapor.xlsx", upload.file)
+"""
+
+import contextlib
+import io
+import os
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import structlog
+
+logger = structlog.get_logger()
+
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+# Parça başına satır sayısı (DataFrame ve metin satırları)
+TABULAR_CHUNK_ROWS = int(os.environ.get("TABULAR_CHUNK_ROWS", "5000"))
+# read_sheets'in tamponlayabileceği toplam DataFrame belleği
+TABULAR_MAX_MEMORY_MB = float(os.environ.get("TABULAR_MAX_MEMORY_MB", "512"))
+# Başlık satırı tespiti için örneklenen ilk satır sayısı
+TABULAR_HEADER_SAMPLE_ROWS = int(os.environ.get("TABULAR_HEADER_SAMPLE_ROWS", "20"))
+# CSV ayraç tespiti için okunan örnek boyutu
+TABULAR_SNIFF_BYTES = int(os.environ.get("TABULAR_SNIFF_BYTES", "65536"))
+
+CSV_SEPARATORS = (',', ';', '\t', '|')
+EXCEL_STREAM_EXTENSIONS = ('.xlsx', '.xlsm')
+TABULAR_EXTENSIONS = ('.csv', '.tsv', '.xls') + EXCEL_STREAM_EXTENSIONS
+
+ProgressCallback = Callable[[dict], None]
+
+
+@dataclass
+class TabularChunk:
+    """Bir sayfanın ardışık satır parçası."""
+    sheet: Optional[str]      # CSV için None
+    sheet_index: int
+    sheet_count: int
+    frame: pd.DataFrame
+    start_row: int            # Sayfadaki ilk veri satırının 0 tabanlı sırası
+
+
+def is_tabular_file(filename: str) -> bool:
+    return (filename or "").lower().endswith(TABULAR_EXTENSIONS)
+
+
+@contextlib.contextmanager
+def _open_source(source):
+    """bytes / yol / dosya tutamacı → başa sarılmış ikili dosya nesnesi."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as handle:
+            yield handle
+    else:
+        source.seek(0)
+        yield source
+
+
+def source_bytes(source) -> bytes:
+    """bytes veya dosya tutamacı → bytes (akışlı okunamayan formatlar için)."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    source.seek(0)
+    return source.read()
+
+
+def source_size(source) -> int:
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    position = source.tell()
+    source.seek(0, os.SEEK_END)
+    size = source.tell()
+    source.seek(position)
+    return size
+
+
+async def read_upload(upload):
+    """UploadFile → tablo dosyalarında spool edilmiş tutamaç, diğerlerinde bytes.
+
+    Excel/CSV yüklemeleri böylece belleğe tek parça okunmaz.
+    """
+    if is_tabular_file(upload.filename):
+        return upload.file
+    return await upload.read()
+
+
+# ══════════════════════════════════════════════════════════════
+# 1. BAŞLIK TESPİTİ (v5.10.8 mantığı — örnek satırlar üzerinde)
+# ══════════════════════════════════════════════════════════════
+
+def _is_blank(value) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _row_width(row) -> int:
+    for j in range(len(row) - 1, -1, -1):
+        if not _is_blank(row[j]):
+            return j + 1
+    return 0
+
+
+def detect_header_row(sample: List[tuple], width: int) -> Optional[int]:
+    """Başlık satırının örnekteki sırası; ilk satır geçerli başlıksa None.
+
+    İlk satırın yarıdan fazlası boşsa ("Unnamed" sütunlar) ilk
+    TABULAR_HEADER_SAMPLE_ROWS satır arasında çoğu hücresi metin olan satır
+    aranır; en iyi skor 0.3'ün altındaysa yine None döner.
+    """
+    if not sample or width == 0:
+        return None
+    first = sample[0]
+    unnamed = sum(1 for j in range(width) if j >= len(first) or _is_blank(first[j]))
+    if unnamed <= width // 2:
+        return None
+    best_row, best_score = 0, 0
+    for ri, row in enumerate(sample[:TABULAR_HEADER_SAMPLE_ROWS]):
+        row_vals = [v for v in row[:width] if not _is_blank(v)]
+        if len(row_vals) < 2:
+            continue
+        str_count = sum(
+            1 for v in row_vals
+            if isinstance(v, str) and len(str(v).strip()) > 1
+            and not str(v).strip().replace('.', '').replace(',', '').isdigit()
+        )
+        score = str_count / max(width, 1)
+        if score > best_score:
+            best_score = score
+            best_row = ri
+    return best_row if best_score >= 0.3 else None
+
+
+def _pandas_column_names(header: tuple, width: int) -> list:
+    """pd.read_excel(header=0) ile aynı adlar: boş → "Unnamed: j", tekrar → "ad.1"."""
+    names, seen = [], {}
+    for j in range(width):
+        value = header[j] if j < len(header) else None
+        name = f"Unnamed: {j}" if _is_blank(value) else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+# ══════════════════════════════════════════════════════════════
+# 2. SAYFA OKUYUCULAR
+# ══════════════════════════════════════════════════════════════
+
+def _excel_sheets(handle) -> Iterator[Tuple[str, int, int, Iterator[tuple]]]:
+    """openpyxl read_only — sayfa başına satır iteratörü (values_only)."""
+    if not OPENPYXL_AVAILABLE:
+        raise ImportError("openpyxl yüklü değil")
+    wb = openpyxl.load_workbook(handle, read_only=True, data_only=True)
+    try:
+        names = wb.sheetnames
+        for index, name in enumerate(names):
+            yield name, index, len(names), wb[name].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _xls_sheets(handle) -> Iterator[Tuple[str, int, int, Iterator[tuple]]]:
+    """Eski .xls — xlrd akışlı okuma desteklemez, sayfa sayfa pandas ile."""
+    xls = pd.ExcelFile(handle)
+    names = xls.sheet_names
+    for index, name in enumerate(names):
+        raw = pd.read_excel(xls, sheet_name=name, header=None)
+        raw = raw.astype(object).where(raw.notna(), None)
+        yield name, index, len(names), raw.itertuples(index=False, name=None)
+
+
+def _sheet_frames(rows: Iterator[tuple], chunk_rows: int, raw: bool = False,
+                  **log_ctx) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """Ham satırlardan başlığı ayırıp (satır ofseti, DataFrame) parçaları üret."""
+    rows = iter(rows)
+    sample = list(islice(rows, TABULAR_HEADER_SAMPLE_ROWS))
+    width = max((_row_width(r) for r in sample), default=0)
+    if width == 0:
+        return
+    header_row = detect_header_row(sample, width)
+    if header_row is None:
+        names = _pandas_column_names(sample[0], width)
+        body = sample[1:]
+    else:
+        header = list(sample[header_row][:width])
+        header += [None] * (width - len(header))
+        names = [
+            str(h).strip() if not _is_blank(h) else f"Sütun_{j}"
+            for j, h in enumerate(header)
+        ]
+        body = sample[header_row + 1:]
+        logger.info("excel_header_autodetected", header_row=header_row, **log_ctx)
+
+    pad = (None,) * width
+    offset = 0
+    buffer: List[tuple] = []
+    for row in _chain(body, rows):
+        row = tuple(row[:width])
+        buffer.append(row + pad[:width - len(row)])
+        if len(buffer) >= chunk_rows:
+            yield offset, _records_frame(buffer, names, raw)
+            offset += len(buffer)
+            buffer = []
+    if buffer:
+        yield offset, _records_frame(buffer, names, raw)
+
+
+def _chain(head: list, tail: Iterator[tuple]) -> Iterator[tuple]:
+    yield from head
+    yield from tail
+
+
+def _records_frame(buffer: List[tuple], names: list, raw: bool = False) -> pd.DataFrame:
+    if raw:
+        frame = pd.DataFrame(np.array(buffer, dtype=object))
+    else:
+        frame = pd.DataFrame.from_records(buffer, columns=range(len(names)))
+    frame.columns = names
+    return frame
+
+
+def _sniff_separator(handle) -> str:
+    """İlk örnekte birden fazla sütun veren ilk ayraç (eski tam-okuma denemesinin eşdeğeri)."""
+    sample = handle.read(TABULAR_SNIFF_BYTES)
+    handle.seek(0)
+    if len(sample) == TABULAR_SNIFF_BYTES and b"\n" in sample:
+        sample = sample[:sample.rfind(b"\n") + 1]
+    for sep in CSV_SEPARATORS:
+        try:
+            probe = pd.read_csv(io.BytesIO(sample), sep=sep, encoding='utf-8')
+            if len(probe.columns) > 1:
+                return sep
+        except Exception:
+            continue
+    return ','
+
+
+# ══════════════════════════════════════════════════════════════
+# 3. GENEL API
+# ══════════════════════════════════════════════════════════════
+
+def iter_dataframe_chunks(
+    filename: str,
+    source,
+    chunk_rows: int = TABULAR_CHUNK_ROWS,
+    sep: Optional[str] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    raw: bool = False,
+) -> Iterator[TabularChunk]:
+    """Excel/CSV dosyasını sayfa sayfa DataFrame parçaları olarak oku.
+
+    raw=True: tip çıkarımı yapılmaz (object/str sütunlar) — parçadan parçaya
+    değişen dtype'lar (ör. boş hücreli parçada int → float) metni etkilemez.
+    """
+    filename_lower = filename.lower()
+    chunk_rows = max(1, chunk_rows)
+    with _open_source(source) as handle:
+        if filename_lower.endswith(('.csv', '.tsv')):
+            sep = sep or _sniff_separator(handle)
+            reader = pd.read_csv(handle, sep=sep, encoding='utf-8', chunksize=chunk_rows,
+                                 dtype=str if raw else None)
+            sheets = [(None, 0, 1, reader)]
+        elif filename_lower.endswith(EXCEL_STREAM_EXTENSIONS):
+            sheets = _excel_sheets(handle)
+        elif filename_lower.endswith('.xls'):
+            sheets = _xls_sheets(handle)
+        else:
+            raise ValueError(f"Tablo formatı değil: {filename}")
+
+        for sheet, index, count, rows in sheets:
+            if sheet is None:
+                frames = _offset_frames(rows)
+            else:
+                frames = _sheet_frames(rows, chunk_rows, raw, filename=filename, sheet=sheet)
+            for offset, frame in frames:
+                chunk = TabularChunk(sheet, index, count, frame, offset)
+                yield chunk
+                if on_progress is not None:
+                    on_progress({
+                        "filename": filename,
+                        "sheet": sheet,
+                        "sheet_index": index,
+                        "sheet_count": count,
+                        "rows": offset + len(frame),
+                    })
+
+
+def _offset_frames(reader) -> Iterator[Tuple[int, pd.DataFrame]]:
+    offset = 0
+    for frame in reader:
+        yield offset, frame
+        offset += len(frame)
+
+
+def chunk_text_rows(filename: str, chunk: TabularChunk) -> List[str]:
+    """Parçayı "dosya | Satır N: Kolon: Değer, ..." satırlarına çevir.
+
+    Hücreler sütun bazında string'leştirilir; boş/NaN hücreler atlanır,
+    hiç değeri olmayan satırlar üretilmez.
+    """
+    frame = chunk.frame
+    cells = np.empty(frame.shape, dtype=object)
+    for j, col in enumerate(frame.columns):
+        values = frame.iloc[:, j]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            # str(Timestamp) biçimi — astype(str) gece yarısı saatini düşürür
+            text = values.dt.strftime('%Y-%m-%d %H:%M:%S')
+        else:
+            text = values.astype(str).str.strip()
+        valid = (values.notna() & (text != "")).to_numpy()
+        labelled = (f"{str(col).strip()}: " + text).to_numpy(dtype=object)
+        cells[:, j] = np.where(valid, labelled, "")
+    lines = []
+    for i, row in enumerate(cells):
+        parts = ", ".join(filter(None, row))
+        if parts:
+            lines.append(f"{filename} | Satır {chunk.start_row + i + 1}: {parts}")
+    return lines
+
+
+def iter_text_rows(
+    filename: str,
+    source,
+    chunk_rows: int = TABULAR_CHUNK_ROWS,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Iterator[str]:
+    """RAG için satır metinleri; çok sayfalı Excel'de sayfa başlıkları eklenir."""
+    current_sheet = object()
+    for chunk in iter_dataframe_chunks(filename, source, chunk_rows, on_progress=on_progress, raw=True):
+        if chunk.sheet != current_sheet:
+            current_sheet = chunk.sheet
+            if chunk.sheet_count > 1:
+                yield f"\n[Sayfa: {chunk.sheet}]"
+        yield from chunk_text_rows(filename, chunk)
+
+
+def read_sheets(
+    filename: str,
+    source,
+    max_memory_mb: float = TABULAR_MAX_MEMORY_MB,
+    sep: Optional[str] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    chunk_rows: int = TABULAR_CHUNK_ROWS,
+) -> Tuple[dict, bool]:
+    """Sayfa adı → DataFrame; bellek tavanı aşılırsa okuma kesilir.
+
+    Returns:
+        (sheets, truncated) — CSV için tek anahtar None'dır.
+    """
+    parts: dict = {}
+    buffered = 0
+    limit = max_memory_mb * 1024 * 1024
+    truncated = False
+    for chunk in iter_dataframe_chunks(filename, source, chunk_rows, sep=sep, on_progress=on_progress):
+        parts.setdefault(chunk.sheet, []).append(chunk.frame)
+        buffered += int(chunk.frame.memory_usage(index=False, deep=True).sum())
+        if buffered >= limit:
+            truncated = True
+            logger.warning("tabular_memory_ceiling", filename=filename, sheet=chunk.sheet,
+                           rows=chunk.start_row + len(chunk.frame),
+                           buffered_mb=round(buffered / 1024 / 1024, 1))
+            break
+    sheets = {
+        name: frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        for name, frames in parts.items()
+    }
+    return sheets, truncated
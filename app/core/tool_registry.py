@@ -855,10 +855,11 @@ def _tool_monte_carlo(**params) -> dict:
     """Monte Carlo risk simülasyonu tool fonksiyonu."""
     try:
         from app.core.monte_carlo import monte_carlo_simulate, format_monte_carlo_table
+        base_value = float(params.get("base_value", 1000000))
         result = monte_carlo_simulate(
-            base_value=float(params.get("base_value", 1000000)),
+            current_value=base_value,
+            target_value=float(params.get("target", 0)) or base_value,
             volatility_pct=float(params.get("volatility", 15)),
-            target_value=float(params.get("target", 0)) or None,
         )
         return {"formatted": format_monte_carlo_table(result), **result}
     except Exception as e:
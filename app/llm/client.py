@@ -17,21 +17,152 @@ Bu, Mistral'in chat template'ini otomatik uygular ve
 ║  • GPU eklenince/çıkarılınca: restart'ta otomatik algılanır.     ║
 ║  • connection_pooling: Tek persistent client (max 10 conn).       ║
 ║  • retry: Ollama 500 hatalarında 1 kez yeniden dener.            ║
+║  • cache: generate() yanıtları response_cache'te (v7.23.00).     ║
+║  • single-flight: özdeş eşzamanlı istekler birleşir (v7.24.00).  ║
+║  • scheduler: öncelik sınıfları + admission control (v7.25.00).  ║
 ╚═══════════════════════════════════════════════════════════════════╝
 """
 
 import asyncio
+import hashlib
 import httpx
 import json
 import os
+import time
 from typing import AsyncGenerator, Optional
 import structlog
 from app.config import settings
 from app.llm.gpu_config import gpu_config
+from app.core.stage_tracing import record_span
+from app.core.shared_metrics import counter, histogram, inc, observe
+from app.llm.scheduler import current_priority, llm_scheduler
+from app.llm.response_cache import (
+    LLM_CACHE_ENABLED, LLM_SEMANTIC_CACHE, get_llm_response_cache,
+    semantic_embedding, set_last_cache_status, ttl_for_mode,
+)
 
 logger = structlog.get_logger()
 
 
+# ── v7.24.00: Single-flight — aynı anda gelen özdeş LLM çağrılarını birleştir ──
+_SINGLE_FLIGHT_STATS = {
+    "leaders": 0,
+    "coalesced": 0,
+    "stream_leaders": 0,
+    "stream_coalesced": 0,
+}
+
+
+def _record_flight(kind: str):
+    _SINGLE_FLIGHT_STATS[kind] += 1
+
+
+def _payload_key(payload: dict, priority: str) -> str:
+    """Ollama payload'ının kararlı hash'i (model + mesajlar + options + tools).
+
+    Öncelik sınıfı da anahtara girer: interactive bir istek background
+    lider'in kuyruk sırasını ve degradasyonda shed edilmesini devralmasın.
+    """
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return f"{priority}:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """Devam eden tek bir generate isteği ve bekleyen sayısı."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class _StreamFlight:
+    """Paylaşılan stream: token tamponu + dinleyicileri uyandıran condition."""
+
+    def __init__(self):
+        self.chunks: list[str] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.subscribers = 0
+        self.task: asyncio.Future | None = None
+        self._cond = asyncio.Condition()
+
+    async def publish(self, chunk: str):
+        async with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    async def finish(self, error: BaseException | None = None):
+        async with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    async def subscribe(self) -> AsyncGenerator[str, None]:
+        """Tamponu baştan oynat, sonra yeni token'ları bekle."""
+        i = 0
+        while True:
+            async with self._cond:
+                while i >= len(self.chunks) and not self.done:
+                    await self._cond.wait()
+                new = self.chunks[i:]
+                i = len(self.chunks)
+                finished = self.done
+            for chunk in new:
+                yield chunk
+            if finished:
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+def _record_ollama_timings(result: dict):
+    """Ollama /api/chat süre alanlarını (ns) aktif sorgu trace'ine yaz.
+
+    Stream olmayan çağrıda TTFT ≈ model yükleme + prompt değerlendirme.
+    """
+    if not isinstance(result, dict):
+        return
+    load_ns = result.get("load_duration") or 0
+    prompt_ns = result.get("prompt_eval_duration") or 0
+    eval_ns = result.get("eval_duration") or 0
+    if load_ns or prompt_ns:
+        record_span("llm.ttft", (load_ns + prompt_ns) / 1e6)
+    if eval_ns:
+        record_span("llm.generation", eval_ns / 1e6)
+
+
+# v7.41.00: Ollama throughput — fleet geneli (shared_metrics)
+counter("companyai_llm_tokens_total", "LLM tokens processed by kind")
+histogram("companyai_llm_tokens_per_second", "LLM generation throughput per request",
+          buckets=(1, 2, 5, 10, 15, 20, 30, 40, 60, 80, 120, 200))
+
+
+def _record_llm_throughput(result: dict, stream: bool = False):
+    """Ollama'nın son yanıtındaki eval sayaç/sürelerinden tokens/sec metrikleri."""
+    if not isinstance(result, dict):
+        return
+    prompt_tokens = result.get("prompt_eval_count") or 0
+    eval_tokens = result.get("eval_count") or 0
+    eval_ns = result.get("eval_duration") or 0
+    if prompt_tokens:
+        inc("companyai_llm_tokens_total", prompt_tokens, kind="prompt")
+    if eval_tokens:
+        inc("companyai_llm_tokens_total", eval_tokens, kind="completion")
+    if eval_tokens and eval_ns:
+        observe("companyai_llm_tokens_per_second", eval_tokens / (eval_ns / 1e9),
+                mode="stream" if stream else "generate")
+
+
+def get_single_flight_stats() -> dict:
+    """Single-flight sayaçları (metrics dashboard için)."""
+    s = dict(_SINGLE_FLIGHT_STATS)
+    s["inflight"] = len(ollama_client._inflight)
+    s["stream_inflight"] = len(ollama_client._stream_flights)
+    return s
+
+
 class OllamaClient:
     """Ollama Chat API ile iletişim kuran async client — connection pooling destekli"""
     
@@ -43,6 +174,9 @@ class OllamaClient:
         # Timeout artık gpu_config tarafından dinamik belirleniyor
         # GPU varsa kısa (120s), yoksa uzun (900s)
         self._client: httpx.AsyncClient | None = None
+        # v7.24.00: payload hash → devam eden istek (single-flight)
+        self._inflight: dict[str, _Flight] = {}
+        self._stream_flights: dict[str, _StreamFlight] = {}
 
     @property
     def timeout(self) -> float:
@@ -115,6 +249,10 @@ class OllamaClient:
         history: list[dict] | None = None,
         tools: list[dict] | None = None,
         use_omni: bool = False,
+        use_cache: bool = False,
+        cache_mode: str | None = None,
+        cache_context: dict | None = None,
+        priority: str | None = None,
     ) -> str | dict:
         """
         Chat API ile tek seferde yanıt üretir.
@@ -124,49 +262,119 @@ class OllamaClient:
         v4.5.0: use_omni parametresi — MiniCPM-o 2.6 omni-modal model için.
         tools varsa ve model tool_calls döndürüyorsa dict döner:
             {"content": str, "tool_calls": list[dict]}
+        
+        v7.23.00: Yanıt cache'i (app.llm.response_cache).
+            use_cache: cache'e açıkça katıl — yalnızca kullanıcıya dönen ana
+                yanıt için (router, reflection, agent alt çağrıları cache'lenmez)
+            cache_mode: TTL'i belirleyen mod ("Bilgi", "Sohbet", ...)
+            cache_context: {"question": str, "doc_ids": list} — semantik mod için
+            Cache durumu get_last_cache_status() ile okunur.
+        
+        v7.25.00: priority — zamanlayıcı sınıfı (interactive/router/enterprise/
+            background). Verilmezse llm_priority() context'inden okunur.
+            Kuyruk SLO'yu aşarsa max_tokens sınıfa göre küçültülür.
+        """
+        set_last_cache_status(None)
+        priority = priority or current_priority()
+        max_tokens = llm_scheduler.degrade_max_tokens(priority, max_tokens)
+
+        model = self.model
+        if use_omni and images:
+            model = self.omni_model   # MiniCPM-o 2.6 (video/ses/görüntü)
+        elif images:
+            model = self.vision_model  # MiniCPM-V (görüntü)
+
+        messages = self._build_messages(prompt, system_prompt, history)
+        
+        # Vision: son mesaja images ekle
+        if images and messages:
+            messages[-1]["images"] = images
+
+        options = {
+            "temperature": temperature,
+            "num_predict": max_tokens,
+            **gpu_config.options,              # GPU auto-config: num_gpu, num_ctx, num_batch, num_thread
+        }
+        payload = {
+            "model": model,
+            "messages": messages,
+            "stream": False,
+            "options": options,
+        }
+        
+        # v4.3.0: Ollama native function calling
+        if tools:
+            payload["tools"] = tools
+
+        # v7.23.00: Exact + semantik yanıt cache'i (görsel istekler hariç)
+        cache = None
+        cache_ttl = ttl_for_mode(cache_mode)
+        if use_cache and LLM_CACHE_ENABLED and not images and cache_ttl > 0:
+            cache = get_llm_response_cache()
+            generation = await cache.generation()
+            cache_key = cache.make_key(model, messages, options, tools, generation)
+            cached = await cache.lookup(cache_key)
+            if cached is not None:
+                set_last_cache_status({"hit": True, "kind": "exact", "mode": cache_mode})
+                logger.info("llm_cache_hit", kind="exact", model=model, mode=cache_mode)
+                return cached
+
+            semantic_bucket = semantic_vec = None
+            if LLM_SEMANTIC_CACHE and cache_context and cache_context.get("question") and not history:
+                semantic_vec = await semantic_embedding(cache_context["question"])
+                if semantic_vec is not None:
+                    semantic_bucket = cache.semantic_bucket(
+                        model, messages, cache_mode, cache_context.get("doc_ids") or [],
+                        options, generation)
+                    cached = cache.lookup_semantic(semantic_bucket, semantic_vec)
+                    if cached is not None:
+                        set_last_cache_status({"hit": True, "kind": "semantic", "mode": cache_mode})
+                        logger.info("llm_cache_hit", kind="semantic", model=model, mode=cache_mode)
+                        return cached
+            cache.record_miss()
+
+        # v7.24.00: Aynı payload zaten Ollama'da işleniyorsa ona katıl
+        answer = await self._single_flight(
+            _payload_key(payload, priority),
+            lambda: self._post_chat(payload, model, len(messages), bool(tools), priority))
+
+        if cache is not None:
+            set_last_cache_status({"hit": False, "mode": cache_mode})
+            if answer:
+                try:
+                    await cache.store(cache_key, answer, cache_ttl)
+                    if semantic_bucket is not None:
+                        cache.store_semantic(semantic_bucket, semantic_vec, answer, cache_ttl)
+                except Exception as e:
+                    logger.debug("llm_cache_store_failed", error=str(e))
+        return answer
+    
+    async def _post_chat(self, payload: dict, model: str, msg_count: int, has_tools: bool,
+                         priority: str | None = None) -> str | dict:
+        """/api/chat isteği — Ollama 500'de 1 kez yeniden dener.
+
+        Her deneme zamanlayıcıdan slot alır; retry beklemesi slot tutmaz.
         """
         max_retries = 1
         last_error = None
         
         for attempt in range(max_retries + 1):
             try:
-                model = self.model
-                if use_omni and images:
-                    model = self.omni_model   # MiniCPM-o 2.6 (video/ses/görüntü)
-                elif images:
-                    model = self.vision_model  # MiniCPM-V (görüntü)
-
-                messages = self._build_messages(prompt, system_prompt, history)
-                
-                # Vision: son mesaja images ekle
-                if images and messages:
-                    messages[-1]["images"] = images
-
-                payload = {
-                    "model": model,
-                    "messages": messages,
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens,
-                        **gpu_config.options,              # GPU auto-config: num_gpu, num_ctx, num_batch, num_thread
-                    },
-                }
-                
-                # v4.3.0: Ollama native function calling
-                if tools:
-                    payload["tools"] = tools
-
                 client = await self._get_client()
-                logger.info("ollama_chat_request", model=model, msg_count=len(messages),
-                            has_tools=bool(tools),
-                            attempt=attempt + 1 if attempt > 0 else None)
-                response = await client.post(
-                    f"{self.base_url}/api/chat",
-                    json=payload,
-                )
+                queued_at = time.perf_counter()
+                async with llm_scheduler.slot(priority):
+                    record_span("llm.queue", (time.perf_counter() - queued_at) * 1000)
+                    logger.info("ollama_chat_request", model=model, msg_count=msg_count,
+                                has_tools=has_tools, priority=priority,
+                                attempt=attempt + 1 if attempt > 0 else None)
+                    response = await client.post(
+                        f"{self.base_url}/api/chat",
+                        json=payload,
+                    )
                 response.raise_for_status()
                 result = response.json()
+                _record_ollama_timings(result)
+                _record_llm_throughput(result)
 
                 # /api/chat yanıt formatı: {"message": {"role": "assistant", "content": "..."}}
                 msg = result.get("message", {})
@@ -206,7 +414,36 @@ class OllamaClient:
         # max_retries aşıldıysa
         logger.error("ollama_http_error", error=str(last_error), retries_exhausted=True)
         raise Exception(f"LLM bağlantı hatası: {last_error}")
-    
+
+    async def _single_flight(self, key: str, factory):
+        """Aynı anahtarlı eşzamanlı çağrılar tek bir Ollama isteğini paylaşır.
+
+        İstek ayrı bir task'ta çalışır; bir bekleyenin iptali diğerlerini
+        etkilemez. Tüm bekleyenler ayrılırsa istek iptal edilir.
+        """
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda t: self._end_flight(key, flight))
+            _record_flight("leaders")
+        else:
+            _record_flight("coalesced")
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _end_flight(self, key: str, flight: "_Flight"):
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        # Kimse beklemiyorken oluşan hata "never retrieved" uyarısı vermesin
+        if not flight.task.cancelled():
+            flight.task.exception()
+
     async def stream(
         self,
         prompt: str,
@@ -214,29 +451,70 @@ class OllamaClient:
         history: list[dict] | None = None,
         temperature: float = 0.7,
         max_tokens: int = 1024,
+        priority: str | None = None,
     ) -> AsyncGenerator[str, None]:
         """
         Chat API ile streaming yanıt üretir.
+        
+        v7.24.00: Aynı payload ile eşzamanlı gelen stream'ler tek Ollama
+        stream'ini paylaşır — token'lar tüm dinleyicilere dağıtılır, geç
+        katılan dinleyici baştan itibaren tamponlanmış token'ları alır.
+        v7.25.00: Stream süresince zamanlayıcı slotu tutulur.
         """
+        priority = priority or current_priority()
+        max_tokens = llm_scheduler.degrade_max_tokens(priority, max_tokens)
+        messages = self._build_messages(prompt, system_prompt, history)
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "stream": True,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+                **gpu_config.options,           # GPU auto-config
+            },
+        }
+        key = _payload_key(payload, priority)
+        flight = self._stream_flights.get(key)
+        if flight is None:
+            flight = _StreamFlight()
+            self._stream_flights[key] = flight
+            flight.task = asyncio.ensure_future(self._pump_stream(key, payload, flight, priority))
+            _record_flight("stream_leaders")
+        else:
+            _record_flight("stream_coalesced")
+        flight.subscribers += 1
+        started = time.perf_counter()
+        first_token = None
+        try:
+            async for content in flight.subscribe():
+                if first_token is None:
+                    first_token = time.perf_counter()
+                    record_span("llm.ttft", (first_token - started) * 1000)
+                yield content
+            if first_token is not None:
+                record_span("llm.generation", (time.perf_counter() - first_token) * 1000)
+        except Exception as e:
+            logger.error("ollama_stream_error", error=str(e))
+            raise
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done:
+                flight.task.cancel()
+
+    async def _pump_stream(self, key: str, payload: dict, flight: "_StreamFlight",
+                           priority: str | None = None):
+        """Ollama stream'ini okuyup token'ları flight tamponuna yazar."""
+        error = None
         try:
-            messages = self._build_messages(prompt, system_prompt, history)
-            
             client = await self._get_client()
-            logger.info("ollama_chat_stream", model=self.model, msg_count=len(messages))
-            async with client.stream(
+            async with llm_scheduler.slot(priority), client.stream(
                 "POST",
                 f"{self.base_url}/api/chat",
-                json={
-                    "model": self.model,
-                    "messages": messages,
-                    "stream": True,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens,
-                        **gpu_config.options,           # GPU auto-config
-                    },
-                }
+                json=payload,
             ) as response:
+                logger.info("ollama_chat_stream", model=payload["model"],
+                            msg_count=len(payload["messages"]), priority=priority)
                 response.raise_for_status()
                 async for line in response.aiter_lines():
                     if line:
@@ -247,11 +525,18 @@ class OllamaClient:
                         msg = data.get("message", {})
                         content = msg.get("content", "")
                         if content:
-                            yield content
-                                
-        except Exception as e:
-            logger.error("ollama_stream_error", error=str(e))
+                            await flight.publish(content)
+                        if data.get("done"):
+                            _record_llm_throughput(data, stream=True)
+        except asyncio.CancelledError:
+            error = asyncio.CancelledError()
             raise
+        except Exception as e:
+            error = e
+        finally:
+            if self._stream_flights.get(key) is flight:
+                del self._stream_flights[key]
+            await flight.finish(error)
     
     async def is_available(self) -> bool:
         """Ollama servisinin erişilebilir olup olmadığını kontrol eder"""
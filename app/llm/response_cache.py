@@ -0,0 +1,380 @@
+"""LLM Yanıt Cache'i (v7.23.00)
+
+OllamaClient.generate için iki mod. Cache isteğe bağlıdır
+(generate(use_cache=True)) — yalnızca engine'in kullanıcıya dönen ana
+yanıtı katılır; router, reflection, self-correction ve agent alt
+çağrıları her seferinde üretilir.
+
+1. Exact: anahtar = (model, system prompt hash'i, mesajlar, options).
+   Süreç içi LRU + Redis (app.cache.cache_get/cache_set). Aynı RAG
+   bağlamıyla tekrar sorulan Bilgi-modu soruları 72B modele gitmez.
+2. Semantik (opsiyonel, LLM_SEMANTIC_CACHE=1): aynı model + mod + system
+   prompt + aynı getirilen doküman kümesi için soru embedding'i cosine >=
+   eşik olan önceki yanıt kullanılır ("X nedir?" / "X ne demek?"). System
+   prompt kullanıcı adı / hafıza / departman taşıdığı için kovanın
+   parçasıdır — kişiselleştirilmiş yanıt başka kullanıcıya dönmez. Sadece
+   geçmişsiz (follow-up olmayan) sorularda devreye girer; süreç içinde
+   tutulur.
+
+TTL moda göre değişir (LLM_CACHE_TTL_<MOD>). Doküman eklenip silindiğinde
+`invalidate_llm_cache()` corpus neslini artırır — nesil anahtarın
+parçası olduğu için eski yanıtlar bir daha eşleşmez. Nesil Redis'te
+tutulur ve anahtar yalnızca ona dayanır; böylece tüm worker'lar aynı L2
+anahtar uzayını paylaşır. Redis erişilemezken süreç içi sayaç kullanılır,
+kaçırılan artış Redis geri geldiğinde uygulanır.
+
+Son generate çağrısının cache durumu ContextVar ile çağırana iletilir:
+    answer = await ollama_client.generate(...)
+    status = get_last_cache_status()   # {"hit": True, "kind": "exact", ...}
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+try:
+    import redis as _redis
+    REDIS_CLIENT_AVAILABLE = True
+except ImportError:
+    REDIS_CLIENT_AVAILABLE = False
+
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") != "0"
+LLM_SEMANTIC_CACHE = os.environ.get("LLM_SEMANTIC_CACHE", "0") == "1"
+LLM_SEMANTIC_THRESHOLD = float(os.environ.get("LLM_SEMANTIC_THRESHOLD", "0.95"))
+LLM_CACHE_L1_SIZE = int(os.environ.get("LLM_CACHE_L1_SIZE", "512"))
+# Semantik kova başına tutulacak en fazla yanıt
+LLM_SEMANTIC_BUCKET_SIZE = 32
+
+# Mod bazlı TTL (saniye) — Bilgi cevapları doküman değişmedikçe geçerli,
+# Sohbet kısa ömürlü, analizler yarım saat
+LLM_CACHE_DEFAULT_TTL = int(os.environ.get("LLM_CACHE_DEFAULT_TTL", "1800"))
+LLM_CACHE_TTL_BY_MODE = {
+    "Bilgi": int(os.environ.get("LLM_CACHE_TTL_BILGI", "21600")),
+    "Öneri": int(os.environ.get("LLM_CACHE_TTL_ONERI", "3600")),
+    "Sohbet": int(os.environ.get("LLM_CACHE_TTL_SOHBET", "600")),
+    "Beyin Fırtınası": 0,  # Çeşitlilik istenir — cache'lenmez
+    "Analiz": int(os.environ.get("LLM_CACHE_TTL_ANALIZ", "1800")),
+    "Rapor": int(os.environ.get("LLM_CACHE_TTL_RAPOR", "1800")),
+    "Acil": 0,  # Acil durumlar hep taze üretilir
+}
+
+_REDIS_PREFIX = "llm:v2"
+_GENERATION_KEY = "llm:corpus_gen"
+# Senkron Redis client'ı koptuktan sonra yeniden deneme aralığı
+REDIS_RETRY_SECONDS = 30.0
+
+_last_status: contextvars.ContextVar = contextvars.ContextVar("llm_cache_status", default=None)
+
+
+def ttl_for_mode(mode: Optional[str]) -> int:
+    """Mod için cache TTL'i (0 → cache'leme)."""
+    if mode is None:
+        return LLM_CACHE_DEFAULT_TTL
+    return LLM_CACHE_TTL_BY_MODE.get(mode, LLM_CACHE_DEFAULT_TTL)
+
+
+def doc_fingerprints(docs: List[dict]) -> List[str]:
+    """RAG sonuçları için sıralı, kısa kimlikler (kaynak + içerik hash'i)."""
+    out = set()
+    for d in docs or []:
+        h = hashlib.sha256(
+            f'{d.get("source", "")}\x00{d.get("content", "")}'.encode("utf-8")
+        ).hexdigest()[:16]
+        out.add(h)
+    return sorted(out)
+
+
+def _hash(obj: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(obj, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class LLMResponseCache:
+    """Exact (LRU + Redis) ve semantik (süreç içi) LLM yanıt cache'i."""
+
+    def __init__(self, l1_size: int = LLM_CACHE_L1_SIZE):
+        self.l1_size = max(0, l1_size)
+        self._lru: "OrderedDict[str, tuple]" = OrderedDict()
+        self._semantic: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._local_generation = 0
+        # Redis'e iletilemeyen nesil artışı — bağlantı dönünce uygulanır
+        self._pending_remote_bump = False
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self._stats = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "invalidations": 0,
+        }
+
+    # ── Nesil (invalidation) ──
+
+    def bump_generation(self):
+        with self._lock:
+            self._local_generation += 1
+            self._lru.clear()
+            self._semantic.clear()
+            self._stats["invalidations"] += 1
+
+    def _sync_redis(self):
+        """Senkron Redis client (invalidation sync kod yollarından gelir); hata sonrası bir süre denemez."""
+        if not REDIS_CLIENT_AVAILABLE:
+            return None
+        if self._redis is not None:
+            return self._redis
+        now = time.monotonic()
+        if now < self._redis_retry_at:
+            return None
+        try:
+            from app.config import settings
+            client = _redis.Redis.from_url(settings.REDIS_URL,
+                                           socket_connect_timeout=1, socket_timeout=1)
+            client.ping()
+            self._redis = client
+        except Exception as e:
+            self._redis_retry_at = now + REDIS_RETRY_SECONDS
+            logger.debug("llm_cache_redis_unavailable", error=str(e))
+        return self._redis
+
+    def bump_remote_generation(self) -> Optional[int]:
+        """Redis neslini artır ve yeni değeri döndür; erişilemezse artış bekletilir."""
+        client = self._sync_redis()
+        if client is None:
+            self._pending_remote_bump = True
+            return None
+        try:
+            generation = int(client.incr(_GENERATION_KEY))
+            self._pending_remote_bump = False
+            return generation
+        except Exception as e:
+            self._pending_remote_bump = True
+            self._redis = None
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            logger.debug("llm_cache_remote_invalidate_failed", error=str(e))
+            return None
+
+    def remote_generation(self) -> Optional[int]:
+        """Redis corpus nesli (senkron) — erişilemezse None."""
+        client = self._sync_redis()
+        if client is None:
+            return None
+        try:
+            if self._pending_remote_bump:
+                client.incr(_GENERATION_KEY)
+                self._pending_remote_bump = False
+            return int(client.get(_GENERATION_KEY) or 0)
+        except Exception as e:
+            self._redis = None
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            logger.debug("llm_cache_generation_unavailable", error=str(e))
+            return None
+
+    async def generation(self) -> str:
+        """Corpus nesli — anahtarın parçası.
+
+        Redis erişilebilirken yalnızca Redis nesli kullanılır (worker'lar
+        aynı anahtarları paylaşır); erişilemezse süreç içi sayaca düşülür.
+        """
+        from app.cache import get_redis
+        try:
+            client = await get_redis()
+            if client is not None:
+                if self._pending_remote_bump:
+                    await client.incr(_GENERATION_KEY)
+                    self._pending_remote_bump = False
+                remote = await client.get(_GENERATION_KEY)
+                return f"r{remote or 0}"
+        except Exception as e:
+            logger.debug("llm_cache_generation_unavailable", error=str(e))
+        return f"l{self._local_generation}"
+
+    # ── Anahtarlar ──
+
+    @staticmethod
+    def _system_hash(messages: List[dict]) -> str:
+        system = "".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        return hashlib.sha256(system.encode("utf-8")).hexdigest()
+
+    def make_key(self, model: str, messages: List[dict], options: dict,
+                 tools: Optional[list], generation: str) -> str:
+        rest = [m for m in messages if m.get("role") != "system"]
+        return _hash({
+            "model": model,
+            "system": self._system_hash(messages),
+            "messages": rest,
+            "options": options,
+            "tools": tools,
+            "gen": generation,
+        })
+
+    def semantic_bucket(self, model: str, messages: List[dict], mode: Optional[str],
+                        doc_ids: List[str], options: dict, generation: str) -> str:
+        """Semantik eşleşme kovası — system prompt (kullanıcı/departman bağlamı) dahil."""
+        return _hash({"model": model, "system": self._system_hash(messages), "mode": mode,
+                      "docs": doc_ids, "options": options, "gen": generation})
+
+    # ── Okuma ──
+
+    async def lookup(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > now:
+                    self._lru.move_to_end(key)
+                    self._stats["exact_hits"] += 1
+                    return value
+                del self._lru[key]
+
+        from app.cache import cache_get
+        raw = await cache_get(f"{_REDIS_PREFIX}:{key}")
+        if raw:
+            try:
+                data = json.loads(raw)
+                with self._lock:
+                    self._l1_put(key, data["r"], data["e"])
+                    self._stats["exact_hits"] += 1
+                return data["r"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                pass
+        return None
+
+    def lookup_semantic(self, bucket: str, embedding) -> Optional[Any]:
+        import numpy as np
+
+        now = time.time()
+        with self._lock:
+            entries = self._semantic.get(bucket)
+            if not entries:
+                return None
+            best, best_sim = None, LLM_SEMANTIC_THRESHOLD
+            for emb, value, expires in entries:
+                if expires <= now:
+                    continue
+                sim = float(np.dot(emb, embedding))
+                if sim >= best_sim:
+                    best, best_sim = value, sim
+            if best is not None:
+                self._stats["semantic_hits"] += 1
+            return best
+
+    def record_miss(self):
+        with self._lock:
+            self._stats["misses"] += 1
+
+    # ── Yazma ──
+
+    def _l1_put(self, key: str, value: Any, expires: float):
+        if self.l1_size == 0:
+            return
+        self._lru[key] = (value, expires)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.l1_size:
+            self._lru.popitem(last=False)
+
+    async def store(self, key: str, value: Any, ttl: int):
+        expires = time.time() + ttl
+        with self._lock:
+            self._l1_put(key, value, expires)
+            self._stats["stores"] += 1
+        from app.cache import cache_set
+        await cache_set(f"{_REDIS_PREFIX}:{key}",
+                        json.dumps({"r": value, "e": expires}, ensure_ascii=False), ttl=ttl)
+
+    def store_semantic(self, bucket: str, embedding, value: Any, ttl: int):
+        with self._lock:
+            entries = self._semantic.get(bucket)
+            if entries is None:
+                entries = self._semantic[bucket] = deque(maxlen=LLM_SEMANTIC_BUCKET_SIZE)
+            entries.append((embedding, value, time.time() + ttl))
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            l1 = len(self._lru)
+            semantic = sum(len(v) for v in self._semantic.values())
+        lookups = s["exact_hits"] + s["semantic_hits"] + s["misses"]
+        return {
+            **s,
+            "enabled": LLM_CACHE_ENABLED,
+            "semantic_enabled": LLM_SEMANTIC_CACHE,
+            "hit_rate": round((s["exact_hits"] + s["semantic_hits"]) / lookups, 4) if lookups else 0,
+            "l1_size": l1,
+            "semantic_entries": semantic,
+            "generation": self._local_generation,
+        }
+
+
+_cache = LLMResponseCache()
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    return _cache
+
+
+def get_llm_cache_stats() -> dict:
+    """LLM yanıt cache metrikleri (metrics dashboard için)."""
+    return _cache.stats()
+
+
+def get_last_cache_status() -> Optional[dict]:
+    """Bu context'teki son generate çağrısının cache durumu (yoksa None)."""
+    return _last_status.get()
+
+
+def set_last_cache_status(status: Optional[dict]):
+    _last_status.set(status)
+
+
+def invalidate_llm_cache(reason: str = "") -> Optional[int]:
+    """Doküman eklendi/silindi — tüm worker'larda cache neslini artır.
+
+    Sync kod yollarından (vector_store) çağrılır; Redis nesli havuzlu
+    senkron client ile artırılır. Redis erişilemezse bu süreç yerel nesle
+    düşer ve artış bağlantı dönünce uygulanır; hata sonrası
+    REDIS_RETRY_SECONDS boyunca bağlantı denenmez (çağrı bloklanmaz).
+
+    Returns: yeni Redis nesli (erişilemezse None)
+    """
+    _cache.bump_generation()
+    generation = _cache.bump_remote_generation()
+    logger.info("llm_cache_invalidated", reason=reason)
+    return generation
+
+
+def get_corpus_generation() -> Optional[int]:
+    """Worker'lar arası paylaşılan corpus nesli — her doküman yazımında artar.
+
+    Süreç içi indeksler (keyword indeksi) bayatlığı bununla anlar;
+    Redis erişilemezse None.
+    """
+    return _cache.remote_generation()
+
+
+async def semantic_embedding(question: str):
+    """Soru embedding'i (normalize) — embedding servisi yoksa None."""
+    try:
+        import numpy as np
+        from app.rag.embedding_service import EMBEDDINGS_AVAILABLE, get_embedding_service
+        if not EMBEDDINGS_AVAILABLE:
+            return None
+        vec = np.asarray(await get_embedding_service().encode_async(question), dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else None
+    except Exception as e:
+        logger.debug("llm_semantic_embedding_failed", error=str(e))
+        return None
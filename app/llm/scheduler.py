@@ -0,0 +1,288 @@
+"""LLM İstek Zamanlayıcısı (v7.25.00)
+
+Ollama önündeki öncelik sınıflı kuyruk + admission control. Eskiden
+router sınıflandırması, interaktif sohbet, reflection/self-correction,
+agent pipeline alt çağrıları ve arka plan işleri aynı httpx havuzunda
+FIFO yarışıyordu; uzun bir Analiz zinciri kullanıcının kısa sorusunu
+dakikalarca bekletebiliyordu.
+
+Sınıflar (yüksekten düşüğe):
+  interactive  — kullanıcının beklediği ana yanıt (varsayılan)
+  router       — niyet sınıflandırma (kısa, ucuz)
+  enterprise   — reflection, self-correction, agent pipeline alt çağrıları
+  background   — yükleme sırasında görsel açıklama vb.
+
+Kapasite gpu_config'ten türetilir (CPU-only → 1, GPU başına 2 eşzamanlı
+istek) ve LLM_MAX_CONCURRENCY ile ezilebilir. Kapasite ≥ 2 iken enterprise
+en az bir slotu interaktif işlere bırakır; background en fazla 1 slot
+kullanır. Kapasite 1'de (CPU-only varsayılanı) ayrılabilecek slot yoktur:
+enterprise/background yalnızca daha yüksek öncelikli bekleyen yokken
+başlar, ama başladıktan sonra slotu bitene kadar tutar — interaktif istek
+çalışan işin bitmesini bekler (kesme/preemption yok).
+
+Kuyruk bekleme süresi SLO'yu (LLM_QUEUE_SLO_MS) aşarsa zamanlayıcı
+"degraded" moda geçer: background istekleri reddedilir, max_tokens
+küçültülür, engine LLM reflection / self-correction'ı ve router LLM
+sınıflandırmasını atlar.
+
+Kullanım:
+    async with llm_scheduler.slot("router"):
+        response = await client.post(...)
+
+    with llm_priority("enterprise"):
+        await ollama_client.generate(...)   # priority context'ten okunur
+"""
+
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import itertools
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+PRIORITIES = {
+    "interactive": 0,
+    "router": 1,
+    "enterprise": 2,
+    "background": 3,
+}
+DEFAULT_PRIORITY = "interactive"
+
+# 0 → gpu_config'ten otomatik
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "0"))
+# Kuyruk bekleme SLO'su — aşılırsa degraded mod
+LLM_QUEUE_SLO_MS = float(os.environ.get("LLM_QUEUE_SLO_MS", "5000"))
+# Sınıf başına maksimum kuyruk uzunluğu (dolunca istek reddedilir)
+LLM_MAX_QUEUE = {
+    "interactive": int(os.environ.get("LLM_MAX_QUEUE_INTERACTIVE", "64")),
+    "router": int(os.environ.get("LLM_MAX_QUEUE_ROUTER", "32")),
+    "enterprise": int(os.environ.get("LLM_MAX_QUEUE_ENTERPRISE", "32")),
+    "background": int(os.environ.get("LLM_MAX_QUEUE_BACKGROUND", "8")),
+}
+# Degraded modda max_tokens üst sınırları
+LLM_DEGRADED_MAX_TOKENS = {
+    "interactive": 512,
+    "router": 10,
+    "enterprise": 256,
+    "background": 128,
+}
+# p95 bekleme hesabında dikkate alınan pencere
+_WAIT_WINDOW_SECONDS = 60.0
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar(
+    "llm_priority", default=DEFAULT_PRIORITY)
+
+
+class LLMOverloadedError(Exception):
+    """Kuyruk dolu veya degraded modda düşük öncelikli istek reddedildi."""
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+@contextlib.contextmanager
+def llm_priority(priority: str):
+    """Bu blok içindeki generate/stream çağrılarının öncelik sınıfı."""
+    token = _current_priority.set(priority if priority in PRIORITIES else DEFAULT_PRIORITY)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class LLMScheduler:
+    """Öncelik sınıflı, sınıf başına limitli LLM eşzamanlılık kontrolü."""
+
+    def __init__(self, capacity: Optional[int] = None):
+        self._capacity_override = capacity
+        self._running: Dict[str, int] = {c: 0 for c in PRIORITIES}
+        self._queued: Dict[str, int] = {c: 0 for c in PRIORITIES}
+        # (öncelik, sıra) ile sıralı bekleyenler: (prio, seq, cls, future, enqueued_at)
+        self._waiters: list = []
+        self._seq = itertools.count()
+        self._waits: Dict[str, deque] = {c: deque(maxlen=256) for c in PRIORITIES}
+        self._stats: Dict[str, Dict[str, int]] = {
+            c: {"admitted": 0, "shed": 0} for c in PRIORITIES
+        }
+        self._degraded = False
+
+    # ── Kapasite ──
+
+    @property
+    def capacity(self) -> int:
+        if self._capacity_override:
+            return self._capacity_override
+        if LLM_MAX_CONCURRENCY > 0:
+            return LLM_MAX_CONCURRENCY
+        from app.llm.gpu_config import gpu_config
+        if not gpu_config.is_gpu_available or gpu_config.num_gpu == 0:
+            return 1
+        return max(1, gpu_config.gpu_count) * 2
+
+    def class_limit(self, cls: str) -> int:
+        capacity = self.capacity
+        if cls == "background":
+            return 1
+        if cls == "enterprise":
+            # Kapasite 1'de slot ayrılamaz; sıfır limit enterprise'ı hiç çalıştırmazdı
+            return capacity - 1 if capacity > 1 else 1
+        return capacity
+
+    def _can_run(self, cls: str) -> bool:
+        return (sum(self._running.values()) < self.capacity
+                and self._running[cls] < self.class_limit(cls))
+
+    # ── Degradation ──
+
+    def _recent_p95(self) -> float:
+        cutoff = time.monotonic() - _WAIT_WINDOW_SECONDS
+        waits = [w for dq in self._waits.values() for t, w in dq if t >= cutoff]
+        return _percentile(waits, 0.95)
+
+    def _oldest_wait_ms(self) -> float:
+        now = time.monotonic()
+        return max(((now - w[4]) * 1000 for w in self._waiters if not w[3].done()), default=0.0)
+
+    def is_degraded(self) -> bool:
+        """Kuyruk gecikmesi SLO'yu aşıyor mu (en eski bekleyen veya son p95).
+
+        Salt okunur — metrik toplama veya max_tokens kararı durum değiştirmez.
+        """
+        return (self._oldest_wait_ms() > LLM_QUEUE_SLO_MS
+                or self._recent_p95() > LLM_QUEUE_SLO_MS)
+
+    def _update_degraded(self) -> bool:
+        """Degraded durum geçişini kaydet ve logla (acquire/release'ten çağrılır)."""
+        degraded = self.is_degraded()
+        if degraded != self._degraded:
+            self._degraded = degraded
+            logger.warning("llm_scheduler_degraded" if degraded else "llm_scheduler_recovered",
+                           oldest_wait_ms=round(self._oldest_wait_ms(), 1), slo_ms=LLM_QUEUE_SLO_MS)
+        return degraded
+
+    def degrade_max_tokens(self, priority: str, max_tokens: int) -> int:
+        """Degraded modda sınıfa göre küçültülmüş max_tokens."""
+        if not self.is_degraded():
+            return max_tokens
+        return min(max_tokens, LLM_DEGRADED_MAX_TOKENS.get(priority, max_tokens))
+
+    # ── Slot ──
+
+    def _shed(self, cls: str, reason: str):
+        self._stats[cls]["shed"] += 1
+        logger.warning("llm_request_shed", priority=cls, reason=reason,
+                       queued=self._queued[cls])
+        raise LLMOverloadedError(f"LLM kapasitesi dolu ({cls}: {reason})")
+
+    def _record_wait(self, cls: str, wait_ms: float):
+        self._stats[cls]["admitted"] += 1
+        self._waits[cls].append((time.monotonic(), wait_ms))
+
+    async def acquire(self, cls: str = DEFAULT_PRIORITY) -> str:
+        if cls not in PRIORITIES:
+            cls = DEFAULT_PRIORITY
+        prio = PRIORITIES[cls]
+
+        blocked = any(w[0] <= prio and not w[3].done() for w in self._waiters)
+        if not blocked and self._can_run(cls):
+            self._running[cls] += 1
+            self._record_wait(cls, 0.0)
+            return cls
+
+        if self._update_degraded() and cls == "background":
+            self._shed(cls, "degraded")
+        if self._queued[cls] >= LLM_MAX_QUEUE.get(cls, 32):
+            self._shed(cls, "queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        enqueued = time.monotonic()
+        entry = (prio, next(self._seq), cls, future, enqueued)
+        # seq benzersiz olduğu için tuple karşılaştırması future'a ulaşmaz
+        bisect.insort(self._waiters, entry)
+        self._queued[cls] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot verildi ama çağıran iptal edildi → geri bırak
+                self.release(cls)
+            raise
+        finally:
+            self._queued[cls] -= 1
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+        self._record_wait(cls, (time.monotonic() - enqueued) * 1000)
+        return cls
+
+    def release(self, cls: str):
+        self._running[cls] = max(0, self._running[cls] - 1)
+        self._dispatch()
+        self._update_degraded()
+
+    def _dispatch(self):
+        """Boş slotları en yüksek öncelikli, limiti dolmamış bekleyenlere ver."""
+        for entry in list(self._waiters):
+            _, _, cls, future, _ = entry
+            if future.done():
+                self._waiters.remove(entry)
+                continue
+            if sum(self._running.values()) >= self.capacity:
+                break
+            if self._running[cls] < self.class_limit(cls):
+                self._running[cls] += 1
+                self._waiters.remove(entry)
+                future.set_result(True)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: Optional[str] = None):
+        cls = await self.acquire(priority or current_priority())
+        try:
+            yield cls
+        finally:
+            self.release(cls)
+
+    # ── Metrikler ──
+
+    def stats(self) -> dict:
+        cutoff = time.monotonic() - _WAIT_WINDOW_SECONDS
+        classes = {}
+        for cls in PRIORITIES:
+            waits = [w for t, w in self._waits[cls] if t >= cutoff]
+            classes[cls] = {
+                "running": self._running[cls],
+                "queued": self._queued[cls],
+                "limit": self.class_limit(cls),
+                "admitted": self._stats[cls]["admitted"],
+                "shed": self._stats[cls]["shed"],
+                "wait_p50_ms": round(_percentile(waits, 0.50), 1),
+                "wait_p95_ms": round(_percentile(waits, 0.95), 1),
+            }
+        return {
+            "capacity": self.capacity,
+            "slo_ms": LLM_QUEUE_SLO_MS,
+            "degraded": self.is_degraded(),
+            "classes": classes,
+        }
+
+
+llm_scheduler = LLMScheduler()
+
+
+def get_llm_scheduler_stats() -> dict:
+    """Zamanlayıcı metrikleri (metrics dashboard için)."""
+    return llm_scheduler.stats()
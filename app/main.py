@@ -3,6 +3,7 @@ Kurumsal AI Asistanı - FastAPI Ana Uygulama
 
 Local LLM (GPT-OSS-20B) + Öğrenen Vektör Hafıza + JWT Auth
 """
+import time
 import uuid
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
@@ -16,6 +17,7 @@ from app.config import APP_VERSION
 from app.db.database import engine, init_db
 from app.db.models import Base
 from app.api.routes import auth, ask, admin, documents, multimodal, memory, analyze, export, backup, metrics
+from app.core.monitoring import metrics_collector, rollup_store
 
 # Rate Limiting
 try:
@@ -51,17 +53,35 @@ class CorrelationIDMiddleware(BaseHTTPMiddleware):
 
 
 # ── Metrics Middleware ──
+def _route_template(scope: dict) -> str:
+    """İsteğin route şablonu (/api/documents/{source}) — eşleşme yoksa "unmatched".
+
+    Yeni FastAPI sürümlerinde include_router rotaları prefix'siz tutulur;
+    tam şablon effective_route_context'tedir.
+    """
+    context = (scope.get("fastapi") or {}).get("effective_route_context")
+    route = scope.get("route")
+    return (getattr(context, "path_format", None)
+            or getattr(route, "path_format", None)
+            or getattr(route, "path", None)
+            or "unmatched")
+
+
 class MetricsMiddleware(BaseHTTPMiddleware):
-    """Her isteğin süresini ve durumunu metrik olarak kaydet"""
+    """Her isteğin süresini ve durumunu metrik olarak kaydet
+
+    v7.41.00: Etiket ham path değil route şablonu (/api/documents/{source});
+    eşleşmeyen istekler tek "unmatched" serisine düşer.
+    v7.42.00: Aynı kayıt monitoring rollup'larına da yazılır (SLA / telemetri).
+    """
     async def dispatch(self, request: Request, call_next):
-        import time as _time
-        start = _time.time()
+        start = time.perf_counter()
         response = await call_next(request)
-        duration = _time.time() - start
+        duration = time.perf_counter() - start
         try:
-            from app.api.routes.metrics import record_request
-            path = request.url.path
-            record_request(path, response.status_code, duration)
+            route = _route_template(request.scope)
+            metrics.record_request(route, response.status_code, duration, request.method)
+            metrics_collector.record_request(route, request.method, response.status_code, duration * 1000)
         except Exception:
             pass
         return response
@@ -238,13 +258,31 @@ async def lifespan(app: FastAPI):
 
     hw_task = asyncio.create_task(_hardware_monitor())
 
+    # ── Doküman yükleme kuyruğu (v7.32.00) — yarım kalan job'lar devam eder ──
+    from app.core.ingest_jobs import get_ingest_queue
+    try:
+        await get_ingest_queue().start()
+    except Exception as e:
+        logger.warning("ingest_queue_start_failed", error=str(e))
+
     yield
     
     # Shutdown — kaynakları temizle
     logger.info("app_shutting_down")
     hw_task.cancel()
+    await get_ingest_queue().stop()
+    from app.core.pdf_ocr import shutdown_ocr_pool
+    shutdown_ocr_pool()
+    from app.core.event_bus import event_bus
+    event_bus.close()
+    rollup_store.flush()
     from app.llm.client import ollama_client
     await ollama_client.close()
+    try:
+        from app.rag.vector_store import shutdown_rag_executor
+        shutdown_rag_executor()
+    except ImportError:
+        pass
     await engine.dispose()
 
 
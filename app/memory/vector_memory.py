@@ -16,12 +16,9 @@ except ImportError:
     CHROMADB_AVAILABLE = False
     logger.warning("chromadb_not_installed", message="ChromaDB is not installed. Using in-memory fallback.")
 
-# Sentence Transformers for embeddings
-try:
-    from sentence_transformers import SentenceTransformer
-    EMBEDDINGS_AVAILABLE = True
-except ImportError:
-    EMBEDDINGS_AVAILABLE = False
+# Embeddings — v7.21.00: RAG ile paylaşılan tek model (app.rag.embedding_service)
+from app.rag.embedding_service import EMBEDDINGS_AVAILABLE, EMBEDDING_MODEL, get_embedding_service
+if not EMBEDDINGS_AVAILABLE:
     logger.warning("sentence_transformers_not_installed", message="SentenceTransformers not installed. Using ChromaDB's default.")
 
 
@@ -62,14 +59,9 @@ class VectorMemory:
                 metadata={"description": "Kurumsal AI Asistanı Hafıza Koleksiyonu"}
             )
             
-            # Embedding model — RAG ile aynı modeli kullan (Türkçe destekli)
+            # Embedding model — RAG ile aynı paylaşılan servis (ayrı kopya yüklenmez)
             if EMBEDDINGS_AVAILABLE:
-                try:
-                    self._embedding_model = SentenceTransformer('sentence-transformers/paraphrase-multilingual-mpnet-base-v2')
-                    logger.info("embedding_model_loaded", model="paraphrase-multilingual-mpnet-base-v2")
-                except Exception as e:
-                    logger.warning("embedding_model_failed", error=str(e))
-                    self._embedding_model = None
+                self._embedding_model = get_embedding_service()
             
             logger.info(
                 "chromadb_initialized",
@@ -298,7 +290,7 @@ class VectorMemory:
                     "total_entries": count,
                     "by_department": departments,
                     "persist_directory": self.persist_directory,
-                    "embedding_model": "paraphrase-multilingual-mpnet-base-v2" if self._embedding_model else "chromadb_default",
+                    "embedding_model": EMBEDDING_MODEL if self._embedding_model else "chromadb_default",
                 }
             except Exception as e:
                 logger.error("chromadb_stats_failed", error=str(e))
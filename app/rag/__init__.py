@@ -2,6 +2,8 @@
 from app.rag.vector_store import (
     add_document,
     search_documents,
+    async_search_documents,
+    async_agentic_search,
     get_stats,
     delete_document,
     clear_all_documents,
@@ -10,6 +12,8 @@ from app.rag.vector_store import (
 __all__ = [
     "add_document",
     "search_documents", 
+    "async_search_documents",
+    "async_agentic_search",
     "get_stats",
     "delete_document",
     "clear_all_documents",
@@ -0,0 +1,384 @@
+"""Paylaşılan Embedding Servisi (v7.21.00)
+
+Süreç genelinde TEK embedding modeli. Daha önce RAG (vector_store),
+semantik hafıza (vector_memory) ve fine-tune scripti
+paraphrase-multilingual-mpnet-base-v2'nin ayrı kopyalarını yüklüyordu;
+gunicorn altında her worker bunu iki kez ödüyordu.
+
+Özellikler:
+- Lazy loading: model ilk encode çağrısında bir kez yüklenir
+- Micro-batching: farklı thread'lerden gelen eşzamanlı küçük encode
+  çağrıları (RAG arama, hafıza yazma, bilgi çıkarma) kısa bir pencere
+  içinde toplanıp tek forward pass'te işlenir
+- Cache: encode edilen her metin önce iki katmanlı embedding cache'te
+  (app.cache.embedding_cache — LRU + Redis) aranır, yalnızca eksikler
+  modele gider
+- Out-of-process mod: EMBEDDING_SERVICE_URL ayarlıysa worker'lar modeli
+  yüklemez, tek bir embedding sunucusuna HTTP ile bağlanır. Sunucu:
+
+      python -m app.rag.embedding_service --serve --port 8011
+
+`encode()` imzası SentenceTransformer ile uyumludur (str → 1-D, liste →
+2-D numpy dizisi, normalize_embeddings); mevcut `model.encode(...)`
+çağrıları değişmeden çalışır. Desteklenmeyen seçenekler sessizce yok
+sayılmaz, TypeError verir.
+
+Uzak sunucuya ulaşılamazsa süreç geçici olarak yerel modele düşer ve
+EMBEDDING_REMOTE_RETRY_SECONDS sonra sunucuyu yeniden dener.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Union
+
+import structlog
+
+logger = structlog.get_logger()
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+# Embedding modeli (Türkçe destekli, PRO seviye)
+EMBEDDING_MODEL = os.environ.get(
+    "EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+)
+
+# Micro-batch penceresi: ilk istekten sonra en fazla bu kadar beklenir
+EMBEDDING_BATCH_WAIT_MS = float(os.environ.get("EMBEDDING_BATCH_WAIT_MS", "5"))
+# Tek forward pass'te birleştirilecek maksimum metin sayısı
+EMBEDDING_MAX_BATCH = int(os.environ.get("EMBEDDING_MAX_BATCH", "64"))
+# Out-of-process mod — boşsa model bu süreçte yüklenir
+EMBEDDING_SERVICE_URL = os.environ.get("EMBEDDING_SERVICE_URL", "").rstrip("/")
+# Uzak sunucu hatası sonrası yerel modelde kalınacak süre
+EMBEDDING_REMOTE_RETRY_SECONDS = float(os.environ.get("EMBEDDING_REMOTE_RETRY_SECONDS", "60"))
+
+EMBEDDINGS_AVAILABLE = SENTENCE_TRANSFORMERS_AVAILABLE or bool(EMBEDDING_SERVICE_URL)
+
+
+class EmbeddingService:
+    """Lazy-load edilen, micro-batching yapan paylaşılan embedding modeli."""
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL,
+        max_batch: int = EMBEDDING_MAX_BATCH,
+        batch_wait_ms: float = EMBEDDING_BATCH_WAIT_MS,
+        remote_url: str = EMBEDDING_SERVICE_URL,
+        cache=None,
+        use_cache: bool = True,
+    ):
+        self.model_name = model_name
+        self.max_batch = max(1, max_batch)
+        self.batch_wait = max(0.0, batch_wait_ms) / 1000
+        self.remote_url = remote_url
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        # Uzak sunucu hatası sonrası bu zamana kadar yerel modele düşülür
+        self._remote_retry_at = 0.0
+        if cache is None and use_cache:
+            from app.cache.embedding_cache import get_embedding_cache
+            cache = get_embedding_cache()
+        self.cache = cache
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "texts": 0,
+            "forward_passes": 0,
+            "coalesced_requests": 0,
+            "encode_ms_sum": 0.0,
+            "remote_requests": 0,
+            "remote_errors": 0,
+        }
+
+    # ── Model ──
+
+    def is_available(self) -> bool:
+        return bool(self.remote_url) or SENTENCE_TRANSFORMERS_AVAILABLE
+
+    def _use_remote(self) -> bool:
+        return bool(self.remote_url) and time.monotonic() >= self._remote_retry_at
+
+    @property
+    def model_loaded(self) -> bool:
+        return self._model is not None
+
+    def get_model(self):
+        """Yerel SentenceTransformer modelini yükler (lazy, thread-safe)."""
+        if self._model is None and SENTENCE_TRANSFORMERS_AVAILABLE:
+            with self._load_lock:
+                if self._model is None:
+                    logger.info("loading_embedding_model", model=self.model_name)
+                    _t = time.perf_counter()
+                    self._model = SentenceTransformer(self.model_name)
+                    logger.info("embedding_model_loaded", model=self.model_name,
+                                load_ms=round((time.perf_counter() - _t) * 1000, 1))
+        return self._model
+
+    # ── Encode ──
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: Optional[int] = None,
+        show_progress_bar: bool = False,
+        normalize_embeddings: bool = False,
+    ):
+        """SentenceTransformer.encode uyumlu encode — str → 1-D, liste → 2-D.
+
+        Cache ham vektörleri tutar; normalize_embeddings çıktıya uygulanır.
+        """
+        import numpy as np
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["texts"] += len(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        cached = self.cache.get_many(self.model_name, texts) if self.cache else {}
+        if len(cached) == len(texts):
+            vectors = np.stack([cached[i] for i in range(len(texts))])
+            if normalize_embeddings:
+                vectors = _normalize(vectors)
+            return vectors[0] if single else vectors
+
+        # Aynı istekte tekrar eden metinler bir kez encode edilir
+        pending: dict = {}
+        for i, t in enumerate(texts):
+            if i not in cached:
+                pending.setdefault(t, []).append(i)
+        computed = self._compute(list(pending), batch_size)
+        if self.cache:
+            self.cache.set_many(self.model_name, list(pending), computed)
+
+        vectors = np.empty((len(texts), computed.shape[1]), dtype=np.float32)
+        for i, vec in cached.items():
+            vectors[i] = vec
+        for row, indices in enumerate(pending.values()):
+            vectors[indices] = computed[row]
+        if normalize_embeddings:
+            vectors = _normalize(vectors)
+        return vectors[0] if single else vectors
+
+    def _compute(self, texts: List[str], batch_size: Optional[int] = None):
+        """Cache'te olmayan metinleri uzak sunucu, doğrudan model veya batcher ile encode et."""
+        if self._use_remote():
+            return self._encode_remote(texts)
+        if len(texts) >= self.max_batch or threading.current_thread() is self._worker:
+            # Büyük işler (doküman yükleme) kuyruğu beklemeden doğrudan
+            return self._encode_local(texts, batch_size)
+        future: Future = Future()
+        self._queue.put((texts, future))
+        self._ensure_worker()
+        return future.result()
+
+    def _encode_local(self, texts: List[str], batch_size: Optional[int] = None):
+        import numpy as np
+
+        model = self.get_model()
+        if model is None:
+            raise RuntimeError("embedding modeli kullanılamıyor")
+        _t = time.perf_counter()
+        vectors = np.asarray(
+            model.encode(texts, batch_size=batch_size or 32, show_progress_bar=False),
+            dtype=np.float32,
+        )
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        with self._stats_lock:
+            self._stats["forward_passes"] += 1
+            self._stats["encode_ms_sum"] += (time.perf_counter() - _t) * 1000
+        return vectors
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._batch_loop, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _batch_loop(self):
+        """Kuyruktaki istekleri pencere boyunca topla, tek forward pass'te işle."""
+        while True:
+            texts, future = self._queue.get()
+            batch = [(texts, future)]
+            total = len(texts)
+            deadline = time.monotonic() + self.batch_wait
+            while total < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                total += len(item[0])
+
+            all_texts = [t for item_texts, _ in batch for t in item_texts]
+            try:
+                vectors = self._encode_local(all_texts)
+            except Exception as e:
+                for _, f in batch:
+                    f.set_exception(e)
+                continue
+
+            if len(batch) > 1:
+                with self._stats_lock:
+                    self._stats["coalesced_requests"] += len(batch)
+            offset = 0
+            for item_texts, f in batch:
+                f.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+    def _encode_remote(self, texts: List[str]):
+        """Paylaşılan embedding sunucusundan vektör al (float32 binary yanıt)."""
+        import httpx
+        import numpy as np
+
+        try:
+            with self._stats_lock:
+                self._stats["remote_requests"] += 1
+            resp = httpx.post(f"{self.remote_url}/encode", json={"texts": texts}, timeout=30.0)
+            resp.raise_for_status()
+            dim = int(resp.headers["X-Embedding-Dim"])
+            return np.frombuffer(resp.content, dtype=np.float32).reshape(len(texts), dim)
+        except Exception as e:
+            with self._stats_lock:
+                self._stats["remote_errors"] += 1
+            if not SENTENCE_TRANSFORMERS_AVAILABLE:
+                raise
+            # Sunucuya ulaşılamıyorsa bir süre yerel modele düş, sonra tekrar dene
+            self._remote_retry_at = time.monotonic() + EMBEDDING_REMOTE_RETRY_SECONDS
+            logger.warning("embedding_service_remote_failed", url=self.remote_url,
+                           error=str(e), fallback="local",
+                           retry_in_s=EMBEDDING_REMOTE_RETRY_SECONDS)
+            return self._encode_local(texts)
+
+    async def encode_async(self, sentences: Union[str, List[str]], **kwargs):
+        """Event loop'u bloklamadan encode."""
+        import asyncio
+        return await asyncio.to_thread(self.encode, sentences, **kwargs)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            s = dict(self._stats)
+        return {
+            "model": self.model_name,
+            "mode": "remote" if self._use_remote() else "local",
+            "model_loaded": self.model_loaded,
+            "queue_depth": self._queue.qsize(),
+            "requests": s["requests"],
+            "texts": s["texts"],
+            "forward_passes": s["forward_passes"],
+            "coalesced_requests": s["coalesced_requests"],
+            "avg_texts_per_pass": round(s["texts"] / s["forward_passes"], 2) if s["forward_passes"] else 0,
+            "avg_encode_ms": round(s["encode_ms_sum"] / s["forward_passes"], 2) if s["forward_passes"] else 0,
+            "remote_requests": s["remote_requests"],
+            "remote_errors": s["remote_errors"],
+        }
+
+
+def _normalize(vectors):
+    import numpy as np
+
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+_service: Optional[EmbeddingService] = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Süreç genelindeki embedding servisi (singleton)."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = EmbeddingService()
+    return _service
+
+
+def get_embedding_service_stats() -> dict:
+    """Embedding servisi metrikleri (metrics dashboard için)."""
+    if _service is None:
+        return {"model": EMBEDDING_MODEL, "model_loaded": False, "requests": 0}
+    return _service.stats()
+
+
+# ══════════════════════════════════════════════════════════════
+# Out-of-process sunucu — N worker tek modeli paylaşır
+# ══════════════════════════════════════════════════════════════
+
+def serve(host: str = "127.0.0.1", port: int = 8011):
+    """Basit HTTP embedding sunucusu: POST /encode {"texts": [...]} → float32."""
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    # Sunucu her zaman yerel modeli kullanır
+    service = EmbeddingService(remote_url="")
+    service.get_model()
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/encode":
+                self.send_error(404)
+                return
+            try:
+                length = int(self.headers.get("Content-Length", "0"))
+                texts = json.loads(self.rfile.read(length))["texts"]
+                vectors = service.encode(list(texts))
+            except Exception as e:
+                self.send_error(400, str(e))
+                return
+            body = vectors.astype("float32").tobytes()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("X-Embedding-Dim", str(vectors.shape[1] if vectors.ndim == 2 else 0))
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            body = json.dumps(service.stats()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    logger.info("embedding_service_listening", host=host, port=port, model=service.model_name)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Paylaşılan embedding sunucusu")
+    parser.add_argument("--serve", action="store_true", help="HTTP sunucusunu başlat")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8011)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.host, args.port)
+    else:
+        parser.print_help()
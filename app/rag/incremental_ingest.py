@@ -0,0 +1,180 @@
+"""Artımlı Doküman Yeniden Yükleme (v7.34.00)
+
+Revize edilmiş bir doküman add_document'a tekrar verildiğinde eskiden
+bütün chunk'lar yeniden embed ediliyor, `{source}_{i}` ID'leri zaten var
+olduğu için Chroma yeni içeriği yok sayıyor, kısalan dokümanın kuyruk
+chunk'ları da indekste kalıyordu.
+
+- Chunk metninin hash'i metadata'da (`chunk_hash`) tutulur; yeniden
+  yüklemede yalnızca yeni/değişen chunk'lar embed edilir, değişmeyenler
+  atlanır, kaybolanlar silinir. Yeri değişen chunk'ın embedding'i
+  koleksiyondan okunur (yeniden hesaplanmaz).
+- Kaynak başına manifest (RAG_MANIFEST_DIR): doküman hash'i ve metadata
+  parmak izi aynıysa Chroma'ya hiç dokunulmaz — gece senkronizasyonunda
+  değişmeyen dokümanların maliyeti bir dosya okuması.
+- chunk_document: metin önce içerikten belirlenen satır sınırlarında
+  bloklara ayrılır (satır hash'i ile), her blok chunk_text ile bölünür.
+  Bir paragraf değişince yalnızca onun bloğunun chunk'ları değişir;
+  sonraki blokların sınırları kaymaz.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+RAG_MANIFEST_DIR = Path(os.environ.get("RAG_MANIFEST_DIR", "data/rag_manifests"))
+
+# Blok hedef boyutu chunk_size'ın katı olarak — ortalama blok ≈ 3 chunk
+_BLOCK_AVG_CHUNKS = 3
+_BLOCK_MAX_CHUNKS = 8
+
+_LINE_RE = re.compile(r'[^\n]*\n|[^\n]+$')
+
+# Manifest formatı değişirse eski manifest'ler yok sayılır
+_MANIFEST_VERSION = 1
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+
+
+def chunk_hash(text: str) -> str:
+    """Chunk kimliği — metadata'da saklanır (Chroma metadata değeri str)."""
+    return hashlib.blake2b(text.encode("utf-8", errors="replace"), digest_size=16).hexdigest()
+
+
+def metadata_fingerprint(doc_type: str, metadata: Optional[dict]) -> str:
+    """Zaman damgaları hariç metadata özeti — departman/yazar değişimi algılanır."""
+    stable = {k: v for k, v in (metadata or {}).items() if k not in ("created_at", "updated_at")}
+    payload = json.dumps({"type": doc_type, **stable}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _is_block_boundary(line: str, avg_chars: int, block_chars: int) -> bool:
+    """Satır hash'i ile olasılıksal sınır — olasılık satır uzunluğuyla orantılı.
+
+    Karar satırın kendi içeriğine (ve bloğun o ana kadarki boyutuna) bağlı;
+    öncesindeki değişiklikler en geç bir sonraki sınırda söner
+    (content-defined chunking). Ortalamanın altında olasılık düşük, üstünde
+    yüksek tutulur — blok boyutları ortalama etrafında toplanır.
+    """
+    stripped = line.strip()
+    if not stripped:
+        return False
+    h = int.from_bytes(hashlib.blake2b(stripped.encode("utf-8", errors="replace"),
+                                       digest_size=4).digest(), "big")
+    scale = 0.5 if block_chars < avg_chars else 2.0
+    return h < min(1.0, scale * len(line) / avg_chars) * 0xFFFFFFFF
+
+
+def split_blocks(text: str, chunk_size: int = 2000) -> List[str]:
+    """Metni içerikten belirlenen satır sınırlarında bloklara ayır ("".join → text)."""
+    min_chars = chunk_size
+    avg_chars = chunk_size * _BLOCK_AVG_CHUNKS
+    max_chars = chunk_size * _BLOCK_MAX_CHUNKS
+
+    blocks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in _LINE_RE.findall(text):
+        current.append(line)
+        size += len(line)
+        if size >= max_chars or (size >= min_chars and _is_block_boundary(line, avg_chars, size)):
+            blocks.append("".join(current))
+            current, size = [], 0
+    if current:
+        blocks.append("".join(current))
+    return blocks
+
+
+def chunk_document(text: str, chunk_size: int = 2000, overlap: int = 300) -> List[str]:
+    """add_document'ın chunk'lama adımı — blok bazında chunk_text.
+
+    Kısa dokümanlar (tek blok) chunk_text ile birebir aynı sonucu verir.
+    """
+    from app.rag.vector_store import chunk_text
+
+    blocks = [b for b in split_blocks(text, chunk_size) if b.strip()]
+    if len(blocks) <= 1:
+        return chunk_text(text, chunk_size=chunk_size, overlap=overlap)
+    chunks: List[str] = []
+    for block in blocks:
+        chunks.extend(c for c in chunk_text(block, chunk_size=chunk_size, overlap=overlap) if c)
+    return chunks
+
+
+class IngestManifestStore:
+    """Kaynak başına manifest — koleksiyon/kaynak adının hash'i ile JSON dosyası."""
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root is not None else RAG_MANIFEST_DIR
+
+    def _path(self, collection_name: str, source: str) -> Path:
+        name = hashlib.sha1(source.encode("utf-8", errors="replace")).hexdigest()
+        return self.root / collection_name / f"{name}.json"
+
+    def load(self, collection_name: str, source: str) -> Optional[dict]:
+        try:
+            with open(self._path(collection_name, source), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != _MANIFEST_VERSION or manifest.get("source") != source:
+            return None
+        return manifest
+
+    def save(self, collection_name: str, source: str, doc_hash: str, meta_fp: str,
+             chunk_hashes: List[str]):
+        path = self._path(collection_name, source)
+        manifest = {
+            "version": _MANIFEST_VERSION,
+            "source": source,
+            "content_hash": doc_hash,
+            "metadata_fp": meta_fp,
+            "chunks": chunk_hashes,
+            "updated_at": time.time(),
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("rag_manifest_write_failed", source=source, error=str(e))
+
+    def delete(self, collection_name: str, source: str):
+        try:
+            self._path(collection_name, source).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("rag_manifest_delete_failed", source=source, error=str(e))
+
+    def clear(self, collection_name: str):
+        directory = self.root / collection_name
+        if not directory.is_dir():
+            return
+        for path in directory.glob("*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+_store: Optional[IngestManifestStore] = None
+
+
+def get_manifest_store() -> IngestManifestStore:
+    global _store
+    if _store is None:
+        _store = IngestManifestStore()
+    return _store
@@ -0,0 +1,260 @@
+"""Keyword / Entity Ters İndeksi (v7.19.00)
+
+search_documents'ın keyword tamamlayıcı araması için chunk metinleri
+üzerinde bellek içi ters indeks. Eskiden her soru için bigram × Türkçe
+büyük harf varyantı + entity kelimeleri başına ayrı bir
+`collection.query(where_document={"$contains": ...})` çağrısı yapılıyor,
+her biri koleksiyonu baştan tarıyordu. İndeks, `_normalize_tr` ile
+katlanmış kelimeleri chunk ID'lerine eşler; bir sorgunun tüm phrase ve
+entity aramaları tek geçişte indeksten cevaplanır.
+
+İndeks add_document / delete_document sırasında güncellenir. Süreç
+başlangıcında (veya başka bir worker koleksiyona yazdığında) ilk
+aramada koleksiyondan bir kez yeniden kurulur. Bayatlık, her doküman
+yazımında artan paylaşılan corpus nesliyle (Redis, response_cache)
+anlaşılır: indeks kurulduğu nesli saklar; bu süreçteki yazma nesli tek
+adım ilerletirse indeks zaten günceldir, aradaki başka bir artış başka
+bir worker'ın yazdığı anlamına gelir. Redis erişilemezse
+`collection.count()` indekslenen sayıyla karşılaştırılır (aynı sayıda
+chunk'ın değiştiği yazmaları kaçırır).
+"""
+
+import bisect
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+import structlog
+
+from app.rag.vector_store import _normalize_tr
+
+logger = structlog.get_logger()
+
+_WORD_RE = re.compile(r'\w+')
+
+# Yeniden kurulumda koleksiyondan sayfa sayfa okunacak chunk sayısı
+REBUILD_PAGE_SIZE = 1000
+
+# Prefix (Türkçe ek) eşleşmesi için minimum kelime uzunluğu —
+# search_documents'taki "5+ karakter substring" kuralı ile aynı
+PREFIX_MATCH_MIN_LEN = 5
+
+
+def _corpus_generation() -> Optional[int]:
+    try:
+        from app.llm.response_cache import get_corpus_generation
+        return get_corpus_generation()
+    except Exception as e:
+        logger.debug("keyword_index_generation_unavailable", error=str(e))
+        return None
+
+
+def tokenize(text: str) -> List[str]:
+    """Türkçe-aware normalizasyon + kelime sınırı ile token listesi."""
+    return _WORD_RE.findall(_normalize_tr(text or ""))
+
+
+class KeywordIndex:
+    """Tek bir Chroma koleksiyonu için token → chunk ID ters indeksi."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._doc_terms: Dict[int, Set[str]] = {}
+        self._id_to_int: Dict[str, int] = {}
+        self._int_to_id: Dict[int, str] = {}
+        self._next_int = 0
+        self._sorted_terms: Optional[List[str]] = None
+        self._synced_count = -1
+        self._synced_generation: Optional[int] = None
+        self.rebuilds = 0
+        self.lookups = 0
+
+    # ── Yazma ──
+
+    def _intern(self, doc_id: str) -> int:
+        key = self._id_to_int.get(doc_id)
+        if key is None:
+            key = self._next_int
+            self._next_int += 1
+            self._id_to_int[doc_id] = key
+            self._int_to_id[key] = doc_id
+        return key
+
+    def _add_locked(self, doc_id: str, text: str) -> bool:
+        key = self._intern(doc_id)
+        old_terms = self._doc_terms.get(key)
+        if old_terms is not None:
+            for term in old_terms:
+                self._postings[term].discard(key)
+        terms = set(tokenize(text))
+        self._doc_terms[key] = terms
+        for term in terms:
+            self._postings[term].add(key)
+        self._sorted_terms = None
+        return old_terms is None
+
+    def add(self, ids: Iterable[str], texts: Iterable[str]):
+        """Yeni chunk'ları indekse ekle (add_document'tan çağrılır)."""
+        with self._lock:
+            added = 0
+            for doc_id, text in zip(ids, texts):
+                added += self._add_locked(doc_id, text)
+            if self._synced_count >= 0:
+                self._synced_count += added
+
+    def note_generation(self, generation: Optional[int]):
+        """Bu süreçteki yazmanın ürettiği corpus nesli (invalidate_llm_cache'ten).
+
+        Nesil indeksin kurulduğu nesilden tam bir fazlaysa araya başka
+        yazma girmemiştir — indeks güncel kalır, yeniden kurulmaz.
+        """
+        with self._lock:
+            if (generation is not None and self._synced_generation is not None
+                    and generation == self._synced_generation + 1):
+                self._synced_generation = generation
+
+    def remove(self, ids: Iterable[str]):
+        """Silinen chunk'ları indeksten çıkar."""
+        with self._lock:
+            removed = 0
+            for doc_id in ids:
+                key = self._id_to_int.pop(doc_id, None)
+                if key is None:
+                    continue
+                self._int_to_id.pop(key, None)
+                for term in self._doc_terms.pop(key, ()):
+                    posting = self._postings.get(term)
+                    if posting is not None:
+                        posting.discard(key)
+                        if not posting:
+                            del self._postings[term]
+                removed += 1
+            if removed:
+                self._sorted_terms = None
+            if self._synced_count >= 0:
+                self._synced_count = max(0, self._synced_count - removed)
+
+    def clear(self):
+        """İndeksi tamamen boşalt — bir sonraki aramada yeniden kurulur."""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._id_to_int.clear()
+            self._int_to_id.clear()
+            self._sorted_terms = None
+            self._synced_count = -1
+            self._synced_generation = None
+
+    def _is_current(self, generation: int) -> bool:
+        with self._lock:
+            return self._synced_count >= 0 and generation == self._synced_generation
+
+    def ensure_synced(self, collection) -> bool:
+        """Corpus nesli (yoksa koleksiyon sayısı) değiştiyse koleksiyondan yeniden kur."""
+        generation = _corpus_generation()
+        if generation is not None and self._is_current(generation):
+            return True
+        try:
+            count = collection.count()
+        except Exception as e:
+            logger.debug("keyword_index_count_failed", index=self.name, error=str(e))
+            return self._synced_count >= 0
+        with self._lock:
+            if generation is None and count == self._synced_count:
+                return True
+            if generation is not None and self._is_current(generation):
+                return True  # Kilit beklenirken başka bir istek kurdu
+            self.clear()
+            offset = 0
+            try:
+                while offset < count:
+                    page = collection.get(include=["documents"],
+                                          limit=REBUILD_PAGE_SIZE, offset=offset)
+                    page_ids = (page or {}).get("ids") or []
+                    if not page_ids:
+                        break
+                    for doc_id, text in zip(page_ids, page.get("documents") or []):
+                        self._add_locked(doc_id, text or "")
+                    offset += len(page_ids)
+            except Exception as e:
+                logger.warning("keyword_index_rebuild_failed", index=self.name, error=str(e))
+                self.clear()
+                return False
+            self._synced_count = count
+            # Kurulum sırasında gelen yazma nesli yine ilerletir → sonraki aramada yeniden kurulur
+            self._synced_generation = generation
+            self.rebuilds += 1
+            logger.info("keyword_index_rebuilt", index=self.name,
+                        chunks=len(self._doc_terms), terms=len(self._postings))
+            return True
+
+    # ── Okuma ──
+
+    def _term_postings(self, term: str) -> Set[int]:
+        """Tek terimin posting kümesi; 5+ karakterde Türkçe ekli biçimler de dahil."""
+        if len(term) < PREFIX_MATCH_MIN_LEN:
+            return set(self._postings.get(term, ()))
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        result: Set[int] = set()
+        i = bisect.bisect_left(self._sorted_terms, term)
+        while i < len(self._sorted_terms) and self._sorted_terms[i].startswith(term):
+            result |= self._postings[self._sorted_terms[i]]
+            i += 1
+        return result
+
+    def lookup(self, text: str) -> Set[str]:
+        """Metindeki tüm token'ları içeren chunk ID'leri (phrase veya tek kelime).
+
+        Çok kelimeli ifadelerde sonuç adaydır — bitişiklik çağıran tarafta
+        chunk metni üzerinden doğrulanır.
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return set()
+        with self._lock:
+            self.lookups += 1
+            # En seçici (en kısa) posting'den başlayarak kesiştir
+            postings = sorted((self._term_postings(t) for t in set(tokens)), key=len)
+            result = postings[0]
+            for p in postings[1:]:
+                result = result & p
+                if not result:
+                    break
+            return {self._int_to_id[k] for k in result if k in self._int_to_id}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "chunks": len(self._doc_terms),
+                "terms": len(self._postings),
+                "synced_count": self._synced_count,
+                "synced_generation": self._synced_generation,
+                "rebuilds": self.rebuilds,
+                "lookups": self.lookups,
+            }
+
+
+_indexes: Dict[str, KeywordIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_keyword_index(name: str) -> KeywordIndex:
+    """Koleksiyon adına göre indeks singleton'ı."""
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = KeywordIndex(name)
+            _indexes[name] = index
+        return index
+
+
+def get_keyword_index_stats() -> List[dict]:
+    """Tüm indekslerin istatistikleri (metrics dashboard için)."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    return [idx.stats() for idx in indexes]
@@ -0,0 +1,228 @@
+"""Cross-Encoder Re-Ranking Servisi (v7.36.00)
+
+Eskiden `_cross_encoder_rerank` her aramada tüm (soru, chunk) çiftlerini
+istek thread'inde `CrossEncoder.predict` ile skorluyordu; agentic_search
+5 alt sorguya kadar 5 ayrı batch çalıştırıyor, çoğu aynı chunk'ları
+tekrar skorluyordu.
+
+- Çift skor cache'i: (soru hash'i, chunk içerik hash'i) → skor, LRU
+  (RERANK_CACHE_SIZE). Aynı soru tekrarlandığında veya alt sorgular aynı
+  chunk'ları getirdiğinde model çalışmaz.
+- Tek batch: aynı çağrıdaki tekrar eden çiftler bir kez skorlanır;
+  agentic_search alt sorgu adaylarını birleştirip orijinal soruya karşı
+  tek rerank yapar (alt sorgu sayısı artsa da maliyet sabit).
+- Zaman bütçesi: RERANK_TIME_BUDGET_MS dolunca kalan adaylar skorlanmaz,
+  hybrid skorlarıyla kalır. Adaylar hybrid sırasıyla geldiği için kesilen
+  kısım listenin kuyruğudur.
+- RERANK_BACKEND=onnx: sentence-transformers'ın ONNX Runtime backend'i
+  (RERANK_ONNX_FILE ile quantize model, ör. onnx/model_qint8_avx512.onnx).
+  Yüklenemezse torch'a düşülür.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+try:
+    from sentence_transformers import CrossEncoder
+    CROSS_ENCODER_AVAILABLE = True
+except ImportError:
+    CROSS_ENCODER_AVAILABLE = False
+
+CROSS_ENCODER_MODEL = os.environ.get(
+    "CROSS_ENCODER_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"  # v4.4.0: Türkçe/çok dilli model
+)
+# torch | onnx
+RERANK_BACKEND = os.environ.get("RERANK_BACKEND", "torch").lower()
+RERANK_ONNX_FILE = os.environ.get("RERANK_ONNX_FILE", "")
+RERANK_CACHE_SIZE = int(os.environ.get("RERANK_CACHE_SIZE", "20000"))
+RERANK_BATCH_SIZE = int(os.environ.get("RERANK_BATCH_SIZE", "16"))
+# Tek aramada rerank'e ayrılan süre — 0 = sınırsız
+RERANK_TIME_BUDGET_MS = float(os.environ.get("RERANK_TIME_BUDGET_MS", "400"))
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8", errors="replace"), digest_size=12).hexdigest()
+
+
+class RerankService:
+    """Lazy-load edilen cross-encoder + çift skor LRU cache'i."""
+
+    def __init__(
+        self,
+        model_name: str = CROSS_ENCODER_MODEL,
+        backend: str = RERANK_BACKEND,
+        cache_size: int = RERANK_CACHE_SIZE,
+        batch_size: int = RERANK_BATCH_SIZE,
+        time_budget_ms: float = RERANK_TIME_BUDGET_MS,
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.cache_size = max(0, cache_size)
+        self.batch_size = max(1, batch_size)
+        self.time_budget_ms = time_budget_ms
+        self._model = None
+        self._load_failed = False
+        self._load_lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "pairs": 0,
+            "duplicate_pairs": 0,
+            "cache_hits": 0,
+            "predicted": 0,
+            "forward_passes": 0,
+            "skipped_budget": 0,
+            "budget_exhausted": 0,
+            "predict_ms_sum": 0.0,
+        }
+
+    # ── Model ──
+
+    def get_model(self):
+        """CrossEncoder'ı yükle (lazy, thread-safe) — onnx yüklenemezse torch."""
+        if self._model is not None or self._load_failed or not CROSS_ENCODER_AVAILABLE:
+            return self._model
+        with self._load_lock:
+            if self._model is not None or self._load_failed:
+                return self._model
+            _t = time.perf_counter()
+            if self.backend == "onnx":
+                try:
+                    kwargs = {"file_name": RERANK_ONNX_FILE} if RERANK_ONNX_FILE else {}
+                    self._model = CrossEncoder(self.model_name, backend="onnx", model_kwargs=kwargs)
+                except Exception as e:
+                    logger.warning("cross_encoder_onnx_unavailable", error=str(e))
+                    self.backend = "torch"
+            if self._model is None:
+                try:
+                    self._model = CrossEncoder(self.model_name)
+                except Exception as e:
+                    logger.warning("cross_encoder_load_failed", error=str(e))
+                    self._load_failed = True
+                    return None
+            logger.info("cross_encoder_loaded", model=self.model_name, backend=self.backend,
+                        load_ms=round((time.perf_counter() - _t) * 1000, 1))
+        return self._model
+
+    # ── Skorlama ──
+
+    def score(self, query: str, texts: Sequence[str],
+              time_budget_ms: Optional[float] = None) -> List[Optional[float]]:
+        """Her metin için (query, metin) skoru — bütçe dolarsa skorlanmayanlar None.
+
+        Metinler öncelik sırasıyla verilmelidir; bütçe kuyruğu keser.
+        """
+        budget_ms = self.time_budget_ms if time_budget_ms is None else time_budget_ms
+        q_key = _digest(query)
+        keys = [(q_key, _digest(t)) for t in texts]
+        scores: Dict[Tuple[str, str], float] = {}
+
+        with self._cache_lock:
+            self._stats["requests"] += 1
+            self._stats["pairs"] += len(keys)
+            for key in keys:
+                if key in scores:
+                    continue
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    scores[key] = cached
+                    self._stats["cache_hits"] += 1
+
+        # Cache'te olmayan tekil çiftler, ilk geçtikleri sırayla
+        pending: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        duplicates = 0
+        for key, text in zip(keys, texts):
+            if key in scores:
+                continue
+            if key in pending:
+                duplicates += 1
+            else:
+                pending[key] = text
+
+        model = self.get_model() if pending else None
+        todo = list(pending.items())
+        start = time.perf_counter()
+        done = 0
+        predicted = 0
+        passes = 0
+        try:
+            while model is not None and done < len(todo):
+                if budget_ms and done and (time.perf_counter() - start) * 1000 >= budget_ms:
+                    break
+                batch = todo[done:done + self.batch_size]
+                values = model.predict([(query, text) for _, text in batch],
+                                       batch_size=self.batch_size, show_progress_bar=False)
+                for (key, _), value in zip(batch, values):
+                    scores[key] = float(value)
+                done += len(batch)
+                predicted += len(batch)
+                passes += 1
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._cache_lock:
+                for key, _ in todo[:done]:
+                    self._cache[key] = scores[key]
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                self._stats["duplicate_pairs"] += duplicates
+                self._stats["predicted"] += predicted
+                self._stats["forward_passes"] += passes
+                self._stats["predict_ms_sum"] += elapsed_ms if passes else 0.0
+                if model is not None and done < len(todo):
+                    self._stats["budget_exhausted"] += 1
+                    self._stats["skipped_budget"] += len(todo) - done
+
+        return [scores.get(key) for key in keys]
+
+    def clear(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._cache_lock:
+            s = dict(self._stats)
+            size = len(self._cache)
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "model_loaded": self._model is not None,
+            "cache_size": size,
+            "cache_max": self.cache_size,
+            "time_budget_ms": self.time_budget_ms,
+            **{k: v for k, v in s.items() if k != "predict_ms_sum"},
+            "cache_hit_rate": round(s["cache_hits"] / s["pairs"], 4) if s["pairs"] else 0,
+            "avg_predict_ms": round(s["predict_ms_sum"] / s["forward_passes"], 2) if s["forward_passes"] else 0,
+        }
+
+
+_service: Optional[RerankService] = None
+_service_lock = threading.Lock()
+
+
+def get_rerank_service() -> RerankService:
+    """Süreç genelindeki rerank servisi (singleton)."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = RerankService()
+    return _service
+
+
+def get_rerank_stats() -> dict:
+    """Rerank servisi metrikleri (metrics dashboard için)."""
+    if _service is None:
+        return {"model": CROSS_ENCODER_MODEL, "backend": RERANK_BACKEND, "model_loaded": False,
+                "requests": 0}
+    return _service.stats()
@@ -0,0 +1,438 @@
+"""Retrieval Backend Katmanı (v7.35.00)
+
+vector_store'un koleksiyon sorguları tek bir arayüzden geçer:
+
+- Her Chroma koleksiyonu ayarlanmış HNSW parametreleriyle oluşturulur
+  (RAG_HNSW_M, RAG_HNSW_EF_CONSTRUCTION, RAG_HNSW_EF_SEARCH). M ve
+  construction_ef yalnızca yeni koleksiyonlarda geçerlidir; search_ef
+  mevcut koleksiyonlara da uygulanmaya çalışılır.
+- Departman/tip/tarih filtreli aramalar Chroma `where` sorgusu yerine
+  departman başına bölümlenmiş bellek içi vektör indeksinden cevaplanır:
+  yalnızca ilgili bölüm taranır, tip/tarih filtresi numpy maskesiyle
+  ön-filtre olarak uygulanır, bölüm içinde arama kesindir (exact L2²).
+  Metin/metadata yalnızca ilk k sonuç için tek `collection.get` ile çekilir.
+- multi_query: ana doküman + öğrenilen bilgi koleksiyonları tek çağrıda
+  sorgulanır (search_documents'ın iki ayrı sorgusu yerine).
+
+Bölümlenmiş indeks KeywordIndex gibi add_document / delete_document
+sırasında güncellenir; başka bir worker koleksiyona yazdığında
+`collection.count()` farkıyla bayat sayılır ve ilk filtreli aramada
+koleksiyondan yeniden kurulur.
+
+Kıyaslama: scripts/bench_retrieval.py (recall@k — gecikme, kesin aramaya karşı).
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+# chroma | partitioned
+RAG_RETRIEVAL_BACKEND = os.environ.get("RAG_RETRIEVAL_BACKEND", "partitioned").lower()
+RAG_HNSW_M = int(os.environ.get("RAG_HNSW_M", "32"))
+RAG_HNSW_EF_CONSTRUCTION = int(os.environ.get("RAG_HNSW_EF_CONSTRUCTION", "200"))
+RAG_HNSW_EF_SEARCH = int(os.environ.get("RAG_HNSW_EF_SEARCH", "96"))
+
+# Yeniden kurulumda koleksiyondan sayfa sayfa okunacak chunk sayısı
+REBUILD_PAGE_SIZE = 1000
+
+_NO_DEPARTMENT = ""
+
+
+# ══════════════════════════════════════════════════════════════
+# 1. HNSW AYARLARI
+# ══════════════════════════════════════════════════════════════
+
+def hnsw_collection_metadata(description: str) -> dict:
+    """get_or_create_collection metadata'sı — Chroma'nın HNSW parametreleri."""
+    return {
+        "description": description,
+        "hnsw:space": "l2",
+        "hnsw:M": RAG_HNSW_M,
+        "hnsw:construction_ef": RAG_HNSW_EF_CONSTRUCTION,
+        "hnsw:search_ef": RAG_HNSW_EF_SEARCH,
+    }
+
+
+def apply_search_ef(collection):
+    """Mevcut koleksiyonda search_ef farklıysa güncellemeyi dene.
+
+    M / construction_ef koleksiyon oluşturulduktan sonra değişmez; farklıysa
+    yalnızca loglanır (yeniden oluşturma: sync_chromadb.py).
+    """
+    meta = dict(getattr(collection, "metadata", None) or {})
+    if meta.get("hnsw:M") not in (None, RAG_HNSW_M):
+        logger.info("hnsw_params_fixed_at_creation", collection=collection.name,
+                    M=meta.get("hnsw:M"), wanted_M=RAG_HNSW_M)
+    if meta.get("hnsw:search_ef") == RAG_HNSW_EF_SEARCH:
+        return
+    try:
+        meta["hnsw:search_ef"] = RAG_HNSW_EF_SEARCH
+        meta.pop("hnsw:space", None)  # uzay değiştirilemez, tekrar gönderme
+        collection.modify(metadata=meta)
+        logger.info("hnsw_search_ef_applied", collection=collection.name, ef=RAG_HNSW_EF_SEARCH)
+    except Exception as e:
+        logger.debug("hnsw_search_ef_not_applied", collection=getattr(collection, "name", "?"),
+                     error=str(e))
+
+
+# ══════════════════════════════════════════════════════════════
+# 2. FİLTRE ÇÖZÜMLEME
+# ══════════════════════════════════════════════════════════════
+
+def parse_where(where: Optional[dict]) -> Optional[dict]:
+    """_build_where_filter çıktısını bölüm indeksi filtresine çevir.
+
+    Desteklenmeyen bir ifade varsa None — sorgu Chroma'ya gider.
+    """
+    if not where:
+        return {}
+    conditions = where["$and"] if set(where) == {"$and"} else [where]
+    filters: dict = {}
+    for cond in conditions:
+        if not isinstance(cond, dict) or len(cond) != 1:
+            return None
+        (key, value), = cond.items()
+        if key in ("department", "type") and isinstance(value, str):
+            filters[key] = value
+        elif key == "created_at" and isinstance(value, dict) and value and set(value) <= {"$gte", "$lte"}:
+            for op, bound in value.items():
+                if not isinstance(bound, str):
+                    return None
+                filters["created_" + op[1:]] = bound
+        else:
+            return None
+    return filters
+
+
+# ══════════════════════════════════════════════════════════════
+# 3. DEPARTMAN BÖLÜMLÜ VEKTÖR İNDEKSİ
+# ══════════════════════════════════════════════════════════════
+
+class PartitionedVectorIndex:
+    """Tek koleksiyon için departman → {chunk ID: (vektör, tip, tarih)} bölümleri."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.RLock()
+        self._partitions: Dict[str, Dict[str, tuple]] = {}
+        self._location: Dict[str, str] = {}
+        self._arrays: Dict[str, tuple] = {}
+        self._synced_count = -1
+        self.rebuilds = 0
+        self.queries = 0
+
+    # ── Yazma ──
+
+    def _add_locked(self, doc_id: str, vector, metadata: Optional[dict]):
+        metadata = metadata or {}
+        key = metadata.get("department") or _NO_DEPARTMENT
+        old_key = self._location.get(doc_id)
+        if old_key is not None:
+            self._partitions[old_key].pop(doc_id, None)
+            self._arrays.pop(old_key, None)
+        self._partitions.setdefault(key, {})[doc_id] = (
+            np.asarray(vector, dtype=np.float32),
+            str(metadata.get("type") or ""),
+            str(metadata.get("created_at") or ""),
+        )
+        self._location[doc_id] = key
+        self._arrays.pop(key, None)
+        return old_key is None
+
+    def add(self, ids: Iterable[str], embeddings: Iterable, metadatas: Iterable[dict]):
+        """Yeni/değişen chunk'ları indekse ekle (add_document'tan çağrılır)."""
+        with self._lock:
+            added = 0
+            for doc_id, vector, metadata in zip(ids, embeddings, metadatas):
+                added += self._add_locked(doc_id, vector, metadata)
+            if self._synced_count >= 0:
+                self._synced_count += added
+
+    def update_metadata(self, ids: Iterable[str], metadatas: Iterable[dict]):
+        """Yalnızca metadata değişti — vektör korunur, gerekirse bölüm değişir."""
+        with self._lock:
+            for doc_id, metadata in zip(ids, metadatas):
+                key = self._location.get(doc_id)
+                if key is None:
+                    continue
+                vector = self._partitions[key][doc_id][0]
+                self._add_locked(doc_id, vector, metadata)
+
+    def remove(self, ids: Iterable[str]):
+        """Silinen chunk'ları indeksten çıkar."""
+        with self._lock:
+            removed = 0
+            for doc_id in ids:
+                key = self._location.pop(doc_id, None)
+                if key is None:
+                    continue
+                self._partitions[key].pop(doc_id, None)
+                self._arrays.pop(key, None)
+                removed += 1
+            if self._synced_count >= 0:
+                self._synced_count = max(0, self._synced_count - removed)
+
+    def clear(self):
+        """İndeksi tamamen boşalt — bir sonraki filtreli aramada yeniden kurulur."""
+        with self._lock:
+            self._partitions.clear()
+            self._location.clear()
+            self._arrays.clear()
+            self._synced_count = -1
+
+    def ensure_synced(self, collection) -> bool:
+        """Koleksiyon sayısı indeksle uyuşmuyorsa koleksiyondan yeniden kur."""
+        try:
+            count = collection.count()
+        except Exception as e:
+            logger.debug("ann_index_count_failed", index=self.name, error=str(e))
+            return self._synced_count >= 0
+        with self._lock:
+            if count == self._synced_count:
+                return True
+            self.clear()
+            offset = 0
+            try:
+                while offset < count:
+                    page = collection.get(include=["embeddings", "metadatas"],
+                                          limit=REBUILD_PAGE_SIZE, offset=offset)
+                    page_ids = (page or {}).get("ids") or []
+                    if not page_ids:
+                        break
+                    embeddings = page.get("embeddings")
+                    if embeddings is None or len(embeddings) != len(page_ids):
+                        raise ValueError("embeddings eksik")
+                    metadatas = page.get("metadatas") or [None] * len(page_ids)
+                    for doc_id, vector, metadata in zip(page_ids, embeddings, metadatas):
+                        self._add_locked(doc_id, vector, metadata)
+                    offset += len(page_ids)
+            except Exception as e:
+                logger.warning("ann_index_rebuild_failed", index=self.name, error=str(e))
+                self.clear()
+                return False
+            self._synced_count = count
+            self.rebuilds += 1
+            logger.info("ann_index_rebuilt", index=self.name, chunks=len(self._location),
+                        partitions=len(self._partitions))
+            return True
+
+    # ── Okuma ──
+
+    def _partition_arrays(self, key: str) -> Optional[tuple]:
+        """Bölümün yığılmış matrisi (değişiklik olana kadar önbellekte)."""
+        arrays = self._arrays.get(key)
+        if arrays is not None:
+            return arrays
+        partition = self._partitions.get(key)
+        if not partition:
+            return None
+        ids = list(partition)
+        rows = list(partition.values())
+        matrix = np.stack([r[0] for r in rows]).astype(np.float32, copy=False)
+        arrays = (
+            ids,
+            matrix,
+            np.einsum("ij,ij->i", matrix, matrix),
+            np.array([r[1] for r in rows], dtype=str),
+            np.array([r[2] for r in rows], dtype=str),
+        )
+        self._arrays[key] = arrays
+        return arrays
+
+    def search(self, embedding, n: int, filters: Optional[dict] = None) -> List[Tuple[str, float]]:
+        """Filtreye uyan chunk'lar içinde en yakın n tanesi: [(id, L2²), ...]."""
+        filters = filters or {}
+        q = np.asarray(embedding, dtype=np.float32)
+        qq = float(q @ q)
+        with self._lock:
+            self.queries += 1
+            if "department" in filters:
+                keys = [filters["department"]]
+            else:
+                keys = list(self._partitions)
+            hits: List[Tuple[float, str]] = []
+            for key in keys:
+                arrays = self._partition_arrays(key)
+                if arrays is None:
+                    continue
+                ids, matrix, sq, types, created = arrays
+                dist = sq - 2.0 * (matrix @ q) + qq
+                mask = None
+                if "type" in filters:
+                    mask = types == filters["type"]
+                if "created_gte" in filters:
+                    m = (created != "") & (created >= filters["created_gte"])
+                    mask = m if mask is None else mask & m
+                if "created_lte" in filters:
+                    m = (created != "") & (created <= filters["created_lte"])
+                    mask = m if mask is None else mask & m
+                if mask is not None:
+                    dist = np.where(mask, dist, np.inf)
+                k = min(n, len(dist))
+                top = np.argpartition(dist, k - 1)[:k] if k < len(dist) else np.arange(len(dist))
+                hits.extend((float(dist[i]), ids[i]) for i in top if np.isfinite(dist[i]))
+        hits.sort()
+        return [(doc_id, max(0.0, d)) for d, doc_id in hits[:n]]
+
+    def query(self, collection, embedding, n: int, filters: Optional[dict] = None) -> dict:
+        """search + ilk n sonucun metni — `collection.query` ile aynı sonuç biçimi."""
+        hits = self.search(embedding, n, filters)
+        empty = {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+        if not hits:
+            return empty
+        got = collection.get(ids=[h[0] for h in hits], include=["documents", "metadatas"]) or {}
+        by_id = {
+            doc_id: (doc, meta)
+            for doc_id, doc, meta in zip(got.get("ids") or [], got.get("documents") or [],
+                                         got.get("metadatas") or [])
+        }
+        kept = [(doc_id, dist) for doc_id, dist in hits if doc_id in by_id]
+        return {
+            "ids": [[doc_id for doc_id, _ in kept]],
+            "documents": [[by_id[doc_id][0] for doc_id, _ in kept]],
+            "metadatas": [[by_id[doc_id][1] or {} for doc_id, _ in kept]],
+            "distances": [[dist for _, dist in kept]],
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            sizes = {k or "-": len(v) for k, v in self._partitions.items()}
+            return {
+                "name": self.name,
+                "chunks": len(self._location),
+                "partitions": sizes,
+                "synced_count": self._synced_count,
+                "rebuilds": self.rebuilds,
+                "queries": self.queries,
+            }
+
+
+_indexes: Dict[str, PartitionedVectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_partitioned_index(name: str) -> PartitionedVectorIndex:
+    """Koleksiyon adına göre indeks singleton'ı."""
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = PartitionedVectorIndex(name)
+            _indexes[name] = index
+        return index
+
+
+# ══════════════════════════════════════════════════════════════
+# 4. BACKEND
+# ══════════════════════════════════════════════════════════════
+
+@dataclass
+class CollectionQuery:
+    name: str
+    collection: object
+    n_results: int
+    where: Optional[dict] = None
+
+
+class RetrievalBackend:
+    """Chroma'nın kendi HNSW araması — filtreler `where` olarak gider."""
+
+    name = "chroma"
+
+    def query(self, collection, collection_name: str, embedding, n_results: int,
+              where: Optional[dict] = None) -> dict:
+        return collection.query(
+            query_embeddings=[embedding],
+            n_results=n_results,
+            where=where if where else None,
+        )
+
+    def multi_query(self, requests: List[CollectionQuery], embedding) -> Dict[str, Optional[dict]]:
+        """Birden çok koleksiyonu aynı vektörle sorgula — koleksiyon adı → sonuç."""
+        results: Dict[str, Optional[dict]] = {}
+        for req in requests:
+            if req.collection is None:
+                results[req.name] = None
+                continue
+            try:
+                results[req.name] = self.query(req.collection, req.name, embedding,
+                                               req.n_results, req.where)
+            except Exception as e:
+                logger.debug("retrieval_query_failed", collection=req.name, error=str(e))
+                results[req.name] = None
+        return results
+
+    # ── Yazma kancaları (vector_store çağırır) ──
+
+    def on_add(self, collection_name: str, ids: List[str], embeddings, metadatas: List[dict]):
+        pass
+
+    def on_update(self, collection_name: str, ids: List[str], metadatas: List[dict]):
+        pass
+
+    def on_remove(self, collection_name: str, ids: List[str]):
+        pass
+
+    def on_clear(self, collection_name: str):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "hnsw": {
+            "M": RAG_HNSW_M, "construction_ef": RAG_HNSW_EF_CONSTRUCTION,
+            "search_ef": RAG_HNSW_EF_SEARCH,
+        }}
+
+
+class PartitionedBackend(RetrievalBackend):
+    """Filtreli sorgular departman bölümlerinden, filtresizler Chroma HNSW'den."""
+
+    name = "partitioned"
+
+    def query(self, collection, collection_name: str, embedding, n_results: int,
+              where: Optional[dict] = None) -> dict:
+        filters = parse_where(where) if where else None
+        if filters:
+            index = get_partitioned_index(collection_name)
+            if index.ensure_synced(collection):
+                return index.query(collection, embedding, n_results, filters)
+        return super().query(collection, collection_name, embedding, n_results, where)
+
+    def on_add(self, collection_name, ids, embeddings, metadatas):
+        get_partitioned_index(collection_name).add(ids, embeddings, metadatas)
+
+    def on_update(self, collection_name, ids, metadatas):
+        get_partitioned_index(collection_name).update_metadata(ids, metadatas)
+
+    def on_remove(self, collection_name, ids):
+        get_partitioned_index(collection_name).remove(ids)
+
+    def on_clear(self, collection_name):
+        get_partitioned_index(collection_name).clear()
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        with _indexes_lock:
+            indexes = list(_indexes.values())
+        stats["indexes"] = [idx.stats() for idx in indexes]
+        return stats
+
+
+_backend: Optional[RetrievalBackend] = None
+
+
+def get_retrieval_backend() -> RetrievalBackend:
+    global _backend
+    if _backend is None:
+        _backend = PartitionedBackend() if RAG_RETRIEVAL_BACKEND == "partitioned" else RetrievalBackend()
+        logger.info("retrieval_backend_ready", backend=_backend.name)
+    return _backend
+
+
+def get_retrieval_backend_stats() -> dict:
+    """Metrics dashboard için backend + bölüm indeksi istatistikleri."""
+    return get_retrieval_backend().stats()
@@ -5,11 +5,22 @@
 
 import os
 import time
+import asyncio
+import contextlib
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional
 from collections import deque
 import structlog
 
+from app.core.stage_tracing import span
+from app.core.shared_metrics import histogram, observe
+from app.rag.retrieval_backend import (
+    CollectionQuery, apply_search_ef, get_retrieval_backend, hnsw_collection_metadata,
+)
+
 logger = structlog.get_logger()
 
 # ChromaDB ve Embedding modeli
@@ -21,23 +32,16 @@ except ImportError:
     CHROMADB_AVAILABLE = False
     logger.warning("chromadb_not_installed", message="RAG özellikleri devre dışı")
 
-try:
-    from sentence_transformers import SentenceTransformer
-    EMBEDDINGS_AVAILABLE = True
-except ImportError:
-    EMBEDDINGS_AVAILABLE = False
+# v7.21.00: Embedding modeli süreç genelinde paylaşılan servisten gelir
+from app.rag.embedding_service import (
+    EMBEDDINGS_AVAILABLE, EMBEDDING_MODEL, get_embedding_service,
+)
+if not EMBEDDINGS_AVAILABLE:
     logger.warning("sentence_transformers_not_installed")
 
 # Cross-Encoder Re-Ranking (v4.3.0)
-try:
-    from sentence_transformers import CrossEncoder
-    _cross_encoder = None
-    CROSS_ENCODER_AVAILABLE = True
-except ImportError:
-    CROSS_ENCODER_AVAILABLE = False
-    _cross_encoder = None
-
-CROSS_ENCODER_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"  # v4.4.0: Türkçe/çok dilli model
+# v7.36.00: Model, çift skor cache'i ve zaman bütçesi paylaşılan rerank servisinde
+from app.rag.reranker import CROSS_ENCODER_AVAILABLE, get_rerank_service
 
 # ── v5.10.8: Türkçe arama yardımcıları ──
 _TR_SEARCH_STOPWORDS = frozenset({
@@ -68,9 +72,14 @@ def _turkish_upper(text: str) -> str:
 # Son N aramanın istatistiklerini circular buffer'da sakla
 _RETRIEVAL_METRICS_BUFFER = deque(maxlen=200)
 
+# v7.41.00: Fleet geneli arama gecikmesi (shared_metrics histogramı)
+histogram("companyai_rag_search_seconds", "RAG search latency",
+          buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
 
-def log_retrieval_metrics(query: str, results: list, latency_ms: float):
+
+def log_retrieval_metrics(query: str, results: list, latency_ms: float, mode: str = "search"):
     """Arama sonuçlarının kalite metriklerini logla ve sakla."""
+    observe("companyai_rag_search_seconds", latency_ms / 1000, mode=mode)
     if not results:
         _RETRIEVAL_METRICS_BUFFER.append({
             "ts": time.time(), "query": query[:80], "n": 0,
@@ -136,18 +145,10 @@ def get_retrieval_metrics_summary() -> dict:
 
 
 def get_cross_encoder():
-    """Cross-encoder modelini lazy-load et (singleton)"""
-    global _cross_encoder
+    """Cross-encoder modelini lazy-load et (singleton — rerank servisinde)"""
     if not CROSS_ENCODER_AVAILABLE:
         return None
-    if _cross_encoder is None:
-        try:
-            _cross_encoder = CrossEncoder(CROSS_ENCODER_MODEL)
-            logger.info("cross_encoder_loaded", model=CROSS_ENCODER_MODEL)
-        except Exception as e:
-            logger.warning("cross_encoder_load_failed", error=str(e))
-            return None
-    return _cross_encoder
+    return get_rerank_service().get_model()
 
 
 def _cross_encoder_rerank(query: str, documents: list, top_k: int = 5) -> list:
@@ -156,6 +157,10 @@ def _cross_encoder_rerank(query: str, documents: list, top_k: int = 5) -> list:
     Bi-encoder (embedding) hızlıdır ama yaklaşıktır.
     Cross-encoder (query, doc) çiftini birlikte değerlendirir → daha kesin sıralama.
     
+    v7.36.00: Skorlar rerank servisinden — cache'teki çiftler yeniden
+    hesaplanmaz; zaman bütçesi dolarsa skorlanmayan adaylar hybrid
+    skorlarıyla kalır.
+    
     Args:
         query: Kullanıcı sorusu
         documents: Aday doküman listesi (her biri 'content' ve 'relevance' içermeli)
@@ -164,30 +169,29 @@ def _cross_encoder_rerank(query: str, documents: list, top_k: int = 5) -> list:
     Returns:
         Cross-encoder skoru ile yeniden sıralanmış doküman listesi
     """
-    encoder = get_cross_encoder()
-    if not encoder or not documents:
+    if not CROSS_ENCODER_AVAILABLE or not documents:
         return documents[:top_k]
     
     try:
-        # Cross-encoder için (query, document) çiftleri oluştur
-        pairs = [(query, doc["content"]) for doc in documents]
-        
-        # Cross-encoder skorları (logits → float)
-        ce_scores = encoder.predict(pairs)
+        with span("rag.rerank"):
+            raw_scores = get_rerank_service().score(query, [doc["content"] for doc in documents])
+        scored = [i for i, s in enumerate(raw_scores) if s is not None]
+        if not scored:
+            return documents[:top_k]
+        ce_scores = [raw_scores[i] for i in scored]
         
         # Skorları normalize et (0-1 arası)
-        import numpy as np
-        ce_min, ce_max = float(np.min(ce_scores)), float(np.max(ce_scores))
+        ce_min, ce_max = min(ce_scores), max(ce_scores)
         if ce_max > ce_min:
             ce_normalized = [(s - ce_min) / (ce_max - ce_min) for s in ce_scores]
         else:
             ce_normalized = [0.5] * len(ce_scores)
         
         # Final skor: %40 hybrid (bi-encoder + keyword) + %60 cross-encoder
-        for i, doc in enumerate(documents):
+        for i, ce_score in zip(scored, ce_normalized):
+            doc = documents[i]
             original_score = doc.get("relevance", 0)
-            ce_score = ce_normalized[i]
-            doc["cross_encoder_score"] = round(float(ce_scores[i]), 4)
+            doc["cross_encoder_score"] = round(float(raw_scores[i]), 4)
             # v5.10.8: Keyword-matched sonuçlara ters ağırlık — keyword sinyali korunur
             # Yüksek keyword_score → daha az CE etkisi (entity aramaları korunur)
             kw_score = doc.get("keyword_score", 0)
@@ -221,7 +225,8 @@ def _cross_encoder_rerank(query: str, documents: list, top_k: int = 5) -> list:
                 top_k_docs[-1] = best_kw
                 top_k_docs.sort(key=lambda x: x["relevance"], reverse=True)
         
-        logger.info("cross_encoder_reranked", candidates=len(documents), top_k=top_k)
+        logger.info("cross_encoder_reranked", candidates=len(documents), scored=len(scored),
+                    top_k=top_k)
         return top_k_docs
         
     except Exception as e:
@@ -238,26 +243,22 @@ COLLECTION_NAME = "company_documents"
 COLLECTION_LEARNED = "learned_knowledge"   # Konuşmalardan öğrenilen bilgi
 COLLECTION_WEB = "web_cache"               # Web aramalarından önbellek
 
-# Embedding modeli (Türkçe destekli, küçük ve hızlı)
-# Embedding modeli (Türkçe destekli, PRO seviye)
-EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
-
 # Singleton instances
 _chroma_client = None
-_embedding_model = None
 _collection = None
 _collection_learned = None
 _collection_web = None
 
 
 def get_embedding_model():
-    """Embedding modelini yükler (lazy loading)"""
-    global _embedding_model
-    if _embedding_model is None and EMBEDDINGS_AVAILABLE:
-        logger.info("loading_embedding_model", model=EMBEDDING_MODEL)
-        _embedding_model = SentenceTransformer(EMBEDDING_MODEL)
-        logger.info("embedding_model_loaded")
-    return _embedding_model
+    """Paylaşılan embedding servisini döner (v7.21.00).
+
+    Dönen nesne SentenceTransformer ile aynı `encode()` arayüzüne sahiptir;
+    model lazy yüklenir ve eşzamanlı çağrılar micro-batch'lenir.
+    """
+    if not EMBEDDINGS_AVAILABLE:
+        return None
+    return get_embedding_service()
 
 
 def get_chroma_client():
@@ -282,8 +283,9 @@ def get_collection():
         if client:
             _collection = client.get_or_create_collection(
                 name=COLLECTION_NAME,
-                metadata={"description": "Şirket dokümanları"}
+                metadata=hnsw_collection_metadata("Şirket dokümanları")
             )
+            apply_search_ef(_collection)
             logger.info("collection_ready", name=COLLECTION_NAME)
     return _collection
 
@@ -296,8 +298,9 @@ def get_learned_collection():
         if client:
             _collection_learned = client.get_or_create_collection(
                 name=COLLECTION_LEARNED,
-                metadata={"description": "Konuşmalardan öğrenilen bilgi"}
+                metadata=hnsw_collection_metadata("Konuşmalardan öğrenilen bilgi")
             )
+            apply_search_ef(_collection_learned)
             logger.info("collection_ready", name=COLLECTION_LEARNED)
     return _collection_learned
 
@@ -310,12 +313,176 @@ def get_web_collection():
         if client:
             _collection_web = client.get_or_create_collection(
                 name=COLLECTION_WEB,
-                metadata={"description": "Web araması önbelleği"}
+                metadata=hnsw_collection_metadata("Web araması önbelleği")
             )
+            apply_search_ef(_collection_web)
             logger.info("collection_ready", name=COLLECTION_WEB)
     return _collection_web
 
 
+# ── v7.20.00: Toplu ingestion ──
+# Embedding batch boyutu (SentenceTransformer.encode batch_size)
+RAG_EMBEDDING_BATCH_SIZE = int(os.environ.get("RAG_EMBEDDING_BATCH_SIZE", "32"))
+# Learned tiplerde yakın-kopya eşiği (L2² mesafe)
+_DUPLICATE_DISTANCE = 0.15
+# Chroma sqlite backend'inin tek add çağrısında kabul ettiği güvenli üst sınır
+_CHROMA_MAX_ADD_BATCH = 5000
+
+# Son N ingestion'ın aşama sürelerini sakla
+_INGESTION_METRICS_BUFFER = deque(maxlen=100)
+
+
+def _encode_batch(texts: List[str]) -> List[list]:
+    """Metin listesini tek batched encode çağrısıyla vektörlere çevir."""
+    import numpy as np
+    if not texts:
+        return []
+    model = get_embedding_model()
+    vectors = np.asarray(
+        model.encode(texts, batch_size=RAG_EMBEDDING_BATCH_SIZE, show_progress_bar=False),
+        dtype=np.float32,
+    )
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    return vectors.tolist()
+
+
+def _filter_near_duplicates(collection, embeddings: List[list], source: str) -> List[int]:
+    """Koleksiyonda veya aynı batch'te çok benzeri olan chunk'ları ele.
+
+    Koleksiyon kontrolü tek bir çoklu `query` çağrısıdır; batch içi kontrol
+    numpy ile ikili L2² mesafe matrisi üzerinden yapılır.
+
+    Returns:
+        Kaydedilecek chunk indeksleri
+    """
+    import numpy as np
+    if not embeddings:
+        return []
+
+    existing_dist = [None] * len(embeddings)
+    try:
+        existing = collection.query(query_embeddings=embeddings, n_results=1)
+        for i, row in enumerate((existing or {}).get('distances') or []):
+            if row:
+                existing_dist[i] = row[0]
+    except Exception:
+        pass  # Duplikasyon kontrolü başarısızsa kaydetmeye devam et
+
+    vecs = np.asarray(embeddings, dtype=np.float32)
+    sq = (vecs ** 2).sum(axis=1)
+    pairwise = sq[:, None] + sq[None, :] - 2.0 * vecs @ vecs.T
+
+    keep = []
+    for i in range(len(embeddings)):
+        if existing_dist[i] is not None and existing_dist[i] < _DUPLICATE_DISTANCE:
+            logger.debug("skip_duplicate", source=source, chunk=i, distance=existing_dist[i])
+            continue
+        if keep and float(pairwise[i, keep].min()) < _DUPLICATE_DISTANCE:
+            logger.debug("skip_duplicate_in_batch", source=source, chunk=i)
+            continue
+        keep.append(i)
+    return keep
+
+
+def _log_ingestion_metrics(source: str, total_chunks: int, added: int, timings: dict,
+                           unchanged: int = 0, deleted: int = 0, reused: int = 0):
+    """Ingestion aşama sürelerini buffer'a yaz."""
+    _INGESTION_METRICS_BUFFER.append({
+        "ts": time.time(),
+        "source": source[:80],
+        "chunks": total_chunks,
+        "added": added,
+        "unchanged": unchanged,
+        "deleted": deleted,
+        "reused": reused,
+        **{k: round(v, 1) for k, v in timings.items()},
+    })
+
+
+def get_ingestion_metrics_summary() -> dict:
+    """Son ingestion'ların aşama bazlı süre özetini döndür."""
+    if not _INGESTION_METRICS_BUFFER:
+        return {"total_ingestions": 0}
+    
+    entries = list(_INGESTION_METRICS_BUFFER)
+    n = len(entries)
+    stages = ("chunk_ms", "encode_ms", "dedup_ms", "write_ms", "index_ms")
+    total_chunks = sum(e["chunks"] for e in entries)
+    total_ms = sum(e.get(st, 0) for e in entries for st in stages)
+    
+    return {
+        "total_ingestions": n,
+        "total_chunks": total_chunks,
+        "avg_stage_ms": {st: round(sum(e.get(st, 0) for e in entries) / n, 1) for st in stages},
+        "chunks_per_sec": round(total_chunks / (total_ms / 1000), 1) if total_ms else 0,
+        # v7.34.00: artımlı senkronizasyon — yazılan / atlanan / silinen chunk'lar
+        "chunks_written": sum(e.get("added", 0) for e in entries),
+        "chunks_unchanged": sum(e.get("unchanged", 0) for e in entries),
+        "chunks_deleted": sum(e.get("deleted", 0) for e in entries),
+        "embedding_batch_size": RAG_EMBEDDING_BATCH_SIZE,
+        "last_10": entries[-10:],
+    }
+
+
+def _index_chunks(collection_name: str, ids: List[str], texts: List[str]):
+    """Yeni chunk'ları keyword ters indeksine ekle (v7.19.00)."""
+    try:
+        from app.rag.keyword_index import get_keyword_index
+        get_keyword_index(collection_name).add(ids, texts)
+    except Exception as e:
+        logger.debug("keyword_index_add_skipped", error=str(e))
+
+
+def _unindex_chunks(collection_name: str, ids: List[str]):
+    """Silinen chunk'ları keyword ters indeksinden çıkar (v7.19.00)."""
+    try:
+        from app.rag.keyword_index import get_keyword_index
+        get_keyword_index(collection_name).remove(ids)
+    except Exception as e:
+        logger.debug("keyword_index_remove_skipped", error=str(e))
+
+
+def _ann_add(collection_name: str, ids: List[str], embeddings: List[list], metadatas: List[dict]):
+    """Yeni/değişen chunk'ları retrieval backend'in bölüm indeksine ekle (v7.35.00)."""
+    try:
+        get_retrieval_backend().on_add(collection_name, ids, embeddings, metadatas)
+    except Exception as e:
+        logger.debug("ann_index_add_skipped", error=str(e))
+
+
+def _ann_update(collection_name: str, ids: List[str], metadatas: List[dict]):
+    """Yalnızca metadata'sı değişen chunk'ları bölüm indeksinde güncelle (v7.35.00)."""
+    try:
+        get_retrieval_backend().on_update(collection_name, ids, metadatas)
+    except Exception as e:
+        logger.debug("ann_index_update_skipped", error=str(e))
+
+
+def _ann_remove(collection_name: str, ids: List[str]):
+    """Silinen chunk'ları bölüm indeksinden çıkar (v7.35.00)."""
+    try:
+        get_retrieval_backend().on_remove(collection_name, ids)
+    except Exception as e:
+        logger.debug("ann_index_remove_skipped", error=str(e))
+
+
+def _invalidate_llm_cache(reason: str, collection_name: Optional[str] = None):
+    """Doküman kümesi değişti — bayat RAG yanıtlarını geçersiz kıl (v7.23.00).
+
+    collection_name verilirse yeni corpus nesli o koleksiyonun keyword
+    indeksine bildirilir — bu süreçteki yazma indeksi bayatlatmaz.
+    """
+    try:
+        from app.llm.response_cache import invalidate_llm_cache
+        generation = invalidate_llm_cache(reason)
+        if collection_name:
+            from app.rag.keyword_index import get_keyword_index
+            get_keyword_index(collection_name).note_generation(generation)
+    except Exception as e:
+        logger.debug("llm_cache_invalidate_skipped", error=str(e))
+
+
 def add_document(
     content: str,
     source: str,
@@ -345,10 +512,13 @@ def add_document(
         
         if _is_learned_type:
             collection = get_learned_collection()
+            collection_name = COLLECTION_LEARNED
         elif _is_web_type:
             collection = get_web_collection()
+            collection_name = COLLECTION_WEB
         else:
             collection = get_collection()
+            collection_name = COLLECTION_NAME
         
         model = get_embedding_model()
         
@@ -359,52 +529,65 @@ def add_document(
         from datetime import datetime
         created_at = datetime.utcnow().isoformat()
         
+        # v7.34.00: Doküman koleksiyonlarında kaynak bazlı artımlı senkronizasyon;
+        # öğrenilen bilgi ekleme-tabanlı kalır (yakın-kopya filtresi)
+        if not _is_learned_type:
+            return _sync_document(collection, collection_name, content, source,
+                                  doc_type, metadata, created_at)
+        
+        timings = {}
+        
         # Dokümanı parçalara böl (chunking)
         # Daha büyük chunk = daha anlamlı bağlam, daha iyi RAG yanıtları
+        _t = time.perf_counter()
         chunks = chunk_text(content, chunk_size=2000, overlap=300)  # v4.4.0: Daha büyük chunk = daha iyi bağlam
+        timings["chunk_ms"] = (time.perf_counter() - _t) * 1000
         
-        added_count = 0
-        for i, chunk in enumerate(chunks):
-            doc_id = f"{source}_{i}"
-            embedding = model.encode(chunk).tolist()
-            
-            # ── DUPLİKASYON KORUMASI ──
-            # chat_learned / qa_learned / voice_learned tiplerinde
-            # zaten çok benzer içerik varsa tekrar kaydetme
-            if _is_learned_type:
-                try:
-                    existing = collection.query(
-                        query_embeddings=[embedding],
-                        n_results=1,
-                    )
-                    if (existing and existing['distances'] and existing['distances'][0]
-                            and existing['distances'][0][0] < 0.15):
-                        logger.debug("skip_duplicate", source=source, chunk=i,
-                                    distance=existing['distances'][0][0])
-                        continue  # Çok benzer kayıt zaten var → atla
-                except Exception:
-                    pass  # Duplikasyon kontrolü başarısızsa kaydetmeye devam et
-            
-            doc_metadata = {
+        # v7.20.00: Tüm chunk'lar tek batched encode çağrısında
+        _t = time.perf_counter()
+        embeddings = _encode_batch(chunks)
+        timings["encode_ms"] = (time.perf_counter() - _t) * 1000
+        
+        # ── DUPLİKASYON KORUMASI ──
+        # chat_learned / qa_learned / voice_learned tiplerinde
+        # zaten çok benzer içerik varsa tekrar kaydetme
+        _t = time.perf_counter()
+        keep = _filter_near_duplicates(collection, embeddings, source)
+        timings["dedup_ms"] = (time.perf_counter() - _t) * 1000
+        
+        ids, kept_embeddings, kept_chunks, metadatas = [], [], [], []
+        for i in keep:
+            ids.append(f"{source}_{i}")
+            kept_embeddings.append(embeddings[i])
+            kept_chunks.append(chunks[i])
+            metadatas.append({
                 "source": source,
                 "type": doc_type,
                 "chunk_index": i,
                 "total_chunks": len(chunks),
                 "created_at": created_at,
                 **(metadata or {})
-            }
-            
-            collection.add(
-                ids=[doc_id],
-                embeddings=[embedding],
-                documents=[chunk],
-                metadatas=[doc_metadata]
-            )
-            added_count += 1
+            })
+        
+        # Tek toplu yazma (Chroma'nın batch limiti aşılırsa dilimlenir)
+        _t = time.perf_counter()
+        _write_chunks(collection.add, ids, kept_embeddings, kept_chunks, metadatas)
+        timings["write_ms"] = (time.perf_counter() - _t) * 1000
+        
+        _t = time.perf_counter()
+        if ids:
+            _index_chunks(collection_name, ids, kept_chunks)
+            _ann_add(collection_name, ids, kept_embeddings, metadatas)
+        timings["index_ms"] = (time.perf_counter() - _t) * 1000
+        
+        added_count = len(ids)
+        _log_ingestion_metrics(source, len(chunks), added_count, timings)
         
         if added_count > 0:
+            _invalidate_llm_cache("document_added", collection_name)
             logger.info("document_added", source=source, chunks=added_count,
-                        skipped=len(chunks) - added_count)
+                        skipped=len(chunks) - added_count,
+                        **{k: round(v, 1) for k, v in timings.items()})
         elif chunks:
             logger.info("document_all_duplicates", source=source, chunks=len(chunks))
         return added_count > 0
@@ -414,6 +597,735 @@ def add_document(
         return False
 
 
+def _write_chunks(write, ids: List[str], embeddings: List[list], documents: List[str],
+                  metadatas: List[dict]):
+    """collection.add / upsert — Chroma'nın batch limiti aşılırsa dilimlenir."""
+    for b in range(0, len(ids), _CHROMA_MAX_ADD_BATCH):
+        write(
+            ids=ids[b:b + _CHROMA_MAX_ADD_BATCH],
+            embeddings=embeddings[b:b + _CHROMA_MAX_ADD_BATCH],
+            documents=documents[b:b + _CHROMA_MAX_ADD_BATCH],
+            metadatas=metadatas[b:b + _CHROMA_MAX_ADD_BATCH],
+        )
+
+
+def _sync_document(collection, collection_name: str, content: str, source: str,
+                   doc_type: str, metadata: Optional[dict], created_at: str) -> bool:
+    """Kaynağın chunk'larını yeni içerikle eşitle (v7.34.00).
+
+    Yalnızca yeni/değişen chunk'lar embed edilir; değişmeyenler atlanır,
+    kaybolanlar silinir. Doküman ve metadata aynıysa manifest sayesinde
+    Chroma'ya yazılmaz.
+    """
+    from app.rag.incremental_ingest import (
+        chunk_document, chunk_hash, content_hash, get_manifest_store, metadata_fingerprint,
+    )
+    
+    timings = {}
+    manifests = get_manifest_store()
+    doc_hash = content_hash(content)
+    meta_fp = metadata_fingerprint(doc_type, metadata)
+    
+    manifest = manifests.load(collection_name, source)
+    if manifest and manifest["content_hash"] == doc_hash and manifest["metadata_fp"] == meta_fp:
+        # Manifest'e rağmen koleksiyon dışarıdan temizlenmiş olabilir — son chunk'a bak
+        last_id = f"{source}_{len(manifest['chunks']) - 1}"
+        if (collection.get(ids=[last_id], include=[]) or {}).get("ids"):
+            _log_ingestion_metrics(source, len(manifest["chunks"]), 0, {}, unchanged=len(manifest["chunks"]))
+            logger.info("document_unchanged", source=source, chunks=len(manifest["chunks"]))
+            return True
+    
+    _t = time.perf_counter()
+    chunks = chunk_document(content, chunk_size=2000, overlap=300)
+    hashes = [chunk_hash(c) for c in chunks]
+    timings["chunk_ms"] = (time.perf_counter() - _t) * 1000
+    
+    # Kaynağın mevcut chunk'ları — yalnızca metadata (embedding taşınmaz)
+    existing = collection.get(where={"source": source}, include=["metadatas"]) or {}
+    existing_hash = {}
+    existing_meta = {}
+    for doc_id, meta in zip(existing.get("ids") or [], existing.get("metadatas") or []):
+        meta = meta or {}
+        existing_hash[doc_id] = meta.get("chunk_hash")
+        existing_meta[doc_id] = meta
+    
+    ids = [f"{source}_{i}" for i in range(len(chunks))]
+    new_metadatas = [{
+        "source": source,
+        "type": doc_type,
+        "chunk_index": i,
+        "total_chunks": len(chunks),
+        "chunk_hash": hashes[i],
+        "created_at": created_at,
+        **(metadata or {})
+    } for i in range(len(chunks))]
+    
+    changed = [i for i, doc_id in enumerate(ids) if existing_hash.get(doc_id) != hashes[i]]
+    unchanged = [i for i, doc_id in enumerate(ids) if existing_hash.get(doc_id) == hashes[i]]
+    # Metin aynı ama metadata (departman, toplam chunk...) farklı → yalnızca metadata güncellenir
+    def _stable(meta: dict) -> dict:
+        return {k: v for k, v in meta.items() if k not in ("created_at", "updated_at")}
+    meta_only = [i for i in unchanged if _stable(existing_meta[ids[i]]) != _stable(new_metadatas[i])]
+    id_set = set(ids)
+    vanished = [doc_id for doc_id in existing_hash if doc_id not in id_set]
+    
+    # Yer değiştiren chunk'ların embedding'i koleksiyondan — yeniden encode yok
+    _t = time.perf_counter()
+    hash_to_id = {h: doc_id for doc_id, h in existing_hash.items() if h}
+    reuse_ids = list({hash_to_id[hashes[i]] for i in changed if hashes[i] in hash_to_id})
+    reused = {}
+    if reuse_ids:
+        stored = collection.get(ids=reuse_ids, include=["embeddings", "metadatas"]) or {}
+        stored_embeddings = stored.get("embeddings")
+        if stored_embeddings is not None:
+            for meta, emb in zip(stored.get("metadatas") or [], stored_embeddings):
+                if meta and meta.get("chunk_hash"):
+                    reused[meta["chunk_hash"]] = list(emb)
+    to_encode = [i for i in changed if hashes[i] not in reused]
+    encoded = dict(zip(to_encode, _encode_batch([chunks[i] for i in to_encode])))
+    timings["encode_ms"] = (time.perf_counter() - _t) * 1000
+    
+    _t = time.perf_counter()
+    added = [i for i in changed if ids[i] not in existing_hash]
+    replaced = [i for i in changed if ids[i] in existing_hash]
+    for write, batch in ((collection.add, added), (collection.upsert, replaced)):
+        if batch:
+            _write_chunks(
+                write,
+                [ids[i] for i in batch],
+                [encoded[i] if i in encoded else reused[hashes[i]] for i in batch],
+                [chunks[i] for i in batch],
+                [new_metadatas[i] for i in batch],
+            )
+    if meta_only:
+        collection.update(ids=[ids[i] for i in meta_only],
+                          metadatas=[new_metadatas[i] for i in meta_only])
+    if vanished:
+        collection.delete(ids=vanished)
+    timings["write_ms"] = (time.perf_counter() - _t) * 1000
+    
+    _t = time.perf_counter()
+    stale_index_ids = [ids[i] for i in replaced] + vanished
+    if stale_index_ids:
+        _unindex_chunks(collection_name, stale_index_ids)
+    if changed:
+        _index_chunks(collection_name, [ids[i] for i in changed], [chunks[i] for i in changed])
+        _ann_add(collection_name, [ids[i] for i in changed],
+                 [encoded[i] if i in encoded else reused[hashes[i]] for i in changed],
+                 [new_metadatas[i] for i in changed])
+    if meta_only:
+        _ann_update(collection_name, [ids[i] for i in meta_only],
+                    [new_metadatas[i] for i in meta_only])
+    if vanished:
+        _ann_remove(collection_name, vanished)
+    timings["index_ms"] = (time.perf_counter() - _t) * 1000
+    
+    manifests.save(collection_name, source, doc_hash, meta_fp, hashes)
+    _log_ingestion_metrics(source, len(chunks), len(changed), timings,
+                           unchanged=len(unchanged), deleted=len(vanished),
+                           reused=len(changed) - len(to_encode))
+    
+    if changed or vanished or meta_only:
+        _invalidate_llm_cache("document_added", collection_name)
+    logger.info("document_synced" if existing_hash else "document_added", source=source,
+                chunks=len(chunks), embedded=len(to_encode), reused=len(changed) - len(to_encode),
+                unchanged=len(unchanged), deleted=len(vanished),
+                **{k: round(v, 1) for k, v in timings.items()})
+    return True
+
+
+# ── v7.18.00: Async retrieval — encode/query/rerank ayrı, sınırlı executor'da ──
+# Event loop'u bloklamamak için ağır işler (SentenceTransformer encode,
+# Chroma query, CrossEncoder predict) bu havuzda çalışır. Havuz boyutu
+# ve eşzamanlı arama sayısı env'den ayarlanabilir.
+RAG_EXECUTOR_WORKERS = int(os.environ.get("RAG_EXECUTOR_WORKERS", "4"))
+RAG_MAX_CONCURRENT_SEARCHES = int(os.environ.get("RAG_MAX_CONCURRENT_SEARCHES", "8"))
+
+# v7.19.00: Keyword ters indeksi — bir lookup bundan fazla aday döndürürse
+# (çok yaygın kelime) Chroma `$contains` sorgusuna düşülür
+RAG_KEYWORD_MAX_CANDIDATES = int(os.environ.get("RAG_KEYWORD_MAX_CANDIDATES", "256"))
+
+_rag_executor = None
+_rag_executor_lock = threading.Lock()
+# RAG havuzu worker thread'lerini işaretler — iç içe submit tespiti için
+_rag_worker = threading.local()
+_search_semaphore = None
+_search_semaphore_loop = None
+
+# Backpressure metrikleri — /metrics üzerinden okunur
+_RAG_EXECUTOR_STATS = {
+    "submitted": 0,
+    "completed": 0,
+    "failed": 0,
+    "queued": 0,
+    "running": 0,
+    "max_queue_depth": 0,
+    "queue_wait_ms_sum": 0.0,
+    "run_ms_sum": 0.0,
+    "searches_waiting": 0,
+    "searches_active": 0,
+    "admission_wait_ms_sum": 0.0,
+    "admission_count": 0,
+}
+
+
+def _mark_rag_worker():
+    _rag_worker.active = True
+
+
+def _in_rag_worker() -> bool:
+    """Çağıran thread RAG havuzunun bir worker'ı mı."""
+    return getattr(_rag_worker, "active", False)
+
+
+def get_rag_executor() -> ThreadPoolExecutor:
+    """RAG için ayrılmış, sınırlı thread havuzunu döner (lazy singleton)."""
+    global _rag_executor
+    if _rag_executor is None:
+        with _rag_executor_lock:
+            if _rag_executor is None:
+                _rag_executor = ThreadPoolExecutor(
+                    max_workers=RAG_EXECUTOR_WORKERS,
+                    thread_name_prefix="rag",
+                    initializer=_mark_rag_worker,
+                )
+                logger.info("rag_executor_started", workers=RAG_EXECUTOR_WORKERS)
+    return _rag_executor
+
+
+def shutdown_rag_executor():
+    """Uygulama kapanışında RAG havuzunu kapat."""
+    global _rag_executor
+    with _rag_executor_lock:
+        if _rag_executor is not None:
+            _rag_executor.shutdown(wait=False, cancel_futures=True)
+            _rag_executor = None
+
+
+async def _run_in_rag_executor(func, *args):
+    """Senkron fonksiyonu RAG havuzunda çalıştır, kuyruk/çalışma sürelerini ölç."""
+    submitted_at = time.perf_counter()
+    with _rag_executor_lock:
+        _RAG_EXECUTOR_STATS["submitted"] += 1
+        _RAG_EXECUTOR_STATS["queued"] += 1
+        _RAG_EXECUTOR_STATS["max_queue_depth"] = max(
+            _RAG_EXECUTOR_STATS["max_queue_depth"], _RAG_EXECUTOR_STATS["queued"])
+
+    def _tracked():
+        started_at = time.perf_counter()
+        with _rag_executor_lock:
+            _RAG_EXECUTOR_STATS["queued"] -= 1
+            _RAG_EXECUTOR_STATS["running"] += 1
+            _RAG_EXECUTOR_STATS["queue_wait_ms_sum"] += (started_at - submitted_at) * 1000
+        ok = False
+        try:
+            result = func(*args)
+            ok = True
+            return result
+        finally:
+            with _rag_executor_lock:
+                _RAG_EXECUTOR_STATS["running"] -= 1
+                _RAG_EXECUTOR_STATS["completed" if ok else "failed"] += 1
+                _RAG_EXECUTOR_STATS["run_ms_sum"] += (time.perf_counter() - started_at) * 1000
+
+    loop = asyncio.get_running_loop()
+    # v7.27.00: Context kopyası — worker thread'deki span'ler sorgu trace'ine yazılır
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_rag_executor(), ctx.run, _tracked)
+
+
+def _get_search_semaphore() -> asyncio.Semaphore:
+    """Eşzamanlı async arama sayısını sınırlayan semaphore (loop başına)."""
+    global _search_semaphore, _search_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _search_semaphore is None or _search_semaphore_loop is not loop:
+        _search_semaphore = asyncio.Semaphore(RAG_MAX_CONCURRENT_SEARCHES)
+        _search_semaphore_loop = loop
+    return _search_semaphore
+
+
+def get_rag_executor_stats() -> dict:
+    """RAG executor backpressure metrikleri (kuyruk derinliği, bekleme süreleri)."""
+    with _rag_executor_lock:
+        s = dict(_RAG_EXECUTOR_STATS)
+    finished = s["completed"] + s["failed"]
+    return {
+        "workers": RAG_EXECUTOR_WORKERS,
+        "max_concurrent_searches": RAG_MAX_CONCURRENT_SEARCHES,
+        "submitted": s["submitted"],
+        "completed": s["completed"],
+        "failed": s["failed"],
+        "queue_depth": s["queued"],
+        "running": s["running"],
+        "max_queue_depth": s["max_queue_depth"],
+        "avg_queue_wait_ms": round(s["queue_wait_ms_sum"] / finished, 2) if finished else 0,
+        "avg_run_ms": round(s["run_ms_sum"] / finished, 2) if finished else 0,
+        "searches_waiting": s["searches_waiting"],
+        "searches_active": s["searches_active"],
+        "avg_admission_wait_ms": (
+            round(s["admission_wait_ms_sum"] / s["admission_count"], 2)
+            if s["admission_count"] else 0
+        ),
+    }
+
+
+def _build_where_filter(
+    department: str = None,
+    doc_type: str = None,
+    date_from: str = None,
+    date_to: str = None,
+) -> dict:
+    """Metadata filtrelerini Chroma `where` ifadesine çevir (v4.4.0)."""
+    where_conditions = []
+
+    if department and department != "Genel":
+        where_conditions.append({"department": department})
+
+    if doc_type:
+        where_conditions.append({"type": doc_type})
+
+    if date_from:
+        where_conditions.append({"created_at": {"$gte": date_from}})
+
+    if date_to:
+        where_conditions.append({"created_at": {"$lte": date_to}})
+
+    if len(where_conditions) == 1:
+        return where_conditions[0]
+    if len(where_conditions) > 1:
+        return {"$and": where_conditions}
+    return {}
+
+
+def _encode_query(query: str) -> list:
+    """Sorguyu embedding vektörüne çevir."""
+    model = get_embedding_model()
+    return model.encode(query).tolist()
+
+
+def _query_collections(collection, query_embedding: list, fetch_n: int, where_filter: dict,
+                       department: str = None, n_results: int = 5):
+    """Ana + öğrenilen bilgi koleksiyonları tek backend çağrısında (v7.35.00).
+
+    Filtreli sorgular backend'in departman bölümlerinden cevaplanır; filtre
+    ile sonuç yoksa ana koleksiyon filtresiz tekrar sorgulanır.
+    Dönüş: (ana sonuçlar, öğrenilen bilgi sonuçları veya None)
+    """
+    backend = get_retrieval_backend()
+    requests = [CollectionQuery(COLLECTION_NAME, collection, fetch_n, where_filter)]
+    try:
+        # v4.4.0: Öğrenilen bilgi koleksiyonu — boşsa sorgulanmaz
+        learned_coll = get_learned_collection()
+        if learned_coll and learned_coll.count() > 0:
+            requests.append(CollectionQuery(COLLECTION_LEARNED, learned_coll, min(3, n_results)))
+    except Exception as learned_err:
+        logger.debug("learned_collection_search_skipped", error=str(learned_err))
+    
+    fused = backend.multi_query(requests, query_embedding)
+    results = fused.get(COLLECTION_NAME)
+
+    # Department filtresi ile sonuç gelmezse, filtresiz tekrar dene
+    if not results or not results['documents'] or not results['documents'][0]:
+        if where_filter:
+            logger.info("rag_retry_without_dept_filter", department=department)
+        if where_filter or results is None:
+            results = backend.query(collection, COLLECTION_NAME, query_embedding, fetch_n)
+    return results, fused.get(COLLECTION_LEARNED)
+
+
+def _keyword_lookups(query: str) -> list:
+    """Keyword tamamlayıcı arama planı: (kind, variant, n_results, bonus) listesi.
+
+    (A) Bigram $contains araması (v5.10.6) ve (B) tekil entity kelime
+    araması (v5.10.8) — her biri orijinal + Türkçe büyük harf varyantı ile.
+    """
+    lookups = []
+    _kw_words = [w for w in query.lower().split() if len(w) >= 2]
+    # v5.10.8: Stopword'leri filtrele — entity kelimeleri (isim/soyisim) kalsın
+    _entity_words = [w for w in _kw_words
+                     if len(w) >= 3 and _normalize_tr(w) not in _TR_SEARCH_STOPWORDS]
+
+    if len(_kw_words) >= 2:
+        for _ki in range(min(len(_kw_words) - 1, 3)):
+            _phrase = f"{_kw_words[_ki]} {_kw_words[_ki + 1]}"
+            if len(_phrase) >= 5:
+                # Hem orijinal hem Türkçe büyük harf varyantını dene
+                for _variant in {_phrase, _turkish_upper(_phrase)}:
+                    lookups.append(("phrase", _variant, 3, 1.15))
+
+    # Excel personel listesi gibi yapısal verilerde Ad ve Soyadı
+    # farklı sütunlarda olduğu için bigram eşleşmez — tekil arama gerekir.
+    for _word in _entity_words[:4]:  # En fazla 4 kelime
+        for _variant in {_word, _turkish_upper(_word)}:
+            lookups.append(("entity", _variant, 5, 1.10))
+
+    return lookups
+
+
+def _query_keyword(collection, query_embedding: list, variant: str, n: int):
+    """Tek bir `$contains` keyword sorgusu — hata olursa None.
+
+    v7.19.00: Sadece ters indeks kullanılamadığında veya aday sayısı
+    RAG_KEYWORD_MAX_CANDIDATES'ı aştığında fallback olarak çalışır.
+    """
+    try:
+        return collection.query(
+            query_embeddings=[query_embedding],
+            where_document={"$contains": variant},
+            n_results=n,
+        )
+    except Exception as _kw_err:
+        logger.debug("keyword_supplement_skip", phrase=variant, error=str(_kw_err))
+        return None
+
+
+def _keyword_supplement(collection, query_embedding: list, lookups: list,
+                        index_name: str = None) -> list:
+    """Tüm keyword lookup'larını ters indeksten tek geçişte cevapla (v7.19.00).
+
+    Her lookup için aday chunk ID'leri indeksten alınır, tüm adaylar tek
+    bir `collection.get` ile (embedding dahil) çekilir ve sorguya L2²
+    mesafesi yerelde hesaplanır — Chroma'nın `$contains` sorgusuyla aynı
+    sıralama, ama varyant başına koleksiyon taraması yok.
+
+    Returns:
+        [(bonus, chroma_result_benzeri_dict), ...] — `_assemble_results` formatı
+    """
+    from app.rag.keyword_index import get_keyword_index, tokenize
+
+    index = get_keyword_index(index_name or COLLECTION_NAME)
+    if not lookups:
+        return []
+    if not index.ensure_synced(collection):
+        return [
+            (bonus, _query_keyword(collection, query_embedding, variant, n))
+            for _kind, variant, n, bonus in lookups
+        ]
+
+    # Normalize edilmiş anahtar başına tek plan — İ/I/ı/i varyantları birleşir
+    plan = {}
+    for kind, variant, n, bonus in lookups:
+        key = " ".join(tokenize(variant))
+        if not key:
+            continue
+        if (kind, key) in plan:
+            plan[(kind, key)]["variants"].append(variant)
+            continue
+        ids = index.lookup(variant)
+        plan[(kind, key)] = {
+            "key": key, "n": n, "bonus": bonus, "variants": [variant],
+            "ids": ids if len(ids) <= RAG_KEYWORD_MAX_CANDIDATES else None,
+        }
+
+    candidate_ids = set()
+    for entry in plan.values():
+        if entry["ids"]:
+            candidate_ids |= entry["ids"]
+
+    fetched = {}
+    if candidate_ids:
+        import numpy as np
+        got = collection.get(
+            ids=sorted(candidate_ids),
+            include=["documents", "metadatas", "embeddings"],
+        )
+        got_ids = got.get("ids") or []
+        got_docs = got.get("documents") or []
+        got_metas = got.get("metadatas") or []
+        got_embs = got.get("embeddings")
+        if got_embs is not None and len(got_embs) == len(got_ids) and len(got_ids) > 0:
+            q = np.asarray(query_embedding, dtype=np.float32)
+            dists = ((np.asarray(got_embs, dtype=np.float32) - q) ** 2).sum(axis=1).tolist()
+        else:
+            dists = [999.0] * len(got_ids)
+        for i, doc_id in enumerate(got_ids):
+            fetched[doc_id] = (
+                got_docs[i] if i < len(got_docs) else "",
+                (got_metas[i] if i < len(got_metas) else None) or {},
+                float(dists[i]),
+                doc_id,
+            )
+
+    keyword_results = []
+    for entry in plan.values():
+        if entry["ids"] is None:
+            # Çok yaygın kelime — indeks adayları fazla, Chroma sıralasın
+            for variant in entry["variants"]:
+                keyword_results.append(
+                    (entry["bonus"], _query_keyword(collection, query_embedding, variant, entry["n"])))
+            continue
+        hits = []
+        is_phrase = " " in entry["key"]
+        for doc_id in entry["ids"]:
+            item = fetched.get(doc_id)
+            if item is None:
+                continue
+            # Phrase: token'lar chunk içinde bitişik olmalı
+            if is_phrase and entry["key"] not in " ".join(tokenize(item[0])):
+                continue
+            hits.append(item)
+        if not hits:
+            continue
+        hits.sort(key=lambda h: h[2])
+        hits = hits[:entry["n"]]
+        keyword_results.append((entry["bonus"], {
+            "ids": [[h[3] for h in hits]],
+            "documents": [[h[0] for h in hits]],
+            "metadatas": [[h[1] for h in hits]],
+            "distances": [[h[2] for h in hits]],
+        }))
+    return keyword_results
+
+
+def _assemble_results(query: str, n_results: int, results, keyword_results: list,
+                      learned_results, rerank: bool = True) -> List[dict]:
+    """Ham sorgu sonuçlarından hybrid skorlu, re-rank edilmiş listeyi üret.
+
+    Args:
+        query: Kullanıcı sorusu
+        n_results: Döndürülecek sonuç sayısı
+        results: Ana vektör araması sonucu
+        keyword_results: [(bonus, chroma_result), ...] keyword tamamlayıcıları
+        learned_results: Öğrenilen bilgi koleksiyonu sonucu (veya None)
+        rerank: False ise cross-encoder atlanır (agentic arama birleşik rerank yapar)
+    """
+    import re as _re
+
+    # v5.10.8: Türkçe-aware normalizasyon (İ/I/ı/i farkını kaldırır)
+    query_normalized = _normalize_tr(query)
+    query_terms = set(query_normalized.split())
+    # Anlamlı terimler: stopword olmayan, 3+ karakter
+    _entity_terms = {t for t in query_terms
+                     if len(t) >= 3 and t not in _TR_SEARCH_STOPWORDS}
+
+    # Sonuçları formatla + hybrid skor hesapla
+    documents = []
+    if results and results['documents']:
+        for i, doc in enumerate(results['documents'][0]):
+            metadata = results['metadatas'][0][i] if results['metadatas'] else {}
+            distance = results['distances'][0][i] if results['distances'] else 0
+            chunk_id = results['ids'][0][i] if results.get('ids') else None
+
+            # Semantic skor (ChromaDB L2² distance → similarity)
+            # v6.01.01: Divisor 4.0→8.0 — PDF/Excel chunk'ları dist>4.0 üretir,
+            # eski 4.0 divisor ile tüm semantic skorlar 0 oluyordu
+            semantic_score = max(0, 1 - distance / 8.0)
+
+            # Keyword skor — v5.10.8: word-boundary matching
+            # Substring yerine kelime sınırı eşleşmesi kullan
+            # (false positive azaltır: "bilgi"≠"bilgisayar", "var"≠"vardiya")
+            doc_normalized = _normalize_tr(doc)
+            doc_word_set = set(_re.findall(r'\w+', doc_normalized))
+            keyword_hits = 0
+            for t in _entity_terms:
+                if t in doc_word_set:
+                    keyword_hits += 1  # Tam kelime eşleşmesi
+                elif len(t) >= 5 and t in doc_normalized:
+                    keyword_hits += 1  # 5+ karakter için substring da kabul (Türkçe ek)
+            keyword_score = keyword_hits / max(len(_entity_terms), 1)
+
+            # Hybrid skor: %70 semantic + %30 keyword
+            hybrid_score = 0.7 * semantic_score + 0.3 * keyword_score
+
+            # v6.01.01: Multi-entity bonus — birden fazla farklı entity
+            # terimi eşleşen chunk'lara bonus ver (ör. "tarak" + "sanfor")
+            if keyword_score >= 0.5 and len(_entity_terms) >= 2:
+                hybrid_score *= (1 + keyword_score)  # kw=0.833 → *1.833
+
+            # Otomatik öğrenilmiş içerik → gerçek dokümanları önceliklendir
+            source = metadata.get("source", "")
+            doc_type = metadata.get("type", "")
+            is_web_learned = "web_search" in source or doc_type == "web_learned"
+            is_chat_learned = doc_type in ("chat_learned", "qa_learned", "voice_learned")
+            if is_web_learned:
+                hybrid_score *= 0.5   # Web cache %50 ceza
+            elif is_chat_learned:
+                hybrid_score *= 0.70  # Chat öğrenmeleri gerçek dokümanlardan sonra
+
+            # Knowledge Decay — eski bilgilerin skoru düşsün
+            created_at_str = metadata.get("created_at", "")
+            if created_at_str:
+                try:
+                    from datetime import datetime
+                    created_dt = datetime.fromisoformat(created_at_str)
+                    age_days = (datetime.utcnow() - created_dt).days
+                    # Yılda %20 azalma, minimum %50 (çok eski bile tamamen yok olmaz)
+                    decay = max(0.50, 1.0 - (age_days / 365) * 0.20)
+                    hybrid_score *= decay
+                except (ValueError, TypeError):
+                    pass
+
+            # v6.03.00: Skoru 1.0 ile cap'le (multi-entity bonus %100'ü aşabilir)
+            hybrid_score = min(hybrid_score, 1.0)
+
+            # v6.01.01: keyword_match flag'ını tüm sonuçlara ata
+            # (CE reranking'de keyword-protected ağırlıklama için gerekli)
+            _has_kw_match = keyword_score > 0
+            documents.append({
+                "content": doc,
+                "source": metadata.get("source", "Bilinmeyen"),
+                "type": metadata.get("type", "text"),
+                "department": metadata.get("department", "Genel"),
+                "relevance": round(hybrid_score, 4),
+                "distance": distance,
+                "semantic_score": round(semantic_score, 4),
+                "keyword_score": round(keyword_score, 4),
+                "keyword_match": _has_kw_match,
+                "chunk_id": chunk_id,
+            })
+
+    # ── v5.10.6 + v5.10.8: Keyword-aware tamamlayıcı arama ──
+    # Vector search'in döndüremediği ama sorgu kelimelerini
+    # birebir içeren dokümanları yakala (isim, varlık, kısa girişler).
+    _existing_contents = {d["content"][:100] for d in documents}
+
+    def _add_kw_result(_kw_doc, _kw_meta, _kw_dist, bonus=1.15, _kw_id=None):
+        """Keyword sonucunu documents listesine ekle (ortak yardımcı)."""
+        if _kw_doc[:100] in _existing_contents:
+            return
+        _existing_contents.add(_kw_doc[:100])
+        _kw_sem = max(0, 1 - _kw_dist / 8.0)  # v6.01.01: divisor 4.0→8.0
+        _kw_doc_norm = _normalize_tr(_kw_doc)
+        _kw_word_set = set(_re.findall(r'\w+', _kw_doc_norm))
+        _kw_hits = 0
+        for t in _entity_terms:
+            if t in _kw_word_set:
+                _kw_hits += 1
+            elif len(t) >= 5 and t in _kw_doc_norm:
+                _kw_hits += 1
+        _kw_kw_score = _kw_hits / max(len(_entity_terms), 1)
+        _kw_hybrid = 0.7 * _kw_sem + 0.3 * _kw_kw_score
+        # v5.10.8: Multi-entity bonus — birden fazla entity eşleşen chunk'lara
+        # katlanarak bonus ver (ad+soyad gibi birleşik sorgularda doğru chunk'ı öne çıkarır)
+        if _kw_kw_score >= 0.5 and len(_entity_terms) >= 2:
+            bonus *= (1 + _kw_kw_score)  # kw=0.75 → bonus*1.75, kw=1.0 → bonus*2.0
+        _kw_hybrid *= bonus
+        _kw_src = _kw_meta.get("source", "")
+        _kw_type = _kw_meta.get("type", "")
+        if "web_search" in _kw_src or _kw_type == "web_learned":
+            _kw_hybrid *= 0.5
+        elif _kw_type in ("chat_learned", "qa_learned", "voice_learned"):
+            _kw_hybrid *= 0.70
+        _kw_hybrid = min(_kw_hybrid, 1.0)  # v6.03.00: cap at 1.0
+        documents.append({
+            "content": _kw_doc,
+            "source": _kw_meta.get("source", "Bilinmeyen"),
+            "type": _kw_meta.get("type", "text"),
+            "department": _kw_meta.get("department", "Genel"),
+            "relevance": round(_kw_hybrid, 4),
+            "distance": _kw_dist,
+            "semantic_score": round(_kw_sem, 4),
+            "keyword_score": round(_kw_kw_score, 4),
+            "keyword_match": True,
+            "chunk_id": _kw_id,
+        })
+
+    for _bonus, kw_results in keyword_results:
+        if kw_results and kw_results['documents'] and kw_results['documents'][0]:
+            for _j, _kw_doc in enumerate(kw_results['documents'][0]):
+                _kw_meta = kw_results['metadatas'][0][_j] if kw_results.get('metadatas') else {}
+                _kw_dist = kw_results['distances'][0][_j] if kw_results.get('distances') else 999
+                _kw_id = kw_results['ids'][0][_j] if kw_results.get('ids') else None
+                _add_kw_result(_kw_doc, _kw_meta, _kw_dist, bonus=_bonus, _kw_id=_kw_id)
+
+    # Re-rank: önce hybrid skora göre sırala
+    documents.sort(key=lambda x: x["relevance"], reverse=True)
+
+    # v4.3.0: Cross-Encoder Re-Ranking — daha kesin sıralama
+    if rerank and CROSS_ENCODER_AVAILABLE and len(documents) > 1:
+        documents = _cross_encoder_rerank(query, documents, top_k=n_results)
+    else:
+        documents = documents[:n_results]
+
+    # v4.4.0: Multi-collection arama — öğrenilen bilgiden de sonuç getir
+    if learned_results and learned_results['documents'] and learned_results['documents'][0]:
+        for i, doc in enumerate(learned_results['documents'][0]):
+            l_metadata = learned_results['metadatas'][0][i] if learned_results['metadatas'] else {}
+            l_distance = learned_results['distances'][0][i] if learned_results['distances'] else 999
+            l_id = learned_results['ids'][0][i] if learned_results.get('ids') else None
+            l_semantic = max(0, 1 - l_distance / 8.0)  # v6.01.01: divisor 4.0→8.0
+            # Öğrenilen bilgi %80 ağırlık (dokümanlardan sonra)
+            l_score = l_semantic * 0.80
+            if l_score > 0.08:  # v6.01.01: eşik 0.15→0.08 (divisor 8.0 ile uyumlu)
+                documents.append({
+                    "content": doc,
+                    "source": l_metadata.get("source", "Öğrenilmiş"),
+                    "type": l_metadata.get("type", "learned"),
+                    "department": l_metadata.get("department", "Genel"),
+                    "relevance": round(l_score, 4),
+                    "distance": l_distance,
+                    "semantic_score": round(l_semantic, 4),
+                    "keyword_score": 0,
+                    "collection": "learned",
+                    "chunk_id": l_id,
+                })
+        # Tekrar sırala — öğrenilen bilgi de dahil
+        documents.sort(key=lambda x: x["relevance"], reverse=True)
+        documents = documents[:n_results]
+
+    return documents
+
+
+def _search_with_embedding(collection, query: str, query_embedding: list, n_results: int,
+                           where_filter: dict, department: str = None,
+                           rerank: bool = True) -> List[dict]:
+    """Vektörü hazır bir sorgu için ana + öğrenilen + keyword arama ve birleştirme.
+
+    Agentic arama alt sorguları tek batch'te encode edip buradan arar (v7.37.00).
+    """
+    # Daha fazla aday getir, sonra re-rank et
+    fetch_n = min(n_results * 3, 30)
+    results, learned_results = _query_collections(collection, query_embedding, fetch_n,
+                                                  where_filter, department, n_results)
+    keyword_results = _keyword_supplement(collection, query_embedding, _keyword_lookups(query))
+    return _assemble_results(query, n_results, results, keyword_results, learned_results,
+                             rerank=rerank)
+
+
+async def _async_search_with_embedding(collection, query: str, query_embedding: list,
+                                       n_results: int, where_filter: dict,
+                                       department: str = None, rerank: bool = True) -> List[dict]:
+    """`_search_with_embedding`'in async sürümü — bağımsız sorgular eşzamanlı."""
+    fetch_n = min(n_results * 3, 30)
+    with span("rag.query"):
+        (results, learned_results), keyword_results = await asyncio.gather(
+            _run_in_rag_executor(_query_collections, collection, query_embedding,
+                                 fetch_n, where_filter, department, n_results),
+            _run_in_rag_executor(_keyword_supplement, collection, query_embedding,
+                                 _keyword_lookups(query)),
+        )
+    with span("rag.assemble"):
+        return await _run_in_rag_executor(
+            _assemble_results, query, n_results, results, keyword_results, learned_results,
+            rerank)
+
+
+@contextlib.asynccontextmanager
+async def _search_slot():
+    """Eşzamanlı arama sınırı — admission bekleme/aktif arama metrikleriyle."""
+    semaphore = _get_search_semaphore()
+    _wait_start = time.perf_counter()
+    with _rag_executor_lock:
+        _RAG_EXECUTOR_STATS["searches_waiting"] += 1
+    try:
+        with span("rag.admission"):
+            await semaphore.acquire()
+    finally:
+        with _rag_executor_lock:
+            _RAG_EXECUTOR_STATS["searches_waiting"] -= 1
+            _RAG_EXECUTOR_STATS["admission_count"] += 1
+            _RAG_EXECUTOR_STATS["admission_wait_ms_sum"] += (time.perf_counter() - _wait_start) * 1000
+    
+    with _rag_executor_lock:
+        _RAG_EXECUTOR_STATS["searches_active"] += 1
+    try:
+        yield
+    finally:
+        with _rag_executor_lock:
+            _RAG_EXECUTOR_STATS["searches_active"] -= 1
+        semaphore.release()
+
+
 def search_documents(
     query: str,
     n_results: int = 5,
@@ -421,10 +1333,13 @@ def search_documents(
     doc_type: str = None,
     date_from: str = None,
     date_to: str = None,
+    rerank: bool = True,
 ) -> List[dict]:
     """
     Sorguya en uygun dokümanları arar.
     
+    Senkron sürüm — async handler'lardan `async_search_documents` kullanın.
+    
     Args:
         query: Arama sorgusu
         n_results: Döndürülecek sonuç sayısı
@@ -432,6 +1347,7 @@ def search_documents(
         doc_type: Doküman tipi filtresi — "pdf", "excel", "learned", vb. (v4.4.0)
         date_from: Başlangıç tarihi filtresi — "2025-01-01" formatı (v4.4.0)
         date_to: Bitiş tarihi filtresi — "2025-06-30" formatı (v4.4.0)
+        rerank: False ise cross-encoder atlanır, hybrid sıralı adaylar döner (v7.36.00)
     
     Returns:
         İlgili doküman parçaları listesi
@@ -449,268 +1365,11 @@ def search_documents(
         _search_start = time.time()
         
         # Sorguyu vektöre çevir
-        query_embedding = model.encode(query).tolist()
-        
-        # Filtreleme (v4.4.0: genişletilmiş metadata filtreleri)
-        where_filter = {}
-        where_conditions = []
-        
-        if department and department != "Genel":
-            where_conditions.append({"department": department})
-        
-        if doc_type:
-            where_conditions.append({"type": doc_type})
-        
-        if date_from:
-            where_conditions.append({"created_at": {"$gte": date_from}})
-        
-        if date_to:
-            where_conditions.append({"created_at": {"$lte": date_to}})
-        
-        if len(where_conditions) == 1:
-            where_filter = where_conditions[0]
-        elif len(where_conditions) > 1:
-            where_filter = {"$and": where_conditions}
-
-        # Daha fazla aday getir, sonra re-rank et
-        fetch_n = min(n_results * 3, 30)
-        
-        # Ara — önce department filtresi ile, sonuç yoksa filtresiz dene
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=fetch_n,
-            where=where_filter if where_filter else None
-        )
-        
-        # Department filtresi ile sonuç gelmezse, filtresiz tekrar dene
-        if where_filter and (not results or not results['documents'] or not results['documents'][0]):
-            logger.info("rag_retry_without_dept_filter", department=department)
-            results = collection.query(
-                query_embeddings=[query_embedding],
-                n_results=fetch_n
-            )
-        
-        # Sonuçları formatla + hybrid skor hesapla
-        documents = []
-        if results and results['documents']:
-            # v5.10.8: Türkçe-aware normalizasyon (İ/I/ı/i farkını kaldırır)
-            import re as _re
-            query_normalized = _normalize_tr(query)
-            query_terms = set(query_normalized.split())
-            # Anlamlı terimler: stopword olmayan, 3+ karakter
-            _entity_terms = {t for t in query_terms
-                             if len(t) >= 3 and t not in _TR_SEARCH_STOPWORDS}
-            
-            for i, doc in enumerate(results['documents'][0]):
-                metadata = results['metadatas'][0][i] if results['metadatas'] else {}
-                distance = results['distances'][0][i] if results['distances'] else 0
-                
-                # Semantic skor (ChromaDB L2² distance → similarity)
-                # v6.01.01: Divisor 4.0→8.0 — PDF/Excel chunk'ları dist>4.0 üretir,
-                # eski 4.0 divisor ile tüm semantic skorlar 0 oluyordu
-                semantic_score = max(0, 1 - distance / 8.0)
-                
-                # Keyword skor — v5.10.8: word-boundary matching
-                # Substring yerine kelime sınırı eşleşmesi kullan
-                # (false positive azaltır: "bilgi"≠"bilgisayar", "var"≠"vardiya")
-                doc_normalized = _normalize_tr(doc)
-                doc_word_set = set(_re.findall(r'\w+', doc_normalized))
-                keyword_hits = 0
-                for t in _entity_terms:
-                    if t in doc_word_set:
-                        keyword_hits += 1  # Tam kelime eşleşmesi
-                    elif len(t) >= 5 and t in doc_normalized:
-                        keyword_hits += 1  # 5+ karakter için substring da kabul (Türkçe ek)
-                keyword_score = keyword_hits / max(len(_entity_terms), 1)
-                
-                # Hybrid skor: %70 semantic + %30 keyword
-                hybrid_score = 0.7 * semantic_score + 0.3 * keyword_score
-                
-                # v6.01.01: Multi-entity bonus — birden fazla farklı entity
-                # terimi eşleşen chunk'lara bonus ver (ör. "tarak" + "sanfor")
-                if keyword_score >= 0.5 and len(_entity_terms) >= 2:
-                    hybrid_score *= (1 + keyword_score)  # kw=0.833 → *1.833
-                
-                # Otomatik öğrenilmiş içerik → gerçek dokümanları önceliklendir
-                source = metadata.get("source", "")
-                doc_type = metadata.get("type", "")
-                is_web_learned = "web_search" in source or doc_type == "web_learned"
-                is_chat_learned = doc_type in ("chat_learned", "qa_learned", "voice_learned")
-                if is_web_learned:
-                    hybrid_score *= 0.5   # Web cache %50 ceza
-                elif is_chat_learned:
-                    hybrid_score *= 0.70  # Chat öğrenmeleri gerçek dokümanlardan sonra
-                
-                # Knowledge Decay — eski bilgilerin skoru düşsün
-                created_at_str = metadata.get("created_at", "")
-                if created_at_str:
-                    try:
-                        from datetime import datetime
-                        created_dt = datetime.fromisoformat(created_at_str)
-                        age_days = (datetime.utcnow() - created_dt).days
-                        # Yılda %20 azalma, minimum %50 (çok eski bile tamamen yok olmaz)
-                        decay = max(0.50, 1.0 - (age_days / 365) * 0.20)
-                        hybrid_score *= decay
-                    except (ValueError, TypeError):
-                        pass
-                
-                # v6.03.00: Skoru 1.0 ile cap'le (multi-entity bonus %100'ü aşabilir)
-                hybrid_score = min(hybrid_score, 1.0)
-                
-                # v6.01.01: keyword_match flag'ını tüm sonuçlara ata
-                # (CE reranking'de keyword-protected ağırlıklama için gerekli)
-                _has_kw_match = keyword_score > 0
-                documents.append({
-                    "content": doc,
-                    "source": metadata.get("source", "Bilinmeyen"),
-                    "type": metadata.get("type", "text"),
-                    "department": metadata.get("department", "Genel"),
-                    "relevance": round(hybrid_score, 4),
-                    "distance": distance,
-                    "semantic_score": round(semantic_score, 4),
-                    "keyword_score": round(keyword_score, 4),
-                    "keyword_match": _has_kw_match,
-                })
-        
-        # ── v5.10.6 + v5.10.8: Keyword-aware tamamlayıcı arama ──
-        # Vector search'in döndüremediği ama sorgu kelimelerini
-        # birebir içeren dokümanları yakala (isim, varlık, kısa girişler).
-        # v5.10.8: Türkçe büyük harf varyantları + tekil kelime araması eklendi
-        _existing_contents = {d["content"][:100] for d in documents}
-        _kw_words = [w for w in query.lower().split() if len(w) >= 2]
-
-        # v5.10.8: Stopword'leri filtrele — entity kelimeleri (isim/soyisim) kalsın
-        _entity_words = [w for w in _kw_words
-                         if len(w) >= 3 and _normalize_tr(w) not in _TR_SEARCH_STOPWORDS]
-
-        def _add_kw_result(_kw_doc, _kw_meta, _kw_dist, bonus=1.15):
-            """Keyword sonucunu documents listesine ekle (ortak yardımcı)."""
-            if _kw_doc[:100] in _existing_contents:
-                return
-            _existing_contents.add(_kw_doc[:100])
-            _kw_sem = max(0, 1 - _kw_dist / 8.0)  # v6.01.01: divisor 4.0→8.0
-            _kw_doc_norm = _normalize_tr(_kw_doc)
-            _kw_word_set = set(_re.findall(r'\w+', _kw_doc_norm))
-            _kw_hits = 0
-            for t in _entity_terms:
-                if t in _kw_word_set:
-                    _kw_hits += 1
-                elif len(t) >= 5 and t in _kw_doc_norm:
-                    _kw_hits += 1
-            _kw_kw_score = _kw_hits / max(len(_entity_terms), 1)
-            _kw_hybrid = 0.7 * _kw_sem + 0.3 * _kw_kw_score
-            # v5.10.8: Multi-entity bonus — birden fazla entity eşleşen chunk'lara
-            # katlanarak bonus ver (ad+soyad gibi birleşik sorgularda doğru chunk'ı öne çıkarır)
-            if _kw_kw_score >= 0.5 and len(_entity_terms) >= 2:
-                bonus *= (1 + _kw_kw_score)  # kw=0.75 → bonus*1.75, kw=1.0 → bonus*2.0
-            _kw_hybrid *= bonus
-            _kw_src = _kw_meta.get("source", "")
-            _kw_type = _kw_meta.get("type", "")
-            if "web_search" in _kw_src or _kw_type == "web_learned":
-                _kw_hybrid *= 0.5
-            elif _kw_type in ("chat_learned", "qa_learned", "voice_learned"):
-                _kw_hybrid *= 0.70
-            _kw_hybrid = min(_kw_hybrid, 1.0)  # v6.03.00: cap at 1.0
-            documents.append({
-                "content": _kw_doc,
-                "source": _kw_meta.get("source", "Bilinmeyen"),
-                "type": _kw_meta.get("type", "text"),
-                "department": _kw_meta.get("department", "Genel"),
-                "relevance": round(_kw_hybrid, 4),
-                "distance": _kw_dist,
-                "semantic_score": round(_kw_sem, 4),
-                "keyword_score": round(_kw_kw_score, 4),
-                "keyword_match": True,
-            })
-
-        # (A) Bigram $contains araması (v5.10.6 — mevcut)
-        if len(_kw_words) >= 2 and collection:
-            _kw_phrases = []
-            for _ki in range(min(len(_kw_words) - 1, 3)):
-                _p = f"{_kw_words[_ki]} {_kw_words[_ki + 1]}"
-                if len(_p) >= 5:
-                    _kw_phrases.append(_p)
+        query_embedding = _encode_query(query)
+        where_filter = _build_where_filter(department, doc_type, date_from, date_to)
 
-            for _phrase in _kw_phrases:
-                # Hem orijinal hem Türkçe büyük harf varyantını dene
-                _variants = {_phrase, _turkish_upper(_phrase)}
-                for _variant in _variants:
-                    try:
-                        kw_results = collection.query(
-                            query_embeddings=[query_embedding],
-                            where_document={"$contains": _variant},
-                            n_results=3,
-                        )
-                        if kw_results and kw_results['documents'] and kw_results['documents'][0]:
-                            for _j, _kw_doc in enumerate(kw_results['documents'][0]):
-                                _kw_meta = kw_results['metadatas'][0][_j] if kw_results.get('metadatas') else {}
-                                _kw_dist = kw_results['distances'][0][_j] if kw_results.get('distances') else 999
-                                _add_kw_result(_kw_doc, _kw_meta, _kw_dist, bonus=1.15)
-                    except Exception as _kw_err:
-                        logger.debug("keyword_supplement_skip", phrase=_variant, error=str(_kw_err))
-
-        # (B) v5.10.8: Tekil entity kelime araması (isim, soyisim vb.)
-        # Excel personel listesi gibi yapısal verilerde Ad ve Soyadı
-        # farklı sütunlarda olduğu için bigram eşleşmez — tekil arama gerekir.
-        if _entity_words and collection:
-            for _word in _entity_words[:4]:  # En fazla 4 kelime
-                _upper_word = _turkish_upper(_word)
-                for _variant in {_word, _upper_word}:
-                    try:
-                        kw_results = collection.query(
-                            query_embeddings=[query_embedding],
-                            where_document={"$contains": _variant},
-                            n_results=5,
-                        )
-                        if kw_results and kw_results['documents'] and kw_results['documents'][0]:
-                            for _j, _kw_doc in enumerate(kw_results['documents'][0]):
-                                _kw_meta = kw_results['metadatas'][0][_j] if kw_results.get('metadatas') else {}
-                                _kw_dist = kw_results['distances'][0][_j] if kw_results.get('distances') else 999
-                                _add_kw_result(_kw_doc, _kw_meta, _kw_dist, bonus=1.10)
-                    except Exception as _kw_err:
-                        logger.debug("entity_keyword_skip", word=_variant, error=str(_kw_err))
-
-        # Re-rank: önce hybrid skora göre sırala
-        documents.sort(key=lambda x: x["relevance"], reverse=True)
-        
-        # v4.3.0: Cross-Encoder Re-Ranking — daha kesin sıralama
-        if CROSS_ENCODER_AVAILABLE and len(documents) > 1:
-            documents = _cross_encoder_rerank(query, documents, top_k=n_results)
-        else:
-            documents = documents[:n_results]
-        
-        # v4.4.0: Multi-collection arama — öğrenilen bilgiden de sonuç getir
-        try:
-            learned_coll = get_learned_collection()
-            if learned_coll and learned_coll.count() > 0:
-                learned_results = learned_coll.query(
-                    query_embeddings=[query_embedding],
-                    n_results=min(3, n_results),
-                )
-                if learned_results and learned_results['documents'] and learned_results['documents'][0]:
-                    for i, doc in enumerate(learned_results['documents'][0]):
-                        l_metadata = learned_results['metadatas'][0][i] if learned_results['metadatas'] else {}
-                        l_distance = learned_results['distances'][0][i] if learned_results['distances'] else 999
-                        l_semantic = max(0, 1 - l_distance / 8.0)  # v6.01.01: divisor 4.0→8.0
-                        # Öğrenilen bilgi %80 ağırlık (dokümanlardan sonra)
-                        l_score = l_semantic * 0.80
-                        if l_score > 0.08:  # v6.01.01: eşik 0.15→0.08 (divisor 8.0 ile uyumlu)
-                            documents.append({
-                                "content": doc,
-                                "source": l_metadata.get("source", "Öğrenilmiş"),
-                                "type": l_metadata.get("type", "learned"),
-                                "department": l_metadata.get("department", "Genel"),
-                                "relevance": round(l_score, 4),
-                                "distance": l_distance,
-                                "semantic_score": round(l_semantic, 4),
-                                "keyword_score": 0,
-                                "collection": "learned",
-                            })
-                    # Tekrar sırala — öğrenilen bilgi de dahil
-                    documents.sort(key=lambda x: x["relevance"], reverse=True)
-                    documents = documents[:n_results]
-        except Exception as learned_err:
-            logger.debug("learned_collection_search_skipped", error=str(learned_err))
+        documents = _search_with_embedding(collection, query, query_embedding, n_results,
+                                           where_filter, department, rerank)
         
         logger.info("search_completed", query=query[:50], results=len(documents),
                      hybrid_search=True,
@@ -727,6 +1386,57 @@ def search_documents(
         return []
 
 
+async def async_search_documents(
+    query: str,
+    n_results: int = 5,
+    department: str = None,
+    doc_type: str = None,
+    date_from: str = None,
+    date_to: str = None,
+    rerank: bool = True,
+) -> List[dict]:
+    """
+    `search_documents`'ın event loop'u bloklamayan sürümü (v7.18.00).
+    
+    Encode, Chroma sorguları ve cross-encoder RAG executor'ında çalışır;
+    birbirinden bağımsız sorgular (ana + öğrenilen bilgi koleksiyonları,
+    keyword tamamlayıcılar) eşzamanlı yürütülür. Eşzamanlı arama sayısı
+    RAG_MAX_CONCURRENT_SEARCHES ile sınırlıdır (backpressure).
+    
+    Args/Returns: `search_documents` ile aynı.
+    """
+    if not CHROMADB_AVAILABLE or not EMBEDDINGS_AVAILABLE:
+        return []
+    
+    async with _search_slot():
+        try:
+            collection = get_collection()
+            if not collection or not get_embedding_model():
+                return []
+            
+            _search_start = time.time()
+            
+            with span("rag.encode"):
+                query_embedding = await _run_in_rag_executor(_encode_query, query)
+            where_filter = _build_where_filter(department, doc_type, date_from, date_to)
+            
+            documents = await _async_search_with_embedding(
+                collection, query, query_embedding, n_results, where_filter, department, rerank)
+            
+            logger.info("search_completed", query=query[:50], results=len(documents),
+                         hybrid_search=True, async_search=True,
+                         cross_encoder=CROSS_ENCODER_AVAILABLE)
+            
+            _search_latency = (time.time() - _search_start) * 1000
+            log_retrieval_metrics(query, documents, _search_latency)
+            
+            return documents
+            
+        except Exception as e:
+            logger.error("search_error", error=str(e))
+            return []
+
+
 def chunk_text(text: str, chunk_size: int = 500, overlap: int = 100) -> List[str]:
     """
     Metni akıllı parçalara böler — cümle sınırlarına saygı gösterir.
@@ -795,6 +1505,10 @@ def agentic_search(query: str, n_results: int = 5, department: str = None) -> Li
     - Sonuçlar birleştirilir ve tekrarlar elenir
     - Daha geniş bilgi tabanı kapsamı sağlanır
     
+    v7.37.00: Alt sorgular tek batch'te encode edilir, RAG executor'ında
+    eşzamanlı aranır ve chunk ID'leri üzerinden reciprocal rank fusion ile
+    birleştirilir — toplam gecikme ≈ tek aramanın gecikmesi.
+    
     Args:
         query: Kullanıcı sorusu
         n_results: Döndürülecek toplam sonuç sayısı
@@ -809,40 +1523,133 @@ def agentic_search(query: str, n_results: int = 5, department: str = None) -> Li
         # Basit sorgu — doğrudan klasik arama
         return search_documents(query, n_results=n_results, department=department)
     
+    if not CHROMADB_AVAILABLE or not EMBEDDINGS_AVAILABLE:
+        return []
+    
     logger.info("agentic_rag_start", original=query[:80], sub_queries=len(sub_queries))
     
-    # Her alt sorguyu ara
-    all_docs = []
-    seen_sources = set()
-    
-    for sq in sub_queries:
-        docs = search_documents(sq, n_results=max(3, n_results // len(sub_queries) + 1),
-                                department=department)
-        for doc in docs:
-            # Duplikasyon kontrolü — aynı source+chunk gelmesin
-            doc_key = f"{doc.get('source', '')}:{doc.get('content', '')[:80]}"
-            if doc_key not in seen_sources:
-                seen_sources.add(doc_key)
+    try:
+        collection = get_collection()
+        if not collection or not get_embedding_model():
+            return []
+        _search_start = time.time()
+        embeddings = _encode_batch(sub_queries)
+        where_filter = _build_where_filter(department)
+        per_query_n = max(3, n_results // len(sub_queries) + 1)
+        
+        # Her alt sorguyu ara — rerank birleşik aday kümesinde bir kez (v7.36.00)
+        args = [(collection, sq, emb, per_query_n, where_filter, department, False)
+                for sq, emb in zip(sub_queries, embeddings)]
+        if _in_rag_worker():
+            # Zaten RAG havuzundayız — iç içe submit havuzu kilitleyebilir
+            per_query_docs = [_search_with_embedding(*a) for a in args]
+        else:
+            executor = get_rag_executor()
+            futures = [executor.submit(contextvars.copy_context().run, _search_with_embedding, *a)
+                       for a in args]
+            per_query_docs = [f.result() for f in futures]
+        
+        documents = _fuse_sub_query_results(sub_queries, per_query_docs, n_results, query=query)
+        log_retrieval_metrics(query, documents, (time.time() - _search_start) * 1000, mode="agentic")
+        return documents
+    except Exception as e:
+        logger.error("search_error", error=str(e))
+        return []
+
+
+async def async_agentic_search(query: str, n_results: int = 5, department: str = None) -> List[dict]:
+    """`agentic_search`'ün async sürümü — alt sorgular eşzamanlı aranır (v7.18.00).
+    
+    Tüm fan-out tek arama slotu kullanır; alt sorgular tek encode
+    çağrısında vektöre çevrilir (v7.37.00).
+    
+    Args/Returns: `agentic_search` ile aynı.
+    """
+    sub_queries = _decompose_query(query)
+    
+    if len(sub_queries) <= 1:
+        return await async_search_documents(query, n_results=n_results, department=department)
+    
+    if not CHROMADB_AVAILABLE or not EMBEDDINGS_AVAILABLE:
+        return []
+    
+    logger.info("agentic_rag_start", original=query[:80], sub_queries=len(sub_queries),
+                async_search=True)
+    
+    async with _search_slot():
+        try:
+            collection = get_collection()
+            if not collection or not get_embedding_model():
+                return []
+            _search_start = time.time()
+            with span("rag.encode"):
+                embeddings = await _run_in_rag_executor(_encode_batch, sub_queries)
+            where_filter = _build_where_filter(department)
+            per_query_n = max(3, n_results // len(sub_queries) + 1)
+
+            async def _sub_search(sq: str, emb: list) -> List[dict]:
+                with span("rag.sub_query"):
+                    return await _async_search_with_embedding(
+                        collection, sq, emb, per_query_n, where_filter, department, False)
+
+            per_query_docs = await asyncio.gather(
+                *[_sub_search(sq, emb) for sq, emb in zip(sub_queries, embeddings)])
+            documents = await _run_in_rag_executor(
+                _fuse_sub_query_results, sub_queries, list(per_query_docs), n_results, query)
+            log_retrieval_metrics(query, documents, (time.time() - _search_start) * 1000, mode="agentic")
+            return documents
+        except Exception as e:
+            logger.error("search_error", error=str(e))
+            return []
+
+
+# Reciprocal rank fusion sabiti — büyük k, alt sıraların katkısını dengeler
+RAG_RRF_K = int(os.environ.get("RAG_RRF_K", "60"))
+# Cross-encoder öncesi hybrid skora katılan normalize RRF payı
+RAG_RRF_WEIGHT = float(os.environ.get("RAG_RRF_WEIGHT", "0.5"))
+
+
+def _fuse_sub_query_results(sub_queries: List[str], per_query_docs: List[List[dict]],
+                            n_results: int, query: str = None) -> List[dict]:
+    """Alt sorgu sonuçlarını reciprocal rank fusion ile birleştir (v7.37.00).
+
+    Her chunk'ın skoru, geldiği her alt sorgudaki sırasından
+    Σ 1 / (RAG_RRF_K + sıra). Tekrarlar chunk ID'si üzerinden elenir
+    (ID yoksa kaynak + içerik başı). `relevance` alt sorgulardaki en
+    yüksek değer olarak kalır.
+
+    query verilirse birleşik aday kümesi orijinal soruya karşı tek batch'te
+    cross-encoder ile yeniden sıralanır (v7.36.00). Rerank `relevance`
+    üzerinden sıraladığı için RRF sırası kaybolmasın diye önce `relevance`
+    normalize RRF skoruyla harmanlanır (RAG_RRF_WEIGHT).
+    """
+    fused = {}
+    for sq, docs in zip(sub_queries, per_query_docs):
+        for rank, doc in enumerate(docs, 1):
+            doc_key = doc.get("chunk_id") or f"{doc.get('source', '')}:{doc.get('content', '')[:80]}"
+            contribution = 1.0 / (RAG_RRF_K + rank)
+            entry = fused.get(doc_key)
+            if entry is None:
                 # Hangi alt sorgudan geldiğini kaydet
                 doc["sub_query"] = sq
-                all_docs.append(doc)
-    
-    # Reciprocal Rank Fusion — her dokümana birden fazla sorgudan geldiyse bonus
-    source_hit_count = {}
-    for doc in all_docs:
-        src = doc.get("source", "")
-        source_hit_count[src] = source_hit_count.get(src, 0) + 1
+                doc["rrf_score"] = contribution
+                fused[doc_key] = doc
+            else:
+                entry["rrf_score"] += contribution
+                entry["relevance"] = max(entry.get("relevance", 0), doc.get("relevance", 0))
     
+    all_docs = list(fused.values())
     for doc in all_docs:
-        src = doc.get("source", "")
-        hits = source_hit_count.get(src, 1)
-        if hits > 1:
-            # Birden fazla alt sorguda çıkan kaynak → %20 bonus * (hit-1)
-            doc["relevance"] = doc.get("relevance", 0) * (1 + 0.20 * (hits - 1))
-    
-    # En yüksek relevance'a göre sırala
-    all_docs.sort(key=lambda x: x.get("relevance", 0), reverse=True)
-    result = all_docs[:n_results]
+        doc["rrf_score"] = round(doc["rrf_score"], 6)
+    all_docs.sort(key=lambda x: (x["rrf_score"], x.get("relevance", 0)), reverse=True)
+    if query and CROSS_ENCODER_AVAILABLE and len(all_docs) > 1:
+        top_rrf = all_docs[0]["rrf_score"]
+        for doc in all_docs:
+            doc["relevance"] = round((1 - RAG_RRF_WEIGHT) * doc.get("relevance", 0)
+                                     + RAG_RRF_WEIGHT * doc["rrf_score"] / top_rrf, 4)
+        result = _cross_encoder_rerank(query, all_docs, top_k=n_results)
+    else:
+        result = all_docs[:n_results]
     
     logger.info("agentic_rag_done", sub_queries=len(sub_queries),
                 total_found=len(all_docs), returned=len(result))
@@ -963,6 +1770,11 @@ def delete_document(source: str) -> bool:
             )
             if results and results['ids']:
                 collection.delete(ids=results['ids'])
+                _unindex_chunks(COLLECTION_NAME, results['ids'])
+                _ann_remove(COLLECTION_NAME, results['ids'])
+                from app.rag.incremental_ingest import get_manifest_store
+                get_manifest_store().delete(COLLECTION_NAME, source)
+                _invalidate_llm_cache("document_deleted", COLLECTION_NAME)
                 logger.info("document_deleted", source=source, chunks=len(results['ids']))
                 return True
     except Exception as e:
@@ -978,6 +1790,12 @@ def clear_all_documents() -> bool:
             client.delete_collection(COLLECTION_NAME)
             global _collection
             _collection = None
+            from app.rag.keyword_index import get_keyword_index
+            get_keyword_index(COLLECTION_NAME).clear()
+            get_retrieval_backend().on_clear(COLLECTION_NAME)
+            from app.rag.incremental_ingest import get_manifest_store
+            get_manifest_store().clear(COLLECTION_NAME)
+            _invalidate_llm_cache("all_documents_cleared")
             logger.info("all_documents_cleared")
             return True
     except Exception as e:
@@ -207,6 +207,11 @@ async def _llm_classify_intent(question: str) -> str | None:
     
     try:
         from app.llm.client import ollama_client
+        from app.llm.scheduler import llm_scheduler
+        # v7.25.00: LLM kuyruğu SLO'yu aşıyorsa sınıflandırmayı regex'e bırak
+        if llm_scheduler.is_degraded():
+            logger.info("llm_router_skipped_degraded")
+            return None
         if not await ollama_client.is_available():
             return None
         
@@ -216,6 +221,7 @@ async def _llm_classify_intent(question: str) -> str | None:
             system_prompt="Sadece sınıf adı yaz: sohbet, iş veya bilgi.",
             temperature=0.0,
             max_tokens=10,
+            priority="router",
         )
         
         if result:
@@ -200,9 +200,11 @@ def train_embedding_model(
     """
     from sentence_transformers import SentenceTransformer, InputExample, losses
     from torch.utils.data import DataLoader
+    from app.rag.embedding_service import EMBEDDING_MODEL
     
-    # Base model yükle
-    base_model = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+    # Base model yükle — eğitim ağırlıkları değiştirdiği için paylaşılan
+    # servisten bağımsız, ayrı bir kopya kullanılır
+    base_model = EMBEDDING_MODEL
     print(f"📦 Base model yükleniyor: {base_model}")
     model = SentenceTransformer(base_model)
     
@@ -264,14 +266,14 @@ def evaluate_model(model_path: str = None):
     """Fine-tuned model vs base model karşılaştırması."""
     from sentence_transformers import SentenceTransformer
     import numpy as np
+    from app.rag.embedding_service import get_embedding_service
     
-    base_model_name = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
     fine_tuned_path = model_path or "models/textile-mpnet-v1"
     
     print("📊 Model değerlendirmesi...")
     
-    # Her iki modeli de yükle
-    base_model = SentenceTransformer(base_model_name)
+    # Base model paylaşılan servisten, fine-tuned model diskten
+    base_model = get_embedding_service()
     fine_model = SentenceTransformer(fine_tuned_path)
     
     # Test çiftleri
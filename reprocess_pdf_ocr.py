@@ -12,7 +12,6 @@ Kullanım (sunucuda):
 import os
 import sys
 import glob
-import time
 
 # ── ChromaDB bağlantısı ──
 CHROMA_PERSIST_DIR = os.environ.get("CHROMA_PERSIST_DIR", "/opt/companyai/data/chromadb")
@@ -176,46 +175,31 @@ def main():
             print("  ℹ Devam ediliyor...")
     
     # 4) PDF'i OCR ile işle
+    # Sayfa paralel OCR — sonuçlar sayfa hash'iyle önbelleklenir, tekrar
+    # çalıştırmada yalnızca değişen sayfalar OCR'lanır
     print("\n[4/6] PDF OCR ile işleniyor (bu birkaç dakika sürebilir)...")
     
-    import fitz
-    pdf_doc = fitz.open(pdf_path)
-    page_count = len(pdf_doc)
-    print(f"  Sayfa sayısı: {page_count}")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from app.core.pdf_ocr import PDF_OCR_WORKERS, iter_pdf_ocr_pages, pdf_page_count
     
-    # EasyOCR reader (CPU modunda — GPU LLM için ayrılmış)
-    print("  EasyOCR yükleniyor (CPU modu)...")
-    reader = easyocr.Reader(['tr', 'en'], gpu=False)
-    print("  ✓ EasyOCR hazır")
+    page_count = pdf_page_count(pdf_path)
+    print(f"  Sayfa sayısı: {page_count}")
+    print(f"  OCR worker sayısı: {PDF_OCR_WORKERS} (CPU modu, sayfa önbelleği açık)")
     
     all_pages_text = []
     total_chars = 0
     
-    for page_num in range(page_count):
-        page = pdf_doc[page_num]
-        
-        # Sayfayı 200 DPI resme çevir
-        mat = fitz.Matrix(200/72, 200/72)
-        pix = page.get_pixmap(matrix=mat)
-        img_bytes = pix.tobytes("png")
-        
-        # OCR
-        start_t = time.time()
-        try:
-            results = reader.readtext(img_bytes, detail=0, paragraph=True)
-            page_text = "\n".join(results)
-            elapsed = time.time() - start_t
-            
-            if page_text.strip():
-                all_pages_text.append(f"--- Sayfa {page_num + 1} ---\n{page_text}")
-                total_chars += len(page_text)
-                print(f"  Sayfa {page_num + 1}/{page_count}: {len(page_text)} karakter ({elapsed:.1f}s)")
-            else:
-                print(f"  Sayfa {page_num + 1}/{page_count}: boş ({elapsed:.1f}s)")
-        except Exception as e:
-            print(f"  Sayfa {page_num + 1}/{page_count}: HATA - {e}")
-    
-    pdf_doc.close()
+    for page in iter_pdf_ocr_pages(pdf_path, filename=PDF_FILENAME):
+        elapsed = page.elapsed_ms / 1000
+        if page.method == "error":
+            print(f"  Sayfa {page.page}/{page_count}: HATA - {page.error}")
+        elif page.text.strip():
+            all_pages_text.append(f"--- Sayfa {page.page} ---\n{page.text}")
+            total_chars += len(page.text)
+            source = "önbellek" if page.method == "cache" else f"{page.dpi} DPI, {elapsed:.1f}s"
+            print(f"  Sayfa {page.page}/{page_count}: {len(page.text)} karakter ({source})")
+        else:
+            print(f"  Sayfa {page.page}/{page_count}: boş ({page.method})")
     
     if not all_pages_text:
         print("  ✗ Hiçbir sayfadan metin çıkarılamadı!")
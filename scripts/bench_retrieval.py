@@ -0,0 +1,169 @@
+"""Retrieval kıyaslaması — recall@k ve gecikme, kesin (brute-force) aramaya karşı.
+
+Kullanım:
+    python scripts/bench_retrieval.py                 # Chroma'daki company_documents
+    python scripts/bench_retrieval.py --synthetic 50000 --dim 384 --departments 8
+    python scripts/bench_retrieval.py --ef 16,32,64,128 --k 10 --queries 200
+
+Ölçülen yöntemler:
+    partitioned  — retrieval_backend.PartitionedVectorIndex (departman bölümü)
+    chroma       — koleksiyonun kendi HNSW araması (`where` filtreli)
+    hnswlib      — hnswlib kuruluysa M/ef taraması (filtre sonradan uygulanır)
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rag.retrieval_backend import (
+    RAG_HNSW_EF_CONSTRUCTION, RAG_HNSW_M, PartitionedVectorIndex, REBUILD_PAGE_SIZE,
+)
+
+
+def load_chroma_corpus(limit):
+    from app.rag.vector_store import get_collection
+    collection = get_collection()
+    if collection is None:
+        raise SystemExit("ChromaDB kullanılamıyor — --synthetic kullanın")
+    ids, vectors, metadatas = [], [], []
+    total = min(collection.count(), limit)
+    offset = 0
+    while offset < total:
+        page = collection.get(include=["embeddings", "metadatas"],
+                              limit=min(REBUILD_PAGE_SIZE, total - offset), offset=offset)
+        if not page["ids"]:
+            break
+        ids.extend(page["ids"])
+        vectors.extend(page["embeddings"])
+        metadatas.extend(m or {} for m in page["metadatas"])
+        offset += len(page["ids"])
+    return collection, ids, np.asarray(vectors, dtype=np.float32), metadatas
+
+
+def synthetic_corpus(n, dim, departments, seed):
+    """Departman başına kümelenmiş, normalize vektörler (embedding dağılımına yakın)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(departments * 4, dim)).astype(np.float32)
+    labels = rng.integers(0, len(centers), size=n)
+    vectors = centers[labels] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    types = ["pdf", "docx", "excel", "text"]
+    metadatas = [{
+        "department": f"Departman{label % departments}",
+        "type": types[i % len(types)],
+        "created_at": f"2025-{1 + i % 12:02d}-01T00:00:00",
+    } for i, label in enumerate(labels)]
+    return None, [f"doc_{i}" for i in range(n)], vectors, metadatas
+
+
+def exact_topk(vectors, mask, q, k):
+    dist = ((vectors - q) ** 2).sum(axis=1)
+    dist = np.where(mask, dist, np.inf)
+    k = min(k, int(mask.sum()))
+    if k == 0:
+        return []
+    top = np.argpartition(dist, k - 1)[:k]
+    return list(top[np.argsort(dist[top])])
+
+
+def percentile_ms(samples, p):
+    return round(float(np.percentile(samples, p)) * 1000, 2) if samples else 0.0
+
+
+def report(name, found, truth, latencies, k):
+    recalls = [len(set(f) & set(t)) / max(1, min(k, len(t))) for f, t in zip(found, truth) if t]
+    print(f"{name:<28} recall@{k}={np.mean(recalls) if recalls else 0:.3f}  "
+          f"p50={percentile_ms(latencies, 50)}ms  p95={percentile_ms(latencies, 95)}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval recall/latency benchmark")
+    parser.add_argument("--synthetic", type=int, default=0, help="Sentetik korpus boyutu (0 = Chroma)")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--departments", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=200000, help="Chroma'dan okunacak en fazla chunk")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef", default="16,32,64,128", help="hnswlib ef_search değerleri")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        collection, ids, vectors, metadatas = synthetic_corpus(
+            args.synthetic, args.dim, args.departments, args.seed)
+    else:
+        collection, ids, vectors, metadatas = load_chroma_corpus(args.limit)
+    if len(ids) == 0:
+        raise SystemExit("Korpus boş")
+    print(f"Korpus: {len(ids)} chunk, boyut {vectors.shape[1]}")
+
+    rng = np.random.default_rng(args.seed)
+    departments = np.array([m.get("department") or "" for m in metadatas])
+    sample = rng.choice(len(ids), size=min(args.queries, len(ids)), replace=False)
+    queries = vectors[sample] + 0.05 * rng.normal(size=(len(sample), vectors.shape[1])).astype(np.float32)
+    query_depts = departments[sample]
+    k = args.k
+
+    # Kesin arama — hem ground truth hem referans gecikme
+    truth, latencies = [], []
+    for q, dept in zip(queries, query_depts):
+        t = time.perf_counter()
+        truth.append([ids[i] for i in exact_topk(vectors, departments == dept, q, k)])
+        latencies.append(time.perf_counter() - t)
+    report("exact (full scan)", truth, truth, latencies, k)
+
+    # Departman bölümlü indeks
+    index = PartitionedVectorIndex("bench")
+    t = time.perf_counter()
+    index.add(ids, vectors, metadatas)
+    print(f"partitioned build: {time.perf_counter() - t:.2f}s")
+    found, latencies = [], []
+    for q, dept in zip(queries, query_depts):
+        t = time.perf_counter()
+        found.append([doc_id for doc_id, _ in index.search(q, k, {"department": dept} if dept else {})])
+        latencies.append(time.perf_counter() - t)
+    report("partitioned", found, truth, latencies, k)
+
+    # Chroma'nın kendi HNSW araması (koleksiyonun mevcut ayarlarıyla)
+    if collection is not None:
+        found, latencies = [], []
+        for q, dept in zip(queries, query_depts):
+            t = time.perf_counter()
+            res = collection.query(query_embeddings=[q.tolist()], n_results=k,
+                                   where={"department": dept} if dept else None, include=[])
+            latencies.append(time.perf_counter() - t)
+            found.append(res["ids"][0])
+        meta = collection.metadata or {}
+        report(f"chroma (ef={meta.get('hnsw:search_ef', 'default')})", found, truth, latencies, k)
+
+    # hnswlib ile M/ef taraması — filtre sonradan uygulanır (k'yı aşan aday çekilir)
+    try:
+        import hnswlib
+    except ImportError:
+        print("hnswlib kurulu değil — ef taraması atlandı")
+        return
+    hnsw = hnswlib.Index(space="l2", dim=vectors.shape[1])
+    hnsw.init_index(max_elements=len(ids), M=RAG_HNSW_M, ef_construction=RAG_HNSW_EF_CONSTRUCTION)
+    t = time.perf_counter()
+    hnsw.add_items(vectors, np.arange(len(ids)))
+    print(f"hnswlib build (M={RAG_HNSW_M}, ef_c={RAG_HNSW_EF_CONSTRUCTION}): {time.perf_counter() - t:.2f}s")
+    for ef in (int(x) for x in args.ef.split(",") if x.strip()):
+        fetch = min(len(ids), k * max(1, args.departments))
+        hnsw.set_ef(max(ef, fetch))
+        found, latencies = [], []
+        for q, dept in zip(queries, query_depts):
+            t = time.perf_counter()
+            labels, _ = hnsw.knn_query(q, k=fetch)
+            hits = [ids[i] for i in labels[0] if departments[i] == dept][:k]
+            latencies.append(time.perf_counter() - t)
+            found.append(hits)
+        report(f"hnswlib (ef={max(ef, fetch)})", found, truth, latencies, k)
+
+
+if __name__ == "__main__":
+    main()
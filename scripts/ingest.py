@@ -2,16 +2,36 @@
 import os
 import sys
 import glob
+import json
+import argparse
 from pathlib import Path
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.rag.vector_store import add_document, get_stats, clear_all_documents
+from app.rag.vector_store import add_document, get_stats, clear_all_documents, get_ingestion_metrics_summary
 
 DOCS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "docs")
+# Dosya boyutu + mtime — değişmeyen dosyalar okunmadan/parse edilmeden atlanır
+STATE_FILE = os.path.join(DOCS_DIR, ".ingest_state.json")
 
-def ingest_all():
+
+def load_state():
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state):
+    tmp = STATE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, STATE_FILE)
+
+
+def ingest_all(full=False):
     print(f"Scanning documents in: {DOCS_DIR}")
     
     if not os.path.exists(DOCS_DIR):
@@ -27,8 +47,15 @@ def ingest_all():
         
     print(f"Found {len(files)} documents.")
     
+    state = {} if full else load_state()
+    
     for file_path in files:
         filename = os.path.basename(file_path)
+        st = os.stat(file_path)
+        fingerprint = [st.st_size, st.st_mtime_ns]
+        if state.get(filename) == fingerprint:
+            print(f"Processing: {filename}... UNCHANGED (file)")
+            continue
         print(f"Processing: {filename}...", end=" ", flush=True)
         
         try:
@@ -57,7 +84,11 @@ def ingest_all():
             if content.strip():
                 success = add_document(content, source=filename, doc_type=doc_type)
                 if success:
-                    print("OK")
+                    # add_document yalnızca değişen chunk'ları embed eder
+                    last = (get_ingestion_metrics_summary().get("last_10") or [{}])[-1]
+                    print(f"OK (written={last.get('added', 0)}, unchanged={last.get('unchanged', 0)}, "
+                          f"deleted={last.get('deleted', 0)})")
+                    state[filename] = fingerprint
                 else:
                     print("FAILED (Vector Store Error)")
             else:
@@ -66,14 +97,24 @@ def ingest_all():
         except Exception as e:
             print(f"ERROR: {e}")
 
+    save_state(state)
     stats = get_stats()
     print("\n--- RAG Stats ---")
     print(stats)
 
 if __name__ == "__main__":
-    confirm = input("Clear existing database before ingestion? (y/n): ")
-    if confirm.lower() == 'y':
-        clear_all_documents()
-        print("Database cleared.")
+    parser = argparse.ArgumentParser(description="data/docs altındaki dokümanları RAG'e yükle")
+    parser.add_argument("--sync", action="store_true",
+                        help="Soru sormadan artımlı senkronizasyon (gece cron'u için)")
+    parser.add_argument("--full", action="store_true",
+                        help="Dosya durum önbelleğini yok say, her dosyayı yeniden oku")
+    args = parser.parse_args()
+    
+    if not args.sync:
+        confirm = input("Clear existing database before ingestion? (y/n): ")
+        if confirm.lower() == 'y':
+            clear_all_documents()
+            args.full = True
+            print("Database cleared.")
         
-    ingest_all()
+    ingest_all(full=args.full)
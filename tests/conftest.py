@@ -8,6 +8,7 @@ SQLite in-memory DB, fake HTTP client, mock ChromaDB vb.
 import os
 import sys
 import asyncio
+import tempfile
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -21,6 +22,8 @@ os.environ["OLLAMA_BASE_URL"] = "http://localhost:11434"
 os.environ["LLM_MODEL"] = "test-model"
 os.environ["ADMIN_DEFAULT_PASSWORD"] = "testpass123"
 os.environ["CORS_ORIGINS"] = '["http://localhost:3000"]'
+# add_document manifest'leri repo'daki data/ yerine geçici dizine
+os.environ["RAG_MANIFEST_DIR"] = tempfile.mkdtemp(prefix="rag_manifests_")
 
 # Proje kökünü path'e ekle
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -163,5 +166,146 @@ def mock_embedding_model():
     """Mock SentenceTransformer model."""
     import numpy as np
     model = MagicMock()
-    model.encode = MagicMock(return_value=np.random.rand(768).astype("float32"))
+    # SentenceTransformer gibi: str → 1-D, liste → 2-D
+    model.encode = MagicMock(side_effect=lambda texts, **kw: (
+        np.random.rand(768).astype("float32") if isinstance(texts, str)
+        else np.random.rand(len(texts), 768).astype("float32")))
     return model
+
+
+# ── Core Modül Fixture'ları ──
+@pytest.fixture
+def sample_frame():
+    """Eksik değer ve uç değer içeren sayısal/kategorik DataFrame."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        "bolge": rng.choice(["Ege", "Marmara", "İç Anadolu"], 200),
+        "satis": rng.lognormal(5, 1, 200),
+        "maliyet": rng.normal(100, 20, 200),
+        "adet": rng.integers(0, 50, 200),
+    })
+    df.loc[[3, 17, 40], "maliyet"] = np.nan
+    df.loc[5, "satis"] = 1e6
+    return df
+
+
+@pytest.fixture
+def make_workbook():
+    """Satır listesinden .xlsx byte'ları üretir."""
+    def _make(rows):
+        import io
+        import openpyxl
+
+        wb = openpyxl.Workbook()
+        for row in rows:
+            wb.active.append(row)
+        buf = io.BytesIO()
+        wb.save(buf)
+        return buf.getvalue()
+    return _make
+
+
+@pytest.fixture
+def make_ingest_queue(tmp_path):
+    """tmp_path'te kalıcı job store'lu IngestQueue; indexlenenler `indexed`e yazılır."""
+    from app.core.ingest_jobs import IngestJobStore, IngestQueue
+
+    def _make(extract, indexed=None, **kwargs):
+        def index(content, filename, doc_type, metadata):
+            if indexed is not None:
+                indexed.append((filename, content, metadata["department"]))
+            return True
+
+        return IngestQueue(store=IngestJobStore(tmp_path), workers=2, process_workers=0,
+                           retry_backoff_s=0, extract_fn=extract, index_fn=index, **kwargs)
+    return _make
+
+
+@pytest.fixture
+def make_page_image():
+    """Gri tonlu sahte PDF sayfası; ink=False → yalnızca tarayıcı gürültüsü."""
+    def _make(number, ink=True):
+        import numpy as np
+        from app.core.pdf_ocr import PageImage
+
+        arr = np.full((200, 160), 255, dtype=np.uint8)
+        arr[::7, ::3] = 250  # tarayıcı gürültüsü
+        if ink:
+            arr[40 + number:80 + number, 20:140:2] = 0
+        return PageImage(page=number, width=160, height=200, samples=arr.tobytes(), dpi=200)
+    return _make
+
+
+@pytest.fixture
+def make_event():
+    """Sıra numarasından query.received event'i."""
+    def _make(i):
+        from datetime import datetime, timezone
+        from app.core.event_bus import Event
+
+        return Event(
+            event_id=f"evt-{i}", event_type="query.received", category="query",
+            timestamp=datetime.now(timezone.utc).isoformat(), payload={"i": i},
+            source="test", correlation_id=f"corr-{i}",
+        )
+    return _make
+
+
+@pytest.fixture
+def make_event_store(tmp_path):
+    """fsync'siz EventStore — varsayılan dizin tmp_path."""
+    from app.core.event_bus import EventStore
+
+    def _make(path=None, **options):
+        path = path or tmp_path
+        options.setdefault("fsync", False)
+        return EventStore(path / "event_log.jsonl", path / "decision_log.jsonl", **options)
+    return _make
+
+
+@pytest.fixture
+def filled_event_store(tmp_path, make_event_store):
+    """Saatlik, dört event tipine dağılmış `count` event yazılmış EventStore."""
+    from datetime import datetime, timedelta, timezone
+    from app.core.event_bus import Event
+
+    async def _fill(count=60, **options):
+        store = make_event_store(tmp_path, **options)
+        base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        types = ["query.received", "decision.created", "decision.approved", "policy.violated"]
+        for i in range(count):
+            et = types[i % len(types)]
+            await store.append(Event(
+                event_id=f"evt-{i}", event_type=et, category=et.split(".")[0],
+                timestamp=(base + timedelta(hours=i)).isoformat(), payload={"i": i},
+                source="test", correlation_id=f"corr-{i // 2}",
+            ))
+        return store
+    return _fill
+
+
+@pytest.fixture
+def make_event_bus(make_event_store):
+    """tmp_path'teki EventStore üzerinde EventBus."""
+    from app.core.event_bus import EventBus
+
+    def _make(**options):
+        return EventBus(store=make_event_store(), **options)
+    return _make
+
+
+@pytest.fixture
+def make_shared_metrics(tmp_path):
+    """tmp_path'te, test metrikleri tanımlı SharedMetrics (bu süreç master)."""
+    from app.core.shared_metrics import SharedMetrics
+
+    def _make():
+        shared = SharedMetrics(directory=tmp_path, flush_seconds=3600, master_pid=os.getpid())
+        shared.registry.declare("t_requests_total", "counter", "Requests")
+        shared.registry.declare("t_latency_seconds", "histogram", "Latency", buckets=(0.1, 1.0))
+        shared.registry.declare("t_queue_depth", "gauge", "Queue depth")
+        return shared
+    return _make
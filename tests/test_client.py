@@ -149,3 +149,340 @@ class TestOllamaClientInit:
     def test_singleton_instance_exists(self):
         from app.llm.client import ollama_client
         assert ollama_client is not None
+
+
+# ═══════════════════════════════════════════════════
+# 4. generate — Yanıt cache'i (v7.23.00)
+# ═══════════════════════════════════════════════════
+
+@pytest.fixture
+def cached_client():
+    """Taze LLM cache + Redis'siz ortamda mock HTTP client."""
+    from app.llm.client import OllamaClient
+    from app.llm.response_cache import LLMResponseCache
+
+    cache = LLMResponseCache()
+    client = OllamaClient()
+    mock_response = MagicMock()
+    mock_response.raise_for_status = MagicMock()
+    mock_response.json.return_value = {"message": {"role": "assistant", "content": "Cevap"}}
+    mock_http = AsyncMock()
+    mock_http.post = AsyncMock(return_value=mock_response)
+    mock_http.is_closed = False
+    client._client = mock_http
+
+    with patch("app.llm.client.get_llm_response_cache", return_value=cache), \
+         patch("app.cache.cache_get", AsyncMock(return_value=None)), \
+         patch("app.cache.cache_set", AsyncMock(return_value=False)):
+        yield client, cache
+
+
+class TestResponseCache:
+    """OllamaClient.generate yanıt cache'i testleri."""
+
+    @pytest.mark.asyncio
+    async def test_exact_hit_skips_llm(self, cached_client):
+        from app.llm.response_cache import get_last_cache_status
+        client, cache = cached_client
+        first = await client.generate("Soru", use_cache=True, system_prompt="Sys", cache_mode="Bilgi")
+        assert get_last_cache_status() == {"hit": False, "mode": "Bilgi"}
+        second = await client.generate("Soru", use_cache=True, system_prompt="Sys", cache_mode="Bilgi")
+        assert first == second == "Cevap"
+        assert client._client.post.await_count == 1
+        assert get_last_cache_status()["kind"] == "exact"
+        assert cache.stats()["exact_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_is_opt_in(self, cached_client):
+        from app.llm.response_cache import get_last_cache_status
+        client, cache = cached_client
+        for _ in range(2):
+            await client.generate("Niyet sınıfla", cache_mode="Bilgi")
+        assert client._client.post.await_count == 2
+        assert get_last_cache_status() is None
+        assert cache.stats()["stores"] == 0
+
+    @pytest.mark.asyncio
+    async def test_key_includes_system_prompt_and_options(self, cached_client):
+        client, _ = cached_client
+        await client.generate("Soru", use_cache=True, system_prompt="Sys A")
+        await client.generate("Soru", use_cache=True, system_prompt="Sys B")
+        await client.generate("Soru", use_cache=True, system_prompt="Sys A", temperature=0.1)
+        assert client._client.post.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_invalidation_on_document_change(self, cached_client):
+        client, cache = cached_client
+        await client.generate("Soru", use_cache=True, cache_mode="Bilgi")
+        cache.bump_generation()
+        await client.generate("Soru", use_cache=True, cache_mode="Bilgi")
+        assert client._client.post.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_uncached_modes_and_images_bypass(self, cached_client):
+        from app.llm.response_cache import get_last_cache_status
+        client, _ = cached_client
+        for _ in range(2):
+            await client.generate("Fikir ver", use_cache=True, cache_mode="Beyin Fırtınası")
+            await client.generate("Bu ne?", use_cache=True, images=["aGVsbG8="])
+        assert client._client.post.await_count == 4
+        assert get_last_cache_status() is None
+
+    @pytest.mark.asyncio
+    async def test_semantic_hit_for_same_docs(self, cached_client):
+        import numpy as np
+        from app.llm.response_cache import get_last_cache_status
+        client, _ = cached_client
+        vec = np.array([1.0, 0.0], dtype=np.float32)
+        with patch("app.llm.client.LLM_SEMANTIC_CACHE", True), \
+             patch("app.llm.client.semantic_embedding", AsyncMock(return_value=vec)):
+            ctx = {"question": "Ring iplik nedir?", "doc_ids": ["d1"]}
+            await client.generate("prompt 1", use_cache=True, cache_mode="Bilgi", cache_context=ctx)
+            ctx2 = {"question": "Ring iplik ne demek?", "doc_ids": ["d1"]}
+            await client.generate("prompt 2", use_cache=True, cache_mode="Bilgi", cache_context=ctx2)
+            assert get_last_cache_status()["kind"] == "semantic"
+            # Farklı doküman kümesi → yeni üretim
+            ctx3 = {"question": "Ring iplik nedir?", "doc_ids": ["d2"]}
+            await client.generate("prompt 3", use_cache=True, cache_mode="Bilgi", cache_context=ctx3)
+        assert client._client.post.await_count == 2
+
+
+# ═══════════════════════════════════════════════════
+# 5. Single-flight — eşzamanlı özdeş istekler (v7.24.00)
+# ═══════════════════════════════════════════════════
+
+def _slow_post(content="Cevap", delay=0.05, error=None):
+    import asyncio
+
+    async def _post(*args, **kwargs):
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        resp = MagicMock()
+        resp.raise_for_status = MagicMock()
+        resp.json.return_value = {"message": {"content": content}}
+        return resp
+    return AsyncMock(side_effect=_post)
+
+
+def _fake_stream(tokens, delay=0.01):
+    import asyncio
+    import json
+    from contextlib import asynccontextmanager
+
+    calls = []
+
+    @asynccontextmanager
+    async def _stream(method, url, **kwargs):
+        calls.append(kwargs.get("json"))
+
+        async def _lines():
+            for t in tokens:
+                await asyncio.sleep(delay)
+                yield json.dumps({"message": {"content": t}})
+
+        resp = MagicMock()
+        resp.raise_for_status = MagicMock()
+        resp.aiter_lines = _lines
+        yield resp
+
+    return _stream, calls
+
+
+class TestSingleFlight:
+    """OllamaClient single-flight testleri."""
+
+    def _client(self):
+        from app.llm.client import OllamaClient
+        client = OllamaClient()
+        client._client = MagicMock()
+        client._client.is_closed = False
+        return client
+
+    @pytest.mark.asyncio
+    async def test_identical_generates_share_one_request(self):
+        import asyncio
+        client = self._client()
+        client._client.post = _slow_post()
+        results = await asyncio.gather(*[
+            client.generate("KPI durumu?", use_cache=False) for _ in range(5)
+        ])
+        assert results == ["Cevap"] * 5
+        assert client._client.post.await_count == 1
+        assert client._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_different_payloads_not_merged(self):
+        import asyncio
+        client = self._client()
+        client._client.post = _slow_post()
+        await asyncio.gather(
+            client.generate("Soru A", use_cache=False),
+            client.generate("Soru B", use_cache=False),
+        )
+        assert client._client.post.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_different_priorities_not_merged(self):
+        import asyncio
+        client = self._client()
+        client._client.post = _slow_post()
+        await asyncio.gather(
+            client.generate("Soru", use_cache=False, priority="background"),
+            client.generate("Soru", use_cache=False, priority="interactive"),
+        )
+        assert client._client.post.await_count == 2
+        assert client._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_error_fans_out_to_all_waiters(self):
+        import asyncio
+        import httpx
+        client = self._client()
+        client._client.post = _slow_post(error=httpx.ConnectError("down"))
+        results = await asyncio.gather(
+            *[client.generate("Soru", use_cache=False) for _ in range(3)],
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, Exception) for r in results)
+        assert client._client.post.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        import asyncio
+        client = self._client()
+        client._client.post = _slow_post(delay=0.1)
+        first = asyncio.ensure_future(client.generate("Soru", use_cache=False))
+        second = asyncio.ensure_future(client.generate("Soru", use_cache=False))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        assert await second == "Cevap"
+
+    @pytest.mark.asyncio
+    async def test_stream_tokens_fanned_out(self):
+        import asyncio
+        client = self._client()
+        stream, calls = _fake_stream(["Mer", "ha", "ba"])
+        client._client.stream = stream
+
+        async def consume():
+            return [t async for t in client.stream("Selam")]
+
+        results = await asyncio.gather(consume(), consume(), consume())
+        assert results == [["Mer", "ha", "ba"]] * 3
+        assert len(calls) == 1
+        assert client._stream_flights == {}
+
+    @pytest.mark.asyncio
+    async def test_late_stream_subscriber_gets_buffered_tokens(self):
+        import asyncio
+        client = self._client()
+        stream, calls = _fake_stream(["a", "b", "c", "d"], delay=0.02)
+        client._client.stream = stream
+
+        async def consume(delay):
+            await asyncio.sleep(delay)
+            return "".join([t async for t in client.stream("Selam")])
+
+        results = await asyncio.gather(consume(0), consume(0.05))
+        assert results == ["abcd", "abcd"]
+        assert len(calls) == 1
+
+
+# ═══════════════════════════════════════════════════
+# 6. LLM zamanlayıcı — öncelik + admission control (v7.25.00)
+# ═══════════════════════════════════════════════════
+
+class TestLLMScheduler:
+    """LLMScheduler öncelik, sınıf limiti ve yük atma testleri."""
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_served_first(self):
+        import asyncio
+        from app.llm.scheduler import LLMScheduler
+        sched = LLMScheduler(capacity=1)
+        order = []
+
+        async def job(cls):
+            async with sched.slot(cls):
+                order.append(cls)
+
+        await sched.acquire("interactive")
+        tasks = [asyncio.ensure_future(job(c)) for c in ("background", "enterprise", "router", "interactive")]
+        await asyncio.sleep(0)
+        assert sched.stats()["classes"]["background"]["queued"] == 1
+        sched.release("interactive")
+        await asyncio.gather(*tasks)
+        assert order == ["interactive", "router", "enterprise", "background"]
+
+    @pytest.mark.asyncio
+    async def test_enterprise_leaves_slot_for_interactive(self):
+        from app.llm.scheduler import LLMScheduler
+        sched = LLMScheduler(capacity=2)
+        await sched.acquire("enterprise")
+        assert not sched._can_run("enterprise")
+        await sched.acquire("interactive")  # beklemeden
+        assert sched.stats()["classes"]["interactive"]["running"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_full_sheds(self):
+        import asyncio
+        from app.llm.scheduler import LLMScheduler, LLMOverloadedError
+        sched = LLMScheduler(capacity=1)
+        await sched.acquire("interactive")
+        with patch.dict("app.llm.scheduler.LLM_MAX_QUEUE", {"background": 1}):
+            waiter = asyncio.ensure_future(sched.acquire("background"))
+            await asyncio.sleep(0)
+            with pytest.raises(LLMOverloadedError):
+                await sched.acquire("background")
+        assert sched.stats()["classes"]["background"]["shed"] == 1
+        waiter.cancel()
+
+    @pytest.mark.asyncio
+    async def test_degraded_mode_sheds_background_and_shrinks_tokens(self):
+        import asyncio
+        from app.llm.scheduler import LLMScheduler, LLMOverloadedError
+        sched = LLMScheduler(capacity=1)
+        await sched.acquire("interactive")
+        with patch("app.llm.scheduler.LLM_QUEUE_SLO_MS", 10.0):
+            waiter = asyncio.ensure_future(sched.acquire("interactive"))
+            await asyncio.sleep(0.03)
+            assert sched.is_degraded()
+            assert sched.degrade_max_tokens("enterprise", 2048) == 256
+            with pytest.raises(LLMOverloadedError):
+                await sched.acquire("background")
+            sched.release("interactive")
+            await waiter
+        assert sched.stats()["classes"]["interactive"]["wait_p95_ms"] >= 10
+
+    @pytest.mark.asyncio
+    async def test_degraded_check_is_read_only(self):
+        import asyncio
+        from app.llm.scheduler import LLMScheduler
+        sched = LLMScheduler(capacity=1)
+        await sched.acquire("interactive")
+        with patch("app.llm.scheduler.LLM_QUEUE_SLO_MS", 10.0):
+            waiter = asyncio.ensure_future(sched.acquire("interactive"))
+            await asyncio.sleep(0.03)
+            with patch("app.llm.scheduler.logger") as log:
+                assert sched.stats()["degraded"] is True
+                sched.degrade_max_tokens("interactive", 2048)
+            log.warning.assert_not_called()
+            assert sched._degraded is False
+            sched.release("interactive")
+            await waiter
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_frees_queue(self):
+        import asyncio
+        from app.llm.scheduler import LLMScheduler
+        sched = LLMScheduler(capacity=1)
+        await sched.acquire("interactive")
+        waiter = asyncio.ensure_future(sched.acquire("router"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        sched.release("interactive")
+        stats = sched.stats()["classes"]
+        assert stats["router"]["queued"] == 0
+        assert sum(c["running"] for c in stats.values()) == 0
@@ -226,5 +226,988 @@ class TestWhisperSTT:
         assert "Desteklenmeyen" in result.get("error", "")
 
 
+# ══════════════════════════════════════════════════════════════
+# 8. STAGE DAG TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestStageDag:
+    """orchestrator.run_stage_dag — eşzamanlılık, bağımlılık, bütçe."""
+
+    async def test_independent_stages_run_concurrently(self):
+        import asyncio
+        import time
+        from app.core.orchestrator import DagStage, run_stage_dag
+
+        async def slow(deps):
+            await asyncio.sleep(0.2)
+            return "ok"
+
+        start = time.monotonic()
+        results = await run_stage_dag([DagStage(f"s{i}", slow) for i in range(5)])
+        assert time.monotonic() - start < 0.6
+        assert all(r.status == "completed" and r.output == "ok" for r in results.values())
+
+    async def test_dependency_outputs_passed(self):
+        from app.core.orchestrator import DagStage, run_stage_dag
+
+        order = []
+
+        async def a(deps):
+            order.append("a")
+            return 1
+
+        async def b(deps):
+            order.append("b")
+            return deps["a"] + 1
+
+        async def c(deps):
+            order.append("c")
+            return deps["a"] + deps["b"]
+
+        results = await run_stage_dag([
+            DagStage("c", c, ["a", "b"]),
+            DagStage("b", b, ["a"]),
+            DagStage("a", a),
+        ])
+        assert order == ["a", "b", "c"]
+        assert results["c"].output == 3
+
+    async def test_timeout_does_not_fail_dependents(self):
+        import asyncio
+        from app.core.orchestrator import DagStage, run_stage_dag
+
+        async def hang(deps):
+            await asyncio.sleep(5)
+
+        async def boom(deps):
+            raise RuntimeError("patladı")
+
+        async def after(deps):
+            return deps
+
+        results = await run_stage_dag([
+            DagStage("hang", hang, timeout=0.05),
+            DagStage("boom", boom),
+            DagStage("after", after, ["hang", "boom"]),
+        ])
+        assert results["hang"].status == "timed_out"
+        assert results["boom"].status == "failed"
+        assert results["after"].status == "completed"
+        assert results["after"].output == {"hang": None, "boom": None}
+
+    async def test_budget_cancels_pending(self):
+        import asyncio
+        from app.core.orchestrator import DagStage, run_stage_dag
+
+        async def slow(deps):
+            await asyncio.sleep(5)
+
+        async def fast(deps):
+            return "ok"
+
+        results = await run_stage_dag([
+            DagStage("fast", fast),
+            DagStage("slow", slow, timeout=10),
+            DagStage("after", fast, ["slow"]),
+        ], budget=0.1)
+        assert results["fast"].status == "completed"
+        assert results["slow"].status == "timed_out"
+        assert results["after"].status == "timed_out"
+
+    async def test_timed_out_stage_thread_sees_cancellation(self):
+        import asyncio
+        import time
+        from app.core.orchestrator import DagStage, run_stage_dag, stage_cancelled, stage_to_thread
+
+        seen = []
+
+        def work():
+            time.sleep(0.15)
+            # Geç kalan iş yan etki yazmadan önce iptali görebilmeli
+            seen.append(stage_cancelled())
+
+        async def slow(deps):
+            await stage_to_thread(work)
+
+        results = await run_stage_dag([DagStage("slow", slow, timeout=0.05)])
+        assert results["slow"].status == "timed_out"
+        await asyncio.sleep(0.2)
+        assert seen == [True]
+
+    def test_cycle_and_unknown_dependency_rejected(self):
+        import asyncio
+        from app.core.orchestrator import DagStage, run_stage_dag
+
+        async def noop(deps):
+            return None
+
+        with pytest.raises(ValueError):
+            asyncio.run(run_stage_dag([DagStage("a", noop, ["b"]), DagStage("b", noop, ["a"])]))
+        with pytest.raises(ValueError):
+            asyncio.run(run_stage_dag([DagStage("a", noop, ["yok"])]))
+
+
+# ══════════════════════════════════════════════════════════════
+# 9. AŞAMA İZLEME (SPAN TRACING) TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestStageTracing:
+    """stage_tracing — span iç içeliği, percentile, thread yayılımı."""
+
+    def test_nested_spans_fold_into_paths(self):
+        from app.core.stage_tracing import StageTracer, QueryTrace, span, _current_trace
+
+        trace = QueryTrace("q")
+        token = _current_trace.set(trace)
+        try:
+            with span("rag_search"):
+                with span("rag.rerank"):
+                    pass
+            with span("llm"):
+                pass
+        finally:
+            _current_trace.reset(token)
+        StageTracer().finish(trace)
+
+        paths = {s["path"] for s in trace.spans}
+        assert paths == {"rag_search", "rag_search;rag.rerank", "llm"}
+        assert "q;rag_search;rag.rerank" in trace.folded()
+        assert trace.summary()["span_count"] == 3
+
+    def test_stage_percentiles_and_errors(self):
+        from app.core.stage_tracing import StageTracer, QueryTrace
+
+        tracer = StageTracer(window=100)
+        for ms in range(1, 101):
+            trace = QueryTrace("q")
+            trace.add(("llm",), 0.0, float(ms), "error" if ms == 100 else "ok")
+            tracer.finish(trace)
+        stats = tracer.stage_stats()["llm"]
+        assert stats["count"] == 100
+        assert stats["p50_ms"] == 51.0
+        assert stats["p95_ms"] == 96.0
+        assert stats["p99_ms"] == 100.0
+        assert stats["errors"] == 1
+        assert "q" in tracer.stage_stats()
+
+    def test_span_without_trace_is_noop(self):
+        from app.core.stage_tracing import span, record_span, current_trace
+
+        assert current_trace() is None
+        with span("router"):
+            record_span("llm.ttft", 12.0)
+
+    async def test_spans_propagate_to_threads(self):
+        import asyncio
+        from app.core.stage_tracing import start_trace, span, stage_tracer
+
+        def work():
+            with span("xai"):
+                pass
+
+        with start_trace("process_question") as trace:
+            with span("enterprise"):
+                await asyncio.to_thread(work)
+        assert "enterprise;xai" in {s["path"] for s in trace.spans}
+        assert stage_tracer.get(trace.trace_id)["total_ms"] is not None
+
+    def test_stage_markers_close_on_next_stage_and_trace_end(self):
+        from app.core.stage_tracing import start_trace, span, enter_stage, exit_stage
+
+        with start_trace("process_question") as trace:
+            enter_stage("router")
+            enter_stage("rag_search")
+            with span("rag.rerank"):
+                pass
+            exit_stage()
+            with span("llm"):
+                pass
+            enter_stage("memory_store")  # erken return: trace kapanınca biter
+        paths = [s["path"] for s in trace.spans]
+        assert sorted(paths) == ["llm", "memory_store", "rag_search", "rag_search;rag.rerank", "router"]
+
+
+# ══════════════════════════════════════════════════════════════
+# 10. MONTE CARLO MOTORU TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestMonteCarloEngine:
+    """monte_carlo.simulate_paths — seed, chunk, risk olayları."""
+
+    def test_seed_is_reproducible(self):
+        from app.core.monte_carlo import monte_carlo_simulate
+
+        a = monte_carlo_simulate(100, 105, trend_pct=1, simulations=2000, seed=7)
+        b = monte_carlo_simulate(100, 105, trend_pct=1, simulations=2000, seed=7)
+        assert a["distribution"] == b["distribution"]
+        assert a["simulations"] == 2000
+
+    def test_chunking_keeps_distribution(self, monkeypatch):
+        import numpy as np
+        from app.core import monte_carlo
+
+        full = monte_carlo.simulate_paths(100, 2, 10, periods=6, simulations=50_000, seed=1)
+        monkeypatch.setattr(monte_carlo, "MC_MEMORY_BUDGET_MB", 0.01)
+        chunked = monte_carlo.simulate_paths(100, 2, 10, periods=6, simulations=50_000, seed=1)
+        assert len(chunked) == 50_000
+        assert abs(np.mean(full) - np.mean(chunked)) < 1.0
+        assert abs(np.mean(full) - 100 * 1.02 ** 6) < 1.0
+
+    def test_certain_risk_event_applies_every_period(self):
+        import numpy as np
+        from app.core.monte_carlo import simulate_paths
+
+        values = simulate_paths(100, 0, 0, [{"probability": 1.0, "impact_pct": -10}],
+                                periods=3, simulations=100, seed=0)
+        assert np.allclose(values, 100 * 0.9 ** 3)
+
+    def test_scenario_engine_uses_engine(self):
+        from app.core.scenario_engine import monte_carlo_simulation, stress_test
+
+        mc = monte_carlo_simulation(100, trend_pct=0, volatility=10, target_value=100)
+        assert mc.ci_lower < mc.mean < mc.ci_upper
+        assert 40 < mc.prob_above_target < 60
+        assert all(r.p5 is None for r in stress_test(100))
+        banded = stress_test(100, volatility=5)
+        assert all(r.p5 < r.impact_value < r.p95 for r in banded)
+
+
+# ══════════════════════════════════════════════════════════════
+# 11. TOPLU TAHMİNLEME TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestForecastBatch:
+    """forecasting — vektörel çekirdekler, toplu API, sıra araması budaması."""
+
+    def test_ses_kernel_matches_recursion(self):
+        import numpy as np
+        from app.core.forecasting import _ses_batch
+
+        values = [10.0, 12.0, 11.0, 15.0, 14.0]
+        expected = [values[0]]
+        for v in values[1:]:
+            expected.append(0.3 * v + 0.7 * expected[-1])
+        smoothed = _ses_batch(np.array([values, values[::-1]]), 0.3)
+        assert np.allclose(smoothed[0], expected)
+
+    def test_forecast_columns_matches_single_series(self):
+        import numpy as np
+        import pandas as pd
+        from app.core.forecasting import forecast_columns, holt_linear_trend
+
+        df = pd.DataFrame({
+            "tarih": pd.date_range("2024-01-01", periods=12, freq="MS"),
+            "uretim": np.linspace(100, 155, 12),
+            "fire": [3.0, 2.5, np.nan, 2.8, 3.1, 2.9, 3.3, 3.0, 2.7, 2.6, 3.2, 3.4],
+            "kisa": [1.0, 2.0, 3.0] + [np.nan] * 9,
+        })
+        result = forecast_columns(df, forecast_periods=3)
+        assert result["success"]
+        assert set(result["columns"]) == {"uretim", "fire"}
+        assert result["skipped"] == ["kisa"]
+        assert result["columns"]["fire"]["data_points"] == 11
+        holt = holt_linear_trend(df["uretim"].tolist(), forecast_periods=3)
+        assert result["columns"]["uretim"]["all_models"]["holt"]["mape"] == holt["mape"]
+
+    def test_order_search_prunes_stale_tiers(self, monkeypatch):
+        from app.core import forecasting
+
+        seen = []
+
+        def fake_map(arr, tier):
+            seen.extend(tier)
+            # En iyi AIC karmaşıklık 1'de, sonrası hep kötüleşiyor
+            return [100.0 + 10 * (o[0] + o[2]) - (50 if o == (1, 1, 0) else 0) for o, _ in tier]
+
+        monkeypatch.setattr(forecasting, "_map_fits", fake_map)
+        monkeypatch.setattr(forecasting, "FORECAST_PRUNE_PATIENCE", 2)
+        candidates = [((p, 1, q), None) for p in range(4) for q in range(4) if p or q]
+        best, aic = forecasting._search_orders(None, candidates)
+        assert best == ((1, 1, 0), None)
+        assert aic == 60.0
+        assert max(o[0] + o[2] for o, _ in seen) == 3
+
+
+# ══════════════════════════════════════════════════════════════
+# 12. SÜTUN PROFİLİ TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestColumnProfile:
+    """document_analyzer — paylaşılan sütun profili."""
+
+    def test_describe_matches_pandas(self, sample_frame):
+        import pandas as pd
+        from app.core.document_analyzer import ColumnProfile
+
+        df = sample_frame
+        profile = ColumnProfile(df)
+        cols = profile.numeric_columns
+        assert cols == ["satis", "maliyet", "adet"]
+        pd.testing.assert_frame_equal(profile.describe(cols), df[cols].describe())
+        assert profile.stat("maliyet", "count") == 197
+        assert profile.corr(cols) is profile.corr(cols)
+
+    def test_parallel_profile_matches_serial(self, monkeypatch, sample_frame):
+        import pandas as pd
+        from app.core import document_analyzer
+
+        df = sample_frame
+        serial = document_analyzer.ColumnProfile(df).numeric
+        monkeypatch.setattr(document_analyzer, "ANALYZER_PROFILE_PARALLEL_CELLS", 0)
+        monkeypatch.setattr(document_analyzer, "ANALYZER_PROFILE_WORKERS", 2)
+        parallel = document_analyzer.ColumnProfile(df).numeric
+        pd.testing.assert_frame_equal(parallel, serial)
+
+    def test_analyses_reuse_shared_profile(self, sample_frame):
+        from app.core import document_analyzer as da
+
+        df = sample_frame
+        profile = da.ColumnProfile(df)
+        for fn in (da.statistical_analysis, da.anomaly_detection, da.correlation_analysis,
+                   da.distribution_analysis, da.data_quality_analysis):
+            assert repr(fn(df, profile)) == repr(fn(df))
+        assert da.discover_data(df, profile) == da.discover_data(df)
+        assert (da.generate_analysis_prompt(df, "full", profile=profile)
+                == da.generate_analysis_prompt(df, "full"))
+
+
+# ══════════════════════════════════════════════════════════════
+# 13. AKIŞLI TABLO OKUMA TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestTabularIngest:
+    """tabular_ingest — parça parça Excel/CSV okuma."""
+
+    def test_header_detected_from_sample(self, make_workbook):
+        from app.core.tabular_ingest import read_sheets
+
+        data = make_workbook([["Aylık Rapor"], [None], ["Bölge", "Satış", "Hedef"]]
+                              + [[f"B{i}", i * 10, i * 12] for i in range(8)])
+        sheets, truncated = read_sheets("rapor.xlsx", data)
+        df = sheets["Sheet"]
+        assert not truncated
+        assert list(df.columns) == ["Bölge", "Satış", "Hedef"]
+        assert len(df) == 8
+        assert df["Satış"].sum() == 280
+
+    def test_text_rows_independent_of_chunk_size(self, make_workbook):
+        from app.core.tabular_ingest import iter_text_rows
+
+        data = make_workbook([["Ürün", "Adet"]] + [[f"U{i}", i] for i in range(10)] + [[None, None], ["Son", 1]])
+        whole = list(iter_text_rows("stok.xlsx", data, chunk_rows=1000))
+        chunked = list(iter_text_rows("stok.xlsx", data, chunk_rows=3))
+        assert whole == chunked
+        assert whole[0] == "stok.xlsx | Satır 1: Ürün: U0, Adet: 0"
+        assert whole[-1] == "stok.xlsx | Satır 12: Ürün: Son, Adet: 1"
+
+    def test_csv_separator_sniff_and_memory_ceiling(self):
+        import io
+        from app.core.tabular_ingest import read_sheets
+
+        csv = "kod;tutar\n" + "".join(f"K{i};{i}\n" for i in range(50))
+        events = []
+        sheets, truncated = read_sheets("ihracat.csv", io.BytesIO(csv.encode()), on_progress=events.append)
+        assert list(sheets[None].columns) == ["kod", "tutar"]
+        assert not truncated and events[-1]["rows"] == 50
+
+        sheets, truncated = read_sheets("ihracat.csv", csv.encode(), max_memory_mb=0, chunk_rows=10)
+        assert truncated
+        assert len(sheets[None]) == 10
+
+
+# ══════════════════════════════════════════════════════════════
+# 14. DOKÜMAN YÜKLEME KUYRUĞU TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestIngestQueue:
+    """ingest_jobs — kalıcı job durumu, yeniden deneme, idempotency."""
+
+    async def test_jobs_processed_and_duplicates_skipped(self, make_ingest_queue):
+        def extract(path, filename):
+            with open(path, "rb") as f:
+                return {"content": f.read().decode(), "doc_type": "text"}
+
+        indexed = []
+        queue = make_ingest_queue(extract, indexed)
+        first = await queue.submit("a.txt", b"ilk dosya", department="Finans", user_id=1)
+        dup = await queue.submit("kopya.txt", b"ilk dosya", department="Finans", user_id=1)
+        other_user = await queue.submit("a.txt", b"ilk dosya", department="Finans", user_id=2)
+        await queue.submit("b.txt", b"ikinci dosya", department="Finans", user_id=1)
+        await queue.join()
+        # Biten job tekilleştirmeye katılmaz (doküman silinip yeniden yüklenebilir)
+        again = await queue.submit("a.txt", b"ilk dosya", department="Finans", user_id=1)
+        await queue.join()
+        await queue.stop()
+
+        assert dup["duplicate"] and dup["job_id"] == first["job_id"]
+        assert not other_user["duplicate"] and other_user["job_id"] != first["job_id"]
+        assert not again["duplicate"] and again["job_id"] != first["job_id"]
+        assert sorted(i[0] for i in indexed) == ["a.txt", "a.txt", "a.txt", "b.txt"]
+        job = queue.get(first["job_id"])
+        assert job["status"] == "done" and job["progress"] == 100
+        assert job["result"]["chars"] == len("ilk dosya")
+        assert not queue.store.spool_path(first["job_id"]).exists()
+        assert len(queue.list_jobs(user_id=1)) == 3
+
+    async def test_transient_errors_retried_permanent_not(self, make_ingest_queue):
+        calls = {}
+
+        def extract(path, filename):
+            calls[filename] = calls.get(filename, 0) + 1
+            if filename == "bozuk.xyz":
+                return {"error": "Desteklenmeyen dosya formatı", "permanent": True}
+            if calls[filename] < 2:
+                raise RuntimeError("OCR zaman aşımı")
+            return {"content": "metin", "doc_type": "pdf"}
+
+        queue = make_ingest_queue(extract, max_attempts=3)
+        ok = await queue.submit("tarama.pdf", b"%PDF", department="Genel")
+        bad = await queue.submit("bozuk.xyz", b"???", department="Genel")
+        await queue.join()
+        await queue.stop()
+
+        assert queue.get(ok["job_id"])["status"] == "done"
+        assert queue.get(ok["job_id"])["attempts"] == 2
+        failed = queue.get(bad["job_id"])
+        assert failed["status"] == "failed" and calls["bozuk.xyz"] == 1
+        assert queue.stats()["retries"] == 1
+
+    async def test_orphaned_jobs_recovered_on_start(self, tmp_path, make_ingest_queue):
+        from app.core.ingest_jobs import IngestJob, IngestJobStore
+
+        store = IngestJobStore(tmp_path)
+        store.ensure()
+        orphan = IngestJob(job_id="yarim", filename="rapor.txt", department="Genel",
+                           content_hash="h", size=5, status="extracting", owner_pid=2 ** 22 + 1)
+        store.spool_path("yarim").write_bytes(b"rapor")
+        store.save(orphan)
+
+        indexed = []
+        queue = make_ingest_queue(lambda p, f: {"content": "rapor", "doc_type": "text"}, indexed)
+        await queue.start()
+        await queue.join()
+        await queue.stop()
+        assert indexed == [("rapor.txt", "rapor", "Genel")]
+        assert IngestJobStore(tmp_path).load("yarim").status == "done"
+
+
+# ══════════════════════════════════════════════════════════════
+# 15. SAYFA PARALEL PDF OCR TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestPdfOcrPipeline:
+    """pdf_ocr — sayfa sırası, boş sayfa atlama, sayfa önbelleği, uyarlanır DPI."""
+
+    def test_pages_streamed_in_order_blank_skipped(self, tmp_path, make_page_image):
+        import random
+        import time as _time
+        from app.core.pdf_ocr import OcrPageCache, ocr_pages
+
+        calls = []
+
+        def fake_ocr(image):
+            calls.append(image.page)
+            _time.sleep(random.uniform(0, 0.02))  # sayfalar karışık sırada biter
+            return f"sayfa {image.page} metni", 0.9
+
+        pages = [make_page_image(n, ink=(n != 3)) for n in range(1, 9)]
+        results = list(ocr_pages(pages, workers=4, cache=OcrPageCache(tmp_path), ocr_fn=fake_ocr))
+
+        assert [r.page for r in results] == list(range(1, 9))
+        assert results[2].method == "blank" and results[2].text == ""
+        assert 3 not in calls and len(calls) == 7
+        assert results[0].text == "sayfa 1 metni" and results[0].method == "ocr"
+
+    def test_rerun_uses_page_cache(self, tmp_path, make_page_image):
+        from app.core.pdf_ocr import OcrPageCache, ocr_pages
+
+        calls = []
+
+        def fake_ocr(image):
+            calls.append(image.page)
+            if image.page == 4:
+                raise RuntimeError("bozuk sayfa")
+            return f"p{image.page}", 0.7
+
+        cache = OcrPageCache(tmp_path)
+        first = list(ocr_pages([make_page_image(n) for n in range(1, 5)], workers=0, cache=cache, ocr_fn=fake_ocr))
+        assert first[3].method == "error" and "bozuk" in first[3].error
+
+        calls.clear()
+        # 2. sayfa değişti → yalnızca o (ve hatalı 4. sayfa) yeniden OCR'lanır
+        pages = [make_page_image(n) for n in range(1, 5)]
+        pages[1] = make_page_image(9)
+        pages[1].page = 2
+        second = list(ocr_pages(pages, workers=2, cache=cache, ocr_fn=fake_ocr))
+        assert sorted(calls) == [2, 4]
+        assert [r.method for r in second] == ["cache", "ocr", "cache", "error"]
+        assert second[0].text == "p1" and second[0].confidence == 0.7
+
+    def test_adaptive_dpi(self):
+        from app.core.pdf_ocr import choose_dpi
+
+        a4 = (595, 842)
+        assert choose_dpi(*a4, max_dpi=200, min_dpi=110, max_megapixels=8.0) == 200
+        # A1 poster: piksel bütçesi için DPI düşer, alt sınırın altına inmez
+        assert choose_dpi(1684, 2384, max_dpi=200, min_dpi=110, max_megapixels=8.0) == 110
+        a2 = choose_dpi(1191, 1684, max_dpi=200, min_dpi=110, max_megapixels=8.0)
+        assert 110 < a2 < 200
+        assert (1191 / 72 * a2) * (1684 / 72 * a2) <= 8.0e6
+
+
+
+# ══════════════════════════════════════════════════════════════
+# 16. EVENT STORE GROUP COMMIT TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestEventStoreLog:
+    """event_log.SegmentedLog — group commit, segment rotasyonu, index ile hızlı açılış."""
+
+    async def test_concurrent_appends_group_committed(self, make_event_store, make_event):
+        import asyncio
+
+        store = make_event_store(group_commit_ms=20)
+        events = await asyncio.gather(*(store.append(make_event(i)) for i in range(200)))
+        stats = store.get_log_stats()["events"]
+        store.close()
+
+        assert [e.sequence for e in events] == list(range(1, 201))
+        assert stats["appended"] == 200
+        assert stats["commits"] < 200
+        assert [e["sequence"] for e in store.replay(limit=500)] == list(range(1, 201))
+        assert store.verify_integrity(sample_size=500)["verified"] is True
+
+    async def test_rotation_keeps_hash_chain(self, make_event_store, make_event):
+        store = make_event_store(segment_max_bytes=2048)
+        for i in range(60):
+            await store.append(make_event(i))
+        store.close()
+
+        segments = store._log.segments()
+        assert len(segments) > 2
+        assert all(s["sealed"] for s in segments[:-1])
+        for prev, seg in zip(segments, segments[1:]):
+            assert seg["start_hash"] == prev["end_hash"]
+            assert seg["first_seq"] == prev["last_seq"] + 1
+        assert store.verify_integrity(sample_size=100)["verified"] is True
+
+    async def test_restart_reads_index_and_recovers_tail(self, make_event_store, make_event):
+        store = make_event_store()
+        for i in range(10):
+            await store.append(make_event(i))
+        store.close()
+
+        reopened = make_event_store()
+        assert reopened.sequence == 10
+        assert reopened._last_hash == store._last_hash
+        assert reopened.get_log_stats()["events"]["recovered_lines"] == 0
+        await reopened.append(make_event(10))
+        reopened.flush()
+
+        # Index yazılmadan çöken süreç: satırlar diskte, index geride + yarım satır
+        active = reopened._log.segment_path(reopened._log.segments()[-1])
+        index_before = reopened._log.index_file.read_text(encoding="utf-8")
+        reopened.close()
+        extra = make_event(11)
+        extra.sequence = 12
+        extra.hash = "x" * 32
+        with open(active, "a", encoding="utf-8") as f:
+            f.write(extra.to_json() + "\n")
+            f.write('{"event_id": "yarim')
+        reopened._log.index_file.write_text(index_before, encoding="utf-8")
+
+        recovered = make_event_store()
+        assert recovered.sequence == 12
+        assert recovered._last_hash == "x" * 32
+        assert recovered.get_log_stats()["events"]["recovered_lines"] == 1
+        assert [e["sequence"] for e in recovered.replay(limit=100)] == list(range(1, 13))
+
+    async def test_nothing_written_until_first_append(self, tmp_path, make_event_store, make_event):
+        store = make_event_store(tmp_path / "yeni")
+        assert store.replay() == [] and store.verify_integrity()["verified"] is True
+        assert not (tmp_path / "yeni").exists()
+
+        await store.append(make_event(0))
+        store.close()
+        assert (tmp_path / "yeni" / "event.index.json").exists()
+        assert not (tmp_path / "yeni" / "decision.index.json").exists()
+        assert make_event_store(tmp_path / "yeni").sequence == 1
+
+    async def test_legacy_log_adopted_as_first_segment(self, tmp_path, make_event_store, make_event):
+        store = make_event_store(tmp_path / "old")
+        for i in range(5):
+            await store.append(make_event(i))
+        store.close()
+        legacy = tmp_path / "event_log.jsonl"
+        legacy.write_text("".join(line + "\n" for line in store._log.iter_lines()), encoding="utf-8")
+
+        migrated = make_event_store()
+        assert migrated.sequence == 5
+        assert migrated._log.segments()[0]["sealed"] is True
+        event = await migrated.append(make_event(5))
+        migrated.close()
+        assert event.sequence == 6
+        assert [e["sequence"] for e in migrated.replay(limit=100)] == list(range(1, 7))
+        assert migrated.verify_integrity()["verified"] is True
+
+
+
+# ══════════════════════════════════════════════════════════════
+# 17. EVENT LOG SATIR INDEX'İ TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestEventLogIndex:
+    """Sidecar satır index'i — filtreli replay, index onarımı, artımlı doğrulama."""
+
+    async def test_filtered_replay_matches_scan(self, filled_event_store):
+        import json
+
+        store = await filled_event_store(segment_max_bytes=4096)
+        store.flush()
+        assert len(store._log.segments()) > 2
+        everything = [json.loads(line) for line in store._log.iter_lines()]
+
+        def scan(since=None, until=None, prefix=None, category=None, correlation_id=None):
+            return [e["sequence"] for e in everything
+                    if (not since or e["timestamp"] >= since) and (not until or e["timestamp"] <= until)
+                    and (not prefix or e["event_type"].startswith(prefix))
+                    and (not category or e["category"] == category)
+                    and (not correlation_id or e["correlation_id"] == correlation_id)]
+
+        def seqs(events):
+            return [e["sequence"] for e in events]
+
+        assert seqs(store.replay(since="2026-01-01T10", until="2026-01-02T05")) == \
+            scan(since="2026-01-01T10", until="2026-01-02T05")
+        assert seqs(store.replay(event_type="decision.*", since="2026-01-02")) == \
+            scan(prefix="decision", since="2026-01-02")
+        assert seqs(store.replay(category="policy", limit=5)) == scan(category="policy")[:5]
+        assert seqs(store.replay(correlation_id="corr-7")) == [15, 16]
+        assert store.replay(event_type="drift.*") == []
+
+        stats = store.get_stats()
+        assert stats["total_events"] == 60
+        assert stats["decision_count"] == 30 and stats["policy_violation_count"] == 15
+        store.close()
+
+    async def test_sidecar_rebuilt_and_kept_live(self, filled_event_store, make_event_store):
+        store = await filled_event_store(count=20)
+        store.close()
+        sidecar = store._log.sidecar_path(store._log.segments()[-1]["number"])
+        lines = sidecar.read_bytes().splitlines(keepends=True)
+        sidecar.write_bytes(b"".join(lines[:8]) + lines[8][:5])  # yarım kalmış sidecar
+
+        reopened = make_event_store()
+        assert [e["sequence"] for e in reopened.replay()] == list(range(1, 21))
+        assert len(sidecar.read_bytes().splitlines()) == 20
+
+        # Index yüklüyken gelen event'ler hem belleğe hem sidecar'a girer
+        extra = await filled_event_store(count=1)
+        assert extra.sequence == 21
+        assert [e["sequence"] for e in extra.replay(correlation_id="corr-0")] == [1, 2, 21]
+        extra.close()
+
+    async def test_incremental_verification_detects_tampering(self, filled_event_store):
+        store = await filled_event_store(count=30)
+        store.flush()
+
+        first = store.verify_integrity(sample_size=10)
+        assert first["verified"] and first["total_checked"] == 10 and first["pending"] == 20
+        rest = store.verify_integrity(sample_size=0)
+        assert rest["verified"] and rest["total_checked"] == 20 and rest["last_sequence"] == 30
+        assert store.verify_integrity()["total_checked"] == 0
+        store.close()
+
+        # Doğrulanmamış kuyrukta bir payload değiştirilir → tespit edilir, checkpoint ilerlemez
+        more = await filled_event_store(count=5)
+        more.close()
+        path = more._log.segment_path(more._log.segments()[-1])
+        data = path.read_text(encoding="utf-8").replace('"i": 2}', '"i": 99}')
+        path.write_text(data, encoding="utf-8")
+        tampered = more.verify_integrity(sample_size=0)
+        assert tampered["verified"] is False and tampered["corrupted_at"] == 33
+        assert more.verify_integrity(sample_size=0)["corrupted_at"] == 33
+
+
+
+# ══════════════════════════════════════════════════════════════
+# 18. EVENT BUS KUYRUKLU DAĞITIM TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestEventBusDispatch:
+    """EventBus — listener kuyrukları, wildcard trie, taşma → dead letter."""
+
+    async def test_slow_listener_does_not_block_emit(self, make_event_bus):
+        import asyncio
+        import time as _time
+
+        bus = make_event_bus(dispatch="queued")
+        seen = []
+
+        @bus.on("query.received")
+        async def slow(event):
+            await asyncio.sleep(0.2)
+            seen.append(("slow", event.sequence))
+
+        @bus.on("query.*")
+        async def by_prefix(event):
+            seen.append(("prefix", event.event_type))
+
+        @bus.on("*")
+        async def everything(event):
+            seen.append(("all", event.event_type))
+
+        @bus.on("decision.*")
+        async def decisions(event):
+            seen.append(("decision", event.event_type))
+
+        started = _time.perf_counter()
+        event = await bus.emit("query.received", {"q": "izin"})
+        assert _time.perf_counter() - started < 0.1
+        bus.emit_nowait("query.completed", {"q": "izin"})
+        await bus.drain()
+
+        assert ("slow", event.sequence) in seen
+        assert sorted(x for x in seen if x[0] == "prefix") == [
+            ("prefix", "query.completed"), ("prefix", "query.received")]
+        assert len([x for x in seen if x[0] == "all"]) == 2
+        assert not [x for x in seen if x[0] == "decision"]
+
+        stats = {s["listener"]: s for s in bus.get_listener_stats()}
+        assert stats["slow"]["delivered"] == 1 and stats["slow"]["avg_handler_ms"] >= 150
+        bus.close()
+        assert [e["event_type"] for e in bus.replay()] == ["query.received", "query.completed"]
+
+    async def test_queue_overflow_goes_to_dead_letters(self, make_event_bus):
+        import asyncio
+
+        bus = make_event_bus(dispatch="queued", queue_size=2)
+        gate = asyncio.Event()
+        handled = []
+
+        @bus.on("audit.recorded")
+        async def blocked(event):
+            await gate.wait()
+            handled.append(event.event_id)
+
+        @bus.on("audit.*")
+        async def failing(event):
+            raise RuntimeError("listener hatası")
+
+        for i in range(5):
+            bus.emit_nowait("audit.recorded", {"i": i})
+        gate.set()
+        await bus.drain()
+
+        stats = {s["listener"]: s for s in bus.get_listener_stats()}
+        assert len(handled) == 2 and stats["blocked"]["dropped"] == 3
+        assert stats["failing"]["failed"] == 2 and stats["failing"]["dropped"] == 3
+        letters = bus.get_dead_letters()
+        assert sum("queue full" in d["error"] for d in letters) == 6
+        assert sum(d["error"] == "listener hatası" for d in letters) == 2
+        assert bus.get_metrics()["_dropped"] == 6
+        bus.close()
+
+    async def test_inline_mode_and_route_cache(self, make_event_bus):
+        from app.core.event_bus import _PrefixTrie
+
+        trie = _PrefixTrie()
+        trie.add("decision.*", "d")
+        trie.add("*", "all")
+        trie.add("dec*", "dec")
+        assert sorted(trie.match("decision.created")) == ["all", "d", "dec"]
+        assert trie.match("query.received") == ["all"]
+
+        bus = make_event_bus(dispatch="inline")
+        seen = []
+
+        async def listener(event):
+            seen.append(event.event_type)
+
+        bus.subscribe("policy.*", listener)
+        await bus.emit("policy.violated", {})
+        assert seen == ["policy.violated"]  # inline: emit dönmeden çalıştı
+
+        bus.emit_nowait("policy.updated", {})
+        assert len(bus._inline_tasks) == 1  # task referansı tutuluyor
+        await bus.drain()
+        assert seen == ["policy.violated", "policy.updated"]
+        assert not bus._inline_tasks
+
+        bus.unsubscribe("policy.*", listener)
+        await bus.emit("policy.violated", {})
+        assert seen == ["policy.violated", "policy.updated"]
+        bus.close()
+
+
+
+# ══════════════════════════════════════════════════════════════
+# 19. PAYLAŞIMLI (MULTI-WORKER) METRİK TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestSharedMetrics:
+    """shared_metrics — histogram, worker snapshot birleştirme, ölü worker emekliliği."""
+
+    @staticmethod
+    def _value(families, family, sample, **labels):
+        return sum(v for name, lbl, v in families[family]["samples"]
+                   if name == sample and all(lbl.get(k) == str(x) for k, x in labels.items()))
+
+    def test_histogram_render_roundtrip(self, make_shared_metrics):
+        from app.core.shared_metrics import parse_exposition, render
+
+        shared = make_shared_metrics()
+        for value in (0.05, 0.5, 3.0):
+            shared.registry.observe("t_latency_seconds", value, route="/api/documents/{source}")
+        text = render(shared.registry.families())
+        assert 't_latency_seconds_bucket{route="/api/documents/{source}",le="0.1"} 1' in text
+        assert 't_latency_seconds_bucket{route="/api/documents/{source}",le="+Inf"} 3' in text
+        assert 't_latency_seconds_count{route="/api/documents/{source}"} 3' in text
+
+        parsed = parse_exposition(text)
+        assert parsed["t_latency_seconds"]["type"] == "histogram"
+        assert len(parsed["t_latency_seconds"]["samples"]) == 5
+
+    def test_workers_merged_and_dead_workers_retired(self, make_shared_metrics):
+        import json
+        import subprocess
+
+        shared = make_shared_metrics()
+        shared.add_collector(lambda: "# HELP t_up Up\n# TYPE t_up gauge\nt_up 1\n")
+        shared.registry.inc("t_requests_total", 5, status="200")
+        shared.registry.observe("t_latency_seconds", 0.05)
+        shared.registry.set("t_queue_depth", 2)
+
+        # Diğer worker'lar: biri canlı (test sürecinin ebeveyni), biri ölmüş
+        proc = subprocess.Popen(["true"])
+        proc.wait()
+        dead_pid = proc.pid
+        other = make_shared_metrics()
+        other.registry.inc("t_requests_total", 7, status="200")
+        other.registry.observe("t_latency_seconds", 0.5)
+        other.registry.set("t_queue_depth", 4)
+        shared.directory.mkdir(parents=True)
+        for pid in (os.getppid(), dead_pid):
+            (shared.directory / f"worker-{pid}.json").write_text(
+                json.dumps({"pid": pid, "families": other.registry.families()}), encoding="utf-8")
+
+        fleet = shared.collect()
+        assert self._value(fleet, "t_requests_total", "t_requests_total", status="200") == 19
+        assert self._value(fleet, "t_latency_seconds", "t_latency_seconds_count") == 3
+        assert self._value(fleet, "t_latency_seconds", "t_latency_seconds_bucket", le="0.1") == 1
+        # Gauge'lar toplanmaz, worker etiketiyle ayrı kalır; ölü worker'ınki düşer
+        depths = {lbl["worker"]: v for _, lbl, v in fleet["t_queue_depth"]["samples"]}
+        assert depths == {str(os.getpid()): 2, str(os.getppid()): 4}
+        assert fleet["t_up"]["samples"][0][1]["worker"] == str(os.getpid())
+        assert not (shared.directory / f"worker-{dead_pid}.json").exists()
+        assert (shared.directory / "retired.json").exists()
+
+        # Emekli sayaçlar sonraki scrape'lerde de sayılır
+        assert self._value(shared.collect(), "t_requests_total", "t_requests_total", status="200") == 19
+
+    def test_middleware_labels_route_template(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from app.core.shared_metrics import get_shared_metrics
+        from app.main import MetricsMiddleware
+
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/api/documents/{source}")
+        async def doc(source: str):
+            return {"source": source}
+
+        client = TestClient(app)
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            client.get(f"/api/documents/{name}")
+        client.get("/yok")
+
+        families = get_shared_metrics().registry.families()
+        paths = {lbl["path"]: v for _, lbl, v in families["companyai_requests_by_path"]["samples"]}
+        assert paths["/api/documents/{source}"] >= 3 and paths["unmatched"] >= 1
+        assert not any("a.pdf" in p for p in paths)
+
+
+
+# ══════════════════════════════════════════════════════════════
+# 20. MONITORING ROLLUP TESTLERİ
+# ══════════════════════════════════════════════════════════════
+
+class TestMonitoringRollups:
+    """rollups — dakika/saat kovaları, sketch doğruluğu, kalıcılık, MetricsCollector/SLA."""
+
+    def test_windows_merge_minute_and_hour_buckets(self):
+        import random
+        from app.core.rollups import RollupSeries
+
+        series = RollupSeries(minute_slots=1440, hour_slots=744)
+        now = 1_800_000_000.0
+        rng = random.Random(7)
+        samples = []
+        for _ in range(20000):
+            ts = now - rng.random() * 30 * 86400
+            value = rng.lognormvariate(5, 1)
+            samples.append((ts, value))
+            series.record(value, error=value > 1000, ts=ts)
+
+        for minutes in (60, 24 * 60):
+            window = series.window(minutes, now=now)
+            first_minute = (int(now // 60) - minutes + 1) * 60
+            exact = sorted(v for ts, v in samples if ts >= first_minute)
+            assert window.count == len(exact)
+            assert window.errors == sum(1 for v in exact if v > 1000)
+            assert window.max == exact[-1]
+            p95 = exact[int(0.95 * (len(exact) - 1))]
+            assert abs(window.quantile(0.95) - p95) / p95 < 0.05
+
+        # 30 gün dakika halkasını aşar — saat sınırına yuvarlanır
+        assert series.window(30 * 24 * 60, now=now).count == len(samples)
+        # Halka dışına düşen eski kayıt daha yeni kovayı ezmez
+        series.record(1.0, ts=now - 40 * 86400)
+        assert series.window(30 * 24 * 60, now=now).count == len(samples)
+
+    def test_store_roundtrip_is_compact(self, tmp_path):
+        from app.core.rollups import RollupStore
+
+        path = tmp_path / "rollups.json.gz"
+        store = RollupStore(path, flush_seconds=3600)
+        series = store.series("requests")
+        now = 1_800_000_000.0
+        for i in range(5000):
+            series.record(10 + i % 500, error=i % 50 == 0, tags=("ep:/api/ask",), ts=now - i * 30)
+        store.flush()
+        assert path.exists() and path.stat().st_size < 200_000
+        before = series.window(3 * 24 * 60, now=now).summary()
+
+        restored = RollupStore(path, flush_seconds=3600).series("requests")
+        after = restored.window(3 * 24 * 60, now=now)
+        assert after.summary() == before
+        assert after.tag_counts("ep") == {"/api/ask": before["count"]}
+
+    def test_collector_and_sla_use_rollups(self):
+        from app.core.monitoring import MetricsCollector, SLAMonitor
+
+        collector = MetricsCollector()
+        for i in range(100):
+            collector.record_request("/api/ask" if i % 4 else "/api/documents/{source}",
+                                     "GET", 500 if i % 10 == 0 else 200, 100 + i)
+        stats = collector.get_response_time_stats(last_minutes=5)
+        assert stats["count"] == 100 and stats["min_ms"] == 100 and stats["max_ms"] == 199
+        assert abs(stats["p50_ms"] - 149.5) < 3
+
+        errors = collector.get_error_rate(last_minutes=5)
+        assert errors["error_rate_percent"] == 10.0 and errors["error_distribution"] == {"500": 10}
+        assert collector.get_throughput()["top_endpoints"] == {"/api/ask": 75, "/api/documents/{source}": 25}
+        assert collector.get_window_summary()["30d"]["count"] == 100
+
+        sla = SLAMonitor()
+        assert sla.get_uptime_percent(24) == 100.0
+        for healthy in (True, True, True, False):
+            sla.record_health_check(healthy)
+        assert sla.get_uptime_percent(24) == 75.0
+        compliance = sla.check_sla_compliance(collector)
+        assert compliance["uptime_30d"] == 75.0 and not compliance["compliant"]
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
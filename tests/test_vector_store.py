@@ -120,6 +120,56 @@ class TestAddDocument:
         assert result is False
 
 
+class TestAddDocumentBulk:
+    """Toplu encode + tek add ile ingestion testleri."""
+
+    @pytest.fixture
+    def ingest_env(self, mock_chromadb):
+        import numpy as np
+        model = MagicMock()
+        model.encode = MagicMock(side_effect=lambda texts, **kw: np.random.rand(len(texts), 8).astype("float32"))
+        with patch("app.rag.vector_store.CHROMADB_AVAILABLE", True), \
+             patch("app.rag.vector_store.EMBEDDINGS_AVAILABLE", True), \
+             patch("app.rag.vector_store.get_collection", return_value=mock_chromadb), \
+             patch("app.rag.vector_store.get_learned_collection", return_value=mock_chromadb), \
+             patch("app.rag.vector_store.get_embedding_model", return_value=model):
+            yield mock_chromadb, model
+
+    def test_single_encode_and_add(self, ingest_env):
+        from app.rag.vector_store import add_document
+        coll, model = ingest_env
+        content = "Bu bir test cümlesidir. " * 400  # birden fazla chunk
+        assert add_document(content, "rapor.pdf", doc_type="pdf") is True
+        assert model.encode.call_count == 1
+        assert coll.add.call_count == 1
+        kwargs = coll.add.call_args.kwargs
+        assert len(kwargs["ids"]) > 1
+        assert kwargs["ids"][0] == "rapor.pdf_0"
+        assert len(kwargs["embeddings"]) == len(kwargs["documents"]) == len(kwargs["ids"])
+
+    def test_learned_duplicate_check_is_one_query(self, ingest_env):
+        from app.rag.vector_store import add_document
+        coll, _ = ingest_env
+        coll.query.return_value = {"distances": [[0.05]]}
+        assert add_document("Fire oranı %3 olarak ölçüldü.", "chat_1", doc_type="chat_learned") is False
+        assert coll.query.call_count == 1
+        coll.add.assert_not_called()
+
+    def test_in_batch_duplicates_filtered(self):
+        from app.rag.vector_store import _filter_near_duplicates
+        coll = MagicMock()
+        coll.query.return_value = {"distances": [[5.0], [5.0], [5.0]]}
+        embs = [[0.0, 0.0], [0.01, 0.0], [3.0, 3.0]]
+        assert _filter_near_duplicates(coll, embs, "s") == [0, 2]
+
+    def test_ingestion_metrics_recorded(self, ingest_env):
+        from app.rag.vector_store import add_document, get_ingestion_metrics_summary
+        add_document("Kısa içerik.", "kisa.txt")
+        summary = get_ingestion_metrics_summary()
+        assert summary["total_ingestions"] >= 1
+        assert "encode_ms" in summary["avg_stage_ms"]
+
+
 # ═══════════════════════════════════════════════════
 # 4. get_stats — Fallback testleri
 # ═══════════════════════════════════════════════════
@@ -134,3 +184,653 @@ class TestGetStats:
         result = get_stats()
         assert result["available"] is False
         assert result["document_count"] == 0
+
+
+# ═══════════════════════════════════════════════════
+# 5. async_search_documents / async_agentic_search — Executor testleri
+# ═══════════════════════════════════════════════════
+
+class TestAsyncSearch:
+    """Event loop'u bloklamayan arama yolu testleri."""
+
+    @pytest.fixture
+    def rag_env(self, mock_chromadb, mock_embedding_model):
+        with patch("app.rag.vector_store.CHROMADB_AVAILABLE", True), \
+             patch("app.rag.vector_store.EMBEDDINGS_AVAILABLE", True), \
+             patch("app.rag.vector_store.CROSS_ENCODER_AVAILABLE", False), \
+             patch("app.rag.vector_store.get_collection", return_value=mock_chromadb), \
+             patch("app.rag.vector_store.get_learned_collection", return_value=None), \
+             patch("app.rag.vector_store.get_embedding_model", return_value=mock_embedding_model):
+            from app.rag.keyword_index import get_keyword_index
+            get_keyword_index("company_documents").clear()
+            yield mock_chromadb
+
+    async def test_async_matches_sync(self, rag_env):
+        from app.rag.vector_store import search_documents, async_search_documents
+        sync_docs = search_documents("kumaş fire oranı", n_results=3)
+        async_docs = await async_search_documents("kumaş fire oranı", n_results=3)
+        assert [d["content"] for d in async_docs] == [d["content"] for d in sync_docs]
+        assert async_docs[0]["source"] == "test.txt"
+
+    async def test_keyword_lookups_use_index(self, rag_env):
+        from app.rag.vector_store import async_search_documents
+        await async_search_documents("Ahmet Yılmaz bilgisi", n_results=3)
+        # Keyword tamamlayıcıları indeksten — $contains taraması yapılmamalı
+        assert rag_env.query.call_count == 1
+        assert not any("where_document" in c.kwargs for c in rag_env.query.call_args_list)
+
+    async def test_executor_stats_updated(self, rag_env):
+        from app.rag.vector_store import async_search_documents, get_rag_executor_stats
+        before = get_rag_executor_stats()["completed"]
+        await async_search_documents("test sorgu", n_results=2)
+        stats = get_rag_executor_stats()
+        assert stats["completed"] > before
+        assert stats["queue_depth"] == 0
+        assert stats["searches_active"] == 0
+
+    async def test_agentic_concurrent_subqueries(self, rag_env):
+        from app.rag.vector_store import async_agentic_search
+        docs = await async_agentic_search("boya maliyeti ile dokuma maliyeti karşılaştır", n_results=5)
+        assert isinstance(docs, list)
+        assert all("sub_query" in d for d in docs)
+
+    @patch("app.rag.vector_store.CHROMADB_AVAILABLE", False)
+    async def test_async_returns_empty_when_unavailable(self):
+        from app.rag.vector_store import async_search_documents
+        assert await async_search_documents("test") == []
+
+
+# ═══════════════════════════════════════════════════
+# 6. KeywordIndex — Ters indeks testleri
+# ═══════════════════════════════════════════════════
+
+class TestKeywordIndex:
+    """Keyword/entity ters indeksi ve tek geçişli keyword tamamlayıcı."""
+
+    def test_turkish_case_folding(self):
+        from app.rag.keyword_index import KeywordIndex
+        idx = KeywordIndex("t")
+        idx.add(["a_0"], ["PERSONEL: AHMET YILMAZ — İplik bölümü"])
+        assert idx.lookup("ahmet yılmaz") == {"a_0"}
+        assert idx.lookup("İPLİK") == {"a_0"}
+        assert idx.lookup("mehmet") == set()
+
+    def test_prefix_match_for_suffixes(self):
+        from app.rag.keyword_index import KeywordIndex
+        idx = KeywordIndex("t")
+        idx.add(["a_0", "b_0"], ["Sanforlama makinesi", "Boya"])
+        # 5+ karakter → Türkçe ekli biçim de eşleşir
+        assert idx.lookup("sanfor") == {"a_0"}
+
+    def test_remove(self):
+        from app.rag.keyword_index import KeywordIndex
+        idx = KeywordIndex("t")
+        idx.add(["a_0", "b_0"], ["dokuma fire", "dokuma hızı"])
+        idx.remove(["a_0"])
+        assert idx.lookup("dokuma") == {"b_0"}
+        assert idx.lookup("fire") == set()
+
+    def test_rebuild_from_collection(self):
+        from app.rag.keyword_index import KeywordIndex
+        coll = MagicMock()
+        coll.count.return_value = 2
+        coll.get.return_value = {"ids": ["x_0", "x_1"], "documents": ["tarak makinesi", "ring iplik"]}
+        idx = KeywordIndex("t")
+        assert idx.ensure_synced(coll) is True
+        assert idx.lookup("tarak") == {"x_0"}
+        # Sayı değişmedikçe yeniden kurulmaz
+        idx.ensure_synced(coll)
+        assert idx.rebuilds == 1
+
+    def test_reindexed_ids_not_counted_twice(self):
+        from app.rag.keyword_index import KeywordIndex
+        coll = MagicMock()
+        coll.count.return_value = 2
+        coll.get.return_value = {"ids": ["x_0", "x_1"], "documents": ["tarak makinesi", "ring iplik"]}
+        idx = KeywordIndex("t")
+        with patch("app.rag.keyword_index._corpus_generation", return_value=None):
+            idx.ensure_synced(coll)
+            idx.add(["x_0", "x_2"], ["tarak bakımı", "bobin"])
+            assert idx.stats()["synced_count"] == 3
+            coll.count.return_value = 3
+            idx.ensure_synced(coll)
+        assert idx.rebuilds == 1
+        assert idx.lookup("makinesi") == set()
+
+    def test_shared_generation_drives_rebuild(self):
+        from app.rag.keyword_index import KeywordIndex
+        coll = MagicMock()
+        coll.count.return_value = 2
+        coll.get.return_value = {"ids": ["x_0", "x_1"], "documents": ["tarak makinesi", "ring iplik"]}
+        idx = KeywordIndex("t")
+        with patch("app.rag.keyword_index._corpus_generation") as generation:
+            generation.return_value = 5
+            idx.ensure_synced(coll)
+            # Bu süreçteki yazma nesli bir ilerletti → yeniden kurulum yok
+            idx.add(["x_2"], ["bobin"])
+            idx.note_generation(6)
+            generation.return_value = 6
+            idx.ensure_synced(coll)
+            assert idx.rebuilds == 1
+            # Sayı aynı kalsa da başka worker'ın yazması (nesil atladı) yeniden kurdurur
+            idx.note_generation(8)
+            generation.return_value = 8
+            idx.ensure_synced(coll)
+        assert idx.rebuilds == 2
+        assert idx.lookup("bobin") == set()
+
+    def test_supplement_single_get_and_phrase_adjacency(self):
+        import numpy as np
+        from app.rag.keyword_index import get_keyword_index
+        from app.rag.vector_store import _keyword_supplement, _keyword_lookups
+        coll = MagicMock()
+        coll.count.return_value = 2
+        coll.get.side_effect = [
+            {"ids": ["p_0", "p_1"], "documents": ["Ahmet Yılmaz usta", "Yılmaz ve Ahmet"]},
+            {"ids": ["p_0", "p_1"], "documents": ["Ahmet Yılmaz usta", "Yılmaz ve Ahmet"],
+             "metadatas": [{"source": "p.xlsx"}, {"source": "q.xlsx"}],
+             "embeddings": np.zeros((2, 4), dtype="float32")},
+        ]
+        get_keyword_index("test_supplement").clear()
+        results = _keyword_supplement(coll, [0.0] * 4, _keyword_lookups("ahmet yılmaz"),
+                                      index_name="test_supplement")
+        coll.query.assert_not_called()
+        assert coll.get.call_count == 2  # 1 indeks kurulumu + 1 toplu aday çekimi
+        phrase_docs = results[0][1]["documents"][0]
+        assert phrase_docs == ["Ahmet Yılmaz usta"]
+
+
+class TestEmbeddingService:
+    """Paylaşılan embedding servisi — micro-batching ve encode uyumluluğu"""
+
+    @staticmethod
+    def _service(max_batch=64, batch_wait_ms=50):
+        import numpy as np
+        from app.rag.embedding_service import EmbeddingService
+        service = EmbeddingService(model_name="fake", max_batch=max_batch,
+                                   batch_wait_ms=batch_wait_ms, remote_url="", use_cache=False)
+        service._model = MagicMock()
+        service._model.encode.side_effect = lambda texts, **kw: np.array(
+            [[float(len(t)), 1.0] for t in texts], dtype="float32")
+        return service
+
+    def test_str_returns_1d_list_returns_2d(self):
+        service = self._service(batch_wait_ms=0)
+        assert service.encode("abc").shape == (2,)
+        assert service.encode(["a", "bb"]).shape == (2, 2)
+        assert service.encode("abc").tolist()[0] == 3.0
+
+    def test_concurrent_calls_are_coalesced(self):
+        import threading
+        service = self._service()
+        results = {}
+
+        def worker(i):
+            results[i] = service.encode("x" * (i + 1))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # Her çağıran kendi vektörünü alır
+        assert all(results[i][0] == float(i + 1) for i in range(8))
+        stats = service.stats()
+        assert stats["requests"] == 8
+        assert stats["forward_passes"] < 8
+        assert stats["coalesced_requests"] > 0
+
+    def test_large_batch_bypasses_queue(self):
+        service = self._service(max_batch=4)
+        vectors = service.encode([f"metin {i}" for i in range(10)], batch_size=5)
+        assert vectors.shape == (10, 2)
+        assert service._worker is None
+        assert service._model.encode.call_args.kwargs["batch_size"] == 5
+
+
+class TestEmbeddingCache:
+    """İki katmanlı embedding cache — LRU, binary Redis formatı, servis entegrasyonu"""
+
+    def test_key_uses_model_and_full_hash(self):
+        from app.cache.embedding_cache import embedding_cache_key
+        k1 = embedding_cache_key("model-a", "iplik")
+        k2 = embedding_cache_key("model-b", "iplik")
+        assert k1 != k2
+        assert len(k1.rsplit(":", 1)[1]) == 64
+
+    def test_lru_evicts_oldest(self):
+        import numpy as np
+        from app.cache.embedding_cache import EmbeddingCache
+        cache = EmbeddingCache(max_size=2, use_redis=False)
+        cache.set_many("m", ["a", "b"], np.ones((2, 3)))
+        cache.get_many("m", ["a"])  # a'yı tazele
+        cache.set_many("m", ["c"], np.ones((1, 3)))
+        assert set(cache.get_many("m", ["a", "b", "c"])) == {0, 2}
+        stats = cache.stats()
+        assert stats["l1_size"] == 2
+        assert stats["misses"] == 1
+
+    def test_redis_layer_stores_float32_bytes(self):
+        import numpy as np
+        from app.cache.embedding_cache import EmbeddingCache
+        store = {}
+        client = MagicMock()
+        client.mget.side_effect = lambda keys: [store.get(k) for k in keys]
+        pipe = MagicMock()
+        pipe.set.side_effect = lambda k, v, ex=None: store.__setitem__(k, v)
+        client.pipeline.return_value = pipe
+
+        cache = EmbeddingCache(max_size=10)
+        cache._redis = client
+        cache.set_many("m", ["dokuma"], np.array([[0.5, 1.5]]))
+        assert list(store.values())[0] == np.array([0.5, 1.5], dtype="float32").tobytes()
+
+        cache.clear()
+        found = cache.get_many("m", ["dokuma"])
+        assert found[0].tolist() == [0.5, 1.5]
+        assert cache.stats()["l2_hits"] == 1
+
+    def test_service_encodes_only_misses(self):
+        import numpy as np
+        from app.cache.embedding_cache import EmbeddingCache
+        from app.rag.embedding_service import EmbeddingService
+        service = EmbeddingService(model_name="fake", batch_wait_ms=0, remote_url="",
+                                   cache=EmbeddingCache(use_redis=False))
+        service._model = MagicMock()
+        service._model.encode.side_effect = lambda texts, **kw: np.array(
+            [[float(len(t)), 1.0] for t in texts], dtype="float32")
+
+        first = service.encode(["ab", "abc", "ab"])
+        assert first[:, 0].tolist() == [2.0, 3.0, 2.0]
+        assert service._model.encode.call_args.args[0] == ["ab", "abc"]
+
+        second = service.encode(["abc", "abcd"])
+        assert second[:, 0].tolist() == [3.0, 4.0]
+        assert service._model.encode.call_args.args[0] == ["abcd"]
+        assert service.encode("ab").shape == (2,)
+        assert service._model.encode.call_count == 2
+
+
+# ═══════════════════════════════════════════════════
+# 7. Artımlı yeniden yükleme — chunk hash + manifest
+# ═══════════════════════════════════════════════════
+
+class _FakeCollection:
+    """add/upsert/update/delete/get destekleyen bellek içi Chroma koleksiyonu."""
+
+    def __init__(self):
+        self.rows = {}
+        self.calls = []
+
+    def _put(self, op, ids, embeddings, documents, metadatas):
+        self.calls.append((op, len(ids)))
+        for i, doc_id in enumerate(ids):
+            self.rows[doc_id] = {"embedding": list(embeddings[i]), "document": documents[i],
+                                 "metadata": dict(metadatas[i])}
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self._put("add", ids, embeddings, documents, metadatas)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self._put("upsert", ids, embeddings, documents, metadatas)
+
+    def update(self, ids, metadatas):
+        self.calls.append(("update", len(ids)))
+        for doc_id, meta in zip(ids, metadatas):
+            self.rows[doc_id]["metadata"] = dict(meta)
+
+    def delete(self, ids):
+        self.calls.append(("delete", len(ids)))
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=0):
+        if ids is not None:
+            keys = [i for i in ids if i in self.rows]
+        elif where is not None:
+            keys = [k for k, r in self.rows.items() if r["metadata"].get("source") == where["source"]]
+        else:
+            keys = list(self.rows)[offset:offset + limit if limit else None]
+        return {"ids": keys,
+                "documents": [self.rows[k]["document"] for k in keys],
+                "metadatas": [self.rows[k]["metadata"] for k in keys],
+                "embeddings": [self.rows[k]["embedding"] for k in keys]}
+
+    def count(self):
+        return len(self.rows)
+
+
+class TestIncrementalIngest:
+    """Yeniden yüklemede yalnızca değişen chunk'lar embed edilir."""
+
+    @pytest.fixture
+    def sync_env(self, tmp_path):
+        import numpy as np
+        from app.rag.incremental_ingest import IngestManifestStore
+        coll = _FakeCollection()
+        encoded = []
+
+        def encode(texts, **kw):
+            encoded.extend(texts)
+            return np.array([[float(len(t)), 1.0] for t in texts], dtype="float32")
+
+        model = MagicMock()
+        model.encode = MagicMock(side_effect=encode)
+        with patch("app.rag.vector_store.CHROMADB_AVAILABLE", True), \
+             patch("app.rag.vector_store.EMBEDDINGS_AVAILABLE", True), \
+             patch("app.rag.vector_store.get_collection", return_value=coll), \
+             patch("app.rag.vector_store.get_embedding_model", return_value=model), \
+             patch("app.rag.incremental_ingest._store", IngestManifestStore(tmp_path)):
+            yield coll, encoded
+
+    @staticmethod
+    def _spec(n_sections=150, changed=None):
+        sections = []
+        for s in range(n_sections):
+            body = " ".join(f"Bölüm {s} madde {k}: kumaş gramajı {s * 10 + k} g/m² olmalıdır."
+                            for k in range(6))
+            if s == changed:
+                body += " Revizyon: çekme toleransı %2'ye düşürüldü."
+            sections.append(f"{s}. Başlık {s}\n{body}\n")
+        return "".join(sections)
+
+    def test_unchanged_document_skipped(self, sync_env):
+        from app.rag.vector_store import add_document
+        coll, encoded = sync_env
+        text = self._spec()
+        assert add_document(text, "sartname.pdf", doc_type="pdf") is True
+        first_encoded, first_calls = len(encoded), len(coll.calls)
+        assert first_encoded == len(coll.rows) > 5
+
+        assert add_document(text, "sartname.pdf", doc_type="pdf") is True
+        assert len(encoded) == first_encoded
+        assert len(coll.calls) == first_calls
+
+    def test_edit_reembeds_only_changed_chunks(self, sync_env):
+        from app.rag.vector_store import add_document
+        coll, encoded = sync_env
+        add_document(self._spec(), "sartname.pdf", doc_type="pdf")
+        total = len(coll.rows)
+        encoded.clear()
+
+        assert add_document(self._spec(changed=75), "sartname.pdf", doc_type="pdf") is True
+        # Yalnızca değişen paragrafın bloğu yeniden chunk'lanır
+        assert 1 <= len(encoded) <= total // 4
+        assert any("Revizyon" in t for t in encoded)
+        assert len(coll.rows) >= total
+        assert all(r["metadata"]["chunk_hash"] for r in coll.rows.values())
+        assert any("Revizyon" in r["document"] for r in coll.rows.values())
+
+    def test_shifted_chunks_reuse_stored_embeddings(self, sync_env):
+        from app.rag.vector_store import add_document, get_ingestion_metrics_summary
+        coll, encoded = sync_env
+        text = self._spec()
+        add_document(text, "sartname.pdf", doc_type="pdf")
+        total = len(coll.rows)
+        encoded.clear()
+
+        # Başa yeni bölüm eklenir → sonraki chunk'ların pozisyonu kayar
+        preface = "Önsöz\n" + "Bu şartname 2025 revizyonudur. " * 80 + "\n"
+        add_document(preface + text, "sartname.pdf", doc_type="pdf")
+        last = get_ingestion_metrics_summary()["last_10"][-1]
+        assert len(coll.rows) > total
+        # Kayan chunk'ların embedding'i koleksiyondan okunur, yeniden hesaplanmaz
+        assert last["reused"] > total // 2
+        assert len(encoded) == last["added"] - last["reused"] < total // 2
+
+    def test_truncated_document_drops_tail_chunks(self, sync_env):
+        from app.rag.vector_store import add_document
+        coll, encoded = sync_env
+        add_document(self._spec(150), "sartname.pdf", doc_type="pdf")
+        before = len(coll.rows)
+        encoded.clear()
+
+        add_document(self._spec(75), "sartname.pdf", doc_type="pdf")
+        assert len(coll.rows) < before
+        assert all(r["metadata"]["total_chunks"] == len(coll.rows) for r in coll.rows.values())
+        assert not any("Bölüm 100 " in r["document"] for r in coll.rows.values())
+        assert len(encoded) <= 5
+
+    def test_metadata_change_updates_without_encoding(self, sync_env):
+        from app.rag.vector_store import add_document
+        coll, encoded = sync_env
+        text = self._spec(10)
+        add_document(text, "el_kitabi.docx", doc_type="docx", metadata={"department": "Üretim"})
+        encoded.clear()
+
+        add_document(text, "el_kitabi.docx", doc_type="docx", metadata={"department": "Kalite"})
+        assert encoded == []
+        assert coll.calls[-1][0] == "update"
+        assert {r["metadata"]["department"] for r in coll.rows.values()} == {"Kalite"}
+
+    def test_block_boundaries_resync_after_edit(self):
+        from app.rag.incremental_ingest import split_blocks
+        original = self._spec()
+        edited = self._spec(changed=3)
+        a, b = split_blocks(original), split_blocks(edited)
+        assert "".join(a) == original and "".join(b) == edited
+        assert len(a) > 3
+        # Değişiklikten sonraki bloklar birebir aynı kalır
+        assert a[-(len(a) - 2):] == b[-(len(a) - 2):]
+
+
+# ═══════════════════════════════════════════════════
+# 8. Retrieval backend — departman bölümlü vektör indeksi
+# ═══════════════════════════════════════════════════
+
+class TestPartitionedRetrieval:
+    """Filtreli aramalar departman bölümünden, kesin aramayla aynı sonuç."""
+
+    @staticmethod
+    def _corpus(n=400, dim=16, seed=3):
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        vectors = rng.normal(size=(n, dim)).astype("float32")
+        depts = ["Finans", "Kalite", "Üretim", None]
+        metadatas = []
+        for i in range(n):
+            meta = {"type": "pdf" if i % 3 else "excel",
+                    "created_at": f"2025-{1 + i % 12:02d}-15T00:00:00"}
+            if depts[i % 4]:
+                meta["department"] = depts[i % 4]
+            metadatas.append(meta)
+        return [f"doc_{i}" for i in range(n)], vectors, metadatas
+
+    def test_parse_where(self):
+        from app.rag.retrieval_backend import parse_where
+        from app.rag.vector_store import _build_where_filter
+        where = _build_where_filter("Finans", "pdf", "2025-01-01", "2025-06-30")
+        assert parse_where(where) == {"department": "Finans", "type": "pdf",
+                                      "created_gte": "2025-01-01", "created_lte": "2025-06-30"}
+        assert parse_where({"source": "a.pdf"}) is None
+        assert parse_where({"$or": [{"type": "pdf"}]}) is None
+
+    def test_search_matches_exact_with_filters(self):
+        import numpy as np
+        from app.rag.retrieval_backend import PartitionedVectorIndex
+        ids, vectors, metadatas = self._corpus()
+        index = PartitionedVectorIndex("test")
+        index.add(ids, vectors, metadatas)
+        filters = {"department": "Kalite", "type": "pdf", "created_gte": "2025-03-01"}
+        q = vectors[7] + 0.01
+
+        def ok(m):
+            return (m.get("department") == "Kalite" and m["type"] == "pdf"
+                    and m["created_at"] >= "2025-03-01")
+        dist = ((vectors - q) ** 2).sum(axis=1)
+        expected = sorted((i for i, m in enumerate(metadatas) if ok(m)), key=lambda i: dist[i])[:5]
+        hits = index.search(q, 5, filters)
+        assert [h[0] for h in hits] == [ids[i] for i in expected]
+        assert np.allclose([h[1] for h in hits], dist[expected], atol=1e-3)
+
+    def test_update_moves_partition_and_remove(self):
+        from app.rag.retrieval_backend import PartitionedVectorIndex
+        ids, vectors, metadatas = self._corpus(n=8)
+        index = PartitionedVectorIndex("test")
+        index.add(ids, vectors, metadatas)
+        assert index.search(vectors[1], 1, {"department": "Kalite"})[0][0] == "doc_1"
+        index.update_metadata(["doc_1"], [{"department": "Finans", "type": "pdf"}])
+        assert "doc_1" not in [h[0] for h in index.search(vectors[1], 8, {"department": "Kalite"})]
+        assert index.search(vectors[1], 1, {"department": "Finans"})[0][0] == "doc_1"
+        index.remove(["doc_1"])
+        assert "doc_1" not in [h[0] for h in index.search(vectors[1], 8, {"department": "Finans"})]
+        assert index.stats()["chunks"] == 7
+
+    def test_filtered_search_skips_chroma_where(self):
+        from app.rag.retrieval_backend import get_partitioned_index
+        from app.rag.vector_store import search_documents
+        ids, vectors, metadatas = self._corpus(n=60)
+        coll = _FakeCollection()
+        coll._put("add", ids, vectors, [f"metin {i}" for i in range(len(ids))], metadatas)
+        coll.query = MagicMock()
+        model = MagicMock()
+        model.encode = MagicMock(return_value=vectors[4] + 0.01)
+        get_partitioned_index("company_documents").clear()
+        with patch("app.rag.vector_store.CHROMADB_AVAILABLE", True), \
+             patch("app.rag.vector_store.EMBEDDINGS_AVAILABLE", True), \
+             patch("app.rag.vector_store.CROSS_ENCODER_AVAILABLE", False), \
+             patch("app.rag.vector_store.get_collection", return_value=coll), \
+             patch("app.rag.vector_store.get_learned_collection", return_value=None), \
+             patch("app.rag.vector_store._keyword_supplement", return_value=[]), \
+             patch("app.rag.vector_store.get_embedding_model", return_value=model):
+            docs = search_documents("kalite raporu", n_results=3, department="Finans")
+        coll.query.assert_not_called()
+        assert docs and docs[0]["content"] == "metin 4"
+        assert {d["department"] for d in docs} == {"Finans"}
+        assert get_partitioned_index("company_documents").stats()["rebuilds"] >= 1
+        get_partitioned_index("company_documents").clear()
+
+
+# ═══════════════════════════════════════════════════
+# 9. Rerank servisi — çift skor cache'i, bütçe, birleşik batch
+# ═══════════════════════════════════════════════════
+
+class TestRerankService:
+    """Cross-encoder çağrıları cache'lenir, tekilleştirilir ve bütçeyle sınırlanır."""
+
+    @staticmethod
+    def _service(delay=0.0, **kwargs):
+        import time
+        from app.rag.reranker import RerankService
+
+        def predict(pairs, **kw):
+            time.sleep(delay)
+            return [float(len(text)) for _, text in pairs]
+
+        service = RerankService(model_name="fake", **kwargs)
+        service._model = MagicMock()
+        service._model.predict = MagicMock(side_effect=predict)
+        return service
+
+    def test_cached_and_duplicate_pairs_not_rescored(self):
+        service = self._service(time_budget_ms=0)
+        assert service.score("soru", ["a", "bb", "a"]) == [1.0, 2.0, 1.0]
+        assert service._model.predict.call_args.args[0] == [("soru", "a"), ("soru", "bb")]
+        assert service.score("soru", ["bb", "ccc"]) == [2.0, 3.0]
+        assert service._model.predict.call_args.args[0] == [("soru", "ccc")]
+        stats = service.stats()
+        assert stats["predicted"] == 3
+        assert stats["cache_hits"] == 1
+        assert stats["duplicate_pairs"] == 1
+
+    def test_time_budget_leaves_tail_unscored(self):
+        service = self._service(delay=0.05, batch_size=2, time_budget_ms=20)
+        scores = service.score("soru", [f"metin {i}" for i in range(6)])
+        assert scores[:2] == [7.0, 7.0]
+        assert scores[2:] == [None] * 4
+        assert service.stats()["skipped_budget"] == 4
+
+    def test_agentic_search_reranks_once(self, mock_chromadb, mock_embedding_model):
+        from app.rag.vector_store import agentic_search
+        mock_chromadb.query.return_value = {
+            "documents": [["Boya maliyeti 12 TL", "Dokuma maliyeti 8 TL", "Fire oranı %3"]],
+            "metadatas": [[{"source": f"rapor{i}.pdf", "type": "pdf"} for i in range(3)]],
+            "distances": [[0.3, 0.4, 0.5]],
+            "ids": [["r0", "r1", "r2"]],
+        }
+        service = self._service(time_budget_ms=0)
+        query = "boya maliyeti ile dokuma maliyeti karşılaştır"
+        with patch("app.rag.vector_store.CHROMADB_AVAILABLE", True), \
+             patch("app.rag.vector_store.EMBEDDINGS_AVAILABLE", True), \
+             patch("app.rag.vector_store.CROSS_ENCODER_AVAILABLE", True), \
+             patch("app.rag.vector_store.get_rerank_service", return_value=service), \
+             patch("app.rag.vector_store.get_collection", return_value=mock_chromadb), \
+             patch("app.rag.vector_store.get_learned_collection", return_value=None), \
+             patch("app.rag.vector_store._keyword_supplement", return_value=[]), \
+             patch("app.rag.vector_store.get_embedding_model", return_value=mock_embedding_model):
+            docs = agentic_search(query, n_results=3)
+        assert len(docs) == 3
+        assert service._model.predict.call_count == 1
+        pairs = service._model.predict.call_args.args[0]
+        assert len(pairs) == 3 and {q for q, _ in pairs} == {query}
+
+
+# ═══════════════════════════════════════════════════
+# 10. Agentic arama — batch encode, paralel alt sorgular, RRF
+# ═══════════════════════════════════════════════════
+
+class TestAgenticFanOut:
+    """Alt sorgular tek encode çağrısında, sonuçlar chunk ID'leriyle RRF."""
+
+    @staticmethod
+    def _doc(chunk_id, relevance=0.5):
+        return {"chunk_id": chunk_id, "content": f"içerik {chunk_id}", "source": "rapor.pdf",
+                "relevance": relevance}
+
+    def test_rrf_prefers_chunks_found_by_several_sub_queries(self):
+        from app.rag.vector_store import _fuse_sub_query_results
+        per_query = [
+            [self._doc("a", 0.9), self._doc("b", 0.6)],
+            [self._doc("c", 0.8), self._doc("b", 0.7)],
+        ]
+        with patch("app.rag.vector_store.CROSS_ENCODER_AVAILABLE", False):
+            docs = _fuse_sub_query_results(["boya", "dokuma"], per_query, n_results=3)
+        assert [d["chunk_id"] for d in docs] == ["b", "a", "c"]
+        assert docs[0]["relevance"] == 0.7
+        assert docs[0]["sub_query"] == "boya"
+
+    def test_same_source_different_chunks_not_boosted(self):
+        from app.rag.vector_store import _fuse_sub_query_results
+        per_query = [[self._doc("a", 0.9)], [self._doc("c", 0.8)]]
+        with patch("app.rag.vector_store.CROSS_ENCODER_AVAILABLE", False):
+            docs = _fuse_sub_query_results(["boya", "dokuma"], per_query, n_results=2)
+        # Aynı kaynak ama farklı chunk — hit-count çarpanı yok, skor değişmez
+        assert [d["relevance"] for d in docs] == [0.9, 0.8]
+
+    def test_rerank_keeps_rrf_signal(self):
+        from app.rag.vector_store import _fuse_sub_query_results
+        per_query = [
+            [self._doc("a", 0.6), self._doc("b", 0.6)],
+            [self._doc("c", 0.7), self._doc("b", 0.6)],
+        ]
+        service = MagicMock()
+        service.score.side_effect = lambda q, texts: [1.0 if t == "içerik a" else 0.0 for t in texts]
+        with patch("app.rag.vector_store.CROSS_ENCODER_AVAILABLE", True), \
+             patch("app.rag.vector_store.get_rerank_service", return_value=service):
+            docs = _fuse_sub_query_results(["boya", "dokuma"], per_query, n_results=3, query="soru")
+        # a cross-encoder'da önde; b iki alt sorguda bulunduğu için c'nin üstünde kalır
+        assert [d["chunk_id"] for d in docs] == ["a", "b", "c"]
+
+    def test_nested_call_in_rag_worker_runs_inline(self):
+        from app.rag.vector_store import _in_rag_worker, get_rag_executor
+        assert not _in_rag_worker()
+        assert get_rag_executor().submit(_in_rag_worker).result() is True
+
+    async def test_sub_queries_encoded_in_one_batch(self, mock_chromadb, mock_embedding_model):
+        from app.rag.vector_store import agentic_search, async_agentic_search
+        query = "boya maliyeti ile dokuma maliyeti karşılaştır"
+        with patch("app.rag.vector_store.CHROMADB_AVAILABLE", True), \
+             patch("app.rag.vector_store.EMBEDDINGS_AVAILABLE", True), \
+             patch("app.rag.vector_store.CROSS_ENCODER_AVAILABLE", False), \
+             patch("app.rag.vector_store.get_collection", return_value=mock_chromadb), \
+             patch("app.rag.vector_store.get_learned_collection", return_value=None), \
+             patch("app.rag.vector_store._keyword_supplement", return_value=[]), \
+             patch("app.rag.vector_store.get_embedding_model", return_value=mock_embedding_model):
+            sync_docs = agentic_search(query, n_results=3)
+            async_docs = await async_agentic_search(query, n_results=3)
+        calls = mock_embedding_model.encode.call_args_list
+        assert len(calls) == 2
+        assert all(isinstance(c.args[0], list) and len(c.args[0]) == 3 for c in calls)
+        assert mock_chromadb.query.call_count == 6
+        assert [d["chunk_id"] for d in sync_docs] == [d["chunk_id"] for d in async_docs] == ["test_0"]